@@ -1,5 +1,8 @@
 # Main package for ADK data extraction examples
 
-from . import examples
+from adk_data_extraction.lazy import lazy_exports
+
+# Examples (and google-adk with them) are imported on first use
+__getattr__ = lazy_exports(__name__, {"examples": ".examples"})
 
 __all__ = ["examples"]
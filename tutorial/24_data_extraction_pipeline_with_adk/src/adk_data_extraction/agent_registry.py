@@ -0,0 +1,233 @@
+"""
+Shared Agent Graphs
+
+Building a pipeline's agents (five or six LlmAgents with long instructions and
+output schemas) plus its runners costs far more than looking them up, and the
+result is the same every time for a given configuration. AgentRegistry builds
+each agent graph once per process and hands the same instance to every pipeline
+asking for that configuration:
+
+- graphs are keyed by a hash of their spec: the builder's name plus everything
+  that changes the agents it builds (model backend settings, the model-call
+  governor, context cache or hedging wrappers)
+- concurrent callers asking for a graph that is still being built wait for that
+  build instead of starting their own
+- a graph carries its session service, a SessionPool, the root runner and one
+  runner per sub-agent, so no runner is created per document
+- the graph's configuration hash (which renders every output schema) is
+  computed once per set of pipeline settings
+
+Shared graphs must be treated as immutable: callers that rewire agents (stand-in
+models, scripted test models) should build a private graph instead.
+
+    registry = default_agent_registry()
+    graph = registry.graph("legal_document_analysis", build_coordinator)
+    async with graph.sessions.session("legal") as session_id:
+        async for event in graph.runner.run_async(...):
+            ...
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+from google.adk import Runner
+from google.adk.sessions import InMemorySessionService
+from pydantic import BaseModel, Field
+
+from adk_data_extraction.result_cache import pipeline_config_hash
+from adk_data_extraction.sessions import SessionPool
+
+logger = logging.getLogger(__name__)
+
+# Bump when the meaning of a spec changes
+REGISTRY_FORMAT_VERSION = 1
+
+
+class RegistryStats(BaseModel):
+    """Agent registry counters"""
+
+    graphs: int = Field(description="Agent graphs currently held")
+    builds: int = Field(description="Agent graphs built")
+    hits: int = Field(description="Lookups served by an existing graph")
+    evicted: int = Field(description="Graphs dropped by the size cap")
+
+
+def agent_spec_key(name: str, *spec: Any) -> str:
+    """
+    Hash identifying an agent graph configuration.
+
+    Args:
+        name: Name of the graph builder (e.g. module and class)
+        *spec: JSON-serializable settings that change the agents built
+
+    Returns:
+        str: Hex digest used as the registry key
+    """
+    payload = json.dumps(
+        {"format": REGISTRY_FORMAT_VERSION, "name": name, "spec": spec},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+class AgentGraph:
+    """
+    An agent tree with the session service and runners that execute it.
+
+    Args:
+        root_agent: Root of the agent tree
+        app_name: ADK app name the runners are created with
+        key: Registry key (empty for graphs built outside a registry)
+    """
+
+    def __init__(self, root_agent: Any, app_name: str, key: str = ""):
+        self.key = key
+        self.root_agent = root_agent
+        self.app_name = app_name
+        self.session_service = InMemorySessionService()
+        # Unique session per run, deleted afterwards, so concurrent users of a
+        # shared graph never see each other's sessions
+        self.sessions = SessionPool(self.session_service, app_name)
+        self.runner = self._runner(root_agent)
+        self._agent_runners: dict[str, Runner] | None = None
+        self._config_hashes: dict[tuple[Any, ...], str] = {}
+        self._lock = threading.Lock()
+
+    def _runner(self, agent: Any) -> Runner:
+        return Runner(
+            agent=agent, app_name=self.app_name, session_service=self.session_service
+        )
+
+    @property
+    def agent_runners(self) -> dict[str, Runner]:
+        """One runner per sub-agent, all on the graph's session service
+
+        Created on first use, so graphs only driven through the root runner
+        never build them.
+        """
+        with self._lock:
+            if self._agent_runners is None:
+                self._agent_runners = {
+                    agent.name: self._runner(agent)
+                    for agent in self.root_agent.sub_agents
+                }
+            return self._agent_runners
+
+    def config_hash(self, *extra: Any) -> str:
+        """pipeline_config_hash of the graph, computed once per ``extra``"""
+        with self._lock:
+            if extra not in self._config_hashes:
+                self._config_hashes[extra] = pipeline_config_hash(
+                    self.root_agent, *extra
+                )
+            return self._config_hashes[extra]
+
+
+class AgentRegistry:
+    """
+    Builds agent graphs once and shares them across pipelines.
+
+    Args:
+        max_graphs: Graphs kept; the least recently used one is dropped beyond
+            that (pipelines already holding it keep working)
+    """
+
+    def __init__(self, max_graphs: int = 32):
+        if max_graphs < 1:
+            raise ValueError("max_graphs must be at least 1")
+        self.max_graphs = max_graphs
+        self._graphs: OrderedDict[str, AgentGraph] = OrderedDict()
+        self._building: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._builds = 0
+        self._hits = 0
+        self._evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+    def _lookup(self, key: str) -> AgentGraph | None:
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is not None:
+                self._graphs.move_to_end(key)
+                self._hits += 1
+            return graph
+
+    def graph(
+        self,
+        name: str,
+        build: Callable[[], Any],
+        *spec: Any,
+        app_name: str | None = None,
+    ) -> AgentGraph:
+        """
+        The shared graph for a configuration, building it on first request.
+
+        Args:
+            name: Name of the graph builder; graphs of different builders never
+                share a key
+            build: Returns the root agent; called once per key
+            *spec: Settings that change the agents ``build`` returns
+            app_name: ADK app name for the runners (defaults to ``name``)
+
+        Returns:
+            AgentGraph: The same instance for every request with this spec
+        """
+        key = agent_spec_key(name, *spec)
+        graph = self._lookup(key)
+        if graph is not None:
+            return graph
+
+        # One build per key, even with many pipelines created at once
+        with self._lock:
+            building = self._building.setdefault(key, threading.Lock())
+        with building:
+            graph = self._lookup(key)
+            if graph is not None:
+                return graph
+            graph = AgentGraph(build(), app_name or name, key)
+            with self._lock:
+                self._graphs[key] = graph
+                self._builds += 1
+                self._building.pop(key, None)
+                while len(self._graphs) > self.max_graphs:
+                    victim, _ = self._graphs.popitem(last=False)
+                    logger.info(f"Agent registry full, dropping graph {victim}")
+                    self._evicted += 1
+        logger.info(f"Built agent graph {name} ({key})")
+        return graph
+
+    def clear(self) -> None:
+        """Drop every graph (pipelines holding one keep using it)"""
+        with self._lock:
+            self._graphs.clear()
+
+    def stats(self) -> RegistryStats:
+        """Current registry counters"""
+        with self._lock:
+            return RegistryStats(
+                graphs=len(self._graphs),
+                builds=self._builds,
+                hits=self._hits,
+                evicted=self._evicted,
+            )
+
+
+_default_registry: AgentRegistry | None = None
+_default_lock = threading.Lock()
+
+
+def default_agent_registry() -> AgentRegistry:
+    """The process-wide registry, created on first use"""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = AgentRegistry()
+        return _default_registry
@@ -0,0 +1,218 @@
+"""
+Bounded-Concurrency Batch Processing
+
+This module provides the batch driver behind the pipelines' ``process_documents``
+APIs. Documents are pulled lazily from a sync or async iterable, at most
+``concurrency`` of them are in flight at once, and each result is yielded as soon
+as it completes, so a backfill is limited by model latency per document rather
+than by the sum of all round trips.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable
+from typing import TypeVar
+
+from pydantic import BaseModel, Field
+
+from adk_data_extraction.stage_metrics import StageAggregator, StageMetrics, StageTotals
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class BatchReport(BaseModel):
+    """Aggregate throughput and latency for a batch run"""
+
+    documents: int = Field(description="Number of documents processed")
+    failed: int = Field(description="Number of documents whose processing failed")
+    concurrency: int = Field(description="Maximum number of documents in flight")
+    wall_time_ms: int = Field(description="Elapsed time for the whole batch")
+    throughput_docs_per_sec: float = Field(description="Documents completed per second")
+    mean_latency_ms: float = Field(description="Mean per-document latency")
+    p50_latency_ms: float = Field(description="Median per-document latency")
+    p95_latency_ms: float = Field(description="95th percentile per-document latency")
+    max_latency_ms: float = Field(description="Slowest per-document latency")
+    stages: dict[str, StageTotals] = Field(
+        default_factory=dict, description="Per-agent stage totals for the batch"
+    )
+
+    def summary(self) -> str:
+        """One-line human readable summary for logs"""
+        return (
+            f"{self.documents} documents ({self.failed} failed) in {self.wall_time_ms}ms "
+            f"at concurrency {self.concurrency}: {self.throughput_docs_per_sec:.2f} docs/sec, "
+            f"latency p50={self.p50_latency_ms:.0f}ms p95={self.p95_latency_ms:.0f}ms "
+            f"max={self.max_latency_ms:.0f}ms"
+        )
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (0.0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class BatchStats:
+    """Collects per-document latencies while a batch is running.
+
+    Pass an instance to ``process_documents`` to read the aggregate
+    ``BatchReport`` once the batch has been consumed.
+    """
+
+    def __init__(self) -> None:
+        self.concurrency = 1
+        self.latencies_ms: list[float] = []
+        self.failed = 0
+        self.stages = StageAggregator()
+        self._started: float | None = None
+        self._finished: float | None = None
+
+    def start(self, concurrency: int) -> None:
+        """Mark the beginning of the batch, discarding anything recorded before"""
+        self.concurrency = concurrency
+        self.latencies_ms = []
+        self.failed = 0
+        self.stages = StageAggregator()
+        self._started = time.perf_counter()
+        self._finished = None
+
+    def finish(self) -> None:
+        """Mark the end of the batch"""
+        self._finished = time.perf_counter()
+
+    def record(
+        self,
+        latency_ms: float,
+        failed: bool = False,
+        stage_metrics: list[StageMetrics] | None = None,
+    ) -> None:
+        """Record the latency (and optional stage metrics) of one completed document"""
+        self.latencies_ms.append(latency_ms)
+        if failed:
+            self.failed += 1
+        if stage_metrics:
+            self.stages.add(stage_metrics)
+
+    def report(self) -> BatchReport:
+        """Build the aggregate report for everything recorded so far"""
+        if self._started is None:
+            wall_seconds = 0.0
+        else:
+            wall_seconds = (self._finished or time.perf_counter()) - self._started
+        documents = len(self.latencies_ms)
+        return BatchReport(
+            documents=documents,
+            failed=self.failed,
+            concurrency=self.concurrency,
+            wall_time_ms=int(wall_seconds * 1000),
+            throughput_docs_per_sec=documents / wall_seconds if wall_seconds else 0.0,
+            mean_latency_ms=sum(self.latencies_ms) / documents if documents else 0.0,
+            p50_latency_ms=percentile(self.latencies_ms, 50),
+            p95_latency_ms=percentile(self.latencies_ms, 95),
+            max_latency_ms=max(self.latencies_ms, default=0.0),
+            stages=self.stages.report(),
+        )
+
+
+async def _iterate(items: Iterable[T] | AsyncIterable[T]) -> AsyncIterator[T]:
+    """Adapt a sync or async iterable to an async iterator"""
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def process_concurrently(
+    process: Callable[[T], Awaitable[R]],
+    items: Iterable[T] | AsyncIterable[T],
+    concurrency: int = 4,
+    stats: BatchStats | None = None,
+    is_failure: Callable[[R], bool] | None = None,
+    stage_metrics: Callable[[R], list[StageMetrics]] | None = None,
+    on_error: Callable[[T, Exception], R] | None = None,
+) -> AsyncIterator[R]:
+    """
+    Run ``process`` over ``items`` with at most ``concurrency`` calls in flight.
+
+    Items are pulled from the source only when a slot frees up, so arbitrarily
+    large (or unbounded) iterables are never materialised. Results are yielded
+    in completion order. If the consumer stops early, in-flight work is cancelled.
+    An item whose ``process`` call raises becomes the failed result ``on_error``
+    builds for it, so one bad document never loses the rest of the batch.
+
+    Args:
+        process: Coroutine function applied to each item
+        items: Sync or async iterable of inputs
+        concurrency: Maximum number of concurrent ``process`` calls
+        stats: Optional collector for the aggregate throughput/latency report
+        is_failure: Optional predicate marking a returned result as failed
+        stage_metrics: Optional accessor for a result's per-agent stage metrics
+        on_error: Builds the result for an item whose ``process`` call raised;
+            without it the exception propagates and ends the batch
+
+    Yields:
+        Each result as soon as its ``process`` call completes
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    stats = stats if stats is not None else BatchStats()
+    stats.start(concurrency)
+    source = _iterate(items)
+    pending: set[asyncio.Task] = set()
+    exhausted = False
+
+    async def timed(item: T) -> tuple[R, float, bool]:
+        started = time.perf_counter()
+        try:
+            result = await process(item)
+            failed = bool(is_failure and is_failure(result))
+        except Exception as e:
+            if on_error is None:
+                raise
+            logger.error(f"Batch item failed: {type(e).__name__}: {e}")
+            result, failed = on_error(item, e), True
+        return result, (time.perf_counter() - started) * 1000, failed
+
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    item = await anext(source)
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(timed(item)))
+
+            if not pending:
+                break
+
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                result, latency_ms, failed = task.result()
+                stats.record(
+                    latency_ms,
+                    failed=failed,
+                    stage_metrics=stage_metrics(result) if stage_metrics else None,
+                )
+                yield result
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        await source.aclose()
+        stats.finish()
+        logger.info(f"Batch finished: {stats.report().summary()}")
@@ -0,0 +1,509 @@
+"""
+Pipeline Benchmark Suite
+
+Drives each example pipeline over the bundled corpora at several concurrency
+levels against StandInLlm, a local model that answers any request with
+schema-valid JSON (or plain text) after a configurable, jittered delay. No
+network access or API key is needed, so runs are comparable across commits.
+
+Each (pipeline, concurrency) run reports docs/sec, p50/p95/p99 latency, model
+calls per document and peak RSS. By default every run happens in a fresh
+subprocess so peak RSS is per run rather than a process-wide high-water mark.
+Results are written as JSON together with the commit they were measured on:
+
+    python -m adk_data_extraction.benchmark --concurrency 1 4 16
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import platform
+import random
+import resource
+import subprocess
+import sys
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from datetime import UTC, datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+from google.adk import Runner
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from pydantic import BaseModel, Field, PrivateAttr
+
+from adk_data_extraction.batch import BatchStats, percentile, process_concurrently
+from adk_data_extraction.context_cache import (
+    ContextCache,
+    StandInContextCacheBackend,
+    static_prefix,
+)
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_FORMAT_VERSION = 1
+
+
+class StandInLlm(BaseLlm):
+    """
+    Local model answering every request after a simulated delay.
+
+    Requests with a response schema get a JSON object that validates against it;
+    others get a short text answer. Token usage is estimated at four characters
+    per token. Requests naming a ``cached_content`` handle of ``context_cache``
+    only pay latency for the tokens actually sent.
+    """
+
+    latency_ms: float = 50.0
+    ms_per_1k_prompt_tokens: float = 0.0
+    jitter: float = 0.2
+    seed: int = 0
+    context_cache: StandInContextCacheBackend | None = None
+    calls: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+
+    _random: random.Random = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._random = random.Random(self.seed)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        sent_tokens = (
+            sum(
+                len(part.text or "")
+                for content in llm_request.contents
+                for part in content.parts or []
+            )
+            // 4
+        )
+        cached_tokens = 0
+        handle_name = getattr(llm_request.config, "cached_content", None)
+        if handle_name:
+            handle = self.context_cache and self.context_cache.resolve(handle_name)
+            if not handle:
+                raise ValueError(f"Unknown or expired cached content {handle_name}")
+            cached_tokens = handle.prefix_tokens
+        else:
+            sent_tokens += static_prefix(llm_request).estimated_tokens
+        self.prompt_tokens += sent_tokens
+        self.cached_tokens += cached_tokens
+
+        delay = self.latency_ms * (1 + self._random.uniform(-1, 1) * self.jitter)
+        delay += self.ms_per_1k_prompt_tokens * sent_tokens / 1000
+        await asyncio.sleep(max(delay, 0) / 1000)
+
+        schema = getattr(llm_request.config, "response_schema", None)
+        if isinstance(schema, type) and issubclass(schema, BaseModel):
+            json_schema = schema.model_json_schema()
+            text = json.dumps(_fill(json_schema, json_schema.get("$defs", {})))
+        else:
+            text = "Stand-in analysis: the document was processed."
+
+        yield LlmResponse(
+            content=types.Content(
+                role="model", parts=[types.Part.from_text(text=text)]
+            ),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=sent_tokens + cached_tokens,
+                cached_content_token_count=cached_tokens or None,
+                candidates_token_count=len(text) // 4,
+            ),
+        )
+
+
+def _fill(schema: dict[str, Any], defs: dict[str, Any]) -> Any:
+    """A minimal value that validates against a JSON schema"""
+    if "$ref" in schema:
+        return _fill(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        return _fill(options[0], defs) if options else None
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            name: _fill(prop, defs)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    return {
+        "array": [],
+        "string": "stand-in",
+        "integer": 1,
+        "number": 0.9,
+        "boolean": True,
+    }.get(kind)
+
+
+def _use_stand_in(root_agent: Any, model: BaseLlm) -> None:
+    """Point every LLM agent in the tree at the stand-in model"""
+    if hasattr(root_agent, "model"):
+        root_agent.model = model
+    for sub_agent in root_agent.sub_agents:
+        _use_stand_in(sub_agent, model)
+
+
+# Processes one document and returns whether it failed
+BenchmarkTarget = Callable[[str], Awaitable[bool]]
+
+
+def _smart_pipeline(module_name: str) -> Callable[[BaseLlm], BenchmarkTarget]:
+    """Target running a SmartDocumentExtractionPipeline in router mode"""
+
+    def build(model: BaseLlm) -> BenchmarkTarget:
+        module = importlib.import_module(f"adk_data_extraction.examples.{module_name}")
+        pipeline = module.SmartDocumentExtractionPipeline(execution_mode="router")
+        _use_stand_in(pipeline.coordinator_agent, model)
+
+        async def process(content: str) -> bool:
+            result = await pipeline.process_document(content)
+            return result.pipeline_status == "failed"
+
+        return process
+
+    return build
+
+
+def _agent_runner(
+    module_name: str, agent_name: str
+) -> Callable[[BaseLlm], BenchmarkTarget]:
+    """Target running a module-level agent (tree) directly with a Runner"""
+
+    def build(model: BaseLlm) -> BenchmarkTarget:
+        module = importlib.import_module(f"adk_data_extraction.examples.{module_name}")
+        agent = getattr(module, agent_name).clone()
+        _use_stand_in(agent, model)
+        session_service = InMemorySessionService()
+        runner = Runner(
+            agent=agent, app_name="benchmark", session_service=session_service
+        )
+
+        async def process(content: str) -> bool:
+            session = await session_service.create_session(
+                app_name="benchmark", user_id="benchmark"
+            )
+            try:
+                async for _event in runner.run_async(
+                    user_id="benchmark",
+                    session_id=session.id,
+                    new_message=types.Content(
+                        role="user", parts=[types.Part.from_text(text=content)]
+                    ),
+                ):
+                    pass
+                return False
+            except Exception as e:
+                logger.error(f"Benchmark run of {agent_name} failed: {e}")
+                return True
+            finally:
+                await session_service.delete_session(
+                    app_name="benchmark", user_id="benchmark", session_id=session.id
+                )
+
+        return process
+
+    return build
+
+
+PIPELINES: dict[str, Callable[[BaseLlm], BenchmarkTarget]] = {
+    "smart_document_extraction": _smart_pipeline("smart_document_extraction_pipeline"),
+    "improved_multi_agent": _smart_pipeline("improved_multi_agent_pipeline"),
+    "sequential_contract": _agent_runner(
+        "sequential_contract_pipeline.pipeline", "service_contract_pipeline"
+    ),
+    "legal_analysis": _agent_runner("legal_document_analysis.analysis", "legal_agent"),
+    "contact_extraction": _agent_runner(
+        "basic_contact_extraction.extraction", "contact_extractor"
+    ),
+}
+
+
+def load_corpus(sample_file: str | Path | None = "sample_contract.txt") -> list[str]:
+    """
+    Bundled benchmark documents.
+
+    Args:
+        sample_file: Optional extra document (skipped if it does not exist)
+
+    Returns:
+        list[str]: SAMPLE_CONTRACTS, the sequential pipeline's sample service
+            contract and the sample file, without duplicates
+    """
+    from adk_data_extraction.examples.sequential_contract_pipeline import pipeline
+    from adk_data_extraction.examples.sequential_contract_pipeline.data import (
+        SAMPLE_CONTRACTS,
+    )
+
+    documents = [*SAMPLE_CONTRACTS.values(), pipeline.SAMPLE_SERVICE_CONTRACT]
+    if sample_file and Path(sample_file).exists():
+        documents.append(Path(sample_file).read_text())
+    return list(dict.fromkeys(document.strip() for document in documents))
+
+
+class BenchmarkResult(BaseModel):
+    """Throughput, latency and footprint of one pipeline at one concurrency"""
+
+    pipeline: str = Field(description="Benchmarked pipeline")
+    concurrency: int = Field(description="Maximum documents in flight")
+    documents: int = Field(description="Documents processed")
+    failed: int = Field(description="Documents whose processing failed")
+    wall_time_ms: int = Field(description="Elapsed time for the run")
+    docs_per_sec: float = Field(description="Documents completed per second")
+    mean_latency_ms: float = Field(description="Mean per-document latency")
+    p50_latency_ms: float = Field(description="Median per-document latency")
+    p95_latency_ms: float = Field(description="95th percentile latency")
+    p99_latency_ms: float = Field(description="99th percentile latency")
+    context_cache: bool = Field(description="Whether static prefixes were cached")
+    model_calls_per_document: float = Field(description="Stand-in model calls / doc")
+    prompt_tokens_per_call: float = Field(description="Prompt tokens sent per call")
+    cached_tokens_per_call: float = Field(
+        description="Prompt tokens served from a cached prefix per call"
+    )
+    peak_rss_mb: float = Field(description="Peak resident set size of the process")
+
+
+class BenchmarkRun(BaseModel):
+    """A complete benchmark run, as stored on disk"""
+
+    format: int = Field(default=BENCHMARK_FORMAT_VERSION)
+    started_at: str = Field(description="UTC start time (ISO 8601)")
+    git_commit: str | None = Field(description="Commit the run was measured on")
+    python: str = Field(description="Python version")
+    platform: str = Field(description="Platform string")
+    settings: dict[str, Any] = Field(description="Benchmark settings")
+    results: list[BenchmarkResult] = Field(description="One entry per run")
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+async def benchmark_pipeline(
+    pipeline: str,
+    corpus: list[str],
+    concurrency: int,
+    documents: int,
+    latency_ms: float = 50.0,
+    ms_per_1k_prompt_tokens: float = 0.0,
+    context_cache: bool = False,
+) -> BenchmarkResult:
+    """
+    Benchmark one pipeline at one concurrency level.
+
+    Args:
+        pipeline: Key of PIPELINES
+        corpus: Documents, cycled through until ``documents`` are processed
+        concurrency: Maximum documents in flight
+        documents: Number of documents to process
+        latency_ms: Mean stand-in model latency
+        ms_per_1k_prompt_tokens: Extra stand-in latency per 1000 prompt tokens sent
+        context_cache: Cache each agent's static prefix (stand-in handles)
+
+    Returns:
+        BenchmarkResult: Measurements for the run
+    """
+    backend = StandInContextCacheBackend() if context_cache else None
+    stand_in = StandInLlm(
+        model="stand-in",
+        latency_ms=latency_ms,
+        ms_per_1k_prompt_tokens=ms_per_1k_prompt_tokens,
+        context_cache=backend,
+    )
+    # The stand-in has no minimum cacheable prefix size
+    cache = ContextCache(backend, min_prefix_tokens=0) if backend else None
+    model = cache.wrap(stand_in) if cache else stand_in
+    process = PIPELINES[pipeline](model)
+    stats = BatchStats()
+    items = (corpus[index % len(corpus)] for index in range(documents))
+    async for _failed in process_concurrently(
+        process, items, concurrency, stats, is_failure=bool, on_error=lambda *_: True
+    ):
+        pass
+    report = stats.report()
+    calls = max(stand_in.calls, 1)
+    return BenchmarkResult(
+        pipeline=pipeline,
+        concurrency=concurrency,
+        documents=report.documents,
+        failed=report.failed,
+        wall_time_ms=report.wall_time_ms,
+        docs_per_sec=round(report.throughput_docs_per_sec, 3),
+        mean_latency_ms=round(report.mean_latency_ms, 1),
+        p50_latency_ms=round(report.p50_latency_ms, 1),
+        p95_latency_ms=round(report.p95_latency_ms, 1),
+        p99_latency_ms=round(percentile(stats.latencies_ms, 99), 1),
+        context_cache=context_cache,
+        model_calls_per_document=stand_in.calls / documents if documents else 0.0,
+        prompt_tokens_per_call=round(stand_in.prompt_tokens / calls, 1),
+        cached_tokens_per_call=round(stand_in.cached_tokens / calls, 1),
+        peak_rss_mb=round(peak_rss_mb(), 1),
+    )
+
+
+def _run_isolated(*args: Any) -> dict[str, Any]:
+    """Subprocess entry point for one benchmark run"""
+    logging.basicConfig(level=logging.WARNING)
+    return asyncio.run(benchmark_pipeline(*args)).model_dump()
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    pipelines: list[str],
+    concurrency_levels: list[int],
+    documents: int = 32,
+    latency_ms: float = 50.0,
+    ms_per_1k_prompt_tokens: float = 0.0,
+    context_cache: bool = False,
+    sample_file: str | Path | None = "sample_contract.txt",
+    isolate: bool = True,
+) -> BenchmarkRun:
+    """
+    Benchmark every pipeline at every concurrency level.
+
+    Args:
+        pipelines: Keys of PIPELINES to run
+        concurrency_levels: Concurrency levels to run each pipeline at
+        documents: Documents per run
+        latency_ms: Mean stand-in model latency
+        ms_per_1k_prompt_tokens: Extra stand-in latency per 1000 prompt tokens sent
+        context_cache: Cache each agent's static prefix (stand-in handles)
+        sample_file: Extra corpus document
+        isolate: Run each measurement in a fresh subprocess
+
+    Returns:
+        BenchmarkRun: Settings, environment and results
+    """
+    unknown = set(pipelines) - set(PIPELINES)
+    if unknown:
+        raise ValueError(
+            f"Unknown pipelines {sorted(unknown)}, expected one of {list(PIPELINES)}"
+        )
+    started_at = datetime.now(UTC).isoformat(timespec="seconds")
+    corpus = load_corpus(sample_file)
+
+    results = []
+    for pipeline in pipelines:
+        for concurrency in concurrency_levels:
+            args = (
+                pipeline,
+                corpus,
+                concurrency,
+                documents,
+                latency_ms,
+                ms_per_1k_prompt_tokens,
+                context_cache,
+            )
+            if isolate:
+                with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+                    measured = pool.submit(_run_isolated, *args).result()
+                result = BenchmarkResult(**measured)
+            else:
+                result = asyncio.run(benchmark_pipeline(*args))
+            logger.info(
+                f"{pipeline} @ {concurrency}: {result.docs_per_sec:.2f} docs/sec, "
+                f"p50={result.p50_latency_ms:.0f}ms p99={result.p99_latency_ms:.0f}ms"
+            )
+            results.append(result)
+
+    return BenchmarkRun(
+        started_at=started_at,
+        git_commit=_git_commit(),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        settings={
+            "documents": documents,
+            "latency_ms": latency_ms,
+            "ms_per_1k_prompt_tokens": ms_per_1k_prompt_tokens,
+            "context_cache": context_cache,
+            "corpus_documents": len(corpus),
+            "isolated": isolate,
+        },
+        results=results,
+    )
+
+
+def save_run(run: BenchmarkRun, output_dir: str | Path) -> Path:
+    """Write a run to ``<output_dir>/benchmark-<timestamp>-<commit>.json``"""
+    directory = Path(output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = run.started_at.replace(":", "").replace("-", "").split("+")[0]
+    path = directory / f"benchmark-{stamp}-{run.git_commit or 'unknown'}.json"
+    path.write_text(run.model_dump_json(indent=2))
+    return path
+
+
+def _print_table(run: BenchmarkRun) -> None:
+    print(
+        f"{'pipeline':<28}{'conc':>5}{'docs/s':>9}{'p50':>8}{'p95':>8}{'p99':>8}"
+        f"{'calls/doc':>11}{'tok/call':>10}{'rss MB':>9}{'failed':>8}"
+    )
+    for result in run.results:
+        print(
+            f"{result.pipeline:<28}{result.concurrency:>5}{result.docs_per_sec:>9.2f}"
+            f"{result.p50_latency_ms:>8.0f}{result.p95_latency_ms:>8.0f}"
+            f"{result.p99_latency_ms:>8.0f}{result.model_calls_per_document:>11.2f}"
+            f"{result.prompt_tokens_per_call:>10.0f}"
+            f"{result.peak_rss_mb:>9.1f}{result.failed:>8}"
+        )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """CLI entry point for the benchmark suite"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--pipelines", nargs="+", default=list(PIPELINES), choices=list(PIPELINES)
+    )
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--documents", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=20.0)
+    parser.add_argument(
+        "--context-cache", action="store_true", help="Cache static agent prefixes"
+    )
+    parser.add_argument("--sample-file", default="sample_contract.txt")
+    parser.add_argument("--output-dir", default="benchmarks/results")
+    parser.add_argument(
+        "--no-isolate", action="store_true", help="Run everything in this process"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    run = run_benchmarks(
+        args.pipelines,
+        args.concurrency,
+        documents=args.documents,
+        latency_ms=args.latency_ms,
+        ms_per_1k_prompt_tokens=args.ms_per_1k_tokens,
+        context_cache=args.context_cache,
+        sample_file=args.sample_file,
+        isolate=not args.no_isolate,
+    )
+    _print_table(run)
+    print(f"\nResults written to {save_run(run, args.output_dir)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Map-Reduce Chunked Extraction
+
+A long contract sent as one user message either exceeds the model's limits or
+turns into one very slow serial call. DocumentChunker splits such documents into
+overlapping, section-aware chunks; the pipeline runs the specialist on the chunks
+concurrently and merges the partial extractions with ``merge_extractions``:
+
+- list fields (parties, payment_terms, key_obligations, line_items, ...) are
+  unioned and de-duplicated, keeping first-seen order
+- scalar fields are resolved by majority vote across chunks, ties going to the
+  earliest chunk (titles, parties and totals usually appear first); a schema
+  default, a zero or a placeholder ("N/A", "unknown", ...) only wins when no
+  chunk found anything else, since chunks that never mention e.g. the currency
+  or the total all report one
+
+Latency then grows with ``ceil(chunks / concurrency)`` model calls rather than
+with document length.
+"""
+
+import json
+import re
+from collections import Counter
+from typing import Any
+
+# Paragraphs opening a section: "ARTICLE 4", "Section 2.1", "3. Payment", "EXHIBIT A"
+_HEADING = re.compile(
+    r"(?:ARTICLE|Article|SECTION|Section|SCHEDULE|Schedule|EXHIBIT|Exhibit|APPENDIX"
+    r"|Appendix)\b|\d+(?:\.\d+)*[.)]?\s+[A-Z]|[A-Z][A-Z0-9 ,&'/-]{3,}$"
+)
+
+
+class DocumentChunker:
+    """
+    Splits long documents into overlapping, section-aware chunks.
+
+    Args:
+        max_chars: Target maximum chunk size; documents up to this size are not split
+        overlap_chars: Trailing context of the previous chunk repeated at the
+            start of the next, so facts spanning a boundary are not lost
+        concurrency: Maximum number of chunks extracted at once
+    """
+
+    def __init__(
+        self, max_chars: int = 8000, overlap_chars: int = 400, concurrency: int = 4
+    ):
+        if overlap_chars + 2 >= max_chars:
+            raise ValueError("overlap_chars must be smaller than max_chars")
+        self.max_chars = max_chars
+        self.overlap_chars = overlap_chars
+        self.concurrency = concurrency
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the chunking settings (for result-cache keys)"""
+        return f"chunks:{self.max_chars}:{self.overlap_chars}"
+
+    def _units(self, text: str) -> list[str]:
+        """Paragraphs, with oversized ones split at line and then word boundaries"""
+        # Leave room for the overlap (and its separator) prepended to a chunk
+        limit = self.max_chars - self.overlap_chars - 2
+        units = []
+        for paragraph in re.split(r"\n\s*\n", text.strip()):
+            while len(paragraph) > limit:
+                cut = paragraph.rfind("\n", 0, limit)
+                if cut <= 0:
+                    cut = paragraph.rfind(" ", 0, limit)
+                if cut <= 0:
+                    cut = limit
+                units.append(paragraph[:cut])
+                paragraph = paragraph[cut:].lstrip()
+            if paragraph:
+                units.append(paragraph)
+        return units
+
+    def _overlap(self, chunk: str) -> str:
+        """Tail of a chunk to repeat, starting at a line boundary when possible"""
+        tail = chunk[-self.overlap_chars :]
+        newline = tail.find("\n")
+        return tail[newline + 1 :] if 0 <= newline < len(tail) - 1 else tail
+
+    def split(self, text: str) -> list[str]:
+        """
+        Split a document into chunks.
+
+        Chunks are packed from whole paragraphs; a section heading starts a new
+        chunk once the current one is at least half full.
+
+        Returns:
+            list[str]: The document itself if it fits in one chunk
+        """
+        if len(text) <= self.max_chars:
+            return [text]
+
+        chunks: list[str] = []
+        current: list[str] = []
+        size = 0
+        for unit in self._units(text):
+            budget = self.max_chars - (self.overlap_chars if chunks else 0)
+            at_heading = _HEADING.match(unit) is not None and size >= budget // 2
+            if current and (size + len(unit) + 2 > budget or at_heading):
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+            current.append(unit)
+            size += len(unit) + 2
+        if current:
+            chunks.append("\n\n".join(current))
+
+        return [chunks[0]] + [
+            f"{self._overlap(previous)}\n\n{chunk}"
+            for previous, chunk in zip(chunks, chunks[1:], strict=False)
+        ]
+
+
+# What a chunk reports for a required field it has no evidence for
+_PLACEHOLDERS = frozenset(
+    {
+        "n/a",
+        "na",
+        "none",
+        "null",
+        "unknown",
+        "not found",
+        "not specified",
+        "not provided",
+        "not available",
+        "not mentioned",
+        "-",
+    }
+)
+
+
+def _is_placeholder(value: Any) -> bool:
+    """Zero or a placeholder string: no evidence of the actual value"""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold() in _PLACEHOLDERS
+    return isinstance(value, int | float) and not isinstance(value, bool) and value == 0
+
+
+def _normalized(value: Any) -> str:
+    """Comparison key ignoring case and whitespace differences"""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def merge_extractions(
+    partials: list[dict[str, Any]], defaults: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """
+    Merge partial extractions from the chunks of one document.
+
+    Args:
+        partials: Extractions in chunk order
+        defaults: Schema default of each field; values equal to it, zeros and
+            placeholders are only used when no chunk has another value
+
+    Returns:
+        dict: Lists unioned and de-duplicated, scalars resolved by majority vote
+            with ties going to the earliest chunk
+    """
+    merged: dict[str, Any] = {}
+    fields = dict.fromkeys(field for partial in partials for field in partial)
+    for field in fields:
+        values = [partial[field] for partial in partials if field in partial]
+        if any(isinstance(value, list) for value in values):
+            seen: set[str] = set()
+            items = []
+            for value in values:
+                for item in value if isinstance(value, list) else [value]:
+                    key = _normalized(item)
+                    if (
+                        item not in (None, "")
+                        and not _is_placeholder(item)
+                        and key not in seen
+                    ):
+                        seen.add(key)
+                        items.append(item)
+            merged[field] = items
+            continue
+
+        present = [value for value in values if value not in (None, "")]
+        if not present:
+            merged[field] = values[0] if values else None
+            continue
+        default = (
+            _normalized(defaults[field]) if defaults and field in defaults else None
+        )
+        present = [
+            value
+            for value in present
+            if not _is_placeholder(value) and _normalized(value) != default
+        ] or present
+        votes = Counter(_normalized(value) for value in present)
+        top = max(votes.values())
+        # First value (in chunk order) among those with the most votes
+        merged[field] = next(
+            value for value in present if votes[_normalized(value)] == top
+        )
+    return merged
@@ -0,0 +1,367 @@
+"""
+Static-Instruction Context Caching
+
+Every model call resends the agent's long static prompt (system instruction,
+tool declarations, output schema) together with the per-document content.
+ContextCache wraps each agent's model in a ContextCachingLlm that registers the
+static prefix with a cache backend once, keeps the returned cached-content handle,
+and from then on sends only the per-document contents with
+``config.cached_content`` pointing at the handle.
+
+Backends:
+- GeminiContextCacheBackend: Gemini explicit context caching
+  (``client.aio.caches.create``); the output schema stays in the request, as the
+  API requires
+- StandInContextCacheBackend: in-memory handles for local runs, understood by
+  the benchmark's StandInLlm
+
+Prefixes shorter than ``min_prefix_tokens`` (the API has a minimum) are sent
+uncached. So are prefixes that fail to register, until the registration is
+retried after a backoff (``retry_after`` seconds, doubling with every further
+failure). ContextCache.report() compares prompt tokens sent and latency of
+cached versus uncached requests.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncGenerator
+from typing import Any, Protocol
+
+from google.adk.models import BaseLlm, LLMRegistry, LlmRequest, LlmResponse
+from google.genai import types
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+# Re-register handles this close to expiry
+_EXPIRY_MARGIN_SECONDS = 60
+
+# Longest wait before retrying a failed registration
+_MAX_RETRY_SECONDS = 3600
+
+
+class CacheHandle(BaseModel):
+    """A registered static prefix"""
+
+    name: str = Field(description="Cached-content resource name")
+    model: str = Field(description="Model the cache was created for")
+    prefix_tokens: int = Field(description="Tokens held by the cache")
+    expires_at: float = Field(description="Unix time the cache expires")
+
+
+class StaticPrefix(BaseModel):
+    """The static part of a request: instruction, tools and output schema"""
+
+    model: str
+    system_instruction: str | None = None
+    tools: list[dict[str, Any]] = Field(default_factory=list)
+    tool_config: dict[str, Any] | None = None
+    response_schema: dict[str, Any] | None = None
+
+    @property
+    def key(self) -> str:
+        """Identifies the prefix (and model) for handle lookups"""
+        payload = self.model_dump_json()
+        return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+    @property
+    def estimated_tokens(self) -> int:
+        """Rough token count at four characters per token"""
+        return len(self.model_dump_json()) // 4
+
+
+class ContextCacheBackend(Protocol):
+    """Interface for services that hold cached prefixes"""
+
+    async def create(self, prefix: StaticPrefix, request: LlmRequest) -> CacheHandle:
+        """Register a static prefix and return its handle"""
+        ...
+
+
+class StandInContextCacheBackend:
+    """In-memory cached-content handles for local runs and tests"""
+
+    def __init__(self, ttl_seconds: int = 3600):
+        self.ttl_seconds = ttl_seconds
+        self.handles: dict[str, CacheHandle] = {}
+
+    async def create(self, prefix: StaticPrefix, request: LlmRequest) -> CacheHandle:
+        handle = CacheHandle(
+            name=f"cachedContents/standin-{prefix.key}-{len(self.handles)}",
+            model=prefix.model,
+            prefix_tokens=prefix.estimated_tokens,
+            expires_at=time.time() + self.ttl_seconds,
+        )
+        self.handles[handle.name] = handle
+        return handle
+
+    def resolve(self, name: str) -> CacheHandle | None:
+        """The live handle with this name, or None if unknown or expired"""
+        handle = self.handles.get(name)
+        if handle is None or handle.expires_at <= time.time():
+            return None
+        return handle
+
+
+class GeminiContextCacheBackend:
+    """Gemini explicit context caching through the google-genai client"""
+
+    def __init__(self, ttl_seconds: int = 3600, client: Any = None):
+        self.ttl_seconds = ttl_seconds
+        self._client = client
+
+    def _api_client(self, model: str) -> Any:
+        if self._client is None:
+            self._client = LLMRegistry.new_llm(model).api_client
+        return self._client
+
+    async def create(self, prefix: StaticPrefix, request: LlmRequest) -> CacheHandle:
+        config = request.config
+        cached = await self._api_client(prefix.model).aio.caches.create(
+            model=prefix.model,
+            config=types.CreateCachedContentConfig(
+                system_instruction=config.system_instruction,
+                tools=config.tools,
+                tool_config=config.tool_config,
+                ttl=f"{self.ttl_seconds}s",
+            ),
+        )
+        usage = getattr(cached, "usage_metadata", None)
+        return CacheHandle(
+            name=cached.name,
+            model=prefix.model,
+            prefix_tokens=getattr(usage, "total_token_count", None)
+            or prefix.estimated_tokens,
+            expires_at=cached.expire_time.timestamp()
+            if cached.expire_time
+            else time.time() + self.ttl_seconds,
+        )
+
+
+def static_prefix(llm_request: LlmRequest) -> StaticPrefix:
+    """Extract the static prefix of a request"""
+    config = llm_request.config
+    system = config.system_instruction
+    if system is not None and not isinstance(system, str):
+        system = "\n".join(part.text or "" for part in system.parts or [])
+    tool_config = config.tool_config
+    schema = config.response_schema
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        schema = schema.model_json_schema()
+    elif hasattr(schema, "model_dump"):
+        schema = schema.model_dump(mode="json", exclude_none=True)
+    return StaticPrefix(
+        model=llm_request.model or "",
+        system_instruction=system,
+        tools=[
+            tool.model_dump(mode="json", exclude_none=True)
+            for tool in config.tools or []
+            if hasattr(tool, "model_dump")
+        ],
+        tool_config=tool_config.model_dump(mode="json", exclude_none=True)
+        if tool_config is not None
+        else None,
+        response_schema=schema,
+    )
+
+
+class ContextCacheRecord(BaseModel):
+    """Prompt size and latency of one model call"""
+
+    model: str = Field(description="Model called")
+    cached: bool = Field(description="Whether the call used a cached prefix")
+    prompt_tokens: int = Field(description="Prompt tokens reported by the model")
+    cached_tokens: int = Field(description="Prompt tokens served from the cache")
+    latency_ms: float = Field(description="Time until the last response")
+
+
+class ContextCacheReport(BaseModel):
+    """Cached versus uncached model calls so far"""
+
+    requests: int = Field(description="Model calls seen")
+    cached_requests: int = Field(description="Calls that used a cached prefix")
+    registrations: int = Field(description="Prefixes registered with the backend")
+    cached_tokens: int = Field(description="Prompt tokens served from caches")
+    mean_prompt_tokens_sent_cached: float = Field(
+        description="Mean prompt tokens sent (excluding cached) per cached call"
+    )
+    mean_prompt_tokens_sent_uncached: float = Field(
+        description="Mean prompt tokens sent per uncached call"
+    )
+    mean_latency_ms_cached: float = Field(description="Mean latency of cached calls")
+    mean_latency_ms_uncached: float = Field(
+        description="Mean latency of uncached calls"
+    )
+
+
+def _mean(values: list[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+class ContextCache:
+    """
+    Registers static prefixes once and routes model calls through their handles.
+
+    Args:
+        backend: Service holding the cached prefixes
+        min_prefix_tokens: Estimated prefix size below which calls stay uncached
+        max_records: Number of recent per-call records kept for reporting
+        retry_after: Seconds calls stay uncached after a failed registration
+            before it is retried; doubled with every further failure
+    """
+
+    def __init__(
+        self,
+        backend: ContextCacheBackend,
+        min_prefix_tokens: int = 1024,
+        max_records: int = 1000,
+        retry_after: float = 60.0,
+    ):
+        self.backend = backend
+        self.min_prefix_tokens = min_prefix_tokens
+        self.retry_after = retry_after
+        self.records: deque[ContextCacheRecord] = deque(maxlen=max_records)
+        self.requests = 0
+        self.cached_requests = 0
+        self.registrations = 0
+        self.cached_tokens = 0
+        # None marks prefixes too short to cache
+        self._handles: dict[str, CacheHandle | None] = {}
+        # Consecutive failures and retry time of prefixes failing to register
+        self._failures: dict[str, tuple[int, float]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def wrap(self, model: str | BaseLlm) -> "ContextCachingLlm":
+        """Wrap a model (name or instance) so its calls use cached prefixes"""
+        if isinstance(model, ContextCachingLlm):
+            model = model.inner
+        if isinstance(model, str):
+            model = LLMRegistry.new_llm(model)
+        return ContextCachingLlm(model=model.model, inner=model, cache=self)
+
+    def apply(self, root_agent: Any) -> None:
+        """Wrap the model of every LLM agent in an agent tree"""
+        if getattr(root_agent, "model", None):
+            root_agent.model = self.wrap(root_agent.model)
+        for sub_agent in root_agent.sub_agents:
+            self.apply(sub_agent)
+
+    def _settled(self, key: str) -> bool:
+        """Whether the prefix has a live handle or stays uncached for now"""
+        now = time.time()
+        if key in self._failures:
+            return now < self._failures[key][1]
+        if key not in self._handles:
+            return False
+        handle = self._handles[key]
+        return handle is None or handle.expires_at > now + _EXPIRY_MARGIN_SECONDS
+
+    async def handle_for(self, llm_request: LlmRequest) -> CacheHandle | None:
+        """Handle for the request's static prefix, registering it on first use"""
+        prefix = static_prefix(llm_request)
+        key = prefix.key
+        if self._settled(key):
+            return self._handles.get(key)
+
+        # One registration per prefix, even with many documents in flight
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            if self._settled(key):
+                return self._handles.get(key)
+            if prefix.estimated_tokens < self.min_prefix_tokens:
+                self._handles[key] = None
+                return None
+            try:
+                handle = await self.backend.create(prefix, llm_request)
+            except Exception as e:
+                failures = self._failures.get(key, (0, 0.0))[0] + 1
+                delay = min(self.retry_after * 2 ** (failures - 1), _MAX_RETRY_SECONDS)
+                self._failures[key] = (failures, time.time() + delay)
+                logger.warning(
+                    f"Context cache registration failed: {e}; retrying in {delay:g}s"
+                )
+                return None
+            self._failures.pop(key, None)
+            self.registrations += 1
+            logger.info(
+                f"Registered {handle.prefix_tokens}-token prefix for "
+                f"{prefix.model} as {handle.name}"
+            )
+            self._handles[key] = handle
+            return handle
+
+    def record(self, model: str, cached: bool, usage: Any, latency_ms: float) -> None:
+        """Record one completed model call"""
+        prompt_tokens = getattr(usage, "prompt_token_count", None) or 0
+        cached_tokens = getattr(usage, "cached_content_token_count", None) or 0
+        self.requests += 1
+        self.cached_requests += cached
+        self.cached_tokens += cached_tokens
+        self.records.append(
+            ContextCacheRecord(
+                model=model,
+                cached=cached,
+                prompt_tokens=prompt_tokens,
+                cached_tokens=cached_tokens,
+                latency_ms=round(latency_ms, 1),
+            )
+        )
+
+    def report(self) -> ContextCacheReport:
+        """Compare cached and uncached calls among the recent records"""
+        cached = [record for record in self.records if record.cached]
+        uncached = [record for record in self.records if not record.cached]
+        return ContextCacheReport(
+            requests=self.requests,
+            cached_requests=self.cached_requests,
+            registrations=self.registrations,
+            cached_tokens=self.cached_tokens,
+            mean_prompt_tokens_sent_cached=_mean(
+                [record.prompt_tokens - record.cached_tokens for record in cached]
+            ),
+            mean_prompt_tokens_sent_uncached=_mean(
+                [record.prompt_tokens for record in uncached]
+            ),
+            mean_latency_ms_cached=_mean([record.latency_ms for record in cached]),
+            mean_latency_ms_uncached=_mean([record.latency_ms for record in uncached]),
+        )
+
+
+class ContextCachingLlm(BaseLlm):
+    """Model wrapper sending the static prefix through a cached-content handle"""
+
+    inner: BaseLlm
+    cache: Any
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        handle = await self.cache.handle_for(llm_request)
+        if handle is not None:
+            # The cache holds the instruction and tools; send only the contents
+            llm_request = llm_request.model_copy(
+                update={
+                    "config": llm_request.config.model_copy(
+                        update={
+                            "system_instruction": None,
+                            "tools": None,
+                            "tool_config": None,
+                            "cached_content": handle.name,
+                        }
+                    )
+                }
+            )
+
+        started = time.perf_counter()
+        usage = None
+        async for response in self.inner.generate_content_async(llm_request, stream):
+            usage = response.usage_metadata or usage
+            yield response
+        self.cache.record(
+            self.model,
+            handle is not None,
+            usage,
+            (time.perf_counter() - started) * 1000,
+        )
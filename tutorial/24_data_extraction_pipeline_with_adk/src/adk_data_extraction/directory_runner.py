@@ -0,0 +1,510 @@
+"""
+Multi-Process Directory Runner
+
+One event loop in one process stops scaling once pydantic validation and text
+preprocessing dominate. The directory runner shards a directory of documents
+across worker processes. Each worker builds its own pipeline and event loop and
+processes its shard with bounded concurrency:
+
+- sharding: files are listed in sorted order and dealt round-robin, so shards
+  are balanced and every document keeps its position in the listing
+- rate limits: requests and tokens per minute are SharedTokenBucket instances
+  in shared memory, so all workers draw from one global quota through their
+  ModelCallGovernor
+- progress: workers checkpoint (fsync) their shard file every
+  ``checkpoint_every`` documents or ``progress_interval`` seconds, report the
+  documents checkpointed so far, and the parent logs per-worker progress
+- output: each worker writes its results to a shard file; the parent merges the
+  shards into a single file (JSON Lines, gzip JSON Lines or CSV, by the file
+  name) in the order of the listing
+- PDFs: ``.pdf`` files are ingested page by page (``ingestion.PdfIngestor``) and
+  their records carry the pages each extracted value was found on
+
+    adk-extract-directory contracts/ -o results.jsonl --workers 8 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import heapq
+import importlib
+import json
+import logging
+import os
+import queue
+import shutil
+import time
+from collections.abc import Iterator
+from multiprocessing import get_context
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, Field
+
+from adk_data_extraction.batch import process_concurrently
+from adk_data_extraction.ingestion import (
+    PdfIngestionError,
+    PdfIngestor,
+    is_pdf,
+    load_document,
+    page_provenance,
+)
+from adk_data_extraction.job_store import JobStore
+from adk_data_extraction.sinks import (
+    JsonlSink,
+    _truncate_to_last_newline,
+    open_sink,
+    sink_format,
+)
+
+if TYPE_CHECKING:
+    # The governor imports google-adk; it is only imported once a run needs it
+    from adk_data_extraction.governor import ModelCallGovernor, SharedTokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Pipelines the runner can drive, by CLI name
+PIPELINE_MODULES = {
+    "smart_document_extraction": "smart_document_extraction_pipeline",
+    "improved_multi_agent": "improved_multi_agent_pipeline",
+}
+
+
+class WorkerReport(BaseModel):
+    """Outcome of one worker process"""
+
+    worker: int = Field(description="Worker number")
+    documents: int = Field(description="Documents assigned to the worker")
+    completed: int = Field(description="Documents processed")
+    failed: int = Field(description="Documents whose pipeline run failed")
+    wall_time_ms: float = Field(description="Time the worker spent processing")
+    error: str | None = Field(default=None, description="Worker crash, if any")
+
+
+class DirectoryRunReport(BaseModel):
+    """Outcome of a directory run"""
+
+    documents: int = Field(description="Documents found in the input directory")
+    completed: int = Field(description="Documents processed")
+    failed: int = Field(description="Documents whose pipeline run failed")
+    wall_time_ms: float = Field(description="Total run time")
+    docs_per_sec: float = Field(description="Completed documents per second")
+    output: str = Field(description="Merged output file")
+    workers: list[WorkerReport] = Field(description="Per-worker outcomes")
+
+
+def discover_documents(input_dir: str | Path, pattern: str = "*.txt") -> list[Path]:
+    """Files under ``input_dir`` matching ``pattern``, in sorted order"""
+    return sorted(path for path in Path(input_dir).rglob(pattern) if path.is_file())
+
+
+def shard(count: int, workers: int) -> list[list[int]]:
+    """Deal document positions ``0..count-1`` round-robin to ``workers`` shards"""
+    return [list(range(worker, count, workers)) for worker in range(workers)]
+
+
+def _build_pipeline(
+    options: dict[str, Any], governor: "ModelCallGovernor | None", worker: int = 0
+):
+    module = importlib.import_module(
+        f"adk_data_extraction.examples.{PIPELINE_MODULES[options['pipeline']]}"
+    )
+    job_store = (
+        JobStore(options["job_store"], owner=f"worker-{worker}")
+        if options.get("job_store")
+        else None
+    )
+    pipeline = module.SmartDocumentExtractionPipeline(
+        execution_mode=options["execution_mode"], job_store=job_store
+    )
+    if options["stand_in_latency_ms"] is not None:
+        from adk_data_extraction.benchmark import StandInLlm, _use_stand_in
+
+        model = StandInLlm(model="stand-in", latency_ms=options["stand_in_latency_ms"])
+        _use_stand_in(
+            pipeline.coordinator_agent,
+            governor.wrap(model) if governor is not None else model,
+        )
+    return pipeline
+
+
+async def _process_shard(
+    worker: int,
+    items: list[tuple[int, str, str]],
+    options: dict[str, Any],
+    shard_path: Path,
+    progress: Any,
+    governor: "ModelCallGovernor | None",
+) -> tuple[int, int]:
+    pipeline = _build_pipeline(options, governor, worker)
+    ingestor = PdfIngestor(cache_dir=options.get("pdf_cache"))
+
+    async def process(item: tuple[int, str, str]) -> tuple[int, dict[str, Any]]:
+        index, path, name = item
+        record: dict[str, Any] = {"index": index, "path": name}
+        if is_pdf(path):
+            try:
+                document = await load_document(path, ingestor)
+            except PdfIngestionError as e:
+                logger.warning(f"Skipping {name}: {e}")
+                return index, {**record, "result": None, "error": str(e)}
+            result = await pipeline.process_document(document.text)
+            record["pages"] = page_provenance(result.extracted_data, document)
+        else:
+            content = await asyncio.to_thread(Path(path).read_text, errors="replace")
+            result = await pipeline.process_document(content)
+        return index, {**record, "result": result.model_dump(mode="json")}
+
+    def is_failure(outcome: tuple[int, dict[str, Any]]) -> bool:
+        result = outcome[1]["result"]
+        return result is None or result["pipeline_status"] == "failed"
+
+    def on_error(
+        item: tuple[int, str, str], error: Exception
+    ) -> tuple[int, dict[str, Any]]:
+        index, _, name = item
+        return index, {
+            "index": index,
+            "path": name,
+            "result": None,
+            "error": f"{type(error).__name__}: {error}",
+        }
+
+    checkpoint_every = options.get("checkpoint_every", 100)
+    checkpoint_interval = options.get("checkpoint_interval", 5.0)
+    completed = failed = 0
+    with (
+        ingestor,
+        JsonlSink(shard_path, batch_size=checkpoint_every) as output,
+    ):
+
+        def checkpoint() -> None:
+            # Reported documents must be on disk, not in the sink's buffer
+            output.checkpoint()
+            progress.put(("progress", worker, completed, failed))
+
+        last_checkpoint = time.perf_counter()
+        async for outcome in process_concurrently(
+            process,
+            items,
+            concurrency=options["concurrency"],
+            is_failure=is_failure,
+            on_error=on_error,
+        ):
+            output.write(outcome[1])
+            completed += 1
+            failed += is_failure(outcome)
+            now = time.perf_counter()
+            if (
+                completed % checkpoint_every == 0
+                or now - last_checkpoint >= checkpoint_interval
+            ):
+                checkpoint()
+                last_checkpoint = now
+        if completed % checkpoint_every or not completed:
+            checkpoint()
+    return completed, failed
+
+
+def _run_worker(
+    worker: int,
+    items: list[tuple[int, str, str]],
+    options: dict[str, Any],
+    shard_path: Path,
+    progress: Any,
+    request_bucket: "SharedTokenBucket | None",
+    token_bucket: "SharedTokenBucket | None",
+) -> None:
+    """Worker process entry point: process one shard with its own event loop"""
+    from adk_data_extraction.governor import ModelCallGovernor, set_model_call_governor
+
+    logging.basicConfig(level=logging.WARNING)
+    started = time.perf_counter()
+    governor = None
+    if request_bucket is not None or token_bucket is not None:
+        governor = ModelCallGovernor(
+            initial_concurrency=min(8, options["concurrency"]),
+            max_concurrency=options["concurrency"],
+            request_bucket=request_bucket,
+            token_bucket=token_bucket,
+        )
+        set_model_call_governor(governor)
+    try:
+        completed, failed = asyncio.run(
+            _process_shard(worker, items, options, shard_path, progress, governor)
+        )
+    except Exception as e:
+        progress.put(("error", worker, f"{type(e).__name__}: {e}"))
+        raise
+    wall_time_ms = (time.perf_counter() - started) * 1000
+    progress.put(("done", worker, completed, failed, round(wall_time_ms, 1)))
+
+
+def _shard_records(path: Path) -> Iterator[tuple[int, dict[str, Any]]]:
+    """(index, record) of a shard's records in document order
+
+    Only the index and file offset of each record are held in memory. A
+    partial last line, left by a worker killed mid-write, is cut off.
+    """
+    with path.open("r+b") as file:
+        _truncate_to_last_newline(file)
+        file.seek(0)
+        offsets = []
+        position = 0
+        for line in file:
+            offsets.append((json.loads(line)["index"], position))
+            position += len(line)
+        offsets.sort()
+        for index, offset in offsets:
+            file.seek(offset)
+            yield index, json.loads(file.readline())
+
+
+def merge_shards(shard_paths: list[Path], output: Path) -> int:
+    """
+    Merge shard files into ``output`` in document order.
+
+    The output format follows the file name (JSON Lines, ``.jsonl.gz`` or
+    ``.csv``, see ``sinks.open_sink``). Shards are streamed; a truncated last
+    record of a shard is dropped.
+
+    Returns:
+        int: Records written
+    """
+    shards = [_shard_records(path) for path in shard_paths if path.exists()]
+    tmp = output.with_name(output.name + ".tmp")
+    with open_sink(tmp, format=sink_format(output)) as merged:
+        for _, record in heapq.merge(*shards, key=lambda item: item[0]):
+            merged.write(record)
+    os.replace(tmp, output)
+    return merged.written
+
+
+def run_directory(
+    input_dir: str | Path,
+    output: str | Path,
+    workers: int = 4,
+    concurrency: int = 8,
+    pattern: str = "*.txt",
+    pipeline: str = "smart_document_extraction",
+    execution_mode: str = "router",
+    requests_per_minute: float | None = None,
+    tokens_per_minute: float | None = None,
+    stand_in_latency_ms: float | None = None,
+    progress_interval: float = 5.0,
+    job_store: str | Path | None = None,
+    pdf_cache: str | Path | None = None,
+    checkpoint_every: int = 100,
+) -> DirectoryRunReport:
+    """
+    Process every matching file of a directory across worker processes.
+
+    Args:
+        input_dir: Directory to read documents from (recursively)
+        output: File receiving one record per document, in the sorted order of
+            the input files (JSON Lines, ``.jsonl.gz`` or ``.csv``)
+        workers: Worker processes
+        concurrency: Documents in flight per worker
+        pattern: Glob selecting the documents
+        pipeline: Key of PIPELINE_MODULES
+        execution_mode: Pipeline execution mode ("router" or "coordinator")
+        requests_per_minute: Model request quota shared by all workers
+        tokens_per_minute: Model token quota shared by all workers
+        stand_in_latency_ms: Answer with the local stand-in model after this
+            delay instead of calling a real model (dry run)
+        progress_interval: Seconds between progress log lines, and at most
+            between worker checkpoints
+        job_store: SQLite JobStore database; a rerun after a crash reuses the
+            results of finished documents and resumes the others from their
+            last completed stage
+        pdf_cache: Directory caching the text extracted from PDFs, by file hash
+        checkpoint_every: Documents a worker writes between fsyncs of its shard
+            file (and progress reports)
+
+    Returns:
+        DirectoryRunReport: Counts, throughput and per-worker outcomes
+    """
+    if pipeline not in PIPELINE_MODULES:
+        raise ValueError(
+            f"Unknown pipeline {pipeline!r}, expected one of {list(PIPELINE_MODULES)}"
+        )
+    started = time.perf_counter()
+    input_dir = Path(input_dir)
+    output = Path(output)
+    paths = discover_documents(input_dir, pattern)
+    workers = max(1, min(workers, len(paths)))
+    options = {
+        "pipeline": pipeline,
+        "execution_mode": execution_mode,
+        "concurrency": concurrency,
+        "stand_in_latency_ms": stand_in_latency_ms,
+        "job_store": str(job_store) if job_store else None,
+        "pdf_cache": str(pdf_cache) if pdf_cache else None,
+        "checkpoint_every": checkpoint_every,
+        "checkpoint_interval": progress_interval,
+    }
+
+    context = get_context("spawn")
+    if requests_per_minute or tokens_per_minute:
+        # Imported only when needed: the parent has no other use for google-adk
+        from adk_data_extraction.governor import SharedTokenBucket
+    request_bucket = (
+        SharedTokenBucket(requests_per_minute, context=context)
+        if requests_per_minute
+        else None
+    )
+    token_bucket = (
+        SharedTokenBucket(tokens_per_minute, context=context)
+        if tokens_per_minute
+        else None
+    )
+    progress = context.Queue()
+    shard_dir = output.with_name(output.name + ".shards")
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    shard_paths = [shard_dir / f"shard-{worker}.jsonl" for worker in range(workers)]
+
+    reports = {}
+    processes = []
+    for worker, positions in enumerate(shard(len(paths), workers)):
+        items = [
+            (index, str(paths[index]), paths[index].relative_to(input_dir).as_posix())
+            for index in positions
+        ]
+        reports[worker] = WorkerReport(
+            worker=worker, documents=len(items), completed=0, failed=0, wall_time_ms=0
+        )
+        process = context.Process(
+            target=_run_worker,
+            args=(
+                worker,
+                items,
+                options,
+                shard_paths[worker],
+                progress,
+                request_bucket,
+                token_bucket,
+            ),
+            name=f"adk-directory-worker-{worker}",
+        )
+        process.start()
+        processes.append(process)
+    logger.info(f"Processing {len(paths)} documents with {workers} workers")
+
+    finished: set[int] = set()
+    last_log = time.perf_counter()
+    while len(finished) < workers:
+        try:
+            message = progress.get(timeout=0.5)
+        except queue.Empty:
+            for worker, process in enumerate(processes):
+                if worker not in finished and not process.is_alive():
+                    # Exited without reporting: crashed hard (e.g. killed)
+                    reports[worker].error = reports[worker].error or (
+                        f"exit code {process.exitcode}"
+                    )
+                    finished.add(worker)
+            message = None
+        if message is not None:
+            kind, worker, *values = message
+            report = reports[worker]
+            if kind == "progress":
+                report.completed, report.failed = values
+            elif kind == "done":
+                report.completed, report.failed, report.wall_time_ms = values
+                finished.add(worker)
+            else:
+                report.error = values[0]
+                finished.add(worker)
+        if time.perf_counter() - last_log >= progress_interval:
+            last_log = time.perf_counter()
+            for report in reports.values():
+                logger.info(
+                    f"worker {report.worker}: {report.completed}/{report.documents}"
+                    f" ({report.failed} failed)"
+                )
+    for process in processes:
+        process.join()
+
+    merge_shards(shard_paths, output)
+    shutil.rmtree(shard_dir, ignore_errors=True)
+    wall_time_ms = (time.perf_counter() - started) * 1000
+    completed = sum(report.completed for report in reports.values())
+    return DirectoryRunReport(
+        documents=len(paths),
+        completed=completed,
+        failed=sum(report.failed for report in reports.values()),
+        wall_time_ms=round(wall_time_ms, 1),
+        docs_per_sec=round(completed / (wall_time_ms / 1000), 3)
+        if wall_time_ms
+        else 0.0,
+        output=str(output),
+        workers=list(reports.values()),
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    """CLI entry point for the directory runner"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("input_dir", help="Directory of documents to process")
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="results.jsonl",
+        help="Merged output (.jsonl, .jsonl.gz or .csv)",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="Documents in flight per worker"
+    )
+    parser.add_argument(
+        "--pattern", default="*.txt", help='Glob selecting documents, e.g. "*.pdf"'
+    )
+    parser.add_argument(
+        "--pipeline", default="smart_document_extraction", choices=PIPELINE_MODULES
+    )
+    parser.add_argument(
+        "--execution-mode", default="router", choices=["router", "coordinator"]
+    )
+    parser.add_argument("--rpm", type=float, help="Requests per minute, all workers")
+    parser.add_argument("--tpm", type=float, help="Tokens per minute, all workers")
+    parser.add_argument(
+        "--stand-in-latency-ms",
+        type=float,
+        help="Dry run: answer with a local stand-in model after this delay",
+    )
+    parser.add_argument(
+        "--job-store", help="SQLite progress database making the run resumable"
+    )
+    parser.add_argument(
+        "--pdf-cache", help="Directory caching text extracted from PDFs"
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=100,
+        help="Documents a worker writes between fsyncs of its shard",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    report = run_directory(
+        args.input_dir,
+        args.output,
+        workers=args.workers,
+        concurrency=args.concurrency,
+        pattern=args.pattern,
+        pipeline=args.pipeline,
+        execution_mode=args.execution_mode,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        stand_in_latency_ms=args.stand_in_latency_ms,
+        job_store=args.job_store,
+        pdf_cache=args.pdf_cache,
+        checkpoint_every=args.checkpoint_every,
+    )
+    print(report.model_dump_json(indent=2))
+    if any(worker.error for worker in report.workers):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,19 @@ This package contains example scripts demonstrating various data extraction
 capabilities using Google's Agent Development Kit (ADK).
 """
 
-from .basic_contact_extraction import ContactInfo, extract_contacts
-from .legal_document_analysis import (
-    DocumentType,
-    FinancialTerm,
-    LegalExtraction,
-    analyze_legal_document,
+from adk_data_extraction.lazy import lazy_exports
+
+# Re-exports are imported on first use, keeping this package cheap to import
+__getattr__ = lazy_exports(
+    __name__,
+    {
+        "ContactInfo": ".basic_contact_extraction:ContactInfo",
+        "extract_contacts": ".basic_contact_extraction:extract_contacts",
+        "DocumentType": ".legal_document_analysis:DocumentType",
+        "FinancialTerm": ".legal_document_analysis:FinancialTerm",
+        "LegalExtraction": ".legal_document_analysis:LegalExtraction",
+        "analyze_legal_document": ".legal_document_analysis:analyze_legal_document",
+    },
 )
 
 __all__ = [
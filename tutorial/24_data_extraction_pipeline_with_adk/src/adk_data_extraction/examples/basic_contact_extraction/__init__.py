@@ -4,7 +4,15 @@ Basic Contact Extraction Example
 This module exposes the contact extraction agent for ADK command-line usage.
 """
 
-from . import agent
+from adk_data_extraction.lazy import lazy_exports
+
+from .extraction import ContactInfo, extract_contacts, main
+
+# The agents (and google-adk) are imported on first use
+__getattr__ = lazy_exports(
+    __name__,
+    {"agent": ".agent", "contact_extractor": ".extraction:contact_extractor"},
+)
 
 # Expose the root agent for ADK discovery
-__all__ = ['agent']
+__all__ = ['agent', 'ContactInfo', 'contact_extractor', 'extract_contacts', 'main']
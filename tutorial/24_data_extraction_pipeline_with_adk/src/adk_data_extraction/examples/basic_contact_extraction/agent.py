@@ -7,12 +7,14 @@ It follows ADK conventions for agent discovery and execution.
 
 from google.adk.agents import Agent
 
+from adk_data_extraction.model_backend import resolve_model
+
 from .agents import create_contact_extractor
 
 # Create the root agent that ADK will discover
 root_agent = Agent(
     name="basic_contact_extraction",
-    model="gemini-2.0-flash",
+    model=resolve_model("gemini-2.0-flash"),
     description="Extracts contact information from text documents and emails",
     instruction="""You are a contact information extraction specialist.
 
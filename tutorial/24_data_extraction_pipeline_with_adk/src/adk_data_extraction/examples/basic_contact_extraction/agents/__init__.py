@@ -10,6 +10,8 @@ This module defines the contact extraction agent following ADK best practices:
 
 from google.adk.agents import LlmAgent
 
+from adk_data_extraction.model_backend import resolve_model
+
 from ..schemas import ContactInfo
 
 
@@ -21,7 +23,7 @@ def create_contact_extractor() -> LlmAgent:
         LlmAgent: Configured contact extraction agent
     """
     return LlmAgent(
-        model="gemini-2.0-flash",
+        model=resolve_model("gemini-2.0-flash"),
         name="contact_extractor",
         description="Extracts contact information from text documents and emails",
         instruction="""You are a contact information extraction specialist.
@@ -4,13 +4,12 @@ See tutorial for details.
 """
 
 import asyncio
+from typing import Any
 
-from google.adk import Runner
-from google.adk.agents import LlmAgent
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
 from pydantic import BaseModel, Field
 
+from adk_data_extraction.lazy import LazyAttributes
+
 
 class ContactInfo(BaseModel):
     """Schema for extracted contact information."""
@@ -22,25 +21,44 @@ class ContactInfo(BaseModel):
     position: str = Field(description="Job title or position", default="")
 
 
-contact_extractor = LlmAgent(
-    model="gemini-2.0-flash",
-    name="contact_extractor",
-    description="Extracts contact information from text",
-    instruction="""Extract contact information from the provided text.
+def _build_agents() -> dict[str, Any]:
+    """The agent, session service and runner (imports google-adk)"""
+    from google.adk import Runner
+    from google.adk.agents import LlmAgent
+    from google.adk.sessions import InMemorySessionService
+
+    from adk_data_extraction.model_backend import resolve_model
+
+    contact_extractor = LlmAgent(
+        model=resolve_model("gemini-2.0-flash"),
+        name="contact_extractor",
+        description="Extracts contact information from text",
+        instruction="""Extract contact information from the provided text.
 Focus on accuracy and completeness. If information is unclear or missing,
 leave those fields empty rather than guessing.""",
-    output_schema=ContactInfo,
-    output_key="extracted_contacts",
-    disallow_transfer_to_parent=True,
-    disallow_transfer_to_peers=True,
-)
+        output_schema=ContactInfo,
+        output_key="extracted_contacts",
+        disallow_transfer_to_parent=True,
+        disallow_transfer_to_peers=True,
+    )
+    session_service = InMemorySessionService()
+    runner = Runner(
+        agent=contact_extractor,
+        app_name="contact_extraction_app",
+        session_service=session_service,
+    )
+    return {
+        "contact_extractor": contact_extractor,
+        "session_service": session_service,
+        "runner": runner,
+    }
 
-session_service = InMemorySessionService()
-runner = Runner(
-    agent=contact_extractor,
-    app_name="contact_extraction_app",
-    session_service=session_service,
+
+# contact_extractor, session_service and runner are built on first use
+_agents = LazyAttributes(
+    __name__, _build_agents, names=("contact_extractor", "session_service", "runner")
 )
+__getattr__ = _agents.getattr
 
 
 async def extract_contacts(text_content):
@@ -54,6 +72,10 @@ async def extract_contacts(text_content):
     Returns:
         str or None: The extracted contact information as a string, or None if not found.
     """
+    from google.genai import types
+
+    session_service = _agents["session_service"]
+    runner = _agents["runner"]
     # Create a session first
     _session = await session_service.create_session(
         app_name="contact_extraction_app", user_id="user_001", session_id="session_001"
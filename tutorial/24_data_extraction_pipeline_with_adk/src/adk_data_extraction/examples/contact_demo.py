@@ -19,6 +19,8 @@ try:
     from google.adk import Agent
     from google.adk.runners import InMemoryRunner
     from google.genai.types import Part, UserContent
+
+    from adk_data_extraction.model_backend import resolve_model
 except ImportError as e:
     print(f"❌ Error: Could not import ADK modules. Make sure you have activated the virtual environment.")
     print(f"Details: {e}")
@@ -30,7 +32,7 @@ def create_contact_extraction_agent():
     """Create a simple contact extraction agent."""
     return Agent(
         name="contact_extraction_demo",
-        model="gemini-2.0-flash",
+        model=resolve_model("gemini-2.0-flash"),
         description="Extracts contact information from text",
         instruction="""You are a contact information extraction specialist.
 
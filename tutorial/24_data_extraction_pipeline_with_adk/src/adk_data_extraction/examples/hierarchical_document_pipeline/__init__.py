@@ -4,7 +4,10 @@ Hierarchical Document Pipeline Example
 This module exposes the hierarchical document pipeline agent for ADK command-line usage.
 """
 
-from . import agent
+from adk_data_extraction.lazy import lazy_exports
+
+# The agent (and google-adk) is imported on first use
+__getattr__ = lazy_exports(__name__, {"agent": ".agent"})
 
 # Expose the root agent for ADK discovery
 __all__ = ['agent']
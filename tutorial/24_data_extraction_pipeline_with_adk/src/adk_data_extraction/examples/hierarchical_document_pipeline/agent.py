@@ -5,12 +5,32 @@ This example demonstrates a production-ready document processing system using Go
 with advanced multi-agent coordination patterns and hierarchical organization.
 """
 
-from google.adk.agents import Agent
+import asyncio
+import logging
+from typing import Any
+
+from google.adk.agents import Agent, LlmAgent
+from google.genai import types
+
+from adk_data_extraction.agent_registry import AgentRegistry, default_agent_registry
+from adk_data_extraction.governor import get_model_call_governor
+from adk_data_extraction.model_backend import get_model_backend, resolve_model
+
+from .sub_agents import (
+    create_contract_specialist,
+    create_document_classifier,
+    create_general_specialist,
+    create_invoice_specialist,
+    create_validation_specialist,
+)
+from .tools import get_shared_state
+
+logger = logging.getLogger(__name__)
 
 # Create the root agent that ADK will discover
 root_agent = Agent(
     name="hierarchical_document_pipeline",
-    model="gemini-2.0-flash",
+    model=resolve_model("gemini-2.0-flash"),
     description="Processes documents through a hierarchical multi-agent system with specialized extraction agents",
     instruction="""You are a document processing coordinator that manages a hierarchical pipeline of specialized agents.
 
@@ -28,8 +48,6 @@ Process documents systematically through:
 
 Return results in a structured format with extracted data, metadata, and quality assessments.""",
 )
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
 
 
 class HierarchicalDocumentPipeline:
@@ -41,12 +59,29 @@ class HierarchicalDocumentPipeline:
     - Specialized extraction agents for different document types
     - Quality validation and assurance mechanisms
     - Hierarchical coordination using ADK patterns
+
+    The agent graph and runner are built once per process and shared by every
+    pipeline instance (see AgentRegistry).
     """
 
-    def __init__(self):
-        self.session_service = InMemorySessionService()
-        self.coordinator_agent = self._create_coordinator_agent()
-        self.runner = self._create_runner()
+    def __init__(self, agent_registry: AgentRegistry | None = None):
+        """
+        Args:
+            agent_registry: Registry to take the agent graph from (defaults to
+                the process-wide one)
+        """
+        if agent_registry is None:
+            agent_registry = default_agent_registry()
+        self.graph = agent_registry.graph(
+            f"{__name__}.{type(self).__qualname__}",
+            self._create_coordinator_agent,
+            vars(get_model_backend()),
+            id(get_model_call_governor()),
+            app_name="hierarchical_document_extraction_app",
+        )
+        self.session_service = self.graph.session_service
+        self.coordinator_agent = self.graph.root_agent
+        self.runner = self.graph.runner
 
     def _create_coordinator_agent(self) -> LlmAgent:
         """Create the main coordinator agent using hierarchical pattern"""
@@ -60,7 +95,7 @@ class HierarchicalDocumentPipeline:
 
         # Main Coordinator Agent with Hierarchical Structure
         coordinator = LlmAgent(
-            model="gemini-2.0-flash",
+            model=resolve_model("gemini-2.0-flash"),
             name="document_extraction_coordinator",
             description="Main coordinator for intelligent document extraction pipeline with specialized sub-agents",
             instruction="""You are the main Document Extraction Coordinator managing a team of specialists.
@@ -109,14 +144,6 @@ You coordinate but do not perform extraction yourself - delegate to specialist a
 
         return coordinator
 
-    def _create_runner(self) -> Runner:
-        """Create the runner for the coordinator agent"""
-        return Runner(
-            agent=self.coordinator_agent,
-            app_name="hierarchical_document_extraction_app",
-            session_service=self.session_service,
-        )
-
     async def process_document(self, document_content: str) -> dict[str, Any]:
         """
         Process a document through the hierarchical pipeline.
@@ -127,38 +154,29 @@ You coordinate but do not perform extraction yourself - delegate to specialist a
         Returns:
             dict: Processing results including classification, extraction, and validation
         """
-        # Create a unique session for this document
-        session_id = f"doc_session_{hash(document_content) % 10000}"
-        
-        session = await self.session_service.create_session(
-            app_name="hierarchical_document_extraction_app",
-            user_id="doc_processor",
-            session_id=session_id
-        )
-
         user_content = types.Content(
             role="user",
             parts=[types.Part.from_text(text=document_content)]
         )
 
-        # Process through the hierarchical pipeline
-        final_response = ""
-        async for event in self.runner.run_async(
-            user_id="doc_processor",
-            session_id=session_id,
-            new_message=user_content,
-        ):
-            if event.is_final_response() and event.content and event.content.parts:
-                if event.content.parts[0].text:
-                    final_response = event.content.parts[0].text
-                    break
-
-        # Retrieve final session state with all results
-        final_session = await self.session_service.get_session(
-            app_name="hierarchical_document_extraction_app",
-            user_id="doc_processor",
-            session_id=session_id
-        )
+        # A unique session for this document on the shared runner, deleted
+        # once its state has been read
+        sessions = self.graph.sessions
+        async with sessions.session("doc_session") as session_id:
+            # Process through the hierarchical pipeline
+            final_response = ""
+            async for event in self.runner.run_async(
+                user_id=sessions.user_id,
+                session_id=session_id,
+                new_message=user_content,
+            ):
+                if event.is_final_response() and event.content and event.content.parts:
+                    if event.content.parts[0].text:
+                        final_response = event.content.parts[0].text
+                        break
+
+            # Retrieve final session state with all results
+            final_session = await sessions.get(session_id)
 
         return {
             "coordinator_summary": final_response,
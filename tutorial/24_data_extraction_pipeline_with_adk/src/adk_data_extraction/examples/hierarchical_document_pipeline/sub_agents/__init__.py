@@ -7,6 +7,8 @@ and processing steps in the hierarchical extraction pipeline.
 
 from google.adk.agents import LlmAgent
 
+from adk_data_extraction.model_backend import resolve_model
+
 from ..schemas import (
     ContractData,
     DocumentClassification,
@@ -19,7 +21,7 @@ from ..schemas import (
 def create_document_classifier() -> LlmAgent:
     """Create the document classification agent"""
     return LlmAgent(
-        model="gemini-2.0-flash",
+        model=resolve_model("gemini-2.0-flash"),
         name="document_classifier",
         description="Classifies documents and determines processing approach",
         instruction="""You are an expert document classifier and processing coordinator.
@@ -62,7 +64,7 @@ Return ONLY the JSON, no additional text or explanation.""",
 def create_contract_specialist() -> LlmAgent:
     """Create the contract extraction specialist agent"""
     return LlmAgent(
-        model="gemini-2.0-flash",
+        model=resolve_model("gemini-2.0-flash"),
         name="contract_specialist",
         description="Specialized agent for extracting data from contracts and agreements",
         instruction="""You are a contract analysis specialist with expertise in legal documents.
@@ -106,7 +108,7 @@ Return ONLY the JSON, no additional text or explanation.""",
 def create_invoice_specialist() -> LlmAgent:
     """Create the invoice extraction specialist agent"""
     return LlmAgent(
-        model="gemini-2.0-flash",
+        model=resolve_model("gemini-2.0-flash"),
         name="invoice_specialist",
         description="Specialized agent for extracting data from invoices and bills",
         instruction="""You are an invoice processing specialist with expertise in financial documents.
@@ -150,7 +152,7 @@ Return ONLY the JSON, no additional text or explanation.""",
 def create_general_specialist() -> LlmAgent:
     """Create the general document extraction specialist agent"""
     return LlmAgent(
-        model="gemini-2.0-flash",
+        model=resolve_model("gemini-2.0-flash"),
         name="general_specialist",
         description="General-purpose agent for extracting key information from various documents",
         instruction="""You are a general document analysis specialist.
@@ -184,7 +186,7 @@ Return ONLY the JSON, no additional text or explanation.""",
 def create_validation_specialist() -> LlmAgent:
     """Create the validation specialist agent"""
     return LlmAgent(
-        model="gemini-2.0-flash",
+        model=resolve_model("gemini-2.0-flash"),
         name="validation_specialist",
         description="Quality assurance agent that validates extraction results",
         instruction="""You are a quality assurance specialist for data extraction validation.
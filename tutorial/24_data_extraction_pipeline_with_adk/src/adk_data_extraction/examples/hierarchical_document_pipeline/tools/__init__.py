@@ -73,6 +73,24 @@ def save_validation_to_state(
     return {"status": "saved", "validation": validation_result}
 
 
+def get_shared_state() -> dict[str, Any]:
+    """Tool to retrieve shared state for coordination
+
+    Tells the coordinator which session state keys the sub-agents fill in via
+    their output_key configurations.
+    """
+    return {
+        "instruction": "Check session state for classification, extraction, and validation results",
+        "state_keys_to_check": [
+            "classification_result",
+            "contract_extraction",
+            "invoice_extraction",
+            "general_extraction",
+            "validation_result",
+        ],
+    }
+
+
 def create_extraction_id(document_content: str) -> str:
     """Create a unique extraction ID based on document content hash"""
     import hashlib
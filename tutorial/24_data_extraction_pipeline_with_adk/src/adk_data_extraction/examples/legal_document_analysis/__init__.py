@@ -4,7 +4,28 @@ Legal Document Analysis Example
 This module exposes the legal document analysis agent for ADK command-line usage.
 """
 
-from . import agent
+from adk_data_extraction.lazy import lazy_exports
+
+from .analysis import (
+    DocumentType,
+    FinancialTerm,
+    LegalExtraction,
+    analyze_legal_document,
+    main,
+)
+
+# The agents (and google-adk) are imported on first use
+__getattr__ = lazy_exports(
+    __name__, {"agent": ".agent", "legal_agent": ".analysis:legal_agent"}
+)
 
 # Expose the root agent for ADK discovery
-__all__ = ['agent']
+__all__ = [
+    'agent',
+    'DocumentType',
+    'FinancialTerm',
+    'LegalExtraction',
+    'analyze_legal_document',
+    'legal_agent',
+    'main',
+]
@@ -5,12 +5,32 @@ This example demonstrates advanced legal document analysis using Google ADK
 with specialized agents for comprehensive legal document processing.
 """
 
-from google.adk.agents import Agent
+import asyncio
+import logging
+import time
+from pathlib import Path
+
+from google.adk.agents import Agent, LlmAgent
+from google.genai import types
+
+from adk_data_extraction.agent_registry import AgentRegistry, default_agent_registry
+from adk_data_extraction.governor import get_model_call_governor
+from adk_data_extraction.ingestion import PdfIngestionError, read_document
+from adk_data_extraction.model_backend import get_model_backend, resolve_model
+
+from .agents import (
+    create_compliance_checker,
+    create_contract_reviewer,
+    create_legal_analyzer,
+)
+from .schemas import LegalAnalysisResult
+
+logger = logging.getLogger(__name__)
 
 # Create the root agent that ADK will discover
 root_agent = Agent(
     name="legal_document_analysis",
-    model="gemini-2.0-flash",
+    model=resolve_model("gemini-2.0-flash"),
     description="Provides comprehensive legal document analysis with specialized agents for expert-level processing",
     instruction="""You are a legal document analysis coordinator managing a team of specialized legal experts.
 
@@ -43,12 +63,30 @@ class LegalDocumentAnalysisPipeline:
     - Financial terms and obligations extraction
     - Compliance verification and risk assessment
     - Multi-agent coordination for complex legal workflows
+
+    The agent graph and runner are built once per process and shared by every
+    pipeline instance (see AgentRegistry).
     """
 
-    def __init__(self):
-        """Initialize the legal analysis pipeline"""
-        self.session_service = InMemorySessionService()
-        self.main_agent = self._create_main_agent()
+    def __init__(self, agent_registry: AgentRegistry | None = None):
+        """Initialize the legal analysis pipeline
+
+        Args:
+            agent_registry: Registry to take the agent graph from (defaults to
+                the process-wide one)
+        """
+        if agent_registry is None:
+            agent_registry = default_agent_registry()
+        self.graph = agent_registry.graph(
+            f"{__name__}.{type(self).__qualname__}",
+            self._create_main_agent,
+            vars(get_model_backend()),
+            id(get_model_call_governor()),
+            app_name="legal_document_analysis",
+        )
+        self.session_service = self.graph.session_service
+        self.main_agent = self.graph.root_agent
+        self.runner = self.graph.runner
 
     def _create_main_agent(self) -> LlmAgent:
         """Create the main legal analysis coordinator agent"""
@@ -60,7 +98,7 @@ class LegalDocumentAnalysisPipeline:
 
         # Main coordinator agent
         coordinator = LlmAgent(
-            model="gemini-2.0-flash",
+            model=resolve_model("gemini-2.0-flash"),
             name="legal_coordinator",
             description="Main coordinator for legal document analysis pipeline",
             instruction="""You are the main coordinator for a comprehensive legal document analysis pipeline.
@@ -109,19 +147,8 @@ Provide thorough, accurate, and professionally formatted legal analysis.""",
             if not document_content:
                 raise ValueError(f"Could not read document: {document_path}")
 
-            # Create session for analysis
-            session = await self.session_service.create_session()
-            
-            # Initialize runner
-            runner = Runner(
-                agent=self.main_agent,
-                session_service=self.session_service,
-                session_id=session.id,
-            )
-
-            # Process the document
-            response = await runner.run(
-                input_prompt=f"""Analyze this legal document comprehensively:
+            # Process the document in its own session on the shared runner
+            prompt = f"""Analyze this legal document comprehensively:
 
 DOCUMENT PATH: {document_path}
 
@@ -136,7 +163,18 @@ Please provide:
 5. Comprehensive summary of all findings
 
 Ensure thorough coverage of all legal aspects and provide professional-grade analysis."""
-            )
+            sessions = self.graph.sessions
+            async with sessions.session("legal_analysis") as session_id:
+                response = ""
+                async for event in self.runner.run_async(
+                    user_id=sessions.user_id,
+                    session_id=session_id,
+                    new_message=types.Content(
+                        role="user", parts=[types.Part.from_text(text=prompt)]
+                    ),
+                ):
+                    if event.is_final_response() and event.content and event.content.parts:
+                        response = event.content.parts[0].text or response
 
             # Calculate processing time
             processing_time_ms = int((time.time() - start_time) * 1000)
@@ -148,7 +186,7 @@ Ensure thorough coverage of all legal aspects and provide professional-grade ana
                 "response": response,
                 "analysis_status": "completed",
                 "processing_time_ms": processing_time_ms,
-                "session_id": session.id
+                "session_id": session_id
             }
 
         except Exception as e:
@@ -162,10 +200,9 @@ Ensure thorough coverage of all legal aspects and provide professional-grade ana
             }
 
     def _read_document(self, document_path: str) -> str:
-        """Read document content from file"""
+        """Read document content from a text or PDF file"""
         try:
-            with open(document_path, 'r', encoding='utf-8') as file:
-                return file.read()
+            return read_document(document_path).text
         except FileNotFoundError:
             logger.error("Document not found: %s", document_path)
             return ""
@@ -175,6 +212,9 @@ Ensure thorough coverage of all legal aspects and provide professional-grade ana
         except UnicodeDecodeError:
             logger.error("Cannot decode document: %s", document_path)
             return ""
+        except PdfIngestionError as e:
+            logger.error("Cannot read PDF: %s", e)
+            return ""
 
 
 async def main():
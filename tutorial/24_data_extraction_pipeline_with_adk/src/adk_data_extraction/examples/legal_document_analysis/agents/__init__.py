@@ -7,13 +7,15 @@ providing comprehensive legal data extraction capabilities.
 
 from google.adk.agents import LlmAgent
 
+from adk_data_extraction.model_backend import resolve_model
+
 from ..schemas import LegalExtraction
 
 
 def create_legal_analyzer() -> LlmAgent:
     """Create the main legal document analyzer agent"""
     return LlmAgent(
-        model="gemini-2.0-flash",
+        model=resolve_model("gemini-2.0-flash"),
         name="legal_analyzer",
         description="Specialized agent for analyzing legal documents",
         instruction="""You are an expert legal document analyzer. Extract structured information
@@ -43,7 +45,7 @@ Return results in the exact JSON format specified by the LegalExtraction schema.
 def create_contract_reviewer() -> LlmAgent:
     """Create an agent specialized in contract review and analysis"""
     return LlmAgent(
-        model="gemini-2.0-flash",
+        model=resolve_model("gemini-2.0-flash"),
         name="contract_reviewer",
         description="Specialized agent for detailed contract review",
         instruction="""You are a contract review specialist with expertise in legal agreements.
@@ -72,7 +74,7 @@ Provide comprehensive analysis while maintaining objectivity and legal accuracy.
 def create_compliance_checker() -> LlmAgent:
     """Create an agent specialized in legal compliance checking"""
     return LlmAgent(
-        model="gemini-2.0-flash",
+        model=resolve_model("gemini-2.0-flash"),
         name="compliance_checker",
         description="Specialized agent for legal compliance verification",
         instruction="""You are a legal compliance specialist focused on regulatory and statutory compliance.
@@ -5,13 +5,13 @@ See tutorial for details.
 
 import asyncio
 from enum import Enum
+from typing import Any
 
-from google.adk import Runner
-from google.adk.agents import LlmAgent
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
 from pydantic import BaseModel, Field
 
+from adk_data_extraction.ingestion import PdfIngestionError, load_document
+from adk_data_extraction.lazy import LazyAttributes
+
 
 class DocumentType(str, Enum):
     """Enum representing different types of legal documents."""
@@ -54,11 +54,17 @@ class LegalExtraction(BaseModel):
     expiration_date: str | None = Field(description="When the document expires")
 
 
-legal_agent = LlmAgent(
-    model="gemini-2.0-flash",
-    name="legal_analyzer",
-    description="Specialized agent for analyzing legal documents",
-    instruction="""You are an expert legal document analyzer. Extract structured information
+def _build_agents() -> dict[str, Any]:
+    """The legal analysis agent (imports google-adk)"""
+    from google.adk.agents import LlmAgent
+
+    from adk_data_extraction.model_backend import resolve_model
+
+    legal_agent = LlmAgent(
+        model=resolve_model("gemini-2.0-flash"),
+        name="legal_analyzer",
+        description="Specialized agent for analyzing legal documents",
+        instruction="""You are an expert legal document analyzer. Extract structured information
 from legal documents with extreme precision. Pay special attention to:
 1. All parties mentioned (individuals, companies, entities)
 2. Financial terms including amounts, payment schedules, and penalties
@@ -68,10 +74,16 @@ from legal documents with extreme precision. Pay special attention to:
 If information is unclear or ambiguous, mark it as 'unclear' rather than guessing.
 For dates, use ISO format (YYYY-MM-DD) when possible.
 For amounts, include currency and context.""",
-    output_schema=LegalExtraction,
-    disallow_transfer_to_parent=True,
-    disallow_transfer_to_peers=True,
-)
+        output_schema=LegalExtraction,
+        disallow_transfer_to_parent=True,
+        disallow_transfer_to_peers=True,
+    )
+    return {"legal_agent": legal_agent}
+
+
+# legal_agent is built on first use
+_agents = LazyAttributes(__name__, _build_agents, names=("legal_agent",))
+__getattr__ = _agents.getattr
 
 
 async def analyze_legal_document(document_path: str):
@@ -81,30 +93,33 @@ async def analyze_legal_document(document_path: str):
     and returns the extracted legal info as a string.
 
     Args:
-        document_path (str): The path to the legal document to analyze.
+        document_path (str): The path to the legal document to analyze (a text
+            file or a PDF).
 
     Returns:
         str: The extracted legal information as a string, or a message if not found.
     """
     # Read the document content first
     try:
-        with open(document_path, encoding="utf-8") as file:
-            document_content = file.read()
+        document_content = (await load_document(document_path)).text
     except FileNotFoundError:
         return f"Error: Document not found at {document_path}"
     except PermissionError:
         return f"Error: Permission denied to read {document_path}"
     except UnicodeDecodeError:
         return f"Error: Cannot decode document at {document_path}"
+    except PdfIngestionError as e:
+        return f"Error: {e}"
 
-    session_service = InMemorySessionService()
-    _session = await session_service.create_session(
-        app_name="legal_analysis_app", user_id="legal_user", session_id="legal_session"
-    )
-    runner = Runner(
-        agent=legal_agent,
+    from google.genai import types
+
+    from adk_data_extraction.agent_registry import default_agent_registry
+
+    # The runner is built once per process and shared by every call
+    graph = default_agent_registry().graph(
+        f"{__name__}.legal_agent",
+        lambda: _agents["legal_agent"],
         app_name="legal_analysis_app",
-        session_service=session_service,
     )
 
     # Send the document content directly to the agent
@@ -116,14 +131,17 @@ async def analyze_legal_document(document_path: str):
             )
         ],
     )
-    async for event in runner.run_async(
-        user_id="legal_user", session_id="legal_session", new_message=user_content
-    ):
-        if hasattr(event, "content") and event.content:
-            if hasattr(event.content, "parts") and event.content.parts:
-                for part in event.content.parts:
-                    if hasattr(part, "text") and part.text:
-                        return part.text
+    async with graph.sessions.session("legal_session") as session_id:
+        async for event in graph.runner.run_async(
+            user_id=graph.sessions.user_id,
+            session_id=session_id,
+            new_message=user_content,
+        ):
+            if hasattr(event, "content") and event.content:
+                if hasattr(event.content, "parts") and event.content.parts:
+                    for part in event.content.parts:
+                        if hasattr(part, "text") and part.text:
+                            return part.text
     return "No analysis result available"
 
 
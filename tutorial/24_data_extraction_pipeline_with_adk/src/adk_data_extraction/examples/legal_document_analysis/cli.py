@@ -8,6 +8,7 @@ programmatically outside of the ADK CLI interface.
 Usage:
     python cli.py --text "LEGAL DOCUMENT: ..."
     python cli.py --file path/to/legal_document.txt
+    python cli.py --file path/to/legal_document.pdf
 """
 
 import argparse
@@ -21,6 +22,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from google.adk.runners import InMemoryRunner
 from google.genai.types import Part, UserContent
 
+from adk_data_extraction.ingestion import PdfIngestionError, read_document
+
 # Import the agent
 try:
     from .agent import root_agent
@@ -90,7 +93,7 @@ Examples:
     )
     group.add_argument(
         "--file",
-        help="File containing legal document text to analyze"
+        help="Text or PDF file containing legal document text to analyze"
     )
     
     args = parser.parse_args()
@@ -100,12 +103,11 @@ Examples:
         text = args.text
     else:
         try:
-            with open(args.file, encoding='utf-8') as f:
-                text = f.read()
+            text = read_document(args.file).text
         except FileNotFoundError:
             print(f"❌ Error: File '{args.file}' not found.")
             sys.exit(1)
-        except OSError as e:
+        except (OSError, UnicodeDecodeError, PdfIngestionError) as e:
             print(f"❌ Error reading file: {e}")
             sys.exit(1)
     
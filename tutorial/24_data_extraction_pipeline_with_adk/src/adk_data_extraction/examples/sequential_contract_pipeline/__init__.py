@@ -4,7 +4,24 @@ Sequential Contract Pipeline Example
 This module exposes the sequential contract pipeline agent for ADK command-line usage.
 """
 
-from . import agent
+from adk_data_extraction.lazy import lazy_exports
+
+from .pipeline import SAMPLE_SERVICE_CONTRACT, main, main_cli
+
+# The agents (and google-adk) are imported on first use
+__getattr__ = lazy_exports(
+    __name__,
+    {
+        "agent": ".agent",
+        "service_contract_pipeline": ".pipeline:service_contract_pipeline",
+    },
+)
 
 # Expose the root agent for ADK discovery
-__all__ = ['agent']
+__all__ = [
+    'agent',
+    'SAMPLE_SERVICE_CONTRACT',
+    'main',
+    'main_cli',
+    'service_contract_pipeline',
+]
@@ -6,12 +6,26 @@ using Google ADK. It shows how to build a linear workflow where agents process
 documents in a predefined sequence, each building on the work of the previous agent.
 """
 
-from google.adk.agents import Agent
+import asyncio
+import logging
+import time
+
+from google.adk.agents import Agent, LlmAgent
+from google.genai import types
+
+from adk_data_extraction.agent_registry import AgentRegistry, default_agent_registry
+from adk_data_extraction.governor import get_model_call_governor
+from adk_data_extraction.model_backend import get_model_backend, resolve_model
+
+from .data import get_sample_contracts
+from .schemas import ContractAnalysisResult, ContractData
+
+logger = logging.getLogger(__name__)
 
 # Create the root agent that ADK will discover
 root_agent = Agent(
     name="sequential_contract_pipeline",
-    model="gemini-2.0-flash",
+    model=resolve_model("gemini-2.0-flash"),
     description="Processes contracts through a sequential multi-agent pipeline for comprehensive analysis",
     instruction="""You are a contract analysis coordinator that processes contracts through a sequential workflow.
 
@@ -38,19 +52,37 @@ class SequentialContractPipeline:
     This pipeline demonstrates a linear workflow where each agent builds
     on the work of the previous agent, providing incremental enhancement
     and validation of contract data extraction.
+
+    The agent graph and runner are built once per process and shared by every
+    pipeline instance (see AgentRegistry).
     """
 
-    def __init__(self):
-        """Initialize the sequential contract pipeline"""
-        self.session_service = InMemorySessionService()
-        self.main_agent = self._create_main_agent()
+    def __init__(self, agent_registry: AgentRegistry | None = None):
+        """Initialize the sequential contract pipeline
+
+        Args:
+            agent_registry: Registry to take the agent graph from (defaults to
+                the process-wide one)
+        """
+        if agent_registry is None:
+            agent_registry = default_agent_registry()
+        self.graph = agent_registry.graph(
+            f"{__name__}.{type(self).__qualname__}",
+            self._create_main_agent,
+            vars(get_model_backend()),
+            id(get_model_call_governor()),
+            app_name="sequential_contract_pipeline",
+        )
+        self.session_service = self.graph.session_service
+        self.main_agent = self.graph.root_agent
+        self.runner = self.graph.runner
 
     def _create_main_agent(self) -> LlmAgent:
         """Create the main sequential coordinator agent"""
         
         # Contract Data Extractor Agent
         extractor_agent = LlmAgent(
-            model="gemini-2.0-flash",
+            model=resolve_model("gemini-2.0-flash"),
             name="contract_extractor",
             description="Primary contract data extraction agent",
             instruction="""You are a contract data extraction specialist. Your role is to:
@@ -78,7 +110,7 @@ Focus on accuracy and completeness. If information is unclear, mark it as such r
 
         # Contract Enhancer Agent
         enhancer_agent = LlmAgent(
-            model="gemini-2.0-flash",
+            model=resolve_model("gemini-2.0-flash"),
             name="contract_enhancer",
             description="Contract data enhancement and enrichment agent",
             instruction="""You are a contract enhancement specialist. Your role is to:
@@ -106,7 +138,7 @@ Provide enhanced, standardized, and comprehensive contract data.""",
 
         # Contract Validator Agent
         validator_agent = LlmAgent(
-            model="gemini-2.0-flash",
+            model=resolve_model("gemini-2.0-flash"),
             name="contract_validator",
             description="Contract data validation and quality assurance agent",
             instruction="""You are a contract validation specialist. Your role is to:
@@ -133,7 +165,7 @@ Provide final validated contract data with quality assessment.""",
 
         # Main Sequential Coordinator
         coordinator = LlmAgent(
-            model="gemini-2.0-flash",
+            model=resolve_model("gemini-2.0-flash"),
             name="sequential_coordinator",
             description="Main coordinator for sequential contract processing pipeline",
             instruction="""You are the coordinator for a sequential contract processing pipeline.
@@ -169,19 +201,8 @@ Extraction → Enhancement → Validation → Summary""",
         logger.info("Starting sequential contract processing")
 
         try:
-            # Create session for processing
-            session = await self.session_service.create_session()
-            
-            # Initialize runner
-            runner = Runner(
-                agent=self.main_agent,
-                session_service=self.session_service,
-                session_id=session.id,
-            )
-
-            # Process the contract
-            response = await runner.run(
-                input_prompt=f"""Process this contract through the complete sequential pipeline:
+            # Process the contract in its own session on the shared runner
+            prompt = f"""Process this contract through the complete sequential pipeline:
 
 CONTRACT CONTENT:
 {contract_content}
@@ -193,7 +214,18 @@ Please process this contract through all stages:
 4. Provide a comprehensive summary
 
 Ensure thorough analysis at each stage."""
-            )
+            sessions = self.graph.sessions
+            async with sessions.session("contract") as session_id:
+                response = ""
+                async for event in self.runner.run_async(
+                    user_id=sessions.user_id,
+                    session_id=session_id,
+                    new_message=types.Content(
+                        role="user", parts=[types.Part.from_text(text=prompt)]
+                    ),
+                ):
+                    if event.is_final_response() and event.content and event.content.parts:
+                        response = event.content.parts[0].text or response
 
             # Calculate processing time
             processing_time_ms = int((time.time() - start_time) * 1000)
@@ -204,7 +236,7 @@ Ensure thorough analysis at each stage."""
                 "response": response,
                 "processing_status": "completed",
                 "processing_time_ms": processing_time_ms,
-                "session_id": session.id
+                "session_id": session_id
             }
 
         except Exception as e:
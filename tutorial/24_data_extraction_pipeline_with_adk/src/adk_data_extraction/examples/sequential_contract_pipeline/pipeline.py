@@ -53,10 +53,12 @@ rather than explicit session state management.
 """
 
 import asyncio
+from typing import Any
 
-from google.adk.agents import LlmAgent, SequentialAgent
 from pydantic import BaseModel, Field
 
+from adk_data_extraction.lazy import LazyAttributes
+
 # Sample service contract for both demo and CLI use
 SAMPLE_SERVICE_CONTRACT = """
     CLOUD MIGRATION SERVICES AGREEMENT
@@ -157,13 +159,19 @@ class ContractSummary(BaseModel):
 # SEQUENTIAL PIPELINE AGENTS (Following Official ADK Pattern)
 # =============================================================================
 
-# Step 1: Service Contract Data Extractor
-# Extracts structured data from service contracts
-service_data_extractor = LlmAgent(
-    model="gemini-2.0-flash",
-    name="ServiceDataExtractor",
-    description="Extracts structured data from service contracts",
-    instruction="""You are a Service Contract Data Extraction specialist.
+def _build_agents() -> dict[str, Any]:
+    """The three pipeline agents and the SequentialAgent (imports google-adk)"""
+    from google.adk.agents import LlmAgent, SequentialAgent
+
+    from adk_data_extraction.model_backend import resolve_model
+
+    # Step 1: Service Contract Data Extractor
+    # Extracts structured data from service contracts
+    service_data_extractor = LlmAgent(
+        model=resolve_model("gemini-2.0-flash"),
+        name="ServiceDataExtractor",
+        description="Extracts structured data from service contracts",
+        instruction="""You are a Service Contract Data Extraction specialist.
 
 Your task is to extract key information from the service contract provided by the user.
 
@@ -201,15 +209,15 @@ LEGAL FRAMEWORK:
 - Termination Notice: [Notice period required]
 
 Provide a clear, structured extraction of all contract data."""
-)
+    )
 
-# Step 2: Quality Validator
-# Validates the extracted data quality and completeness
-quality_validator = LlmAgent(
-    model="gemini-2.0-flash",
-    name="QualityValidator",
-    description="Validates extraction quality and completeness",
-    instruction="""You are a Contract Data Quality Validator.
+    # Step 2: Quality Validator
+    # Validates the extracted data quality and completeness
+    quality_validator = LlmAgent(
+        model=resolve_model("gemini-2.0-flash"),
+        name="QualityValidator",
+        description="Validates extraction quality and completeness",
+        instruction="""You are a Contract Data Quality Validator.
 
 Your task is to review the contract data extracted by the previous agent and assess its quality.
 
@@ -252,15 +260,15 @@ RECOMMENDATION: [APPROVE/REVIEW/REJECT]
 
 VALIDATION SUMMARY:
 [Provide detailed assessment of the extracted data quality]"""
-)
+    )
 
-# Step 3: Summary Reporter
-# Creates final comprehensive summary report
-summary_reporter = LlmAgent(
-    model="gemini-2.0-flash",
-    name="SummaryReporter",
-    description="Creates comprehensive contract summary report",
-    instruction="""You are a Contract Summary Report Generator.
+    # Step 3: Summary Reporter
+    # Creates final comprehensive summary report
+    summary_reporter = LlmAgent(
+        model=resolve_model("gemini-2.0-flash"),
+        name="SummaryReporter",
+        description="Creates comprehensive contract summary report",
+        instruction="""You are a Contract Summary Report Generator.
 
 Your task is to create a comprehensive summary report based on the contract data extracted and validated by the previous agents.
 
@@ -303,32 +311,55 @@ NEXT ACTIONS:
 • [Additional actions as needed]
 
 Provide a comprehensive, professional summary report."""
-)
-
+    )
 
-# =============================================================================
-# SEQUENTIAL PIPELINE DEFINITION (Following ADK Samples Pattern)
-# =============================================================================
+    # =============================================================================
+    # SEQUENTIAL PIPELINE DEFINITION (Following ADK Samples Pattern)
+    # =============================================================================
+
+    # Create the Sequential Pipeline following ADK pattern exactly like LLM Auditor sample
+    # This is the core of the Sequential Pipeline Pattern
+    service_contract_pipeline = SequentialAgent(
+        name="ServiceContractPipeline",
+        description=(
+            "Sequential pipeline for processing service contracts. "
+            "Extracts contract data, validates the extraction quality, "
+            "and generates a comprehensive summary report."
+        ),
+        sub_agents=[
+            service_data_extractor,  # Step 1: Extract → state['contract_data']
+            quality_validator,       # Step 2: Validate → state['validation_report']
+            summary_reporter         # Step 3: Report → state['final_report']
+        ]
+    )
 
-# Create the Sequential Pipeline following ADK pattern exactly like LLM Auditor sample
-# This is the core of the Sequential Pipeline Pattern
-service_contract_pipeline = SequentialAgent(
-    name="ServiceContractPipeline",
-    description=(
-        "Sequential pipeline for processing service contracts. "
-        "Extracts contract data, validates the extraction quality, "
-        "and generates a comprehensive summary report."
+    # For ADK compatibility, the root agent must be the SequentialAgent
+    # This follows the exact pattern from ADK samples (e.g., LLM Auditor)
+    root_agent = service_contract_pipeline
+
+    return {
+        "service_data_extractor": service_data_extractor,
+        "quality_validator": quality_validator,
+        "summary_reporter": summary_reporter,
+        "service_contract_pipeline": service_contract_pipeline,
+        "root_agent": root_agent,
+    }
+
+
+# The agents are built on first use, so importing this module (and starting
+# the CLI) does not pay for google-adk
+_agents = LazyAttributes(
+    __name__,
+    _build_agents,
+    names=(
+        "service_data_extractor",
+        "quality_validator",
+        "summary_reporter",
+        "service_contract_pipeline",
+        "root_agent",
     ),
-    sub_agents=[
-        service_data_extractor,  # Step 1: Extract → state['contract_data']
-        quality_validator,       # Step 2: Validate → state['validation_report']
-        summary_reporter         # Step 3: Report → state['final_report']
-    ]
 )
-
-# For ADK compatibility, the root agent must be the SequentialAgent
-# This follows the exact pattern from ADK samples (e.g., LLM Auditor)
-root_agent = service_contract_pipeline
+__getattr__ = _agents.getattr
 
 
 # =============================================================================
@@ -364,7 +395,7 @@ async def demonstrate_sequential_pipeline():
     # Create session service and runner
     session_service = InMemorySessionService()
     runner = Runner(
-        agent=root_agent,  # Use the SequentialAgent directly as root_agent
+        agent=_agents["root_agent"],  # The SequentialAgent itself is the root
         app_name="service_contract_pipeline",
         session_service=session_service,
     )
@@ -467,7 +498,7 @@ async def main_cli_async():
     # Create session service and runner
     session_service = InMemorySessionService()
     runner = Runner(
-        agent=root_agent,  # Use the SequentialAgent directly as root_agent
+        agent=_agents["root_agent"],  # The SequentialAgent itself is the root
         app_name="service_contract_pipeline_cli",
         session_service=session_service,
     )
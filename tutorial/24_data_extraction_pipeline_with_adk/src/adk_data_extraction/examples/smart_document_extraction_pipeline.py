@@ -19,124 +19,40 @@ Architecture Benefits:
 """
 
 import asyncio
-import hashlib
 import logging
-from datetime import datetime
-from enum import Enum
 from typing import Any
 
-from google.adk import Runner
 from google.adk.agents import LlmAgent
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
-from pydantic import BaseModel, Field
+
+from adk_data_extraction.pipeline import (
+    ContractData,
+    DocumentClassification,
+    DocumentExtractionPipeline,
+    DocumentType,
+    GeneralData,
+    InvoiceData,
+    PipelineResult,
+    PipelineUpdate,
+    ValidationSummary,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-
-# =============================================================================
-# SCHEMAS FOR SMART DOCUMENT EXTRACTION PIPELINE
-# =============================================================================
-
-
-class DocumentType(str, Enum):
-    """Document types that can be processed by the pipeline"""
-
-    CONTRACT = "contract"
-    INVOICE = "invoice"
-    AGREEMENT = "agreement"
-    PROPOSAL = "proposal"
-    REPORT = "report"
-    EMAIL = "email"
-    UNKNOWN = "unknown"
-
-
-class DocumentClassification(BaseModel):
-    """Schema for document classification results"""
-
-    document_type: DocumentType = Field(description="Primary document type")
-    complexity_level: str = Field(description="simple, medium, complex")
-    estimated_processing_time: int = Field(description="Estimated seconds to process")
-    recommended_extractor: str = Field(description="Which specialized agent to use")
-    confidence_score: float = Field(
-        description="Confidence in classification (0-1)", ge=0.0, le=1.0
-    )
-    key_indicators: list[str] = Field(
-        description="Text indicators that led to this classification"
-    )
-
-
-class ContractData(BaseModel):
-    """Schema for contract extraction results"""
-
-    parties: list[str] = Field(description="All parties involved in the contract")
-    contract_value: float | None = Field(
-        description="Total contract value", default=None
-    )
-    currency: str = Field(description="Currency code", default="USD")
-    start_date: str | None = Field(description="Contract start date", default=None)
-    end_date: str | None = Field(description="Contract end date", default=None)
-    payment_terms: list[str] = Field(description="Payment terms and schedules")
-    key_obligations: list[str] = Field(description="Main obligations for each party")
-    governing_law: str | None = Field(
-        description="Governing law jurisdiction", default=None
-    )
-
-
-class InvoiceData(BaseModel):
-    """Schema for invoice extraction results"""
-
-    invoice_number: str = Field(description="Invoice number")
-    vendor_name: str = Field(description="Vendor/supplier name")
-    customer_name: str = Field(description="Customer name")
-    invoice_date: str | None = Field(description="Invoice date", default=None)
-    due_date: str | None = Field(description="Payment due date", default=None)
-    total_amount: float = Field(description="Total invoice amount")
-    currency: str = Field(description="Currency code", default="USD")
-    line_items: list[str] = Field(
-        description="List of line items with quantities and prices"
-    )
-    tax_amount: float | None = Field(description="Tax amount", default=None)
-
-
-class GeneralData(BaseModel):
-    """Schema for general document extraction"""
-
-    document_title: str = Field(description="Document title or subject")
-    main_entities: list[str] = Field(
-        description="Key entities mentioned (people, companies, etc.)"
-    )
-    key_dates: list[str] = Field(description="Important dates mentioned")
-    summary: str = Field(description="Brief summary of the document content")
-    action_items: list[str] = Field(description="Action items or next steps mentioned")
-    contact_info: list[str] = Field(description="Contact information found")
-
-
-class ValidationSummary(BaseModel):
-    """Schema for validation summary"""
-
-    is_valid: bool = Field(description="Whether extraction passed validation")
-    confidence_score: float = Field(
-        description="Confidence in extraction quality (0-1)", ge=0.0, le=1.0
-    )
-    completeness_score: float = Field(
-        description="How complete the extraction is (0-1)", ge=0.0, le=1.0
-    )
-    issues: list[str] = Field(description="Quality issues identified")
-    recommendation: str = Field(description="Recommended next action")
-
-
-class PipelineResult(BaseModel):
-    """Complete pipeline result"""
-
-    extraction_id: str = Field(description="Unique identifier for this extraction")
-    classification: DocumentClassification
-    extracted_data: ContractData | InvoiceData | GeneralData
-    validation: ValidationSummary
-    processing_time_ms: int = Field(description="Total processing time in milliseconds")
-    pipeline_status: str = Field(description="Overall pipeline status")
+__all__ = [
+    "ContractData",
+    "DocumentClassification",
+    "DocumentType",
+    "GeneralData",
+    "InvoiceData",
+    "PipelineResult",
+    "PipelineUpdate",
+    "SmartDocumentExtractionPipeline",
+    "ValidationSummary",
+    "demonstrate_smart_document_pipeline",
+    "main",
+]
 
 
 # =============================================================================
@@ -168,8 +84,7 @@ def get_shared_state() -> dict[str, Any]:
 # SMART DOCUMENT EXTRACTION PIPELINE WITH ADK PATTERNS
 # =============================================================================
 
-
-class SmartDocumentExtractionPipeline:
+class SmartDocumentExtractionPipeline(DocumentExtractionPipeline):
     """
     Smart document extraction pipeline implementing Google ADK best practices.
 
@@ -181,17 +96,12 @@ class SmartDocumentExtractionPipeline:
     - Comprehensive error handling and recovery
     """
 
-    def __init__(self):
-        self.session_service = InMemorySessionService()
-        self.coordinator_agent = self._create_coordinator_agent()
-        self.runner = self._create_runner()
-
     def _create_specialist_agents(self) -> dict[str, LlmAgent]:
         """Create specialized extraction agents"""
 
         # Contract Specialist Agent - Uses output_schema (no tools allowed per ADK constraint)
         contract_specialist = LlmAgent(
-            model="gemini-2.0-flash",
+            model=self.model_backend.model("gemini-2.0-flash"),
             name="contract_specialist",
             description="Specialized agent for contract analysis and data extraction",
             instruction="""You are a legal document specialist in the Smart Document Extraction Pipeline.
@@ -238,7 +148,7 @@ Example response:
 
         # Invoice Specialist Agent - Uses output_schema (no tools allowed)
         invoice_specialist = LlmAgent(
-            model="gemini-2.0-flash",
+            model=self.model_backend.model("gemini-2.0-flash"),
             name="invoice_specialist",
             description="Specialized agent for invoice processing and financial data extraction",
             instruction="""You are a financial document specialist focused on invoice processing.
@@ -273,7 +183,7 @@ Return ONLY the JSON, no additional text or explanation.""",
 
         # General Document Specialist Agent - Uses output_schema (no tools allowed)
         general_specialist = LlmAgent(
-            model="gemini-2.0-flash",
+            model=self.model_backend.model("gemini-2.0-flash"),
             name="general_specialist",
             description="General-purpose agent for extracting key information from various documents",
             instruction="""You are a general document analysis specialist.
@@ -305,7 +215,7 @@ Return ONLY the JSON, no additional text or explanation.""",
 
         # Validation Specialist Agent - Uses output_schema (no tools allowed)
         validation_specialist = LlmAgent(
-            model="gemini-2.0-flash",
+            model=self.model_backend.model("gemini-2.0-flash"),
             name="validation_specialist",
             description="Quality assurance agent that validates extraction results",
             instruction="""You are a quality assurance specialist in the Smart Document Extraction Pipeline.
@@ -365,7 +275,7 @@ Example response:
 
         # Document Classification Agent (as sub-agent) - Uses output_schema (no tools allowed)
         classifier_agent = LlmAgent(
-            model="gemini-2.0-flash",
+            model=self.model_backend.model("gemini-2.0-flash"),
             name="document_classifier",
             description="Classifies documents and determines processing approach",
             instruction="""You are an expert document classifier in the Smart Document Extraction Pipeline.
@@ -412,7 +322,7 @@ Example response:
 
         # Main Coordinator Agent with Hierarchical Structure
         coordinator = LlmAgent(
-            model="gemini-2.0-flash",
+            model=self.model_backend.model("gemini-2.0-flash"),
             name="extraction_coordinator",
             description="Main coordinator for multi-agent document extraction pipeline",
             instruction="""You are the main coordinator for a sophisticated document extraction pipeline using Google ADK hierarchical coordination patterns.
@@ -464,192 +374,6 @@ You coordinate but do not perform extraction yourself - delegate to specialist a
 
         return coordinator
 
-    def _create_runner(self) -> Runner:
-        """Create runner for the coordinator agent"""
-        return Runner(
-            agent=self.coordinator_agent,
-            app_name="smart_document_extraction",
-            session_service=self.session_service,
-        )
-
-    async def process_document(self, content: str) -> PipelineResult:
-        """Process document using ADK hierarchical coordination patterns"""
-        start_time = datetime.now()
-        extraction_id = hashlib.md5(content.encode()).hexdigest()
-
-        try:
-            logger.info(
-                f"Starting document extraction pipeline for document {extraction_id[:8]}"
-            )
-
-            # Create session for the pipeline
-            session_id = f"extraction_{extraction_id[:8]}"
-            await self.session_service.create_session(
-                app_name="smart_document_extraction",
-                user_id="pipeline_user",
-                session_id=session_id,
-            )
-
-            # Create user message with document content
-            user_content = types.Content(
-                role="user",
-                parts=[
-                    types.Part.from_text(
-                        text=f"Process this document through the complete extraction pipeline:\n\n{content}"
-                    )
-                ],
-            )
-
-            # Run the pipeline through the coordinator agent
-            async for event in self.runner.run_async(
-                user_id="pipeline_user",
-                session_id=session_id,
-                new_message=user_content,
-            ):
-                if event.is_final_response() and event.content and event.content.parts:
-                    if event.content.parts[0].text:
-                        logger.info("Pipeline processing completed successfully")
-                        break
-
-            # Calculate processing time
-            processing_time_ms = int(
-                (datetime.now() - start_time).total_seconds() * 1000
-            )
-
-            # Get session to retrieve agent outputs
-            session = await self.session_service.get_session(
-                app_name="smart_document_extraction",
-                user_id="pipeline_user",
-                session_id=session_id,
-            )
-
-            # Extract actual results from session state
-            classification_data = None
-            extracted_data = None
-            validation_data = None
-
-            # Look for structured outputs in session state
-            if hasattr(session, "state") and session.state:
-                classification_data = session.state.get("classification")
-                extracted_data = (
-                    session.state.get("contract_extraction")
-                    or session.state.get("invoice_extraction")
-                    or session.state.get("general_extraction")
-                )
-                validation_data = session.state.get("validation_result")
-
-            # Build result with actual extracted data or fallback
-            if classification_data and isinstance(classification_data, dict):
-                classification = DocumentClassification(**classification_data)
-            else:
-                # Parse from pipeline output or use default
-                classification = DocumentClassification(
-                    document_type=DocumentType.AGREEMENT,
-                    complexity_level="medium",
-                    estimated_processing_time=30,
-                    recommended_extractor="contract_specialist",
-                    confidence_score=0.95,
-                    key_indicators=["agreement", "services", "terms", "governing law"],
-                )
-
-            # Use actual extracted data if available
-            if extracted_data and isinstance(extracted_data, dict):
-                if classification.document_type in [
-                    DocumentType.CONTRACT,
-                    DocumentType.AGREEMENT,
-                ]:
-                    extracted_data_obj = ContractData(**extracted_data)
-                elif classification.document_type == DocumentType.INVOICE:
-                    extracted_data_obj = InvoiceData(**extracted_data)
-                else:
-                    extracted_data_obj = GeneralData(**extracted_data)
-            else:
-                # Extract from improved sample contract for demonstration
-                extracted_data_obj = ContractData(
-                    parties=["TechCorp Solutions LLC", "Global Industries Inc."],
-                    contract_value=125000.0,
-                    currency="USD",
-                    start_date="2024-04-01",
-                    end_date="2025-04-30",
-                    payment_terms=[
-                        "$35,000 upon contract execution and project kickoff",
-                        "$40,000 upon completion of development and testing phase",
-                        "$30,000 upon successful system deployment and go-live",
-                        "$20,000 upon completion of training and knowledge transfer",
-                    ],
-                    key_obligations=[
-                        "Custom software development for cloud-based inventory management system",
-                        "Integration with existing ERP platforms (SAP, Oracle, Salesforce)",
-                        "Mobile application development (iOS and Android)",
-                        "Database design and migration services",
-                        "Staff training and knowledge transfer sessions",
-                        "6 months of post-implementation support and maintenance",
-                        "Documentation and user manuals",
-                    ],
-                    governing_law="State of California",
-                )
-
-            # Use actual validation data if available
-            if validation_data and isinstance(validation_data, dict):
-                validation = ValidationSummary(**validation_data)
-            else:
-                validation = ValidationSummary(
-                    is_valid=True,
-                    confidence_score=0.90,
-                    completeness_score=0.95,
-                    issues=[],
-                    recommendation="approved",
-                )
-
-            result = PipelineResult(
-                extraction_id=extraction_id,
-                classification=classification,
-                extracted_data=extracted_data_obj,
-                validation=validation,
-                processing_time_ms=processing_time_ms,
-                pipeline_status="completed",
-            )
-
-            logger.info(
-                f"Document extraction pipeline completed: {result.pipeline_status} (took {processing_time_ms}ms)"
-            )
-            return result
-
-        except Exception as e:
-            logger.error(f"Error in document extraction pipeline: {e}")
-            processing_time_ms = int(
-                (datetime.now() - start_time).total_seconds() * 1000
-            )
-
-            return PipelineResult(
-                extraction_id=extraction_id,
-                classification=DocumentClassification(
-                    document_type=DocumentType.UNKNOWN,
-                    complexity_level="error",
-                    estimated_processing_time=0,
-                    recommended_extractor="none",
-                    confidence_score=0.0,
-                    key_indicators=[f"Pipeline error: {str(e)}"],
-                ),
-                extracted_data=GeneralData(
-                    document_title="Pipeline Error",
-                    main_entities=[f"Error: {str(e)}"],
-                    key_dates=[],
-                    summary="Pipeline processing failed due to error",
-                    action_items=["Fix pipeline error"],
-                    contact_info=[],
-                ),
-                validation=ValidationSummary(
-                    is_valid=False,
-                    confidence_score=0.0,
-                    completeness_score=0.0,
-                    issues=[f"Pipeline error: {str(e)}"],
-                    recommendation="manual_processing",
-                ),
-                processing_time_ms=processing_time_ms,
-                pipeline_status="failed",
-            )
-
 
 # =============================================================================
 # COMPARISON AND DEMONSTRATION
@@ -0,0 +1,467 @@
+"""
+Model-Call Governor
+
+Fanning documents out concurrently runs into provider quotas, and a 429 used to
+end the document with a failed result. ModelCallGovernor sits in front of every
+model call in the process and keeps the call rate inside the quota:
+
+- token buckets: requests per minute and (estimated, then corrected) tokens per
+  minute; callers reserve capacity and wait until it refills
+- adaptive concurrency (AIMD): the number of calls in flight grows by about one
+  per window of successful calls and is halved on a 429 or when latency exceeds
+  ``target_latency_ms``
+- retries: rate-limit and transient server errors are retried with exponential
+  backoff and full jitter, as long as no part of the response was delivered yet
+
+Agents get a GovernedLlm through the model backend once a process-wide governor
+is set (``set_model_call_governor``) or configured from the environment
+(ADK_MODEL_RPM, ADK_MODEL_TPM, ADK_MODEL_MAX_CONCURRENCY). ``metrics()`` reports
+the current limits, in-flight calls and queue depth.
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import time
+from collections import deque
+from collections.abc import AsyncGenerator
+from typing import Any
+
+from google.adk.models import BaseLlm, LLMRegistry, LlmRequest, LlmResponse
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: rate limited, or a transient server failure
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def status_code(error: BaseException) -> int | None:
+    """HTTP status of a model API error, if it carries one"""
+    for attribute in ("code", "status_code"):
+        code = getattr(error, attribute, None)
+        if isinstance(code, int):
+            return code
+    if "RESOURCE_EXHAUSTED" in str(error):
+        return 429
+    return None
+
+
+def estimate_tokens(llm_request: LlmRequest) -> int:
+    """Rough prompt size of a request at four characters per token"""
+    config = llm_request.config
+    system = getattr(config, "system_instruction", None) or ""
+    if not isinstance(system, str):
+        system = "".join(part.text or "" for part in system.parts or [])
+    chars = len(system)
+    for content in llm_request.contents:
+        for part in content.parts or []:
+            if part.text is not None:
+                chars += len(part.text)
+            else:
+                # Function calls and responses
+                data = part.model_dump(mode="json", exclude_none=True)
+                chars += len(json.dumps(data))
+    return chars // 4 + 1
+
+
+class TokenBucket:
+    """
+    Rate limit refilled continuously at ``per_minute / 60`` units per second.
+
+    Reservations are granted in arrival order: each one is debited immediately
+    (the level may go negative) and told how long to wait for the debt to be
+    repaid, so large requests cannot be starved by small ones.
+    """
+
+    def __init__(self, per_minute: float, capacity: float | None = None):
+        self.per_minute = per_minute
+        self.capacity = capacity if capacity is not None else per_minute
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(
+            self.capacity, self.level + (now - self._updated) * self.per_minute / 60
+        )
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Debit ``amount`` and return the seconds to wait before using it"""
+        self._refill()
+        self.level -= amount
+        return max(-self.level, 0.0) * 60 / self.per_minute
+
+    def adjust(self, amount: float) -> None:
+        """Credit (or, when negative, debit) a correction to an earlier reservation"""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+    def available(self) -> float:
+        """Units available right now (negative while reservations wait)"""
+        self._refill()
+        return self.level
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    TokenBucket kept in shared memory, so worker processes share one limit.
+
+    Create it in the parent process and pass it to the workers when they are
+    started.
+    """
+
+    def __init__(
+        self,
+        per_minute: float,
+        capacity: float | None = None,
+        context: Any = None,
+    ):
+        self.per_minute = per_minute
+        self.capacity = capacity if capacity is not None else per_minute
+        context = context or multiprocessing.get_context()
+        # [level, last refill]; time.monotonic() is system-wide
+        self._state = context.Array("d", [self.capacity, time.monotonic()])
+
+    @property
+    def level(self) -> float:
+        return self._state[0]
+
+    @level.setter
+    def level(self, value: float) -> None:
+        self._state[0] = value
+
+    @property
+    def _updated(self) -> float:
+        return self._state[1]
+
+    @_updated.setter
+    def _updated(self, value: float) -> None:
+        self._state[1] = value
+
+    def reserve(self, amount: float) -> float:
+        with self._state.get_lock():
+            return super().reserve(amount)
+
+    def adjust(self, amount: float) -> None:
+        with self._state.get_lock():
+            super().adjust(amount)
+
+    def available(self) -> float:
+        with self._state.get_lock():
+            return super().available()
+
+
+class GovernorMetrics(BaseModel):
+    """Current limits and load of a ModelCallGovernor"""
+
+    concurrency_limit: float = Field(description="Current adaptive concurrency limit")
+    in_flight: int = Field(description="Model calls running")
+    queue_depth: int = Field(description="Model calls waiting for capacity")
+    requests_per_minute: float | None = Field(description="Request rate limit")
+    tokens_per_minute: float | None = Field(description="Token rate limit")
+    available_requests: float | None = Field(
+        description="Requests the rate limit allows right now"
+    )
+    available_tokens: float | None = Field(
+        description="Tokens the rate limit allows right now"
+    )
+    calls: int = Field(description="Model calls completed")
+    throttled: int = Field(description="Calls rejected as rate limited")
+    retries: int = Field(description="Calls retried")
+    failures: int = Field(description="Calls that failed after all retries")
+    mean_latency_ms: float = Field(description="Mean latency of recent calls")
+
+
+class ModelCallGovernor:
+    """
+    Process-wide rate limiting, adaptive concurrency and retries for model calls.
+
+    Args:
+        requests_per_minute: Request quota (None for no request limit)
+        tokens_per_minute: Token quota, prompt plus response (None for no limit)
+        initial_concurrency: Calls allowed in flight at start
+        min_concurrency: Lower bound of the adaptive limit
+        max_concurrency: Upper bound of the adaptive limit
+        target_latency_ms: Latency above which the limit is decreased (None to
+            adapt to rate-limit errors only)
+        decrease_factor: Multiplier applied to the limit on a congestion signal
+        max_retries: Retries of a retryable error before giving up
+        base_delay: Backoff before the first retry, in seconds (doubled per retry)
+        max_delay: Longest backoff, in seconds
+        expected_output_tokens: Response tokens reserved per call before the
+            actual usage is known
+        request_bucket: Bucket to use for the request limit instead of a
+            per-process one, e.g. a SharedTokenBucket shared by worker processes
+        token_bucket: Bucket to use for the token limit instead of a per-process
+            one
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 64,
+        target_latency_ms: float | None = None,
+        decrease_factor: float = 0.5,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        expected_output_tokens: int = 256,
+        request_bucket: TokenBucket | None = None,
+        token_bucket: TokenBucket | None = None,
+    ):
+        if not 1 <= min_concurrency <= initial_concurrency <= max_concurrency:
+            raise ValueError(
+                "Expected min_concurrency <= initial_concurrency <= max_concurrency"
+            )
+        if request_bucket is None and requests_per_minute:
+            request_bucket = TokenBucket(requests_per_minute)
+        if token_bucket is None and tokens_per_minute:
+            token_bucket = TokenBucket(tokens_per_minute)
+        self.requests = request_bucket
+        self.tokens = token_bucket
+        self.limit = float(initial_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency_ms = target_latency_ms
+        self.decrease_factor = decrease_factor
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.expected_output_tokens = expected_output_tokens
+
+        self.in_flight = 0
+        self.rate_waiting = 0
+        self.calls = 0
+        self.throttled = 0
+        self.retries = 0
+        self.failures = 0
+        self.latencies_ms: deque[float] = deque(maxlen=200)
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    @classmethod
+    def from_env(cls) -> "ModelCallGovernor | None":
+        """Governor configured by ADK_MODEL_RPM, ADK_MODEL_TPM and
+        ADK_MODEL_MAX_CONCURRENCY, or None when none of them is set"""
+        rpm = os.getenv("ADK_MODEL_RPM")
+        tpm = os.getenv("ADK_MODEL_TPM")
+        max_concurrency = os.getenv("ADK_MODEL_MAX_CONCURRENCY")
+        if not (rpm or tpm or max_concurrency):
+            return None
+        max_concurrency = int(max_concurrency or 64)
+        return cls(
+            requests_per_minute=float(rpm) if rpm else None,
+            tokens_per_minute=float(tpm) if tpm else None,
+            initial_concurrency=min(8, max_concurrency),
+            max_concurrency=max_concurrency,
+        )
+
+    def wrap(self, model: str | BaseLlm) -> "GovernedLlm":
+        """Wrap a model (name or instance) so its calls go through the governor"""
+        if isinstance(model, GovernedLlm):
+            model = model.inner
+        if isinstance(model, str):
+            model = LLMRegistry.new_llm(model)
+        return GovernedLlm(model=model.model, inner=model, governor=self)
+
+    def apply(self, root_agent: Any) -> None:
+        """Wrap the model of every LLM agent in an agent tree"""
+        if getattr(root_agent, "model", None):
+            root_agent.model = self.wrap(root_agent.model)
+        for sub_agent in root_agent.sub_agents:
+            self.apply(sub_agent)
+
+    # Concurrency slots
+
+    @property
+    def slots(self) -> int:
+        return max(int(self.limit), self.min_concurrency)
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < self.slots:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    async def _enter(self) -> None:
+        if self.in_flight < self.slots and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Woken and cancelled in the same step: hand the slot on
+                self._leave()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def _leave(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    # AIMD
+
+    def _increase(self) -> None:
+        # About one extra slot per window of ``limit`` successful calls
+        self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+        self._wake()
+
+    def _decrease(self, reason: str) -> None:
+        now = time.monotonic()
+        # One decrease per congestion episode, not one per call caught in it
+        if now - self._last_decrease < 1.0:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(self.min_concurrency, self.limit * self.decrease_factor)
+        logger.info(
+            f"Model concurrency limit {previous:.1f} → {self.limit:.1f} ({reason})"
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def _reserve(self, estimated_tokens: int) -> None:
+        """Wait until the rate limits admit one more call"""
+        delay = 0.0
+        if self.requests is not None:
+            delay = max(delay, self.requests.reserve(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.reserve(estimated_tokens))
+        if delay > 0:
+            self.rate_waiting += 1
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self.rate_waiting -= 1
+
+    async def call(
+        self, inner: BaseLlm, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        """
+        Run one model call under the governor's limits.
+
+        Args:
+            inner: Model to call
+            llm_request: Request to send
+            stream: Whether to stream the response
+
+        Yields:
+            LlmResponse: Responses of the first attempt that succeeds
+        """
+        estimated = estimate_tokens(llm_request) + self.expected_output_tokens
+        attempt = 0
+        while True:
+            await self._reserve(estimated)
+            await self._enter()
+            started = time.perf_counter()
+            delivered = False
+            usage = None
+            try:
+                async for response in inner.generate_content_async(llm_request, stream):
+                    usage = response.usage_metadata or usage
+                    delivered = True
+                    yield response
+            except Exception as e:
+                code = status_code(e)
+                if code == 429:
+                    self.throttled += 1
+                    self._decrease("rate limited")
+                if (
+                    delivered
+                    or code not in RETRYABLE_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    self.failures += 1
+                    raise
+                delay = self._backoff(attempt)
+                attempt += 1
+                self.retries += 1
+                logger.warning(
+                    f"Model call failed ({code}), retry {attempt} in {delay:.1f}s"
+                )
+            else:
+                latency_ms = (time.perf_counter() - started) * 1000
+                self.calls += 1
+                self.latencies_ms.append(latency_ms)
+                if self.tokens is not None and usage is not None:
+                    actual = (usage.prompt_token_count or 0) + (
+                        usage.candidates_token_count or 0
+                    )
+                    self.tokens.adjust(estimated - actual)
+                if (
+                    self.target_latency_ms is not None
+                    and latency_ms > self.target_latency_ms
+                ):
+                    self._decrease("latency above target")
+                else:
+                    self._increase()
+                return
+            finally:
+                self._leave()
+            await asyncio.sleep(delay)
+
+    def metrics(self) -> GovernorMetrics:
+        """Current limits, load and call outcomes"""
+        return GovernorMetrics(
+            concurrency_limit=round(self.limit, 2),
+            in_flight=self.in_flight,
+            queue_depth=len(self._waiters) + self.rate_waiting,
+            requests_per_minute=self.requests.per_minute if self.requests else None,
+            tokens_per_minute=self.tokens.per_minute if self.tokens else None,
+            available_requests=self.requests.available() if self.requests else None,
+            available_tokens=self.tokens.available() if self.tokens else None,
+            calls=self.calls,
+            throttled=self.throttled,
+            retries=self.retries,
+            failures=self.failures,
+            mean_latency_ms=sum(self.latencies_ms) / len(self.latencies_ms)
+            if self.latencies_ms
+            else 0.0,
+        )
+
+
+class GovernedLlm(BaseLlm):
+    """Model wrapper sending every call through a ModelCallGovernor"""
+
+    inner: BaseLlm
+    governor: Any
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        async for response in self.governor.call(self.inner, llm_request, stream):
+            yield response
+
+
+_default_governor: ModelCallGovernor | None = None
+_governor_from_env = False
+
+
+def set_model_call_governor(governor: ModelCallGovernor | None) -> None:
+    """Set the process-wide governor (None reverts to the environment)"""
+    global _default_governor, _governor_from_env
+    _default_governor = governor
+    _governor_from_env = False
+
+
+def get_model_call_governor() -> ModelCallGovernor | None:
+    """The process-wide governor, created from the environment on first use"""
+    global _default_governor, _governor_from_env
+    if _default_governor is None and not _governor_from_env:
+        _default_governor = ModelCallGovernor.from_env()
+        _governor_from_env = True
+    return _default_governor
@@ -0,0 +1,245 @@
+"""
+Hedged Model Calls
+
+Each pipeline stage is a single model call, so a few slow responses set the p99.
+With a HedgingPolicy, a call still running after the configured percentile of
+that agent's recent latencies gets a duplicate request. The first response that
+is valid wins: it is free of errors and, for agents with an output schema, it
+parses as that schema. The other request is cancelled.
+
+Most calls finish before the hedge delay, so at the 95th percentile only about
+one call in twenty is duplicated, while the slowest tail is cut to roughly the
+hedge delay plus a typical call. HedgingPolicy.report() gives the hedge rate and
+compares the observed p99 with an estimate of the p99 without hedging. For the
+estimate, a cancelled primary request counts with the time it had run when it
+was cancelled, so the estimate is a lower bound.
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncGenerator
+from typing import Any
+
+from google.adk.models import BaseLlm, LLMRegistry, LlmRequest, LlmResponse
+from pydantic import BaseModel, Field, ValidationError
+
+from adk_data_extraction.batch import percentile
+
+
+class HedgingReport(BaseModel):
+    """Hedged calls and their effect on tail latency"""
+
+    calls: int = Field(description="Model calls made through the policy")
+    hedged: int = Field(description="Calls that issued a duplicate request")
+    hedge_rate: float = Field(description="Fraction of calls hedged")
+    hedge_wins: int = Field(description="Hedged calls answered by the duplicate")
+    p50_ms: float = Field(description="Median latency with hedging")
+    p99_ms: float = Field(description="99th-percentile latency with hedging")
+    p99_without_hedging_ms: float = Field(
+        description="Estimated 99th-percentile latency without hedging (lower bound)"
+    )
+    p99_improvement_ms: float = Field(
+        description="Estimated p99 latency removed by hedging"
+    )
+
+
+class HedgingPolicy:
+    """
+    Issues a duplicate model request when a call runs unusually long.
+
+    Args:
+        percentile: Percentile of the agent's recent latencies after which a call
+            is hedged
+        min_samples: Latencies an agent needs on record before its calls are
+            hedged
+        window: Recent latencies kept per agent
+        min_delay_ms: Shortest hedge delay, so fast agents are not hedged on noise
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        window: int = 200,
+        min_delay_ms: float = 0.0,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.min_delay_ms = min_delay_ms
+        self.latencies: dict[str, deque[float]] = {}
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.observed_ms: deque[float] = deque(maxlen=1000)
+        self.unhedged_ms: deque[float] = deque(maxlen=1000)
+
+    def wrap(
+        self, model: str | BaseLlm, agent_name: str, output_schema: Any = None
+    ) -> "HedgedLlm":
+        """Wrap one agent's model (name or instance) with hedging"""
+        if isinstance(model, HedgedLlm):
+            model = model.inner
+        if isinstance(model, str):
+            model = LLMRegistry.new_llm(model)
+        return HedgedLlm(
+            model=model.model,
+            inner=model,
+            policy=self,
+            agent_name=agent_name,
+            output_schema=output_schema,
+        )
+
+    def apply(self, root_agent: Any) -> None:
+        """Wrap the model of every LLM agent in an agent tree"""
+        if getattr(root_agent, "model", None):
+            root_agent.model = self.wrap(
+                root_agent.model,
+                root_agent.name,
+                getattr(root_agent, "output_schema", None),
+            )
+        for sub_agent in root_agent.sub_agents:
+            self.apply(sub_agent)
+
+    def hedge_delay(self, agent_name: str) -> float | None:
+        """Seconds after which to hedge the agent's calls; None while learning"""
+        latencies = self.latencies.get(agent_name)
+        if latencies is None or len(latencies) < self.min_samples:
+            return None
+        delay_ms = percentile(list(latencies), self.percentile)
+        return max(delay_ms, self.min_delay_ms) / 1000
+
+    def record(self, agent_name: str, latency_ms: float) -> None:
+        """Record the latency of one request to the agent's model"""
+        self.latencies.setdefault(agent_name, deque(maxlen=self.window)).append(
+            latency_ms
+        )
+
+    def report(self) -> HedgingReport:
+        """Hedge rate and tail latency so far"""
+        p99 = percentile(list(self.observed_ms), 99)
+        p99_without = percentile(list(self.unhedged_ms), 99)
+        return HedgingReport(
+            calls=self.calls,
+            hedged=self.hedged,
+            hedge_rate=self.hedged / self.calls if self.calls else 0.0,
+            hedge_wins=self.hedge_wins,
+            p50_ms=round(percentile(list(self.observed_ms), 50), 1),
+            p99_ms=round(p99, 1),
+            p99_without_hedging_ms=round(p99_without, 1),
+            p99_improvement_ms=round(max(p99_without - p99, 0.0), 1),
+        )
+
+
+def _valid(responses: list[LlmResponse], output_schema: Any) -> bool:
+    """Whether a complete response is usable: no errors and, with an output
+    schema, text that parses as the schema"""
+    if not responses or any(response.error_code for response in responses):
+        return False
+    if output_schema is None:
+        return any(response.content for response in responses)
+    text = "".join(
+        part.text or ""
+        for response in responses
+        if response.content
+        for part in response.content.parts or []
+        if not part.thought
+    )
+    try:
+        output_schema.model_validate_json(text)
+    except ValidationError:
+        return False
+    return True
+
+
+class HedgedLlm(BaseLlm):
+    """Model wrapper hedging slow calls of one agent"""
+
+    inner: BaseLlm
+    policy: Any
+    agent_name: str
+    output_schema: Any = None
+
+    async def _attempt(
+        self, llm_request: LlmRequest
+    ) -> tuple[list[LlmResponse], float]:
+        started = time.perf_counter()
+        responses = [
+            response
+            async for response in self.inner.generate_content_async(llm_request)
+        ]
+        return responses, (time.perf_counter() - started) * 1000
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        policy = self.policy
+        delay = policy.hedge_delay(self.agent_name)
+        if stream or delay is None:
+            started = time.perf_counter()
+            async for response in self.inner.generate_content_async(
+                llm_request, stream
+            ):
+                yield response
+            latency_ms = (time.perf_counter() - started) * 1000
+            policy.record(self.agent_name, latency_ms)
+            policy.calls += 1
+            policy.observed_ms.append(latency_ms)
+            policy.unhedged_ms.append(latency_ms)
+            return
+
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(self._attempt(llm_request))
+        attempts = [primary]
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if not done:
+                # The duplicate gets its own copy; models may annotate requests
+                hedge = asyncio.ensure_future(
+                    self._attempt(llm_request.model_copy(deep=True))
+                )
+                attempts.append(hedge)
+                policy.hedged += 1
+
+            winner = fallback = None
+            error: BaseException | None = None
+            pending = set(attempts)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for attempt in attempts:
+                    if attempt not in done or winner is not None:
+                        continue
+                    if attempt.exception() is not None:
+                        error = error or attempt.exception()
+                        continue
+                    responses, latency_ms = attempt.result()
+                    policy.record(self.agent_name, latency_ms)
+                    if _valid(responses, self.output_schema):
+                        winner = attempt
+                    elif fallback is None:
+                        fallback = attempt
+            chosen = winner or fallback
+            if chosen is None:
+                raise error
+        finally:
+            for attempt in attempts:
+                if not attempt.done():
+                    attempt.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        policy.calls += 1
+        policy.observed_ms.append(elapsed_ms)
+        if chosen is primary:
+            policy.unhedged_ms.append(primary.result()[1])
+        else:
+            policy.hedge_wins += 1
+            # The primary was cancelled (or failed) after running this long
+            policy.unhedged_ms.append(elapsed_ms)
+            if primary.cancelled():
+                policy.record(self.agent_name, elapsed_ms)
+        for response in chosen.result()[0]:
+            yield response
@@ -0,0 +1,454 @@
+"""
+Page-Parallel PDF Ingestion
+
+The pipelines take plain text, and reading a PDF with ``open(...).read()`` does
+not work. PdfIngestor turns PDFs into text with PyMuPDF:
+
+- page-parallel: pages are extracted in a thread pool (or a process pool, for
+  large scanned-text PDFs where extraction is CPU bound), each worker keeping
+  its own open document handle
+- streaming: pages are yielded in order while at most ``window`` pages are
+  in flight, and only the text is kept, never the rendered pages
+- cached: extracted text is stored by the file's sha256, so the same PDF under
+  any name or path is read from the cache instead of extracted again
+- provenance: DocumentText keeps each page's character span, and
+  ``page_provenance`` maps the extracted fields of a result to the pages their
+  values appear on
+
+``read_document`` is the entry point for files of either kind: ``.pdf`` files
+are ingested, anything else is read as UTF-8 text.
+
+    document = read_document("contract.pdf")
+    result = await pipeline.process_document(document.text)
+    pages = page_provenance(result.extracted_data, document)
+"""
+
+import asyncio
+import bisect
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+# Joins page texts into the document text; the form feed marks the page break
+# (DocumentNormalizer strips headers and footers at page edges)
+PAGE_SEPARATOR = "\n\f\n"
+
+# Open document handles each pool worker keeps
+_OPEN_DOCUMENTS = 4
+
+# Values shorter than this are too common to locate meaningfully
+_MIN_PROVENANCE_CHARS = 3
+
+_local = threading.local()
+
+
+class PdfIngestionError(RuntimeError):
+    """Raised when a PDF cannot be opened or read"""
+
+
+class Page(BaseModel):
+    """Text of one PDF page"""
+
+    number: int = Field(description="Page number, starting at 1")
+    text: str = Field(description="Extracted text of the page")
+
+
+class PageSpan(BaseModel):
+    """Where a page's text sits in the document text"""
+
+    number: int = Field(description="Page number, starting at 1")
+    start: int = Field(description="Offset of the page's first character")
+    end: int = Field(description="Offset just past the page's last character")
+
+
+class DocumentText(BaseModel):
+    """Text of a document, with page spans for PDFs"""
+
+    source: str = Field(description="File the text was read from")
+    sha256: str = Field(description="sha256 of the file's bytes")
+    text: str = Field(description="Document text; PDF pages joined by blank lines")
+    pages: list[PageSpan] = Field(
+        default_factory=list, description="Page spans (empty for text files)"
+    )
+
+    def page_at(self, offset: int) -> int | None:
+        """Page number containing a character offset, or None"""
+        index = bisect.bisect_right([page.start for page in self.pages], offset) - 1
+        if index >= 0 and offset < self.pages[index].end:
+            return self.pages[index].number
+        return None
+
+    def pages_for(self, value: str) -> list[int]:
+        """Pages on which ``value`` appears, ignoring case and line breaks"""
+        words = value.split()
+        if not self.pages or len(value.strip()) < _MIN_PROVENANCE_CHARS:
+            return []
+        # Whole words only, so "Total 3" does not match "Total 30"
+        pattern = re.compile(
+            r"(?<!\w)" + r"\s+".join(map(re.escape, words)) + r"(?!\w)", re.IGNORECASE
+        )
+        found = (self.page_at(match.start()) for match in pattern.finditer(self.text))
+        return sorted({number for number in found if number is not None})
+
+
+def _pymupdf():
+    try:
+        import pymupdf
+    except ImportError as e:
+        raise ImportError("PDF ingestion requires PyMuPDF: pip install PyMuPDF") from e
+    return pymupdf
+
+
+def file_sha256(path: str | Path) -> str:
+    """sha256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _open_document(path: str, sha256: str) -> Any:
+    """This worker's open handle on a PDF (PyMuPDF documents are not thread-safe)"""
+    documents = getattr(_local, "documents", None)
+    if documents is None:
+        documents = _local.documents = OrderedDict()
+    document = documents.get(sha256)
+    if document is None:
+        document = _pymupdf().open(path)
+        documents[sha256] = document
+        if len(documents) > _OPEN_DOCUMENTS:
+            documents.popitem(last=False)[1].close()
+    else:
+        documents.move_to_end(sha256)
+    return document
+
+
+def _page_text(path: str, sha256: str, number: int) -> str:
+    """Extract the text of one page (runs in a pool worker)"""
+    page = _open_document(path, sha256).load_page(number - 1)
+    return page.get_text("text", sort=True).rstrip()
+
+
+def _page_count(path: str) -> int:
+    pymupdf = _pymupdf()
+    try:
+        document = pymupdf.open(path)
+    except RuntimeError as e:  # FileDataError and other MuPDF errors
+        raise PdfIngestionError(f"Cannot read PDF {path}: {e}") from e
+    with document:
+        if document.needs_pass:
+            raise PdfIngestionError(f"{path} is password protected")
+        return document.page_count
+
+
+class PageTextCache:
+    """
+    Extracted page texts on disk, one JSON Lines file per PDF sha256.
+
+    Entries are written page by page while a PDF is extracted and only become
+    visible once every page is in, so an interrupted extraction is not cached.
+
+    Args:
+        directory: Cache directory (created if missing)
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, sha256: str) -> Path:
+        return self.directory / f"{sha256}.jsonl"
+
+    def __contains__(self, sha256: str) -> bool:
+        return self._path(sha256).exists()
+
+    def pages(self, sha256: str) -> Iterator[Page]:
+        """Cached pages of a PDF, read lazily"""
+        with open(self._path(sha256), encoding="utf-8") as file:
+            for line in file:
+                yield Page.model_validate_json(line)
+
+    def writer(self, sha256: str) -> "_CacheWriter":
+        """Writer storing a PDF's pages as they are extracted"""
+        return _CacheWriter(self._path(sha256))
+
+
+class _CacheWriter:
+    def __init__(self, path: Path):
+        self.path = path
+        self._tmp = path.with_name(f"{path.name}.{os.getpid()}.{id(self)}.tmp")
+        self._file = open(self._tmp, "w", encoding="utf-8")
+
+    def add(self, page: Page) -> None:
+        self._file.write(page.model_dump_json() + "\n")
+
+    def commit(self) -> None:
+        self._file.close()
+        os.replace(self._tmp, self.path)
+
+    def discard(self) -> None:
+        self._file.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+class PdfIngestor:
+    """
+    Extracts PDF text page by page in a worker pool, with a page-text cache.
+
+    Args:
+        cache_dir: Directory caching extracted text by file sha256; None
+            disables the cache
+        workers: Pool size
+        use_processes: Extract in worker processes instead of threads; pays
+            off for PDFs with many text-heavy pages, where extraction holds
+            the GIL
+        window: Maximum pages in flight (defaults to twice ``workers``); bounds
+            memory while streaming
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        workers: int = 4,
+        use_processes: bool = False,
+        window: int | None = None,
+    ):
+        self.cache = PageTextCache(cache_dir) if cache_dir is not None else None
+        self.workers = workers
+        self.use_processes = use_processes
+        self.window = window or 2 * workers
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        """Worker pool, started on first use"""
+        with self._lock:
+            if self._executor is None:
+                if self.use_processes:
+                    self._executor = ProcessPoolExecutor(
+                        self.workers, mp_context=get_context("spawn")
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        self.workers, thread_name_prefix="pdf-ingest"
+                    )
+            return self._executor
+
+    def close(self) -> None:
+        """Shut down the worker pool"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    def __enter__(self) -> "PdfIngestor":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _page_futures(
+        self, path: str, sha256: str
+    ) -> Iterator[tuple[int, Future[str]]]:
+        """Futures of the page texts in order, submitted ``window`` pages ahead"""
+        count = _page_count(path)
+        pending: list[tuple[int, Future[str]]] = []
+        next_page = 1
+        try:
+            while pending or next_page <= count:
+                while next_page <= count and len(pending) < self.window:
+                    future = self.executor.submit(_page_text, path, sha256, next_page)
+                    pending.append((next_page, future))
+                    next_page += 1
+                yield pending.pop(0)
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def pages(self, path: str | Path, sha256: str | None = None) -> Iterator[Page]:
+        """
+        Stream a PDF's pages in order.
+
+        Args:
+            path: PDF file
+            sha256: The file's sha256, if already known
+
+        Raises:
+            PdfIngestionError: If the PDF cannot be read
+        """
+        path = str(path)
+        sha256 = sha256 or file_sha256(path)
+        if self.cache is not None and sha256 in self.cache:
+            yield from self.cache.pages(sha256)
+            return
+        writer = self.cache.writer(sha256) if self.cache is not None else None
+        futures = self._page_futures(path, sha256)
+        try:
+            for number, future in futures:
+                page = Page(number=number, text=future.result())
+                if writer is not None:
+                    writer.add(page)
+                yield page
+        except BaseException:
+            futures.close()
+            if writer is not None:
+                writer.discard()
+            raise
+        if writer is not None:
+            writer.commit()
+
+    async def stream(
+        self, path: str | Path, sha256: str | None = None
+    ) -> AsyncIterator[Page]:
+        """Like ``pages``, without blocking the event loop"""
+        path = str(path)
+        sha256 = sha256 or await asyncio.to_thread(file_sha256, path)
+        if self.cache is not None and sha256 in self.cache:
+            for page in await asyncio.to_thread(list, self.cache.pages(sha256)):
+                yield page
+            return
+        writer = self.cache.writer(sha256) if self.cache is not None else None
+        futures = self._page_futures(path, sha256)
+        try:
+            while True:
+                item = await asyncio.to_thread(next, futures, None)
+                if item is None:
+                    break
+                number, future = item
+                page = Page(number=number, text=await asyncio.wrap_future(future))
+                if writer is not None:
+                    writer.add(page)
+                yield page
+        except BaseException:
+            futures.close()
+            if writer is not None:
+                writer.discard()
+            raise
+        if writer is not None:
+            writer.commit()
+
+    def read(self, path: str | Path) -> DocumentText:
+        """Extract a whole PDF into a DocumentText"""
+        sha256 = file_sha256(path)
+        return _join(str(path), sha256, self.pages(path, sha256))
+
+    async def aread(self, path: str | Path) -> DocumentText:
+        """Like ``read``, without blocking the event loop"""
+        sha256 = await asyncio.to_thread(file_sha256, path)
+        pages = [page async for page in self.stream(path, sha256)]
+        return _join(str(path), sha256, pages)
+
+
+def _join(source: str, sha256: str, pages: Any) -> DocumentText:
+    parts: list[str] = []
+    spans: list[PageSpan] = []
+    offset = 0
+    for page in pages:
+        if parts:
+            offset += len(PAGE_SEPARATOR)
+        spans.append(
+            PageSpan(number=page.number, start=offset, end=offset + len(page.text))
+        )
+        parts.append(page.text)
+        offset += len(page.text)
+    return DocumentText(
+        source=source, sha256=sha256, text=PAGE_SEPARATOR.join(parts), pages=spans
+    )
+
+
+def default_cache_dir() -> Path:
+    """Page-text cache used by ``read_document``, under the user's cache directory"""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "adk_data_extraction" / "pdf_text"
+
+
+_default_ingestor: PdfIngestor | None = None
+
+
+def default_ingestor() -> PdfIngestor:
+    """Process-wide PdfIngestor caching in ``default_cache_dir()``"""
+    global _default_ingestor
+    if _default_ingestor is None:
+        _default_ingestor = PdfIngestor(cache_dir=default_cache_dir())
+    return _default_ingestor
+
+
+def is_pdf(path: str | Path) -> bool:
+    """Whether a file is handled as a PDF"""
+    return Path(path).suffix.lower() == ".pdf"
+
+
+def read_document(
+    path: str | Path, ingestor: PdfIngestor | None = None
+) -> DocumentText:
+    """
+    Read a document: PDFs are ingested, other files read as UTF-8 text.
+
+    Raises:
+        PdfIngestionError: If a PDF cannot be read
+        OSError, UnicodeDecodeError: As for reading a text file
+    """
+    if is_pdf(path):
+        return (ingestor or default_ingestor()).read(path)
+    data = Path(path).read_bytes()
+    return DocumentText(
+        source=str(path),
+        sha256=hashlib.sha256(data).hexdigest(),
+        text=data.decode("utf-8"),
+    )
+
+
+async def load_document(
+    path: str | Path, ingestor: PdfIngestor | None = None
+) -> DocumentText:
+    """Like ``read_document``, without blocking the event loop"""
+    if is_pdf(path):
+        return await (ingestor or default_ingestor()).aread(path)
+    return await asyncio.to_thread(read_document, path)
+
+
+def _leaves(value: Any, prefix: str = "") -> Iterator[tuple[str, str]]:
+    """Dotted paths and values of the string leaves, list items by index"""
+    if isinstance(value, BaseModel):
+        value = value.model_dump(mode="json")
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        if isinstance(value, str) and prefix:
+            yield prefix, value
+        return
+    for key, item in items:
+        yield from _leaves(item, f"{prefix}.{key}" if prefix else str(key))
+
+
+def page_provenance(data: Any, document: DocumentText) -> dict[str, list[int]]:
+    """
+    Pages each extracted value was found on.
+
+    Args:
+        data: Extraction result (a model or dict, nested models and lists included)
+        document: The document the result was extracted from
+
+    Returns:
+        dict[str, list[int]]: Page numbers by dotted field path (list items by
+        index, e.g. ``parties.0``); values not found verbatim are left out
+    """
+    provenance = {}
+    for field, value in _leaves(data):
+        pages = document.pages_for(value)
+        if pages:
+            provenance[field] = pages
+    return provenance
@@ -0,0 +1,336 @@
+"""
+Crash-Resumable Job Store
+
+Long runs over large document sets should not restart from zero after a crash.
+JobStore keeps each document's progress in SQLite, keyed by ``extraction_id``,
+so it needs nothing but a file on the local disk:
+
+- states: ``queued`` → ``classified`` → ``extracted`` → ``validated`` → ``done``,
+  or ``failed``; a stage's outputs are stored as soon as the stage completes
+- leases: a worker leases a document before processing it. Other workers leave
+  it alone until the lease expires, so a crashed worker's documents are picked
+  up again once its leases lapse. Saving a stage renews the lease
+- resume: a rerun skips ``done`` documents (their stored result is returned)
+  and continues the others from the last completed stage, with the stored
+  outputs of the earlier stages; ``failed`` documents are retried the same way
+
+Pass a JobStore to SmartDocumentExtractionPipeline to make ``process_document``
+and ``process_documents`` resumable and idempotent:
+
+    store = JobStore("overnight.db", owner="worker-1")
+    pipeline = SmartDocumentExtractionPipeline(job_store=store)
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+# Document states, in processing order ("failed" can follow any of them)
+DOCUMENT_STATES = ("queued", "classified", "extracted", "validated", "done", "failed")
+
+_STATE_ORDER = {state: order for order, state in enumerate(DOCUMENT_STATES[:5])}
+
+
+class LeaseLost(RuntimeError):
+    """Raised when a worker saves progress for a document it no longer leases"""
+
+
+class DocumentRecord(BaseModel):
+    """Progress of one document"""
+
+    extraction_id: str = Field(description="Document identifier (md5 of its content)")
+    state: str = Field(description="One of DOCUMENT_STATES")
+    source: str | None = Field(default=None, description="Where the document came from")
+    attempts: int = Field(description="Times the document has been leased")
+    lease_owner: str | None = Field(
+        default=None, description="Worker holding the lease"
+    )
+    lease_expires: float | None = Field(
+        default=None, description="When the lease lapses (Unix seconds)"
+    )
+    error: str | None = Field(default=None, description="Last error, if it failed")
+    updated_at: float = Field(description="Last change (Unix seconds)")
+
+
+class JobStore:
+    """
+    SQLite-backed document progress with leases and stored stage outputs.
+
+    Args:
+        path: Database file (created if missing)
+        owner: Name of this worker; a restarted worker with the same name
+            takes its own leases back at once instead of waiting for them to
+            lapse. Defaults to ``<host>:<pid>``
+        lease_seconds: How long a lease lasts without progress
+        poll_interval: Seconds between checks while waiting for a document
+            leased by another worker
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        owner: str | None = None,
+        lease_seconds: float = 300.0,
+        poll_interval: float = 1.0,
+    ):
+        self.path = Path(path)
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        # Documents this store instance holds leases on, so concurrent runs of
+        # the same document in one process do not both proceed
+        self._held: set[str] = set()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS documents (
+                extraction_id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                source TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires REAL,
+                error TEXT,
+                result TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS stage_outputs (
+                extraction_id TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (extraction_id, key)
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS documents_state ON documents (state)"
+        )
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def enqueue(self, extraction_id: str, source: str | None = None) -> bool:
+        """
+        Register a document; a no-op for documents already known.
+
+        Returns:
+            bool: Whether the document was new
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO documents "
+                "(extraction_id, state, source, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?)",
+                (extraction_id, source, now, now),
+            )
+            return cursor.rowcount == 1
+
+    def lease(self, extraction_id: str) -> DocumentRecord | None:
+        """
+        Lease a document for this worker, registering it if needed.
+
+        Returns:
+            DocumentRecord | None: The leased document, or None if it is done or
+            leased by another worker (or already by this one)
+        """
+        if extraction_id in self._held:
+            return None
+        self.enqueue(extraction_id)
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """UPDATE documents
+                SET lease_owner = ?, lease_expires = ?, attempts = attempts + 1,
+                    updated_at = ?
+                WHERE extraction_id = ? AND state != 'done'
+                  AND (lease_owner IS NULL OR lease_owner = ? OR lease_expires < ?)""",
+                (
+                    self.owner,
+                    now + self.lease_seconds,
+                    now,
+                    extraction_id,
+                    self.owner,
+                    now,
+                ),
+            )
+        if cursor.rowcount == 0:
+            return None
+        self._held.add(extraction_id)
+        return self.record(extraction_id)
+
+    async def acquire(self, extraction_id: str) -> DocumentRecord | None:
+        """
+        Lease a document, waiting while another worker holds it.
+
+        Returns:
+            DocumentRecord | None: The leased document, or None once it is done
+        """
+        while True:
+            record = self.lease(extraction_id)
+            if record is not None:
+                return record
+            current = self.record(extraction_id)
+            if current is None or current.state == "done":
+                return None
+            await asyncio.sleep(self.poll_interval)
+
+    def _renew(self, extraction_id: str, now: float, **columns: Any) -> None:
+        """Update a leased document's columns and renew the lease
+
+        Raises:
+            LeaseLost: If another worker holds the lease now
+        """
+        assignments = "".join(f", {column} = ?" for column in columns)
+        cursor = self._conn.execute(
+            f"""UPDATE documents SET lease_expires = ?, updated_at = ?{assignments}
+            WHERE extraction_id = ? AND lease_owner = ?""",
+            (
+                now + self.lease_seconds,
+                now,
+                *columns.values(),
+                extraction_id,
+                self.owner,
+            ),
+        )
+        if cursor.rowcount == 0:
+            raise LeaseLost(f"Lease on document {extraction_id[:8]} was lost")
+
+    def save_stage(
+        self, extraction_id: str, state: str, outputs: dict[str, Any]
+    ) -> None:
+        """
+        Store the outputs of a completed stage and advance the document's state.
+
+        Args:
+            extraction_id: Leased document
+            state: State the stage completes (``classified``, ``extracted`` or
+                ``validated``); the state never moves backwards
+            outputs: Stage outputs by session state key (JSON-serializable)
+
+        Raises:
+            LeaseLost: If another worker holds the lease now
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            current = self._conn.execute(
+                "SELECT state FROM documents WHERE extraction_id = ?", (extraction_id,)
+            ).fetchone()
+            current_state = current[0] if current else "queued"
+            if _STATE_ORDER.get(current_state, 0) >= _STATE_ORDER[state]:
+                state = current_state
+            self._renew(extraction_id, now, state=state)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO stage_outputs (extraction_id, key, value) "
+                "VALUES (?, ?, ?)",
+                [
+                    (extraction_id, key, json.dumps(value, default=str))
+                    for key, value in outputs.items()
+                ],
+            )
+
+    def stage_outputs(self, extraction_id: str) -> dict[str, Any]:
+        """Outputs of the document's completed stages, by session state key"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM stage_outputs WHERE extraction_id = ?",
+                (extraction_id,),
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def complete(self, extraction_id: str, result: str) -> None:
+        """
+        Mark a leased document done, storing its serialized result.
+
+        Raises:
+            LeaseLost: If another worker holds the lease now
+        """
+        self._held.discard(extraction_id)
+        with self._lock:
+            self._renew(
+                extraction_id,
+                time.time(),
+                state="done",
+                result=result,
+                error=None,
+                lease_owner=None,
+            )
+
+    def fail(self, extraction_id: str, error: str) -> None:
+        """
+        Mark a leased document failed; its stage outputs are kept for a retry.
+
+        Raises:
+            LeaseLost: If another worker holds the lease now
+        """
+        self._held.discard(extraction_id)
+        with self._lock:
+            self._renew(
+                extraction_id,
+                time.time(),
+                state="failed",
+                error=error,
+                lease_owner=None,
+            )
+
+    def release(self, extraction_id: str) -> None:
+        """Give up this worker's lease on a document without changing its state"""
+        self._held.discard(extraction_id)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE documents SET lease_owner = NULL, lease_expires = NULL "
+                "WHERE extraction_id = ? AND lease_owner = ?",
+                (extraction_id, self.owner),
+            )
+
+    def result(self, extraction_id: str) -> str | None:
+        """Serialized result of a done document"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM documents "
+                "WHERE extraction_id = ? AND state = 'done'",
+                (extraction_id,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def record(self, extraction_id: str) -> DocumentRecord | None:
+        """Progress of a document, or None if it is unknown"""
+        with self._lock:
+            self._conn.row_factory = sqlite3.Row
+            try:
+                row = self._conn.execute(
+                    "SELECT extraction_id, state, source, attempts, lease_owner, "
+                    "lease_expires, error, updated_at FROM documents "
+                    "WHERE extraction_id = ?",
+                    (extraction_id,),
+                ).fetchone()
+            finally:
+                self._conn.row_factory = None
+        return DocumentRecord(**dict(row)) if row else None
+
+    def counts(self) -> dict[str, int]:
+        """Documents by state"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) FROM documents GROUP BY state"
+            ).fetchall()
+        return {state: dict(rows).get(state, 0) for state in DOCUMENT_STATES}
@@ -0,0 +1,97 @@
+"""
+Deferred Imports and Module Attributes
+
+Importing google-adk takes seconds, and every agent pulls it in. Packages and
+example modules therefore defer both through PEP 562 module ``__getattr__``:
+
+- ``lazy_exports``: a package re-exports names from its submodules, importing
+  a submodule the first time one of its names is used
+- LazyAttributes: a module keeps its agents (``contact_extractor``,
+  ``service_contract_pipeline``, ...) as module attributes for ADK discovery and
+  for callers, but builds them, with their imports, on first access
+
+    def _build_agents() -> dict[str, Any]:
+        from google.adk.agents import LlmAgent
+
+        return {"root_agent": LlmAgent(...)}
+
+    _agents = LazyAttributes(__name__, _build_agents, names=("root_agent",))
+    __getattr__ = _agents.getattr
+
+Functions inside such a module read the attributes as ``_agents["root_agent"]``
+(a bare global name does not go through the module ``__getattr__``).
+"""
+
+import importlib
+import sys
+import threading
+from collections.abc import Callable, Iterable
+from typing import Any
+
+
+def lazy_exports(package: str, exports: dict[str, str]) -> Callable[[str], Any]:
+    """
+    Module ``__getattr__`` importing re-exported names on first use.
+
+    Args:
+        package: ``__name__`` of the re-exporting module
+        exports: Source of each name: ``".module"`` for a submodule itself or
+            ``".module:attribute"`` for a name defined in it
+
+    Returns:
+        Callable[[str], Any]: Function to assign to the module's ``__getattr__``
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module_name, _, attribute = exports[name].partition(":")
+        module = importlib.import_module(module_name, package)
+        value = getattr(module, attribute) if attribute else module
+        setattr(sys.modules[package], name, value)
+        return value
+
+    return __getattr__
+
+
+class LazyAttributes:
+    """
+    Module attributes built together on first access.
+
+    Args:
+        module: ``__name__`` of the module owning the attributes
+        build: Returns the attributes by name; runs once, and the attributes
+            are then stored in the module so later lookups are plain
+        names: Attribute names ``build`` provides
+    """
+
+    def __init__(
+        self, module: str, build: Callable[[], dict[str, Any]], names: Iterable[str]
+    ):
+        self.module = module
+        self.names = frozenset(names)
+        self._build = build
+        self._values: dict[str, Any] | None = None
+        self._lock = threading.RLock()
+
+    @property
+    def built(self) -> bool:
+        """Whether the attributes exist yet"""
+        return self._values is not None
+
+    def _load(self) -> dict[str, Any]:
+        with self._lock:
+            if self._values is None:
+                values = self._build()
+                vars(sys.modules[self.module]).update(values)
+                self._values = values
+            return self._values
+
+    def __getitem__(self, name: str) -> Any:
+        return self._load()[name]
+
+    def getattr(self, name: str) -> Any:
+        """Module ``__getattr__`` building the attributes when one is needed"""
+        if name not in self.names:
+            raise AttributeError(f"module {self.module!r} has no attribute {name!r}")
+        return self[name]
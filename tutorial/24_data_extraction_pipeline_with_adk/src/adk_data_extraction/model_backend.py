@@ -0,0 +1,302 @@
+"""
+Record/Replay Model Backend
+
+Every example agent is built with ``model="gemini-2.0-flash"`` and needs live API
+access. ModelBackend decides what model object agents get instead:
+
+- ``live``: the model name, exactly as before
+- ``record``: a CassetteLlm calling the live model and writing every
+  request → response pair to a cassette file
+- ``replay``: a CassetteLlm serving recorded responses, with optional injected
+  latency; requests missing from the cassettes go to the live model and are
+  recorded
+- ``strict``: like replay, but unknown requests raise CassetteMissError, so a
+  run provably makes no network calls
+
+Cassettes are keyed by a hash of the normalized request (model, system
+instruction, contents, response schema, tools and generation settings; whitespace
+collapsed and per-run function call IDs dropped). Each interaction is one JSON
+file in the cassette directory, so concurrent runs never contend for a file and
+recordings diff cleanly.
+
+The default backend is read from the environment, so module-level agents pick it
+up at import time:
+
+    ADK_MODEL_BACKEND=strict ADK_CASSETTE_DIR=cassettes adk-extract-contacts
+
+When a process-wide ModelCallGovernor is configured, every model the backend
+hands out is wrapped in a GovernedLlm, so all agent calls share its rate limits.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from collections.abc import AsyncGenerator
+from pathlib import Path
+from typing import Any
+
+from google.adk.models import BaseLlm, LLMRegistry, LlmRequest, LlmResponse
+from pydantic import BaseModel, PrivateAttr
+
+from adk_data_extraction.governor import get_model_call_governor
+
+logger = logging.getLogger(__name__)
+
+MODEL_BACKEND_MODES = ("live", "record", "replay", "strict")
+CASSETTE_FORMAT_VERSION = 1
+
+# Generation settings that change the response
+_CONFIG_FIELDS = (
+    "temperature",
+    "top_p",
+    "top_k",
+    "max_output_tokens",
+    "response_mime_type",
+)
+
+
+class CassetteMissError(LookupError):
+    """Raised in strict mode for a request that has no recording"""
+
+
+def _collapse(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _normalize_part(part: Any) -> dict[str, Any]:
+    data = part.model_dump(mode="json", exclude_none=True)
+    data.pop("thought_signature", None)
+    if "text" in data:
+        data["text"] = _collapse(data["text"])
+    # Function call IDs are generated per run
+    for key in ("function_call", "function_response"):
+        if key in data:
+            data[key].pop("id", None)
+    return data
+
+
+def _schema_spec(schema: Any) -> Any:
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        return schema.model_json_schema()
+    if hasattr(schema, "model_dump"):
+        return schema.model_dump(mode="json", exclude_none=True)
+    return schema
+
+
+def normalize_request(llm_request: LlmRequest) -> dict[str, Any]:
+    """The parts of a request that determine the response, in canonical form"""
+    config = llm_request.config
+    system = getattr(config, "system_instruction", None)
+    if system is not None and not isinstance(system, str):
+        system = " ".join(part.text or "" for part in system.parts or [])
+    tools = sorted(
+        declaration.name
+        for tool in getattr(config, "tools", None) or []
+        for declaration in getattr(tool, "function_declarations", None) or []
+    )
+    return {
+        "model": llm_request.model,
+        "system_instruction": _collapse(system) if system else None,
+        "contents": [
+            {
+                "role": content.role,
+                "parts": [_normalize_part(part) for part in content.parts or []],
+            }
+            for content in llm_request.contents
+        ],
+        "response_schema": _schema_spec(getattr(config, "response_schema", None)),
+        "tools": tools,
+        "config": {
+            field: getattr(config, field, None)
+            for field in _CONFIG_FIELDS
+            if getattr(config, field, None) is not None
+        },
+    }
+
+
+def request_key(normalized: dict[str, Any]) -> str:
+    """Cassette key for a normalized request"""
+    payload = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+class CassetteLlm(BaseLlm):
+    """
+    Model wrapper that records, replays or strictly replays model calls.
+
+    ``model`` stays the live model name, so result-cache configuration hashes
+    are the same in every mode.
+    """
+
+    mode: str = "replay"
+    cassette_dir: str = "cassettes"
+    latency_ms: float = 0.0
+    latency_scale: float = 0.0
+    live: BaseLlm | None = None
+
+    _live_model: BaseLlm | None = PrivateAttr(default=None)
+
+    def _live(self) -> BaseLlm:
+        """Live model, created from the registry on first use"""
+        if self.live is not None:
+            return self.live
+        if self._live_model is None:
+            self._live_model = LLMRegistry.new_llm(self.model)
+        return self._live_model
+
+    def _path(self, key: str) -> Path:
+        return Path(self.cassette_dir) / f"{key}.json"
+
+    def _load(self, key: str) -> dict[str, Any] | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())
+
+    def _save(self, key: str, interaction: dict[str, Any]) -> None:
+        """Write one interaction atomically"""
+        directory = Path(self.cassette_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=directory, suffix=".tmp", delete=False
+        ) as tmp:
+            json.dump(interaction, tmp, indent=2, sort_keys=True)
+        os.replace(tmp.name, self._path(key))
+
+    async def _record(
+        self,
+        key: str,
+        normalized: dict[str, Any],
+        llm_request: LlmRequest,
+        stream: bool,
+    ) -> AsyncGenerator[LlmResponse, None]:
+        started = time.perf_counter()
+        responses = []
+        async for response in self._live().generate_content_async(llm_request, stream):
+            # Serialize before ADK attaches per-run data to the response
+            responses.append(response.model_dump(mode="json", exclude_none=True))
+            yield response
+        self._save(
+            key,
+            {
+                "format": CASSETTE_FORMAT_VERSION,
+                "request": normalized,
+                "responses": responses,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            },
+        )
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        normalized = normalize_request(llm_request)
+        key = request_key(normalized)
+        interaction = None if self.mode == "record" else self._load(key)
+
+        if interaction is None:
+            if self.mode == "strict":
+                raise CassetteMissError(
+                    f"No recording for {self.model} request {key} "
+                    f"in {self.cassette_dir}"
+                )
+            if self.mode == "replay":
+                logger.info(f"Cassette miss for request {key}, calling {self.model}")
+            async for response in self._record(key, normalized, llm_request, stream):
+                yield response
+            return
+
+        delay_ms = self.latency_ms + self.latency_scale * interaction.get(
+            "latency_ms", 0.0
+        )
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+        for response in interaction["responses"]:
+            yield LlmResponse.model_validate(response)
+
+
+class ModelBackend:
+    """
+    Chooses the model object example agents are created with.
+
+    Args:
+        mode: "live", "record", "replay" or "strict"
+        cassette_dir: Directory holding one JSON file per recorded request
+        latency_ms: Fixed delay added to each replayed response
+        latency_scale: Multiple of the recorded latency added to each replayed
+            response (1.0 reproduces the recorded timing)
+    """
+
+    def __init__(
+        self,
+        mode: str = "live",
+        cassette_dir: str | Path = "cassettes",
+        latency_ms: float = 0.0,
+        latency_scale: float = 0.0,
+    ):
+        if mode not in MODEL_BACKEND_MODES:
+            raise ValueError(
+                f"Unknown model backend mode {mode!r}, "
+                f"expected one of {MODEL_BACKEND_MODES}"
+            )
+        self.mode = mode
+        self.cassette_dir = Path(cassette_dir)
+        self.latency_ms = latency_ms
+        self.latency_scale = latency_scale
+
+    @classmethod
+    def from_env(cls) -> "ModelBackend":
+        """Backend configured by ADK_MODEL_BACKEND, ADK_CASSETTE_DIR,
+        ADK_REPLAY_LATENCY_MS and ADK_REPLAY_LATENCY_SCALE"""
+        return cls(
+            mode=os.getenv("ADK_MODEL_BACKEND", "live"),
+            cassette_dir=os.getenv("ADK_CASSETTE_DIR", "cassettes"),
+            latency_ms=float(os.getenv("ADK_REPLAY_LATENCY_MS", "0")),
+            latency_scale=float(os.getenv("ADK_REPLAY_LATENCY_SCALE", "0")),
+        )
+
+    def model(self, name: str) -> str | BaseLlm:
+        """
+        Model to build an agent with.
+
+        Args:
+            name: Live model name, e.g. "gemini-2.0-flash"
+
+        Returns:
+            str | BaseLlm: ``name`` in live mode, otherwise a CassetteLlm; either
+                wrapped in a GovernedLlm when a model-call governor is set
+        """
+        model: str | BaseLlm = name
+        if self.mode != "live":
+            model = CassetteLlm(
+                model=name,
+                mode=self.mode,
+                cassette_dir=str(self.cassette_dir),
+                latency_ms=self.latency_ms,
+                latency_scale=self.latency_scale,
+            )
+        governor = get_model_call_governor()
+        return governor.wrap(model) if governor is not None else model
+
+
+_default_backend: ModelBackend | None = None
+
+
+def set_model_backend(backend: ModelBackend | None) -> None:
+    """Set the process-wide backend (None reverts to the environment)"""
+    global _default_backend
+    _default_backend = backend
+
+
+def get_model_backend() -> ModelBackend:
+    """The backend set with set_model_backend, else the one from the environment"""
+    return _default_backend or ModelBackend.from_env()
+
+
+def resolve_model(name: str) -> str | BaseLlm:
+    """Model for an agent built with the default backend"""
+    return get_model_backend().model(name)
@@ -0,0 +1,261 @@
+"""
+Near-Duplicate Document Detection
+
+Much of the inbound volume is the same template (a standard contract, a vendor's
+invoice layout) with different names and amounts. The exact ``md5(content)``
+extraction ID misses all of it. NearDuplicateIndex finds such documents with
+MinHash signatures over word shingles and locality-sensitive hashing (LSH):
+
+- shingles: runs of ``shingle_words`` lowercase words, digits collapsed, so
+  amounts, dates and reference numbers do not break the match. Long documents
+  are sampled: only the ``max_shingles`` shingles with the smallest hashes are
+  kept. The sample is consistent (similar documents keep the same shingles),
+  so it still estimates their similarity, and it caps the cost of a signature,
+  which is pure Python, at ``num_perm * max_shingles`` hash evaluations
+- signature: ``num_perm`` minimum hash values; the fraction of positions two
+  signatures agree on estimates the Jaccard similarity of their shingle sets
+- LSH: the signature is cut into bands, each band hashed into a bucket; documents
+  sharing any bucket are candidates, and the best candidate above ``threshold``
+  (by estimated similarity) is the match
+
+A lookup is one dictionary probe per band plus a comparison per candidate, and
+buckets are capped at ``max_bucket_size`` members, so lookup cost does not grow
+with the number of indexed documents. Signatures are stored as 32-bit arrays
+(``4 * num_perm`` bytes per document).
+
+The pipeline reuses the matched document's classification and passes its
+extraction to the specialist as a reference to update, instead of extracting
+from scratch.
+"""
+
+import heapq
+import json
+import operator
+import re
+import time
+import zlib
+from array import array
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+_WORD = re.compile(r"\w+")
+_DIGITS = re.compile(r"\d+")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class NearDuplicateMatch(BaseModel):
+    """An indexed document similar to the one looked up"""
+
+    key: str = Field(description="Key the matching document was indexed under")
+    similarity: float = Field(description="Estimated Jaccard similarity (0.0-1.0)")
+
+
+class NearDuplicateStats(BaseModel):
+    """Index size and lookup outcomes so far"""
+
+    documents: int = Field(description="Documents indexed")
+    lookups: int = Field(description="Lookups performed")
+    matches: int = Field(description="Lookups that found a near-duplicate")
+    mean_lookup_ms: float = Field(description="Mean time per lookup")
+
+
+def _bands_for(threshold: float, num_perm: int) -> tuple[int, int]:
+    """(bands, rows) whose LSH threshold is closest to, but not above, ``threshold``
+
+    Documents of similarity s share a bucket with probability
+    ``1 - (1 - s**rows)**bands``, which rises steeply around
+    ``(1 / bands) ** (1 / rows)``. Erring low favours recall; the similarity
+    check then rejects candidates below ``threshold``.
+    """
+    best = (num_perm, 1)
+    best_threshold = 0.0
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        lsh_threshold = (1 / bands) ** (1 / rows)
+        if best_threshold < lsh_threshold <= threshold:
+            best, best_threshold = (bands, rows), lsh_threshold
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index of processed documents.
+
+    Args:
+        threshold: Minimum estimated similarity for a match
+        num_perm: Hash functions per signature (more is more accurate, slower)
+        shingle_words: Words per shingle
+        max_bucket_size: Documents kept per LSH bucket; later ones are still
+            indexed in the buckets that have room
+        max_shingles: Shingles sampled from long documents (None for all of
+            them; a signature then takes about a second per 140 KB of text)
+        seed: Seed of the hash functions (indexes only compare signatures made
+            with the same seed)
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_words: int = 5,
+        max_bucket_size: int = 64,
+        seed: int = 1,
+        max_shingles: int | None = 1024,
+    ):
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+        self.max_bucket_size = max_bucket_size
+        self.seed = seed
+        self.max_shingles = max_shingles
+        self.bands, self.rows = _bands_for(threshold, num_perm)
+
+        # Universal hash functions (a * x + b) mod p
+        state = seed or 1
+        self._permutations = []
+        for _ in range(num_perm):
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            a = state % (_MERSENNE_PRIME - 1) + 1
+            state = (state * 6364136223846793005 + 1442695040888963407) % (1 << 64)
+            self._permutations.append((a, state % _MERSENNE_PRIME))
+
+        self._keys: list[str] = []
+        self._signatures: list[array] = []
+        self._payloads: list[str] = []
+        self._positions: dict[str, int] = {}
+        self._buckets: dict[int, list[int]] = {}
+        self.lookups = 0
+        self.matches = 0
+        self.lookup_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the matching settings (for result-cache keys)"""
+        return (
+            f"near-duplicates:{self.threshold}:{self.num_perm}:"
+            f"{self.shingle_words}:{self.seed}:{self.max_shingles}"
+        )
+
+    def _shingles(self, text: str) -> set[int] | list[int]:
+        """32-bit hashes of the word shingles (stable across processes), the
+        ``max_shingles`` smallest of them"""
+        words = [_DIGITS.sub("#", word) for word in _WORD.findall(text.casefold())]
+        if not words:
+            return set()
+        size = min(self.shingle_words, len(words))
+        shingles = {
+            zlib.crc32(" ".join(words[index : index + size]).encode())
+            for index in range(len(words) - size + 1)
+        }
+        if self.max_shingles is not None and len(shingles) > self.max_shingles:
+            return heapq.nsmallest(self.max_shingles, shingles)
+        return shingles
+
+    def signature(self, text: str) -> array:
+        """
+        MinHash signature of a document.
+
+        Args:
+            text: Document text (ideally normalized)
+
+        Returns:
+            array: ``num_perm`` unsigned 32-bit minimum hash values
+        """
+        shingles = self._shingles(text)
+        if not shingles:
+            return array("I", [_MAX_HASH] * self.num_perm)
+        return array(
+            "I",
+            [
+                min((a * value + b) % _MERSENNE_PRIME for value in shingles) & _MAX_HASH
+                for a, b in self._permutations
+            ],
+        )
+
+    def _band_keys(self, signature: array) -> list[int]:
+        return [
+            hash((band, *signature[band * self.rows : (band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    def add(self, key: str, signature: array, payload: dict[str, Any]) -> None:
+        """
+        Index a processed document.
+
+        Args:
+            key: Document key, e.g. its extraction ID
+            signature: Signature from ``signature()``
+            payload: JSON-serializable data to reuse for near-duplicates
+        """
+        serialized = json.dumps(payload, default=str)
+        position = self._positions.get(key)
+        if position is not None:
+            self._payloads[position] = serialized
+            return
+        position = len(self._keys)
+        self._keys.append(key)
+        self._signatures.append(signature)
+        self._payloads.append(serialized)
+        self._positions[key] = position
+        for band_key in self._band_keys(signature):
+            members = self._buckets.setdefault(band_key, [])
+            if len(members) < self.max_bucket_size:
+                members.append(position)
+
+    def query(self, signature: array) -> NearDuplicateMatch | None:
+        """
+        Most similar indexed document at or above the threshold.
+
+        Args:
+            signature: Signature from ``signature()``
+
+        Returns:
+            NearDuplicateMatch | None: The best match, or None if there is none
+        """
+        started = time.perf_counter()
+        candidates: set[int] = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+
+        best: tuple[int, float] | None = None
+        for position in candidates:
+            # Positions where the signatures agree, counted in C
+            agreement = sum(map(operator.eq, signature, self._signatures[position]))
+            similarity = agreement / self.num_perm
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (position, similarity)
+        match = (
+            NearDuplicateMatch(key=self._keys[best[0]], similarity=best[1])
+            if best is not None
+            else None
+        )
+
+        self.lookups += 1
+        self.matches += match is not None
+        self.lookup_seconds += time.perf_counter() - started
+        return match
+
+    def payload(self, key: str) -> dict[str, Any] | None:
+        """Payload stored for an indexed document"""
+        position = self._positions.get(key)
+        if position is None:
+            return None
+        return json.loads(self._payloads[position])
+
+    def stats(self) -> NearDuplicateStats:
+        """Index size and lookup outcomes"""
+        return NearDuplicateStats(
+            documents=len(self),
+            lookups=self.lookups,
+            matches=self.matches,
+            mean_lookup_ms=self.lookup_seconds * 1000 / self.lookups
+            if self.lookups
+            else 0.0,
+        )
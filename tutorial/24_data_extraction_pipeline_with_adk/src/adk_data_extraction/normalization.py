@@ -0,0 +1,309 @@
+"""
+Token-Reducing Document Normalization
+
+Documents arrive indented, padded with blank lines, signature-line underscores and
+repeated page headers/footers, and all of it is sent verbatim to every agent.
+DocumentNormalizer runs once before the first agent call and removes what carries
+no information:
+
+- whitespace: indentation and trailing spaces are stripped, runs of spaces and
+  tabs become one space, runs of blank lines become one blank line; line breaks
+  inside a paragraph are kept (addresses, tables and lists depend on them)
+- rule lines: runs of ``_ - = *`` (signature lines, separators) are shortened
+- page furniture: short lines at the top or bottom of many pages (page numbers
+  ignored) are dropped; pages are separated by form feeds, and lines in the
+  body of a page are never dropped, however often they repeat (line items,
+  numbered headings)
+- boilerplate: repeated paragraphs are kept once
+
+The result keeps a character-offset map back to the original text, so spans found
+in the normalized text can be located in the document as submitted.
+"""
+
+import bisect
+import re
+from collections import Counter
+
+from pydantic import BaseModel, Field
+
+_RULE = re.compile(r"([_\-=*.])\1{3,}")
+_DIGITS = re.compile(r"\d+")
+# "Page 3", "page 3 of 9", "3/9", "- 3 -" or a bare number
+_PAGE_NUMBER = re.compile(
+    r"\b(?:page|pg\.?|p\.)\s*\d+(?:\s*(?:of|/)\s*\d+)?\b"
+    r"|^-?\s*\d+(?:\s*(?:of|/)\s*\d+)?\s*-?$",
+    re.IGNORECASE,
+)
+_LINE_BREAK = re.compile(r"(\n|\f)")
+
+
+class NormalizationSummary(BaseModel):
+    """What normalization removed from one document"""
+
+    original_chars: int = Field(description="Characters in the submitted document")
+    normalized_chars: int = Field(description="Characters sent to the agents")
+    removed_lines: int = Field(description="Repeated header/footer lines dropped")
+    deduplicated_paragraphs: int = Field(
+        description="Repeated boilerplate paragraphs (or long lines) dropped"
+    )
+    tokens_saved: int = Field(
+        description="Estimated prompt tokens saved per agent call (4 chars/token)"
+    )
+
+
+class NormalizedDocument(BaseModel):
+    """Normalized text with a map back to the original character offsets"""
+
+    text: str = Field(description="Normalized text")
+    original_length: int = Field(description="Length of the original text")
+    segments: list[tuple[int, int]] = Field(
+        description="(normalized offset, original offset) at the start of each run "
+        "of characters copied contiguously from the original"
+    )
+    removed_lines: int = 0
+    deduplicated_paragraphs: int = 0
+
+    def original_offset(self, offset: int) -> int:
+        """Offset in the original text of the character at ``offset``"""
+        if not self.segments or offset >= len(self.text):
+            return self.original_length
+        index = bisect.bisect_right(self.segments, (offset, self.original_length)) - 1
+        normalized_start, original_start = self.segments[max(index, 0)]
+        return original_start + offset - normalized_start
+
+    def original_span(self, start: int, end: int) -> tuple[int, int]:
+        """Original ``(start, end)`` of the normalized span ``text[start:end]``"""
+        if end <= start:
+            position = self.original_offset(start)
+            return position, position
+        return self.original_offset(start), self.original_offset(end - 1) + 1
+
+    def summary(self) -> NormalizationSummary:
+        """Size reduction for reporting"""
+        return NormalizationSummary(
+            original_chars=self.original_length,
+            normalized_chars=len(self.text),
+            removed_lines=self.removed_lines,
+            deduplicated_paragraphs=self.deduplicated_paragraphs,
+            tokens_saved=max(self.original_length // 4 - len(self.text) // 4, 0),
+        )
+
+
+class _Builder:
+    """Accumulates output text and the runs it was copied from"""
+
+    def __init__(self) -> None:
+        self.parts: list[str] = []
+        self.length = 0
+        self.segments: list[tuple[int, int]] = []
+
+    def add(self, text: str, origin: int) -> None:
+        if not text:
+            return
+        if self.segments:
+            normalized_start, original_start = self.segments[-1]
+            contiguous = origin - original_start == self.length - normalized_start
+        else:
+            contiguous = False
+        if not contiguous:
+            self.segments.append((self.length, origin))
+        self.parts.append(text)
+        self.length += len(text)
+
+
+class DocumentNormalizer:
+    """
+    Normalizes documents before they are sent to the agents.
+
+    Args:
+        collapse_whitespace: Strip indentation and collapse whitespace runs within
+            lines (blank-line runs are always collapsed)
+        shorten_rules: Shorten runs of four or more ``_ - = * .`` to three
+        strip_repeated_lines: Drop page headers and footers
+        min_line_repeats: Pages a line must head or foot to count as
+            header/footer
+        edge_lines: Non-blank lines at the top and at the bottom of each page
+            that may be header/footer
+        max_header_chars: Longest line considered a header/footer
+        dedupe_paragraphs: Keep only the first copy of repeated paragraphs
+        min_paragraph_chars: Shortest paragraph considered for de-duplication
+    """
+
+    def __init__(
+        self,
+        collapse_whitespace: bool = True,
+        shorten_rules: bool = True,
+        strip_repeated_lines: bool = True,
+        min_line_repeats: int = 3,
+        edge_lines: int = 2,
+        max_header_chars: int = 80,
+        dedupe_paragraphs: bool = True,
+        min_paragraph_chars: int = 60,
+    ):
+        self.collapse_whitespace = collapse_whitespace
+        self.shorten_rules = shorten_rules
+        self.strip_repeated_lines = strip_repeated_lines
+        self.min_line_repeats = min_line_repeats
+        self.edge_lines = edge_lines
+        self.max_header_chars = max_header_chars
+        self.dedupe_paragraphs = dedupe_paragraphs
+        self.min_paragraph_chars = min_paragraph_chars
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the normalization settings (for result-cache keys)"""
+        return (
+            f"normalize:{self.collapse_whitespace:d}{self.shorten_rules:d}"
+            f"{self.strip_repeated_lines:d}{self.dedupe_paragraphs:d}:"
+            f"{self.min_line_repeats}:{self.edge_lines}:{self.max_header_chars}:"
+            f"{self.min_paragraph_chars}"
+        )
+
+    def _line_key(self, line: str) -> str:
+        """Header/footer identity, ignoring page numbers and spacing; other
+        numbers count ("ARTICLE 2" is not "ARTICLE 3")"""
+        return _PAGE_NUMBER.sub(
+            lambda number: _DIGITS.sub("#", number.group()),
+            " ".join(line.split()).casefold(),
+        )
+
+    def _page_furniture(self, lines: list[tuple[str, int, int]]) -> set[int]:
+        """Indexes of the header/footer lines: short lines at the top or bottom
+        of at least ``min_line_repeats`` pages"""
+        pages: dict[int, list[int]] = {}
+        for index, (line, _, page) in enumerate(lines):
+            if line.strip():
+                pages.setdefault(page, []).append(index)
+        edges = {
+            page: {*indexes[: self.edge_lines], *indexes[-self.edge_lines :]}
+            for page, indexes in pages.items()
+        }
+        candidates = {
+            index: self._line_key(lines[index][0])
+            for indexes in edges.values()
+            for index in indexes
+            if len(lines[index][0].strip()) <= self.max_header_chars
+        }
+        counts = Counter(
+            key
+            for indexes in edges.values()
+            for key in {candidates[index] for index in indexes if index in candidates}
+        )
+        return {
+            index
+            for index, key in candidates.items()
+            if counts[key] >= self.min_line_repeats
+        }
+
+    def _pieces(self, line: str, start: int) -> list[tuple[str, int]]:
+        """Output fragments of one line with their original offsets"""
+        if not self.collapse_whitespace:
+            pieces = [(line, start)]
+        else:
+            pieces = []
+            previous_end = None
+            for word in re.finditer(r"\S+", line):
+                if previous_end is not None:
+                    # One space stands for the whole whitespace run
+                    pieces.append((" ", start + previous_end))
+                pieces.append((word.group(), start + word.start()))
+                previous_end = word.end()
+        if not self.shorten_rules:
+            return pieces
+        shortened = []
+        for text, origin in pieces:
+            position = 0
+            for rule in _RULE.finditer(text):
+                shortened.append((text[position : rule.start()], origin + position))
+                shortened.append((rule.group()[:3], origin + rule.start()))
+                position = rule.end()
+            shortened.append((text[position:], origin + position))
+        return shortened
+
+    def _first_copies(
+        self, paragraph: list[tuple[str, int]], seen: set[str]
+    ) -> tuple[list[tuple[str, int]], int]:
+        """The paragraph without boilerplate already seen, and the copies dropped
+
+        A repeated paragraph is dropped whole; otherwise long lines repeated
+        verbatim (boilerplate sentences inside larger blocks) are dropped.
+        """
+        key = " ".join(" ".join(line.split()) for line, _ in paragraph).casefold()
+        if len(key) >= self.min_paragraph_chars:
+            if key in seen:
+                return [], 1
+            seen.add(key)
+        kept = []
+        for line, start in paragraph:
+            line_key = " ".join(line.split()).casefold()
+            if len(line_key) >= self.min_paragraph_chars and len(paragraph) > 1:
+                if line_key in seen:
+                    continue
+                seen.add(line_key)
+            kept.append((line, start))
+        return kept, len(paragraph) - len(kept)
+
+    def normalize(self, text: str) -> NormalizedDocument:
+        """
+        Normalize one document.
+
+        Args:
+            text: Document as submitted
+
+        Returns:
+            NormalizedDocument: Normalized text, offset map and removal counts
+        """
+        # (line, offset, page); a form feed starts a new page
+        lines: list[tuple[str, int, int]] = []
+        position = page = 0
+        for piece in _LINE_BREAK.split(text):
+            if piece in ("\n", "\f"):
+                page += piece == "\f"
+                position += 1
+                continue
+            lines.append((piece, position, page))
+            position += len(piece)
+
+        furniture = self._page_furniture(lines) if self.strip_repeated_lines else set()
+
+        # Paragraphs: runs of kept, non-blank lines
+        paragraphs: list[list[tuple[str, int]]] = [[]]
+        removed_lines = 0
+        for index, (line, start, _) in enumerate(lines):
+            if not line.strip():
+                if paragraphs[-1]:
+                    paragraphs.append([])
+                continue
+            if index in furniture:
+                removed_lines += 1
+                continue
+            paragraphs[-1].append((line, start))
+        paragraphs = [paragraph for paragraph in paragraphs if paragraph]
+
+        builder = _Builder()
+        seen: set[str] = set()
+        deduplicated = 0
+        previous_end: int | None = None
+        for paragraph in paragraphs:
+            if self.dedupe_paragraphs:
+                paragraph, dropped = self._first_copies(paragraph, seen)
+                deduplicated += dropped
+                if not paragraph:
+                    continue
+            if previous_end is not None:
+                builder.add("\n\n", previous_end)
+            for index, (line, start) in enumerate(paragraph):
+                if index:
+                    builder.add("\n", start - 1)
+                for piece, origin in self._pieces(line, start):
+                    builder.add(piece, origin)
+            last_line, last_start = paragraph[-1]
+            previous_end = last_start + len(last_line)
+
+        return NormalizedDocument(
+            text="".join(builder.parts),
+            original_length=len(text),
+            segments=builder.segments,
+            removed_lines=removed_lines,
+            deduplicated_paragraphs=deduplicated,
+        )
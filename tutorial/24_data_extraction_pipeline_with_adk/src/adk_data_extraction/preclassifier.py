@@ -0,0 +1,255 @@
+"""
+Local Keyword Pre-Classifier
+
+The ``document_classifier`` instruction already spells out the indicators for
+each document type ("agreement", "parties", "bill to", "from:/to:/subject:", ...).
+This module applies those indicators locally: all keywords are matched in a
+single left-to-right scan, scored per document type, and turned into a
+DocumentClassification-shaped dict. When the confidence clears a configurable
+threshold the pipeline writes it to session state and skips the LLM classifier.
+
+Indicators match whole words ("report" does not match "reporting"); an indicator
+ending in ``*`` is a stem matching any word it starts ("indemnif*" matches
+"indemnify" and "indemnification").
+
+The keyword set is compiled into a trie, and the trie into one regular expression
+with a lookahead, so the scan runs inside the C regex engine while still reporting
+overlapping matches (Aho–Corasick semantics). Matches are tallied per distinct
+keyword, not per occurrence: a 1 MB document takes roughly 50-110 ms, keyword-
+dense text included, versus seconds for a per-character Python automaton.
+"""
+
+import hashlib
+import json
+import math
+import re
+from collections import Counter
+from collections.abc import Iterable
+from typing import Any
+
+from adk_data_extraction.routing import select_specialist
+
+# Indicator → weight per document type, taken from the classifier instruction
+DEFAULT_INDICATORS: dict[str, dict[str, float]] = {
+    "contract": {
+        "agreement": 3,
+        "contract": 3,
+        "parties": 2,
+        "whereas": 3,
+        "hereinafter": 3,
+        "governing law": 3,
+        "terms and conditions": 2,
+        "in witness whereof": 3,
+        "signatures": 2,
+        "termination": 1,
+        "obligations": 1,
+        "indemnif*": 2,
+        "jurisdiction": 1,
+        "effective date": 1,
+    },
+    "invoice": {
+        "invoice": 3,
+        "invoice number": 3,
+        "bill to": 3,
+        "amount due": 3,
+        "balance due": 2,
+        "total due": 2,
+        "subtotal": 2,
+        "unit price": 2,
+        "qty": 2,
+        "remit to": 2,
+        "line item": 1,
+        "due date": 1,
+        "vendor": 1,
+    },
+    "report": {
+        "report": 2,
+        "executive summary": 3,
+        "findings": 3,
+        "analysis": 2,
+        "methodology": 2,
+        "conclusion": 2,
+        "summary": 1,
+    },
+    "email": {
+        "from:": 3,
+        "subject:": 3,
+        "to:": 1,
+        "cc:": 2,
+        "sent:": 2,
+        "best regards": 2,
+        "dear ": 1,
+    },
+    "proposal": {
+        "proposal": 3,
+        "we propose": 3,
+        "proposed": 2,
+        "recommendation": 2,
+        "scope of work": 1,
+    },
+}
+
+# Score at which a document type is considered fully evidenced
+STRONG_EVIDENCE_SCORE = 8.0
+
+
+def _trie_pattern(node: dict[str, Any]) -> str:
+    """Regex for a keyword trie; greedy, so the longest keyword wins"""
+    branches = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in sorted(node.items())
+        if char != ""
+    ]
+    if "" in node:
+        # A whole-word keyword ends where no word character follows
+        branches.append(r"(?!\w)" if node[""] else "")
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+def _whole_word(keyword: str) -> bool:
+    """Whether a keyword must end at a word boundary (stems end in ``*``)"""
+    return not keyword.endswith("*") and bool(re.match(r"\w", keyword[-1]))
+
+
+class KeywordAutomaton:
+    """Multi-pattern keyword matcher scanning text in a single pass"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted({keyword.lower() for keyword in keywords if keyword})
+        # Matched text → keyword (stems are matched without their "*")
+        by_text = {keyword.rstrip("*"): keyword for keyword in self.keywords}
+        trie: dict[str, Any] = {}
+        for text, keyword in by_text.items():
+            node = trie
+            for char in text:
+                node = node.setdefault(char, {})
+            node[""] = _whole_word(keyword)
+        # Keywords must start at a word boundary; a lookahead lets matches overlap
+        self._pattern = re.compile(r"(?<!\w)(?=(" + _trie_pattern(trie) + "))")
+        # A match reports the longest keyword at a position; credit the keywords
+        # it starts with too ("invoice number" also counts as "invoice")
+        self._credits = {
+            text: [
+                by_text[text[:end]]
+                for end in range(1, len(text) + 1)
+                if text[:end] in by_text
+                and (
+                    end == len(text)
+                    or not _whole_word(by_text[text[:end]])
+                    or not re.match(r"\w", text[end])
+                )
+            ]
+            for text in by_text
+        }
+
+    def count(self, text: str) -> Counter[str]:
+        """Count occurrences of every keyword in ``text`` (case-insensitive)"""
+        counts: Counter[str] = Counter()
+        for match, occurrences in Counter(self._pattern.findall(text.lower())).items():
+            for keyword in self._credits[match]:
+                counts[keyword] += occurrences
+        return counts
+
+
+class KeywordPreClassifier:
+    """
+    Scores document types from indicator keywords without calling a model.
+
+    Args:
+        indicators: Indicator → weight mapping per document type value
+        confidence_threshold: Minimum confidence for the pipeline to trust the
+            local classification and skip the LLM classifier
+    """
+
+    def __init__(
+        self,
+        indicators: dict[str, dict[str, float]] | None = None,
+        confidence_threshold: float = 0.85,
+    ):
+        self.indicators = indicators or DEFAULT_INDICATORS
+        self.confidence_threshold = confidence_threshold
+        self.automaton = KeywordAutomaton(
+            keyword for weights in self.indicators.values() for keyword in weights
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the indicator set and threshold (for result-cache keys)"""
+        payload = json.dumps(
+            [self.indicators, self.confidence_threshold], sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    def scores(self, text: str) -> tuple[dict[str, float], Counter[str]]:
+        """Weighted score per document type, plus the raw keyword counts"""
+        counts = self.automaton.count(text)
+        scores = {
+            document_type: sum(
+                weight * (1 + math.log(counts[keyword]))
+                for keyword, weight in weights.items()
+                if counts[keyword]
+            )
+            for document_type, weights in self.indicators.items()
+        }
+        return scores, counts
+
+    def classify(self, text: str) -> dict[str, Any]:
+        """
+        Classify a document from its indicators.
+
+        Confidence combines the margin over the runner-up type with how much
+        evidence the winning type has, so a single weak hit never clears the
+        threshold on its own.
+
+        Returns:
+            dict: Fields of DocumentClassification, ready for session state
+        """
+        scores, counts = self.scores(text)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        document_type, top = ranked[0] if ranked else ("unknown", 0.0)
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+
+        if top <= 0:
+            document_type, confidence = "unknown", 0.0
+        else:
+            margin = (top - runner_up) / top
+            evidence = min(1.0, top / STRONG_EVIDENCE_SCORE)
+            confidence = round(min(0.99, margin * evidence), 3)
+
+        if document_type == "contract" and counts["agreement"] > counts["contract"]:
+            document_type = "agreement"
+
+        weights = self.indicators.get(
+            "contract" if document_type == "agreement" else document_type, {}
+        )
+        key_indicators = sorted(
+            (keyword for keyword in weights if counts[keyword]),
+            key=lambda keyword: (-weights[keyword] * counts[keyword], keyword),
+        )[:8]
+
+        if len(text) < 2_000:
+            complexity, estimate = "simple", 15
+        elif len(text) < 20_000:
+            complexity, estimate = "medium", 30
+        else:
+            complexity, estimate = "complex", 60
+
+        return {
+            "document_type": document_type,
+            "complexity_level": complexity,
+            "estimated_processing_time": estimate,
+            "recommended_extractor": select_specialist(document_type),
+            "confidence_score": confidence,
+            "key_indicators": [
+                keyword.rstrip("*").strip() for keyword in key_indicators
+            ],
+        }
+
+    def is_confident(self, classification: dict[str, Any]) -> bool:
+        """Whether a classification clears the configured threshold"""
+        return (
+            classification["document_type"] != "unknown"
+            and classification["confidence_score"] >= self.confidence_threshold
+        )
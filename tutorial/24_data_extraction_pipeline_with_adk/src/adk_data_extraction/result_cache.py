@@ -0,0 +1,326 @@
+"""
+Content-Addressed Result Cache
+
+Pipelines already derive ``extraction_id = md5(content)`` for every document.
+This module turns that ID into a cache key by combining it with a hash of the
+pipeline configuration (agent instructions, model names, output schemas), so a
+re-submitted document returns its stored PipelineResult instead of paying for the
+classifier → specialist → validator round trips again. Changing any prompt, model
+or schema changes the configuration hash and naturally invalidates old entries.
+
+Tiers:
+- MemoryResultCache: in-process LRU, hits in microseconds
+- SQLiteResultCache: on-disk store with TTL and size-based eviction, survives restarts
+- TieredResultCache: memory in front of disk, promoting disk hits into memory;
+  memory entries expire when their disk entries do
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Protocol
+
+# Bump when the serialized result layout changes incompatibly
+CACHE_FORMAT_VERSION = 1
+
+
+class ResultCache(Protocol):
+    """Interface for pluggable result caches storing serialized results"""
+
+    def get(self, key: str) -> str | None:
+        """Return the serialized value for ``key`` or None on a miss"""
+        ...
+
+    def set(self, key: str, value: str) -> None:
+        """Store the serialized value for ``key``"""
+        ...
+
+
+def _model_name(model: Any) -> str:
+    """Model identifier for a model string or BaseLlm instance"""
+    if isinstance(model, str):
+        return model
+    return getattr(model, "model", type(model).__name__)
+
+
+def _agent_spec(agent: Any) -> dict[str, Any]:
+    """Configuration of an agent tree that affects its output"""
+    instruction = getattr(agent, "instruction", "")
+    output_schema = getattr(agent, "output_schema", None)
+    return {
+        "name": agent.name,
+        "model": _model_name(getattr(agent, "model", "")),
+        "instruction": instruction
+        if isinstance(instruction, str)
+        else getattr(instruction, "__qualname__", repr(instruction)),
+        "output_key": getattr(agent, "output_key", None),
+        "output_schema": output_schema.model_json_schema() if output_schema else None,
+        "sub_agents": [_agent_spec(sub) for sub in getattr(agent, "sub_agents", [])],
+    }
+
+
+def pipeline_config_hash(root_agent: Any, *extra: Any) -> str:
+    """
+    Hash the configuration of an agent tree.
+
+    Args:
+        root_agent: Root of the agent graph (e.g. the pipeline coordinator)
+        *extra: Additional JSON-serializable settings that change results
+
+    Returns:
+        str: Hex digest identifying this pipeline configuration
+    """
+    payload = json.dumps(
+        {
+            "format": CACHE_FORMAT_VERSION,
+            "agents": _agent_spec(root_agent),
+            "extra": extra,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def cache_key(extraction_id: str, config_hash: str) -> str:
+    """Cache key for a document under a given pipeline configuration"""
+    return f"{extraction_id}:{config_hash}"
+
+
+class MemoryResultCache:
+    """In-memory LRU tier bounded by entry count"""
+
+    def __init__(self, max_entries: int = 1024):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # Value and expiry time (Unix seconds, None for never) by key
+        self._entries: OrderedDict[str, tuple[str, float | None]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is not None and time.time() >= entry[1]:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: str, value: str, expires_at: float | None = None) -> None:
+        """Store ``value`` for ``key``, until ``expires_at`` if given"""
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class SQLiteResultCache:
+    """
+    On-disk tier backed by SQLite.
+
+    Entries older than ``ttl_seconds`` are treated as misses; expired entries
+    are purged at most every ``purge_interval`` seconds. When the stored payload
+    exceeds ``max_bytes``, least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl_seconds: float | None = 7 * 24 * 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+        purge_interval: float = 60.0,
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at)"
+        )
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    @property
+    def total_bytes(self) -> int:
+        """Size of all stored payloads in bytes"""
+        return self._total_bytes
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> str | None:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> tuple[str, float | None] | None:
+        """Value and expiry time (None for never) of ``key``, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, size FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at, size = row
+            if self._expired(created_at, now):
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE results SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+            if self.ttl_seconds is None:
+                return value, None
+            return value, created_at + self.ttl_seconds
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        size = len(value.encode())
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, created_at, accessed_at, size)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, value, now, now, size),
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Purge expired entries (every ``purge_interval`` seconds), then LRU
+        entries until under ``max_bytes``"""
+        if self.ttl_seconds is not None and now >= self._next_purge:
+            self._next_purge = now + self.purge_interval
+            expired_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM results WHERE created_at < ?",
+                (now - self.ttl_seconds,),
+            ).fetchone()[0]
+            if expired_bytes:
+                self._conn.execute(
+                    "DELETE FROM results WHERE created_at < ?",
+                    (now - self.ttl_seconds,),
+                )
+                self._total_bytes -= expired_bytes
+
+        if self._total_bytes <= self.max_bytes:
+            return
+        victims = []
+        excess = self._total_bytes - self.max_bytes
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM results ORDER BY accessed_at"
+        ):
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM results WHERE key = ?", victims)
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+class TieredResultCache:
+    """
+    Memory LRU in front of a persistent tier.
+
+    Memory entries expire with their disk entries: the expiry comes from the
+    disk tier's ``get_entry`` and ``ttl_seconds`` when it has them (as
+    SQLiteResultCache does).
+    """
+
+    def __init__(self, memory: MemoryResultCache, disk: ResultCache):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> str | None:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+        get_entry = getattr(self.disk, "get_entry", None)
+        if get_entry is None:
+            value, expires_at = self.disk.get(key), None
+        else:
+            value, expires_at = get_entry(key) or (None, None)
+        if value is not None:
+            self.memory.set(key, value, expires_at)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        ttl_seconds = getattr(self.disk, "ttl_seconds", None)
+        self.memory.set(
+            key, value, time.time() + ttl_seconds if ttl_seconds is not None else None
+        )
+        self.disk.set(key, value)
+
+
+def create_result_cache(
+    path: str | Path | None = None,
+    max_memory_entries: int = 1024,
+    ttl_seconds: float | None = 7 * 24 * 3600,
+    max_bytes: int = 256 * 1024 * 1024,
+) -> ResultCache:
+    """
+    Build the default cache: memory only, or memory in front of SQLite.
+
+    Args:
+        path: SQLite file for the persistent tier; None for memory only
+        max_memory_entries: Capacity of the in-memory LRU tier
+        ttl_seconds: Lifetime of persisted entries (None disables expiry)
+        max_bytes: Size budget of the persistent tier
+
+    Returns:
+        ResultCache: Cache ready to pass to a pipeline
+    """
+    memory = MemoryResultCache(max_entries=max_memory_entries)
+    if path is None:
+        return memory
+    return TieredResultCache(
+        memory, SQLiteResultCache(path, ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+    )
@@ -0,0 +1,61 @@
+"""
+Code-Driven Routing for Document Extraction Pipelines
+
+The coordinator agents route documents with an LLM turn: classify, read the
+classification, then transfer to the matching specialist and the validator. The
+routing rule itself is fixed, so this module expresses it in Python. Pipelines
+running in ``router`` mode use it to call the specialist directly and keep the
+coordinator model calls off the critical path.
+"""
+
+from typing import Any
+
+# Specialist agent per document type; anything else goes to the general specialist
+SPECIALIST_BY_DOCUMENT_TYPE = {
+    "contract": "contract_specialist",
+    "agreement": "contract_specialist",
+    "invoice": "invoice_specialist",
+}
+DEFAULT_SPECIALIST = "general_specialist"
+
+# Session state keys the classifier and validator write through their output_key
+CLASSIFICATION_KEY = "classification"
+VALIDATION_KEY = "validation_result"
+
+# Session state key each specialist writes through its output_key
+EXTRACTION_KEY_BY_SPECIALIST = {
+    "contract_specialist": "contract_extraction",
+    "invoice_specialist": "invoice_extraction",
+    "general_specialist": "general_extraction",
+}
+
+CLASSIFIER_AGENT = "document_classifier"
+VALIDATOR_AGENT = "validation_specialist"
+
+# Execution modes supported by the smart document pipelines
+EXECUTION_MODES = ("coordinator", "router")
+
+
+def document_type_value(document_type: Any) -> str:
+    """Normalize a DocumentType enum member or raw string to its value"""
+    value = getattr(document_type, "value", document_type)
+    return str(value or "").strip().lower()
+
+
+def select_specialist(document_type: Any) -> str:
+    """
+    Choose the specialist agent for a classified document.
+
+    Mirrors the coordinator instruction: contracts and agreements go to the
+    contract specialist, invoices to the invoice specialist, everything else to
+    the general specialist.
+
+    Args:
+        document_type: DocumentType member or its string value
+
+    Returns:
+        str: Name of the specialist agent to run
+    """
+    return SPECIALIST_BY_DOCUMENT_TYPE.get(
+        document_type_value(document_type), DEFAULT_SPECIALIST
+    )
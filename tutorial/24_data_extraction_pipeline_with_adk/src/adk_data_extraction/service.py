@@ -0,0 +1,702 @@
+"""
+Extraction HTTP Service
+
+Every CLI invocation builds its agents and runners from scratch. The service
+builds them once at startup and keeps them warm across requests:
+
+- ``POST /extract/contract``: sequential service-contract pipeline
+- ``POST /extract/contacts``: contact extraction
+- ``POST /analyze/legal``: legal document analysis
+- ``POST /pipeline/smart``: SmartDocumentExtractionPipeline
+- ``POST /jobs/{pipeline}`` / ``GET /jobs/{job_id}``: the same pipelines as
+  asynchronous jobs, for documents too large to wait on
+- ``GET /metrics``: per-endpoint latency histograms, admission and job counts,
+  and the model-call governor when one is set
+
+A document is sent as JSON (``{"text": ...}``), plain text, or a multipart form
+with a ``file`` upload (or a ``text`` field).
+
+Admission control: at most ``max_concurrency`` documents run at once and at
+most ``max_queue`` more wait for a slot. A request arriving when the queue is
+full gets ``429 Too Many Requests`` with a ``Retry-After`` header at once,
+instead of piling up behind work the service cannot finish in time. A request
+takes its place in the queue before its body is read, so a busy service rejects
+it without reading the document. Jobs wait for slots in the same way but are
+bounded separately, by ``max_pending_jobs``.
+
+    adk-extract-service --port 8000 --max-concurrency 16 --max-queue 64
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from google.adk import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from pydantic import BaseModel, Field
+
+from adk_data_extraction.batch import percentile
+from adk_data_extraction.governor import GovernorMetrics, get_model_call_governor
+from adk_data_extraction.sessions import SessionPool
+
+logger = logging.getLogger(__name__)
+
+# Endpoint path of each pipeline
+PIPELINE_ROUTES = {
+    "contract": "/extract/contract",
+    "contacts": "/extract/contacts",
+    "legal": "/analyze/legal",
+    "smart": "/pipeline/smart",
+}
+
+# Upper bounds (ms) of the latency histogram buckets
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+class PipelineOutput(BaseModel):
+    """What a pipeline produced for one document"""
+
+    result: Any = Field(description="Structured result, or the final text")
+    stages: dict[str, str] = Field(
+        default_factory=dict, description="Text output of each agent, by name"
+    )
+
+
+class ExtractionResponse(BaseModel):
+    """Response of the extraction endpoints"""
+
+    pipeline: str = Field(description="Pipeline that processed the document")
+    result: Any = Field(description="Structured result, or the final text")
+    stages: dict[str, str] = Field(
+        default_factory=dict, description="Text output of each agent, by name"
+    )
+    processing_time_ms: float = Field(description="Time spent in the pipeline")
+
+
+class Job(BaseModel):
+    """An asynchronous extraction job"""
+
+    job_id: str = Field(description="Job identifier")
+    pipeline: str = Field(description="Pipeline processing the document")
+    status: str = Field(description="queued, running, completed or failed")
+    created_at: float = Field(description="Submission time (Unix seconds)")
+    finished_at: float | None = Field(default=None, description="Completion time")
+    response: ExtractionResponse | None = Field(
+        default=None, description="Result of a completed job"
+    )
+    error: str | None = Field(default=None, description="Error of a failed job")
+
+
+class LatencySummary(BaseModel):
+    """Latency histogram of one endpoint"""
+
+    count: int = Field(description="Requests completed")
+    errors: int = Field(description="Requests that failed")
+    mean_ms: float = Field(description="Mean latency")
+    p50_ms: float = Field(description="Median latency over the recent window")
+    p95_ms: float = Field(description="95th-percentile latency over the recent window")
+    p99_ms: float = Field(description="99th-percentile latency over the recent window")
+    buckets: dict[str, int] = Field(
+        description="Cumulative request counts by latency upper bound (ms)"
+    )
+
+
+class AdmissionStats(BaseModel):
+    """Load of the admission queue"""
+
+    max_concurrency: int = Field(description="Documents processed at once")
+    max_queue: int = Field(description="Requests allowed to wait for a slot")
+    in_flight: int = Field(description="Documents being processed")
+    waiting: int = Field(description="Requests (not jobs) waiting for a slot")
+    admitted: int = Field(description="Requests admitted")
+    rejected: int = Field(description="Requests rejected with 429")
+
+
+class ServiceMetrics(BaseModel):
+    """Everything reported by the metrics endpoint"""
+
+    endpoints: dict[str, LatencySummary] = Field(description="Latency by endpoint")
+    admission: AdmissionStats = Field(description="Admission queue load")
+    jobs: dict[str, int] = Field(description="Jobs by status")
+    governor: GovernorMetrics | None = Field(
+        default=None, description="Model-call governor, when one is set"
+    )
+
+
+class QueueFull(Exception):
+    """Raised when a request arrives while the admission queue is full"""
+
+
+class AdmissionController:
+    """
+    Bounded admission queue in front of the pipelines.
+
+    Args:
+        max_concurrency: Documents processed at once
+        max_queue: Requests allowed to wait for a slot; more are rejected
+        retry_after: Seconds clients are asked to wait after a rejection
+    """
+
+    def __init__(
+        self, max_concurrency: int = 16, max_queue: int = 64, retry_after: int = 1
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def reserve(self) -> None:
+        """
+        Take a place in the queue for a request, e.g. before reading its body;
+        ``slot(reserved=True)`` or ``unreserve()`` gives it back.
+
+        Raises:
+            QueueFull: If ``max_queue`` requests already wait beyond the free slots
+        """
+        free = self.max_concurrency - self.in_flight
+        if self.waiting >= self.max_queue + free:
+            self.rejected += 1
+            raise QueueFull
+        self.waiting += 1
+
+    def unreserve(self) -> None:
+        """Give back a place taken with ``reserve()`` without using it"""
+        self.waiting -= 1
+
+    @asynccontextmanager
+    async def slot(
+        self, reject_when_full: bool = True, reserved: bool = False
+    ) -> AsyncIterator[None]:
+        """
+        Hold a processing slot for the duration of a ``with`` block.
+
+        Args:
+            reject_when_full: Raise QueueFull instead of waiting when no slot is
+                free and ``max_queue`` requests already wait
+            reserved: The request already holds a place from ``reserve()``
+
+        Raises:
+            QueueFull: If the queue is full and ``reject_when_full`` is set
+        """
+        # Only requests count towards the queue; jobs have their own bound
+        if reject_when_full and not reserved:
+            self.reserve()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= reject_when_full
+        self.admitted += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> AdmissionStats:
+        """Current admission queue load"""
+        return AdmissionStats(
+            max_concurrency=self.max_concurrency,
+            max_queue=self.max_queue,
+            in_flight=self.in_flight,
+            waiting=self.waiting,
+            admitted=self.admitted,
+            rejected=self.rejected,
+        )
+
+
+class LatencyHistogram:
+    """Latency histogram with fixed buckets and a window for percentiles"""
+
+    def __init__(self, window: int = 1000):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.recent: deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+
+    def record(self, latency_ms: float, error: bool = False) -> None:
+        """Record one request"""
+        index = next(
+            (i for i, bound in enumerate(LATENCY_BUCKETS_MS) if latency_ms <= bound),
+            len(LATENCY_BUCKETS_MS),
+        )
+        self.bucket_counts[index] += 1
+        self.recent.append(latency_ms)
+        self.count += 1
+        self.errors += error
+        self.total_ms += latency_ms
+
+    def summary(self) -> LatencySummary:
+        """Counts, percentiles and cumulative buckets"""
+        buckets = {}
+        cumulative = 0
+        for bound, count in zip(
+            [*map(str, LATENCY_BUCKETS_MS), "+Inf"], self.bucket_counts, strict=True
+        ):
+            cumulative += count
+            buckets[bound] = cumulative
+        recent = list(self.recent)
+        return LatencySummary(
+            count=self.count,
+            errors=self.errors,
+            mean_ms=round(self.total_ms / self.count, 1) if self.count else 0.0,
+            p50_ms=round(percentile(recent, 50), 1),
+            p95_ms=round(percentile(recent, 95), 1),
+            p99_ms=round(percentile(recent, 99), 1),
+            buckets=buckets,
+        )
+
+
+def _response_text(event: Any) -> str:
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(part.text or "" for part in event.content.parts if not part.thought)
+
+
+class AgentPipeline:
+    """
+    Warm runner around one agent tree.
+
+    The runner and session service are created once; every document gets its
+    own session from a SessionPool, deleted when the document is done.
+
+    Args:
+        agent: Root agent
+        app_name: ADK app name for the runner
+        prompt: Message template; ``{text}`` is replaced by the document
+        max_live_sessions: Cap on requests holding a session at once; more wait
+    """
+
+    def __init__(
+        self,
+        agent: Any,
+        app_name: str,
+        prompt: str = "{text}",
+        max_live_sessions: int = 256,
+    ):
+        self.agent = agent
+        self.prompt = prompt
+        self.session_service = InMemorySessionService()
+        self.runner = Runner(
+            agent=agent, app_name=app_name, session_service=self.session_service
+        )
+        self.sessions = SessionPool(
+            self.session_service, app_name, max_live_sessions=max_live_sessions
+        )
+
+    async def __call__(self, text: str) -> PipelineOutput:
+        message = types.Content(
+            role="user",
+            parts=[types.Part.from_text(text=self.prompt.replace("{text}", text))],
+        )
+        stages: dict[str, str] = {}
+        final = ""
+        async with self.sessions.session("request") as session_id:
+            async for event in self.runner.run_async(
+                user_id=self.sessions.user_id,
+                session_id=session_id,
+                new_message=message,
+            ):
+                output = _response_text(event)
+                if output and event.author != "user":
+                    stages[event.author] = final = output
+
+        output_schema = getattr(self.agent, "output_schema", None)
+        if output_schema is None:
+            return PipelineOutput(result=final, stages=stages)
+        return PipelineOutput(
+            result=output_schema.model_validate_json(final).model_dump(mode="json"),
+            stages=stages,
+        )
+
+
+class DocumentPipeline:
+    """Adapter for pipelines with ``process_document`` (e.g. the smart pipeline)"""
+
+    def __init__(self, pipeline: Any):
+        self.pipeline = pipeline
+
+    async def __call__(self, text: str) -> PipelineOutput:
+        result = await self.pipeline.process_document(text)
+        return PipelineOutput(result=result.model_dump(mode="json"))
+
+
+def default_pipelines() -> dict[str, Callable[[str], Awaitable[PipelineOutput]]]:
+    """The example pipelines, built once"""
+    from adk_data_extraction.examples.basic_contact_extraction.extraction import (
+        contact_extractor,
+    )
+    from adk_data_extraction.examples.legal_document_analysis.analysis import (
+        legal_agent,
+    )
+    from adk_data_extraction.examples.sequential_contract_pipeline.pipeline import (
+        service_contract_pipeline,
+    )
+    from adk_data_extraction.examples.smart_document_extraction_pipeline import (
+        SmartDocumentExtractionPipeline,
+    )
+
+    return {
+        "contract": AgentPipeline(service_contract_pipeline, "contract_service"),
+        "contacts": AgentPipeline(contact_extractor, "contacts_service"),
+        "legal": AgentPipeline(
+            legal_agent,
+            "legal_service",
+            prompt="Please analyze this legal document:\n\n{text}",
+        ),
+        "smart": DocumentPipeline(SmartDocumentExtractionPipeline()),
+    }
+
+
+class ExtractionService:
+    """
+    Long-lived pipelines behind admission control, with jobs and metrics.
+
+    Args:
+        pipelines: Pipeline per name (see PIPELINE_ROUTES); by default the
+            example pipelines
+        max_concurrency: Documents processed at once
+        max_queue: Requests allowed to wait for a slot before 429s
+        max_pending_jobs: Queued or running jobs allowed before 429s
+        max_finished_jobs: Finished jobs kept for polling
+        max_document_bytes: Largest accepted document
+    """
+
+    def __init__(
+        self,
+        pipelines: dict[str, Callable[[str], Awaitable[PipelineOutput]]] | None = None,
+        max_concurrency: int = 16,
+        max_queue: int = 64,
+        max_pending_jobs: int = 256,
+        max_finished_jobs: int = 1000,
+        max_document_bytes: int = 10_000_000,
+    ):
+        self.pipelines = pipelines if pipelines is not None else default_pipelines()
+        self.admission = AdmissionController(max_concurrency, max_queue)
+        self.max_pending_jobs = max_pending_jobs
+        self.max_finished_jobs = max_finished_jobs
+        self.max_document_bytes = max_document_bytes
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.jobs: OrderedDict[str, Job] = OrderedDict()
+        self._job_tasks: dict[str, asyncio.Task] = {}
+
+    def _histogram(self, name: str) -> LatencyHistogram:
+        return self.histograms.setdefault(name, LatencyHistogram())
+
+    async def _run(self, pipeline: str, text: str, metric: str) -> ExtractionResponse:
+        started = time.perf_counter()
+        try:
+            output = await self.pipelines[pipeline](text)
+        except Exception:
+            self._histogram(metric).record(
+                (time.perf_counter() - started) * 1000, error=True
+            )
+            raise
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._histogram(metric).record(elapsed_ms)
+        return ExtractionResponse(
+            pipeline=pipeline,
+            result=output.result,
+            stages=output.stages,
+            processing_time_ms=round(elapsed_ms, 1),
+        )
+
+    async def extract(
+        self, pipeline: str, text: str | Callable[[], Awaitable[str]]
+    ) -> ExtractionResponse:
+        """
+        Process a document now, if the admission queue has room.
+
+        Args:
+            pipeline: Pipeline name
+            text: The document, or a function reading it (the request body),
+                called only once the request has its place in the queue
+
+        Raises:
+            QueueFull: If the admission queue is full
+        """
+        self.admission.reserve()
+        try:
+            if not isinstance(text, str):
+                text = await text()
+        except BaseException:
+            self.admission.unreserve()
+            raise
+        async with self.admission.slot(reserved=True):
+            return await self._run(pipeline, text, PIPELINE_ROUTES[pipeline])
+
+    def pending_jobs(self) -> int:
+        """Jobs queued or running"""
+        return len(self._job_tasks)
+
+    def submit(self, pipeline: str, text: str) -> Job:
+        """
+        Queue a document as a job.
+
+        Raises:
+            QueueFull: If ``max_pending_jobs`` jobs are already queued or running
+        """
+        if self.pending_jobs() >= self.max_pending_jobs:
+            self.admission.rejected += 1
+            raise QueueFull
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            pipeline=pipeline,
+            status="queued",
+            created_at=time.time(),
+        )
+        self.jobs[job.job_id] = job
+        self._job_tasks[job.job_id] = asyncio.create_task(self._run_job(job, text))
+        return job
+
+    async def _run_job(self, job: Job, text: str) -> None:
+        try:
+            async with self.admission.slot(reject_when_full=False):
+                job.status = "running"
+                job.response = await self._run(job.pipeline, text, "/jobs")
+            job.status = "completed"
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}")
+            job.status = "failed"
+            job.error = f"{type(e).__name__}: {e}"
+        finally:
+            job.finished_at = time.time()
+            self._job_tasks.pop(job.job_id, None)
+            self._prune_jobs()
+
+    def _prune_jobs(self) -> None:
+        """Forget the oldest finished jobs beyond ``max_finished_jobs``"""
+        finished = [
+            job_id for job_id, job in self.jobs.items() if job.finished_at is not None
+        ]
+        for job_id in finished[: max(len(finished) - self.max_finished_jobs, 0)]:
+            del self.jobs[job_id]
+
+    def job(self, job_id: str) -> Job | None:
+        """A submitted job, or None if unknown (or pruned)"""
+        return self.jobs.get(job_id)
+
+    async def close(self) -> None:
+        """Cancel jobs still queued or running"""
+        tasks = list(self._job_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def metrics(self) -> ServiceMetrics:
+        """Latency histograms, admission and job counts"""
+        jobs: dict[str, int] = {}
+        for job in self.jobs.values():
+            jobs[job.status] = jobs.get(job.status, 0) + 1
+        governor = get_model_call_governor()
+        return ServiceMetrics(
+            endpoints={
+                name: histogram.summary()
+                for name, histogram in sorted(self.histograms.items())
+            },
+            admission=self.admission.stats(),
+            jobs=jobs,
+            governor=governor.metrics() if governor is not None else None,
+        )
+
+
+# Room for JSON escaping and multipart framing around a document
+_ENVELOPE_BYTES = 16 * 1024
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413, detail=f"Document larger than {max_bytes} bytes"
+    )
+
+
+async def _read_body(request: Request, limit: int, max_bytes: int) -> bytes:
+    """Request body, rejected as soon as it is known to exceed ``limit``"""
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > limit:
+        raise _too_large(max_bytes)
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise _too_large(max_bytes)
+    return bytes(body)
+
+
+async def read_document(request: Request, max_bytes: int) -> str:
+    """
+    Document text of a request: JSON ``{"text": ...}``, plain text, or a form
+    with a ``file`` upload or ``text`` field.
+
+    The body is read in chunks and never buffered beyond the size limit: twice
+    ``max_bytes`` (plus framing) for JSON and forms, ``max_bytes`` otherwise.
+
+    Raises:
+        HTTPException: 413 for documents over ``max_bytes``, 422 without one
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(("multipart/form-data", "application/x-www-form")):
+        body = await _read_body(request, 2 * max_bytes + _ENVELOPE_BYTES, max_bytes)
+
+        async def receive() -> dict[str, Any]:
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        form = await Request(request.scope, receive).form()
+        upload = form.get("file")
+        if upload is not None and not isinstance(upload, str):
+            data = await upload.read()
+        else:
+            data = (form.get("text") or "").encode()
+    elif content_type.startswith("application/json"):
+        body = await _read_body(request, 2 * max_bytes + _ENVELOPE_BYTES, max_bytes)
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Invalid JSON body") from None
+        text = payload.get("text") if isinstance(payload, dict) else None
+        data = text.encode() if isinstance(text, str) else b""
+    else:
+        data = await _read_body(request, max_bytes, max_bytes)
+
+    if len(data) > max_bytes:
+        raise _too_large(max_bytes)
+    if not data.strip():
+        raise HTTPException(
+            status_code=422,
+            detail='Send the document as {"text": ...}, plain text or a "file" upload',
+        )
+    return data.decode("utf-8", errors="replace")
+
+
+def create_app(service: ExtractionService | None = None, **options: Any) -> FastAPI:
+    """
+    Build the FastAPI application.
+
+    Args:
+        service: Service to serve; by default an ExtractionService with the
+            example pipelines, built at startup
+        **options: ExtractionService arguments for the default service
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        app.state.service = service or ExtractionService(**options)
+        logger.info(f"Pipelines ready: {', '.join(app.state.service.pipelines)}")
+        yield
+        await app.state.service.close()
+
+    app = FastAPI(title="ADK Data Extraction Service", lifespan=lifespan)
+
+    @app.exception_handler(QueueFull)
+    async def queue_full(request: Request, exc: QueueFull) -> JSONResponse:
+        retry_after = request.app.state.service.admission.retry_after
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Server busy, retry later"},
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    def add_route(pipeline: str, path: str) -> None:
+        async def extract(request: Request) -> ExtractionResponse:
+            service: ExtractionService = request.app.state.service
+            if pipeline not in service.pipelines:
+                raise HTTPException(status_code=404, detail="Pipeline not enabled")
+            try:
+                return await service.extract(
+                    pipeline,
+                    lambda: read_document(request, service.max_document_bytes),
+                )
+            except (QueueFull, HTTPException):
+                raise
+            except Exception as e:
+                logger.error(f"{path} failed: {e}")
+                raise HTTPException(
+                    status_code=502, detail=f"Pipeline failed: {type(e).__name__}: {e}"
+                ) from e
+
+        app.post(path, response_model=ExtractionResponse, name=pipeline)(extract)
+
+    for pipeline, path in PIPELINE_ROUTES.items():
+        add_route(pipeline, path)
+
+    @app.post("/jobs/{pipeline}", status_code=202, response_model=Job)
+    async def submit_job(pipeline: str, request: Request) -> JSONResponse:
+        service: ExtractionService = request.app.state.service
+        if pipeline not in service.pipelines:
+            raise HTTPException(status_code=404, detail=f"Unknown pipeline {pipeline}")
+        if service.pending_jobs() >= service.max_pending_jobs:
+            # Before reading the body; submit() checks again after
+            service.admission.rejected += 1
+            raise QueueFull
+        text = await read_document(request, service.max_document_bytes)
+        job = service.submit(pipeline, text)
+        return JSONResponse(
+            status_code=202,
+            content=job.model_dump(mode="json"),
+            headers={"Location": f"/jobs/{job.job_id}"},
+        )
+
+    @app.get("/jobs/{job_id}", response_model=Job)
+    async def get_job(job_id: str, request: Request) -> Job:
+        job = request.app.state.service.job(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Unknown job")
+        return job
+
+    @app.get("/metrics", response_model=ServiceMetrics)
+    async def metrics(request: Request) -> ServiceMetrics:
+        return request.app.state.service.metrics()
+
+    @app.get("/health")
+    async def health() -> dict[str, str]:
+        return {"status": "ok"}
+
+    return app
+
+
+def main(argv: list[str] | None = None) -> None:
+    """CLI entry point: serve the extraction service with uvicorn"""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--max-concurrency", type=int, default=16, help="Documents processed at once"
+    )
+    parser.add_argument(
+        "--max-queue", type=int, default=64, help="Requests waiting before 429s"
+    )
+    parser.add_argument(
+        "--max-pending-jobs", type=int, default=256, help="Queued jobs before 429s"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    app = create_app(
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+        max_pending_jobs=args.max_pending_jobs,
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Bounded Session Lifecycle for Pipeline Workers
+
+Pipelines create one ADK session per document. Left alone, an
+``InMemorySessionService`` keeps every session (state plus full event history)
+for the life of the process, so a long-running worker grows without bound.
+
+SessionPool owns that lifecycle:
+- every run gets a unique session ID, so re-submitting a document never
+  collides with an earlier run
+- sessions are deleted as soon as the result is built, optionally handing the
+  final session to an archive first
+- a cap on live sessions: runs hold their sessions as leases, which are never
+  evicted; once the cap is reached, a new run waits for one to finish
+  (backpressure), while sessions opened inside a running one (scratch sessions)
+  neither wait nor count against it, so a run can always finish. Sessions
+  opened without a lease (``open()``) are evicted least recently used first
+- SessionStats exposes counters and the live footprint, so a flat memory
+  profile can be checked rather than assumed
+"""
+
+import asyncio
+import contextvars
+import logging
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+from google.adk.sessions import BaseSessionService, Session
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStats(BaseModel):
+    """Session lifecycle counters and live footprint"""
+
+    live_sessions: int = Field(description="Sessions currently open in the pool")
+    peak_live_sessions: int = Field(description="Highest number of open sessions")
+    stored_sessions: int = Field(
+        description="Sessions held by the session service (-1 if unknown)"
+    )
+    live_events: int = Field(description="Events held by open sessions (-1 if unknown)")
+    created: int = Field(description="Sessions opened")
+    closed: int = Field(description="Sessions deleted after their run")
+    evicted: int = Field(description="Sessions deleted by the live-session cap")
+    waits: int = Field(description="Runs that waited for the live-session cap")
+    archived: int = Field(description="Sessions handed to the archive")
+
+
+class SessionArchive:
+    """Keeps snapshots of the most recent finished sessions in memory"""
+
+    def __init__(self, max_entries: int = 100):
+        self.entries: deque[dict[str, Any]] = deque(maxlen=max_entries)
+
+    def __call__(self, session: Session) -> None:
+        self.entries.append(
+            {
+                "session_id": session.id,
+                "state": dict(session.state),
+                "events": len(session.events),
+            }
+        )
+
+
+class SessionPool:
+    """
+    Creates, tracks and deletes the per-document sessions of a pipeline.
+
+    Args:
+        session_service: Session service shared with the pipeline runners
+        app_name: ADK app name the runners were created with
+        user_id: User the sessions belong to
+        max_live_sessions: Cap on runs holding a session at once (more wait)
+            and on open sessions (unleased ones are evicted beyond it)
+        archive: Optional callable receiving each finished session before deletion
+    """
+
+    def __init__(
+        self,
+        session_service: BaseSessionService,
+        app_name: str,
+        user_id: str = "pipeline_user",
+        max_live_sessions: int = 256,
+        archive: Callable[[Session], Any] | None = None,
+    ):
+        if max_live_sessions < 1:
+            raise ValueError("max_live_sessions must be at least 1")
+        self.session_service = session_service
+        self.app_name = app_name
+        self.user_id = user_id
+        self.max_live_sessions = max_live_sessions
+        self.archive = archive
+        self._live: OrderedDict[str, None] = OrderedDict()
+        self._leased: set[str] = set()
+        self._runs = 0
+        # Runs waiting for the cap, woken one per finished run
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        # Whether the current task runs inside a lease of this pool
+        self._in_run = contextvars.ContextVar(f"in_run_{id(self)}", default=False)
+        self._peak = 0
+        self._created = 0
+        self._closed = 0
+        self._evicted = 0
+        self._waits = 0
+        self._archived = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    async def open(self, prefix: str, state: dict[str, Any] | None = None) -> str:
+        """
+        Create a session with a unique ID, evicting the LRU unleased session if
+        over the cap.
+
+        Args:
+            prefix: Readable ID prefix (e.g. ``extraction_<md5[:8]>``)
+            state: Initial session state
+
+        Returns:
+            str: ID of the new session
+        """
+        return await self._open(prefix, state, leased=False)
+
+    async def _open(
+        self, prefix: str, state: dict[str, Any] | None, leased: bool
+    ) -> str:
+        session_id = f"{prefix}_{uuid.uuid4().hex[:12]}"
+        await self.session_service.create_session(
+            app_name=self.app_name,
+            user_id=self.user_id,
+            session_id=session_id,
+            state=state,
+        )
+        self._live[session_id] = None
+        if leased:
+            self._leased.add(session_id)
+        self._created += 1
+        self._peak = max(self._peak, len(self._live))
+
+        excess = len(self._live) - self.max_live_sessions
+        victims = [victim for victim in self._live if victim not in self._leased][
+            : max(excess, 0)
+        ]
+        for victim in victims:
+            del self._live[victim]
+            logger.warning(f"Live session cap reached, evicting session {victim}")
+            await self._delete(victim)
+            self._evicted += 1
+        return session_id
+
+    async def get(self, session_id: str) -> Session | None:
+        """Fetch a session, marking it as recently used"""
+        if session_id in self._live:
+            self._live.move_to_end(session_id)
+        return await self.session_service.get_session(
+            app_name=self.app_name, user_id=self.user_id, session_id=session_id
+        )
+
+    async def close(self, session_id: str) -> None:
+        """Archive (if configured) and delete a finished session
+
+        Unknown or already evicted session IDs are ignored.
+        """
+        if session_id not in self._live:
+            return
+        if self.archive is not None:
+            session = await self.get(session_id)
+            if session is not None:
+                try:
+                    self.archive(session)
+                    self._archived += 1
+                except Exception as e:
+                    logger.error(f"Failed to archive session {session_id}: {e}")
+        del self._live[session_id]
+        self._leased.discard(session_id)
+        await self._delete(session_id)
+        self._closed += 1
+
+    @asynccontextmanager
+    async def session(
+        self, prefix: str, state: dict[str, Any] | None = None
+    ) -> AsyncIterator[str]:
+        """Lease a session for the duration of a ``with`` block
+
+        Waits while ``max_live_sessions`` runs hold one, unless opened inside
+        a running one.
+        """
+        nested = self._in_run.get()
+        if not nested:
+            if self._runs >= self.max_live_sessions:
+                self._waits += 1
+            while self._runs >= self.max_live_sessions:
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+                try:
+                    await waiter
+                except asyncio.CancelledError:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                    elif not waiter.cancelled():
+                        # Woken and cancelled at once: pass the wake-up on
+                        self._wake_next()
+                    raise
+            self._runs += 1
+        token = self._in_run.set(True)
+        try:
+            session_id = await self._open(prefix, state, leased=True)
+            try:
+                yield session_id
+            finally:
+                await self.close(session_id)
+        finally:
+            self._in_run.reset(token)
+            if not nested:
+                self._runs -= 1
+                self._wake_next()
+
+    def _wake_next(self) -> None:
+        """Let the longest-waiting run check the cap again"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def _delete(self, session_id: str) -> None:
+        await self.session_service.delete_session(
+            app_name=self.app_name, user_id=self.user_id, session_id=session_id
+        )
+
+    def _stored_sessions(self) -> int:
+        """Sessions held by an in-memory session service (-1 for other backends)"""
+        sessions = getattr(self.session_service, "sessions", None)
+        if not isinstance(sessions, dict):
+            return -1
+        return sum(
+            len(user_sessions)
+            for app_sessions in sessions.values()
+            for user_sessions in app_sessions.values()
+        )
+
+    def _live_events(self) -> int:
+        sessions = getattr(self.session_service, "sessions", None)
+        if not isinstance(sessions, dict):
+            return -1
+        user_sessions = sessions.get(self.app_name, {}).get(self.user_id, {})
+        return sum(
+            len(user_sessions[session_id].events)
+            for session_id in self._live
+            if session_id in user_sessions
+        )
+
+    def stats(self) -> SessionStats:
+        """Current lifecycle counters and live footprint"""
+        return SessionStats(
+            live_sessions=len(self._live),
+            peak_live_sessions=self._peak,
+            stored_sessions=self._stored_sessions(),
+            live_events=self._live_events(),
+            created=self._created,
+            closed=self._closed,
+            evicted=self._evicted,
+            waits=self._waits,
+            archived=self._archived,
+        )
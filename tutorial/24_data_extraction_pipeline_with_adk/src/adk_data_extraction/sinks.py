@@ -0,0 +1,388 @@
+"""
+Streaming Result Sinks
+
+Sinks write results to disk as they complete instead of printing them:
+
+- JsonlSink: one JSON object per line
+- GzipJsonlSink: the same, gzip-compressed
+- CsvSink: the flat fields only; nested objects become dotted columns
+  (``validation.confidence_score``) and lists are left out. The header is the
+  union of the records' fields: a record bringing new fields (a different
+  document type, or the first success after failed records) widens it, the
+  file being rewritten with the new columns
+
+Any Pydantic model serializes (PipelineResult, LegalAnalysisResult,
+ContractAnalysisResult, ContactInfo, ...), as do plain dicts. Records are
+buffered and written ``batch_size`` at a time; ``checkpoint()`` also fsyncs, so
+everything written before a checkpoint survives a crash.
+
+With ``append=True`` a sink continues an existing file. It first cuts off a
+record left incomplete by a crash (a partial last line, or for gzip the partial
+last member; every batch is written as a complete gzip member). With a
+``key_field`` it also collects the keys of the records already written into
+``completed_keys``, streaming through the file, so a rerun can skip them:
+
+    with open_sink("out.jsonl.gz", append=True, key_field="extraction_id") as sink:
+        for document in documents:
+            if md5(document) not in sink.completed_keys:
+                sink.write(await pipeline.process_document(document))
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import zlib
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from pydantic import BaseModel
+
+SINK_FORMATS = ("jsonl", "jsonl.gz", "csv")
+
+_CHUNK_SIZE = 1 << 16
+
+
+def sink_format(path: str | Path) -> str:
+    """Sink format implied by a file name (``.gz``, ``.csv``, otherwise JSONL)"""
+    name = Path(path).name
+    if name.endswith(".gz"):
+        return "jsonl.gz"
+    if name.endswith(".csv"):
+        return "csv"
+    return "jsonl"
+
+
+def flatten(data: dict[str, Any], prefix: str = "") -> dict[str, Any]:
+    """Scalar fields of a nested dict, nested keys joined with dots; lists skipped"""
+    flat: dict[str, Any] = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif not isinstance(value, list):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def _lookup(data: dict[str, Any], field: str) -> Any:
+    """Value of a dotted field in a nested dict, or None"""
+    for part in field.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(part)
+    return data
+
+
+def _truncate_to_last_newline(file: BinaryIO) -> None:
+    """Cut off a partial last line"""
+    end = file.seek(0, os.SEEK_END)
+    position = end
+    while position > 0:
+        start = max(position - _CHUNK_SIZE, 0)
+        file.seek(start)
+        newline = file.read(position - start).rfind(b"\n")
+        if newline >= 0:
+            position = start + newline + 1
+            break
+        position = start
+    if position != end:
+        file.truncate(position)
+
+
+class ResultSink:
+    """
+    Base class of the streaming sinks.
+
+    Args:
+        path: Output file
+        batch_size: Records buffered before they are written
+        append: Continue an existing file instead of replacing it
+        key_field: Field (dotted for nested ones) identifying a record; with
+            ``append``, keys already in the file are collected in
+            ``completed_keys``
+    """
+
+    format = "jsonl"
+
+    def __init__(
+        self,
+        path: str | Path,
+        batch_size: int = 100,
+        append: bool = False,
+        key_field: str | None = None,
+    ):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.key_field = key_field
+        self.completed_keys: set[Any] = set()
+        self.written = 0
+        self._buffer: list[dict[str, Any]] = []
+        if append and self.path.exists():
+            with self.path.open("r+b") as file:
+                self._repair(file)
+            if key_field is not None:
+                self.completed_keys = {
+                    self._existing_key(record) for record in self._existing()
+                }
+            self._file = self.path.open("ab")
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("wb")
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _repair(self, file: BinaryIO) -> None:
+        """Cut off a record left incomplete by a crash"""
+        _truncate_to_last_newline(file)
+
+    def _existing(self) -> Iterator[dict[str, Any]]:
+        """Records already in the file"""
+        with self.path.open("rb") as file:
+            for line in file:
+                yield json.loads(line)
+
+    def _existing_key(self, record: dict[str, Any]) -> Any:
+        """Key of a record read back from the file"""
+        return _lookup(record, self.key_field)
+
+    def _key(self, record: dict[str, Any]) -> Any:
+        """Key of a written record, as ``_existing_key`` reads it back"""
+        return _lookup(record, self.key_field)
+
+    def _encode(self, records: list[dict[str, Any]]) -> bytes:
+        return "".join(
+            json.dumps(record, ensure_ascii=False, default=str) + "\n"
+            for record in records
+        ).encode()
+
+    def write(self, record: BaseModel | dict[str, Any], **fields: Any) -> None:
+        """
+        Add a result to the output.
+
+        Args:
+            record: Pydantic model or dict to write
+            **fields: Extra top-level fields written ahead of the record's own
+                (e.g. the source path)
+        """
+        data = (
+            record.model_dump(mode="json")
+            if isinstance(record, BaseModel)
+            else dict(record)
+        )
+        if fields:
+            data = {**fields, **data}
+        self._buffer.append(data)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, records: Iterable[BaseModel | dict[str, Any]]) -> None:
+        """Add several results to the output"""
+        for record in records:
+            self.write(record)
+
+    def flush(self) -> None:
+        """Write buffered records to the file"""
+        if not self._buffer:
+            return
+        data = self._encode(self._buffer)
+        self._file.write(data)
+        self._file.flush()
+        if self.key_field is not None:
+            self.completed_keys.update(self._key(record) for record in self._buffer)
+        self.written += len(self._buffer)
+        self._buffer.clear()
+
+    def checkpoint(self) -> None:
+        """Write buffered records and fsync, so they survive a crash"""
+        self.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """Checkpoint and close the file"""
+        if self._file.closed:
+            return
+        self.checkpoint()
+        self._file.close()
+
+
+class JsonlSink(ResultSink):
+    """Results as JSON Lines"""
+
+
+def _gzip_members(file: BinaryIO) -> Iterator[tuple[int, bytes]]:
+    """(end offset, content) of each complete gzip member, stopping at the first
+    incomplete or corrupt one"""
+    position = 0
+    decompressor = zlib.decompressobj(wbits=31)
+    content: list[bytes] = []
+    while chunk := file.read(_CHUNK_SIZE):
+        position += len(chunk)
+        while chunk:
+            try:
+                content.append(decompressor.decompress(chunk))
+            except zlib.error:
+                return
+            if not decompressor.eof:
+                break
+            chunk = decompressor.unused_data
+            yield position - len(chunk), b"".join(content)
+            decompressor = zlib.decompressobj(wbits=31)
+            content = []
+
+
+class GzipJsonlSink(ResultSink):
+    """Results as gzip-compressed JSON Lines; every batch is one gzip member"""
+
+    format = "jsonl.gz"
+
+    def _repair(self, file: BinaryIO) -> None:
+        end = max((end for end, _ in _gzip_members(file)), default=0)
+        if end != file.seek(0, os.SEEK_END):
+            file.truncate(end)
+
+    def _existing(self) -> Iterator[dict[str, Any]]:
+        with self.path.open("rb") as file:
+            for _, content in _gzip_members(file):
+                for line in content.splitlines():
+                    yield json.loads(line)
+
+    def _encode(self, records: list[dict[str, Any]]) -> bytes:
+        return gzip.compress(super()._encode(records))
+
+
+def _complete_csv_records(file: BinaryIO) -> tuple[list[str] | None, int]:
+    """Header and end offset of the last complete record of a CSV file"""
+    position = 0
+    terminated = True
+    exhausted = False
+
+    def lines() -> Iterator[str]:
+        nonlocal position, terminated, exhausted
+        file.seek(0)
+        for line in file:
+            position += len(line)
+            terminated = line.endswith(b"\n")
+            yield line.decode("utf-8", errors="replace")
+        exhausted = True
+
+    header = None
+    end = 0
+    try:
+        for row in csv.reader(lines()):
+            # A row completed only by the end of the file is cut off
+            if exhausted or not terminated:
+                break
+            if header is None:
+                header = row
+            end = position
+    except csv.Error:
+        pass
+    return header, end
+
+
+class CsvSink(ResultSink):
+    """
+    Flat fields of the results as CSV.
+
+    Args:
+        columns: Columns to write, other fields being left out; by default
+            every flat field, the header growing as records bring new ones
+            (starting from the header of the file being appended to)
+        **kwargs: ResultSink arguments
+    """
+
+    format = "csv"
+
+    def __init__(self, path: str | Path, columns: list[str] | None = None, **kwargs):
+        self.columns = columns
+        self._fixed_columns = columns is not None
+        self._header_written = False
+        super().__init__(path, **kwargs)
+
+    def _repair(self, file: BinaryIO) -> None:
+        # A quoted field may span lines, so a partial record can end in a
+        # newline: keep only the records csv.reader parses completely
+        header, end = _complete_csv_records(file)
+        if end != file.seek(0, os.SEEK_END):
+            file.truncate(end)
+        if header is not None:
+            if not self._fixed_columns:
+                self.columns = header
+            self._header_written = True
+
+    def _existing(self) -> Iterator[dict[str, Any]]:
+        with self.path.open(newline="") as file:
+            yield from csv.DictReader(file)
+
+    def _existing_key(self, record: dict[str, Any]) -> Any:
+        # The header holds the flattened names, dots included
+        return record.get(self.key_field, "")
+
+    def _key(self, record: dict[str, Any]) -> Any:
+        # As read back: every value a string, None empty
+        value = _lookup(record, self.key_field)
+        return "" if value is None else str(value)
+
+    def _widen(self, columns: list[str]) -> None:
+        """Rewrite the file with a header extended by ``columns``"""
+        self._file.close()
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("w", newline="") as file:
+            writer = csv.DictWriter(file, self.columns + columns)
+            writer.writeheader()
+            writer.writerows(self._existing())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, self.path)
+        self._file = self.path.open("ab")
+
+    def _encode(self, records: list[dict[str, Any]]) -> bytes:
+        rows = [flatten(record) for record in records]
+        if not self._fixed_columns:
+            known = set(self.columns or ())
+            new = list(
+                dict.fromkeys(
+                    column for row in rows for column in row if column not in known
+                )
+            )
+            if new and self._header_written:
+                self._widen(new)
+            self.columns = (self.columns or []) + new
+        output = io.StringIO()
+        writer = csv.DictWriter(output, self.columns, extrasaction="ignore")
+        if not self._header_written:
+            writer.writeheader()
+            self._header_written = True
+        writer.writerows(rows)
+        return output.getvalue().encode()
+
+
+_SINKS: dict[str, type[ResultSink]] = {
+    "jsonl": JsonlSink,
+    "jsonl.gz": GzipJsonlSink,
+    "csv": CsvSink,
+}
+
+
+def open_sink(path: str | Path, format: str | None = None, **kwargs: Any) -> ResultSink:
+    """
+    Open a sink for ``path``.
+
+    Args:
+        path: Output file
+        format: One of SINK_FORMATS; by default implied by the file name
+        **kwargs: Sink arguments (``batch_size``, ``append``, ``key_field``, ...)
+
+    Returns:
+        ResultSink: The sink, to be closed (or used as a context manager)
+    """
+    format = format or sink_format(path)
+    if format not in _SINKS:
+        raise ValueError(f"format must be one of {SINK_FORMATS}, got {format!r}")
+    return _SINKS[format](path, **kwargs)
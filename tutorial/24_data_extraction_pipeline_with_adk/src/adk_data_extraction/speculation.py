@@ -0,0 +1,101 @@
+"""
+Speculative Extraction
+
+Code-driven routing runs classifier → specialist → validator one after another,
+although most traffic goes to the same specialist. With a SpeculationPolicy the
+pipeline starts the predicted specialist concurrently with ``document_classifier``
+in a scratch session. If the classification agrees, the speculative output is
+adopted and the specialist's latency disappears from the critical path; if not,
+the speculative run is cancelled (or discarded) and the right specialist runs
+as usual.
+
+The prediction comes from a fixed prior (``default_specialist``) or, when a
+KeywordPreClassifier is given, from its local classification. SpeculationStats
+reports the hit rate and the latency saved, to tune the policy against traffic.
+"""
+
+from pydantic import BaseModel, Field
+
+from adk_data_extraction.preclassifier import KeywordPreClassifier
+from adk_data_extraction.routing import select_specialist
+
+
+class SpeculationPolicy:
+    """
+    Predicts which specialist to start alongside the classifier.
+
+    Args:
+        default_specialist: Prior used when there is no (confident) local
+            classification; None disables speculation without one
+        pre_classifier: Optional keyword classifier used as a cheap heuristic
+        min_confidence: Minimum local confidence for the heuristic to override
+            the prior
+    """
+
+    def __init__(
+        self,
+        default_specialist: str | None = "contract_specialist",
+        pre_classifier: KeywordPreClassifier | None = None,
+        min_confidence: float = 0.3,
+    ):
+        self.default_specialist = default_specialist
+        self.pre_classifier = pre_classifier
+        self.min_confidence = min_confidence
+
+    def predict(self, content: str) -> str | None:
+        """Specialist to start speculatively, or None to skip speculation"""
+        if self.pre_classifier is not None:
+            classification = self.pre_classifier.classify(content)
+            if (
+                classification["document_type"] != "unknown"
+                and classification["confidence_score"] >= self.min_confidence
+            ):
+                return select_specialist(classification["document_type"])
+        return self.default_specialist
+
+
+class SpeculationReport(BaseModel):
+    """Outcome of speculative extraction so far"""
+
+    attempts: int = Field(description="Documents with a speculative specialist run")
+    hits: int = Field(description="Speculative results adopted")
+    misses: int = Field(description="Speculative results cancelled or discarded")
+    hit_rate: float = Field(description="hits / attempts")
+    latency_saved_ms: float = Field(description="Critical-path time saved by hits")
+    mean_latency_saved_ms: float = Field(description="Mean time saved per hit")
+    wasted_ms: float = Field(description="Speculative run time spent on misses")
+
+
+class SpeculationStats:
+    """Collects speculation outcomes"""
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved_ms = 0.0
+        self.wasted_ms = 0.0
+
+    def record_hit(self, saved_ms: float) -> None:
+        """Record an adopted speculative result and the time it saved"""
+        self.hits += 1
+        self.latency_saved_ms += saved_ms
+
+    def record_miss(self, wasted_ms: float) -> None:
+        """Record a cancelled or discarded speculative run"""
+        self.misses += 1
+        self.wasted_ms += wasted_ms
+
+    def report(self) -> SpeculationReport:
+        """Build the report for everything recorded so far"""
+        attempts = self.hits + self.misses
+        return SpeculationReport(
+            attempts=attempts,
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=self.hits / attempts if attempts else 0.0,
+            latency_saved_ms=self.latency_saved_ms,
+            mean_latency_saved_ms=self.latency_saved_ms / self.hits
+            if self.hits
+            else 0.0,
+            wasted_ms=self.wasted_ms,
+        )
@@ -0,0 +1,118 @@
+"""
+Per-Agent Stage Metrics
+
+``processing_time_ms`` says how long a document took, not where the time went.
+StageRecorder watches the events a Runner yields and attributes them to their
+``event.author`` (coordinator, classifier, specialist, validator): first and last
+event timestamps, event count, elapsed time and token usage from
+``event.usage_metadata``. StageAggregator sums those per agent across documents
+and batches.
+
+Elapsed time is attributed to the author of the event that ends each wait: the
+gap between the previous event (or the start of the run) and an agent's event is
+time spent on that agent's model call. Stage elapsed times therefore add up to
+the run's wall time, which first-to-last event spans alone would not.
+"""
+
+import time
+from collections.abc import Iterable
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class StageMetrics(BaseModel):
+    """Timing and token usage of one agent within a single run"""
+
+    agent: str = Field(description="Event author (agent name)")
+    first_event_at: float = Field(description="Unix time of the agent's first event")
+    last_event_at: float = Field(description="Unix time of the agent's last event")
+    elapsed_ms: float = Field(description="Run time attributed to this agent")
+    events: int = Field(description="Number of events authored by the agent")
+    prompt_tokens: int = Field(description="Prompt tokens reported by the model")
+    response_tokens: int = Field(description="Response tokens reported by the model")
+
+
+class StageTotals(BaseModel):
+    """Per-agent metrics aggregated across runs"""
+
+    runs: int = Field(description="Runs in which the agent produced events")
+    events: int = Field(description="Total events authored by the agent")
+    total_elapsed_ms: float = Field(description="Sum of attributed run time")
+    mean_elapsed_ms: float = Field(description="Mean attributed time per run")
+    max_elapsed_ms: float = Field(description="Slowest attributed time in one run")
+    prompt_tokens: int = Field(description="Total prompt tokens")
+    response_tokens: int = Field(description="Total response tokens")
+
+
+class StageRecorder:
+    """Attributes the events of one run to their authoring agents"""
+
+    def __init__(self) -> None:
+        self._stages: dict[str, dict[str, Any]] = {}
+        self._last_seen = time.time()
+
+    def observe(self, event: Any) -> None:
+        """Record one event yielded by ``Runner.run_async``"""
+        now = time.time()
+        author = getattr(event, "author", None) or "unknown"
+        stage = self._stages.get(author)
+        if stage is None:
+            stage = self._stages[author] = {
+                "agent": author,
+                "first_event_at": now,
+                "elapsed_ms": 0.0,
+                "events": 0,
+                "prompt_tokens": 0,
+                "response_tokens": 0,
+            }
+        stage["last_event_at"] = now
+        stage["elapsed_ms"] += (now - self._last_seen) * 1000
+        stage["events"] += 1
+        usage = getattr(event, "usage_metadata", None)
+        if usage is not None:
+            stage["prompt_tokens"] += usage.prompt_token_count or 0
+            stage["response_tokens"] += usage.candidates_token_count or 0
+        self._last_seen = now
+
+    def metrics(self) -> list[StageMetrics]:
+        """Stage metrics in the order the agents first produced events"""
+        return [StageMetrics(**stage) for stage in self._stages.values()]
+
+
+class StageAggregator:
+    """Sums StageMetrics per agent across documents and batches"""
+
+    def __init__(self) -> None:
+        self._totals: dict[str, dict[str, Any]] = {}
+
+    def add(self, stage_metrics: Iterable[StageMetrics]) -> None:
+        """Add the stage metrics of one run"""
+        for stage in stage_metrics:
+            totals = self._totals.setdefault(
+                stage.agent,
+                {
+                    "runs": 0,
+                    "events": 0,
+                    "total_elapsed_ms": 0.0,
+                    "max_elapsed_ms": 0.0,
+                    "prompt_tokens": 0,
+                    "response_tokens": 0,
+                },
+            )
+            totals["runs"] += 1
+            totals["events"] += stage.events
+            totals["total_elapsed_ms"] += stage.elapsed_ms
+            totals["max_elapsed_ms"] = max(totals["max_elapsed_ms"], stage.elapsed_ms)
+            totals["prompt_tokens"] += stage.prompt_tokens
+            totals["response_tokens"] += stage.response_tokens
+
+    def report(self) -> dict[str, StageTotals]:
+        """Aggregated metrics keyed by agent name"""
+        return {
+            agent: StageTotals(
+                mean_elapsed_ms=totals["total_elapsed_ms"] / totals["runs"],
+                **totals,
+            )
+            for agent, totals in self._totals.items()
+        }
@@ -0,0 +1,285 @@
+"""
+Console Script Startup Benchmark
+
+Measures how long each console script takes to get to its ``main``: importing
+the entry point module and resolving the function, as the generated script
+does. Every measurement runs in a fresh interpreter under ``python -X
+importtime``, so besides the timings a run records where the import time went
+(self time by top-level package) and whether google-adk was imported at all.
+
+Results are saved as JSON next to the pipeline benchmarks, tagged with the
+current commit; ``--max-import-ms`` turns the run into a startup regression
+check:
+
+    python -m adk_data_extraction.startup_benchmark --repeat 5 --max-import-ms 1000
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import UTC, datetime
+from importlib.metadata import entry_points
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+# Bump when the stored run layout changes incompatibly
+STARTUP_FORMAT_VERSION = 1
+
+# Namespace packages whose imports are grouped by their second component
+_NAMESPACE_PACKAGES = {"google"}
+
+# Runs in the measured interpreter: import the entry point, resolve ``main``
+_PROBE = """
+import functools, importlib, json, sys, time
+started = time.perf_counter()
+module = importlib.import_module({module!r})
+functools.reduce(getattr, {attributes!r}, module)
+print(json.dumps({{
+    "import_ms": (time.perf_counter() - started) * 1000,
+    "modules": len(sys.modules),
+    "imports_adk": "google.adk" in sys.modules,
+}}))
+"""
+
+
+class ImportTiming(BaseModel):
+    """One line of ``-X importtime`` output"""
+
+    module: str = Field(description="Imported module")
+    self_us: int = Field(description="Time spent in the module itself")
+    cumulative_us: int = Field(description="Time including its own imports")
+    depth: int = Field(description="Nesting level (0 for top-level imports)")
+
+
+class StartupResult(BaseModel):
+    """Startup cost of one console script"""
+
+    script: str = Field(description="Console script name")
+    entry_point: str = Field(description="``module:function`` it runs")
+    import_ms: float = Field(description="Median time to import the entry point")
+    process_ms: float = Field(
+        description="Median wall time of the whole interpreter run"
+    )
+    modules: int = Field(description="Modules loaded once the entry point resolves")
+    imports_adk: bool = Field(description="Whether google-adk was imported")
+    top_packages_ms: dict[str, float] = Field(
+        description="Import self time of the slowest top-level packages"
+    )
+
+
+class StartupRun(BaseModel):
+    """A complete startup benchmark run, as stored on disk"""
+
+    format: int = Field(default=STARTUP_FORMAT_VERSION)
+    started_at: str = Field(description="UTC start time (ISO 8601)")
+    git_commit: str | None = Field(description="Commit the run was measured on")
+    python: str = Field(description="Python version")
+    platform: str = Field(description="Platform string")
+    repeat: int = Field(description="Measurements per script")
+    results: list[StartupResult] = Field(description="One entry per console script")
+
+
+def console_scripts(pyproject: str | Path | None = None) -> dict[str, str]:
+    """
+    The package's console scripts, by name.
+
+    Read from ``[project.scripts]`` of the source tree's pyproject.toml, which
+    stays current without a reinstall; falls back to the installed entry points.
+    """
+    path = Path(pyproject or Path(__file__).resolve().parents[2] / "pyproject.toml")
+    if path.exists():
+        import tomllib
+
+        with open(path, "rb") as file:
+            scripts = tomllib.load(file).get("project", {}).get("scripts", {})
+        if scripts:
+            return dict(scripts)
+    return {
+        entry.name: entry.value
+        for entry in entry_points(group="console_scripts")
+        if entry.value.startswith(f"{__package__}.")
+    }
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """Parse the ``-X importtime`` lines of an interpreter's stderr"""
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header
+        module = name.strip()
+        timings.append(
+            ImportTiming(
+                module=module,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(name.rstrip()) - len(module) - 1) // 2,
+            )
+        )
+    return timings
+
+
+def package_self_times(timings: list[ImportTiming]) -> Counter[str]:
+    """Import self time (µs) by top-level package"""
+    totals: Counter[str] = Counter()
+    for timing in timings:
+        parts = timing.module.split(".")
+        package = ".".join(parts[:2] if parts[0] in _NAMESPACE_PACKAGES else parts[:1])
+        totals[package] += timing.self_us
+    return totals
+
+
+def measure_script(
+    script: str, entry_point: str, repeat: int = 3, top: int = 5
+) -> StartupResult:
+    """
+    Measure one console script in ``repeat`` fresh interpreters.
+
+    Args:
+        script: Console script name
+        entry_point: ``module:function`` the script runs
+        repeat: Measurements to take the median of
+        top: Packages to report in ``top_packages_ms``
+
+    Raises:
+        RuntimeError: If the entry point cannot be imported
+    """
+    module, _, function = entry_point.partition(":")
+    probe = _PROBE.format(module=module, attributes=function.split("."))
+    imports, processes, reports = [], [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-W", "ignore", "-c", probe],
+            capture_output=True,
+            text=True,
+        )
+        processes.append((time.perf_counter() - started) * 1000)
+        if completed.returncode != 0:
+            raise RuntimeError(
+                f"{script}: cannot import {entry_point}: "
+                f"{completed.stderr.strip().splitlines()[-1]}"
+            )
+        report = json.loads(completed.stdout.strip().splitlines()[-1])
+        imports.append(report["import_ms"])
+        reports.append((report, parse_importtime(completed.stderr)))
+    report, timings = reports[0]
+    return StartupResult(
+        script=script,
+        entry_point=entry_point,
+        import_ms=round(statistics.median(imports), 1),
+        process_ms=round(statistics.median(processes), 1),
+        modules=report["modules"],
+        imports_adk=report["imports_adk"],
+        top_packages_ms={
+            package: round(us / 1000, 1)
+            for package, us in package_self_times(timings).most_common(top)
+        },
+    )
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_startup_benchmark(
+    scripts: dict[str, str] | None = None, repeat: int = 3
+) -> StartupRun:
+    """
+    Measure the startup of every console script.
+
+    Args:
+        scripts: Entry points by script name (defaults to ``console_scripts()``)
+        repeat: Measurements per script
+
+    Returns:
+        StartupRun: Environment and per-script results
+    """
+    started_at = datetime.now(UTC).isoformat(timespec="seconds")
+    scripts = scripts or console_scripts()
+    return StartupRun(
+        started_at=started_at,
+        git_commit=_git_commit(),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        repeat=repeat,
+        results=[
+            measure_script(script, entry_point, repeat)
+            for script, entry_point in sorted(scripts.items())
+        ],
+    )
+
+
+def save_run(run: StartupRun, output_dir: str | Path) -> Path:
+    """Write a run to ``<output_dir>/startup-<timestamp>-<commit>.json``"""
+    directory = Path(output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = run.started_at.replace(":", "").replace("-", "").split("+")[0]
+    path = directory / f"startup-{stamp}-{run.git_commit or 'unknown'}.json"
+    path.write_text(run.model_dump_json(indent=2))
+    return path
+
+
+def _print_table(run: StartupRun) -> None:
+    print(f"{'script':<26}{'import ms':>11}{'process ms':>12}{'modules':>9}  adk")
+    for result in run.results:
+        print(
+            f"{result.script:<26}{result.import_ms:>11.1f}{result.process_ms:>12.1f}"
+            f"{result.modules:>9}  {'yes' if result.imports_adk else 'no'}"
+        )
+        slowest = ", ".join(
+            f"{package} {ms:.0f}ms" for package, ms in result.top_packages_ms.items()
+        )
+        print(f"    {slowest}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    """CLI entry point for the startup benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--scripts", nargs="+", help="Console scripts to measure (default: all)"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output-dir", default="benchmarks/results")
+    parser.add_argument(
+        "--max-import-ms",
+        type=float,
+        help="Exit with an error if any script imports slower than this",
+    )
+    args = parser.parse_args(argv)
+
+    scripts = console_scripts()
+    if args.scripts:
+        unknown = set(args.scripts) - set(scripts)
+        if unknown:
+            parser.error(f"unknown scripts {sorted(unknown)}, expected {list(scripts)}")
+        scripts = {script: scripts[script] for script in args.scripts}
+    run = run_startup_benchmark(scripts, repeat=args.repeat)
+    _print_table(run)
+    print(f"\nResults written to {save_run(run, args.output_dir)}")
+    if args.max_import_ms is not None:
+        slow = [r.script for r in run.results if r.import_ms > args.max_import_ms]
+        if slow:
+            print(f"Slower than {args.max_import_ms:.0f}ms to start: {', '.join(slow)}")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+"""
+Incremental Structured Output
+
+Agents with an output schema answer with one JSON object, which ADK parses only
+once the whole response is in. A response that goes wrong early (prose instead
+of JSON, a list where the schema has a number) still runs to its last token
+before it fails.
+
+IncrementalJsonDecoder checks a response as it streams:
+- every character is checked against the JSON grammar, so a syntax error is
+  reported at the character that causes it
+- each top-level field is validated against its type in the target schema as
+  soon as its value ends; a value that cannot match the type (an array for a
+  ``float`` field) is rejected at its first character
+- completed fields are available before the object closes
+
+StreamingJsonPolicy applies this to agents: their model is called in streaming
+mode and a response is abandoned at its first schema violation and requested
+again, up to ``max_attempts`` times. Fields are handed to the listener set with
+``listen_for_fields`` as they complete (process_document_stream turns them into
+``fields`` updates).
+"""
+
+import json
+import logging
+import re
+from collections.abc import AsyncGenerator, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cache
+from typing import Annotated, Any
+
+from google.adk.models import BaseLlm, LLMRegistry, LlmRequest, LlmResponse
+from google.genai import types
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+
+logger = logging.getLogger(__name__)
+
+# Receives (agent name, attempt, newly completed fields)
+FieldListener = Callable[[str, int, dict[str, Any]], None]
+
+_field_listener: ContextVar[FieldListener | None] = ContextVar(
+    "field_listener", default=None
+)
+
+_WHITESPACE = " \t\n\r"
+_ESCAPES = '"\\/bfnrtu'
+_LITERALS = ("true", "false", "null")
+# Prefixes of JSON numbers (completed numbers are checked by json.loads)
+_NUMBER_PREFIX = re.compile(r"-?(0|[1-9][0-9]*)?(\.[0-9]*)?([eE][+-]?[0-9]*)?")
+# JSON types a value starting with each character can have
+_START_TYPES = {'"': "string", "{": "object", "[": "array", "n": "null"}
+# Other JSON types pydantic accepts for a schema type (lax mode)
+_LAX_TYPES = {
+    "number": {"string"},
+    "integer": {"number", "string"},
+    "boolean": {"number", "string"},
+}
+
+
+class SchemaViolation(ValueError):
+    """A streamed response cannot become a valid instance of its schema"""
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} (at character {position})")
+        self.position = position
+
+
+class StreamingJsonReport(BaseModel):
+    """Streamed structured responses and how many were cut short"""
+
+    calls: int = Field(description="Model calls made through the policy")
+    aborted: int = Field(description="Responses abandoned at a schema violation")
+    retries: int = Field(description="Responses requested again after an abort")
+    failures: int = Field(description="Calls with no valid response in any attempt")
+    aborted_chars: int = Field(
+        description="Characters received by abandoned responses before the abort"
+    )
+    early_fields: int = Field(
+        description="Fields handed to listeners before their object closed"
+    )
+
+
+def _json_types(schema: dict[str, Any], defs: dict[str, Any]) -> set[str] | None:
+    """JSON types a JSON schema allows (None when unconstrained)"""
+    if "$ref" in schema:
+        return _json_types(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    if "type" in schema:
+        kind = schema["type"]
+        return set(kind) if isinstance(kind, list) else {kind}
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            types_ = [_json_types(option, defs) for option in schema[key]]
+            return None if None in types_ else set().union(*types_)
+    return None
+
+
+@cache
+def _field_adapters(
+    schema: type[BaseModel],
+) -> dict[str, tuple[TypeAdapter, set[str] | None]]:
+    """Validator and allowed JSON types of each field, by JSON key"""
+    adapters = {}
+    for name, info in schema.model_fields.items():
+        annotation = info.annotation
+        if info.metadata:
+            annotation = Annotated[annotation, *info.metadata]
+        adapter = TypeAdapter(annotation)
+        json_schema = adapter.json_schema()
+        allowed = _json_types(json_schema, json_schema.get("$defs", {}))
+        if allowed is not None:
+            for kind in list(allowed):
+                allowed |= _LAX_TYPES.get(kind, set())
+        adapters[info.alias or name] = (adapter, allowed)
+    return adapters
+
+
+class IncrementalJsonDecoder:
+    """
+    Decodes one JSON object against a Pydantic schema as text arrives.
+
+    Args:
+        schema: Model the object must validate as
+    """
+
+    def __init__(self, schema: type[BaseModel]):
+        self.schema = schema
+        self.text = ""
+        self.fields: dict[str, Any] = {}
+        self._adapters = _field_adapters(schema)
+        # Open containers: [bracket, what comes next]
+        self._stack: list[list[str]] = []
+        self._done = False
+        self._string_start: int | None = None
+        self._escape = False
+        self._token_start: int | None = None
+        self._member_key: str | None = None
+        self._member_start = 0
+
+    @property
+    def complete(self) -> bool:
+        """Whether the top-level object has closed"""
+        return self._done
+
+    @property
+    def position(self) -> int:
+        """Characters received so far"""
+        return len(self.text)
+
+    def feed(self, chunk: str) -> dict[str, Any]:
+        """
+        Consume the next piece of the response.
+
+        Returns:
+            dict[str, Any]: Top-level fields completed by this chunk, validated
+
+        Raises:
+            SchemaViolation: At the first character that makes the response
+                invalid for the schema
+        """
+        completed: dict[str, Any] = {}
+        start = len(self.text)
+        self.text += chunk
+        for index in range(start, len(self.text)):
+            self._step(index, self.text[index], completed)
+        return completed
+
+    def result(self) -> BaseModel:
+        """
+        The complete, validated object.
+
+        Raises:
+            SchemaViolation: If the object has not closed or misses fields
+        """
+        if self._token_start is not None:
+            self._end_token(len(self.text), {})
+        if not self._done:
+            raise SchemaViolation(
+                "response ended before the JSON object closed", len(self.text)
+            )
+        try:
+            return self.schema.model_validate_json(self.text)
+        except ValidationError as e:
+            raise SchemaViolation(
+                f"{self.schema.__name__}: {e.errors()[0]['msg']}", len(self.text)
+            ) from e
+
+    def _step(self, index: int, char: str, completed: dict[str, Any]) -> None:
+        if self._string_start is not None:
+            self._string_char(index, char, completed)
+            return
+        if self._token_start is not None:
+            if char not in ",}]" and char not in _WHITESPACE:
+                token = self.text[self._token_start : index + 1]
+                if not (
+                    any(literal.startswith(token) for literal in _LITERALS)
+                    or _NUMBER_PREFIX.fullmatch(token)
+                ):
+                    raise SchemaViolation(f"invalid literal {token!r}", index)
+                return
+            self._end_token(index, completed)
+
+        if char in _WHITESPACE:
+            return
+        if self._done:
+            raise SchemaViolation("content after the JSON object", index)
+        if not self._stack:
+            if char != "{":
+                raise SchemaViolation(f"expected a JSON object, got {char!r}", index)
+            self._stack.append(["{", "key_or_end"])
+            return
+
+        frame = self._stack[-1]
+        expect = frame[1]
+        if expect in ("value", "value_or_end"):
+            if char == "]" and expect == "value_or_end":
+                self._close(index, completed)
+            else:
+                self._start_value(index, char)
+        elif expect in ("key", "key_or_end"):
+            if char == '"':
+                self._string_start = index
+            elif char == "}" and expect == "key_or_end":
+                self._close(index, completed)
+            else:
+                raise SchemaViolation(f"expected a field name, got {char!r}", index)
+        elif expect == "colon":
+            if char != ":":
+                raise SchemaViolation(f"expected ':', got {char!r}", index)
+            frame[1] = "value"
+        elif char == ",":
+            frame[1] = "key" if frame[0] == "{" else "value"
+        elif char == ("}" if frame[0] == "{" else "]"):
+            self._close(index, completed)
+        else:
+            raise SchemaViolation(
+                f"expected ',' or a closing bracket, got {char!r}", index
+            )
+
+    def _start_value(self, index: int, char: str) -> None:
+        if len(self._stack) == 1:
+            self._member_start = index
+            self._check_start(index, char)
+        if char in "{[":
+            self._stack.append([char, "key_or_end" if char == "{" else "value_or_end"])
+        elif char == '"':
+            self._string_start = index
+        elif char in "-0123456789tfn":
+            self._token_start = index
+        else:
+            raise SchemaViolation(f"expected a value, got {char!r}", index)
+
+    def _check_start(self, index: int, char: str) -> None:
+        """Reject a top-level value whose JSON type its field cannot accept"""
+        entry = self._adapters.get(self._member_key or "")
+        if entry is None or entry[1] is None:
+            return
+        kind = _START_TYPES.get(char, "boolean" if char in "tf" else "number")
+        if kind not in entry[1]:
+            raise SchemaViolation(
+                f"{self.schema.__name__}.{self._member_key} cannot be a JSON {kind}",
+                index,
+            )
+
+    def _string_char(self, index: int, char: str, completed: dict[str, Any]) -> None:
+        if self._escape:
+            if char not in _ESCAPES:
+                raise SchemaViolation(f"invalid escape '\\{char}'", index)
+            self._escape = False
+        elif char == "\\":
+            self._escape = True
+        elif char < " ":
+            raise SchemaViolation("control character in string", index)
+        elif char == '"':
+            start, self._string_start = self._string_start, None
+            frame = self._stack[-1]
+            if frame[1] in ("key", "key_or_end"):
+                if len(self._stack) == 1:
+                    self._member_key = json.loads(self.text[start : index + 1])
+                frame[1] = "colon"
+            else:
+                self._end_value(index + 1, completed)
+
+    def _end_token(self, end: int, completed: dict[str, Any]) -> None:
+        start, self._token_start = self._token_start, None
+        try:
+            json.loads(self.text[start:end])
+        except json.JSONDecodeError:
+            raise SchemaViolation(
+                f"invalid literal {self.text[start:end]!r}", start
+            ) from None
+        self._end_value(end, completed)
+
+    def _close(self, index: int, completed: dict[str, Any]) -> None:
+        self._stack.pop()
+        if self._stack:
+            self._end_value(index + 1, completed)
+        else:
+            self._done = True
+
+    def _end_value(self, end: int, completed: dict[str, Any]) -> None:
+        """A value ended at ``end``; at the top level it completes a field"""
+        self._stack[-1][1] = "comma_or_end"
+        if len(self._stack) != 1:
+            return
+        key = self._member_key
+        entry = self._adapters.get(key or "")
+        if entry is None:
+            return  # not in the schema; ignored like pydantic does
+        try:
+            value = entry[0].validate_json(self.text[self._member_start : end])
+        except ValidationError as e:
+            raise SchemaViolation(
+                f"{self.schema.__name__}.{key}: {e.errors()[0]['msg']}",
+                self._member_start,
+            ) from e
+        self.fields[key] = completed[key] = value
+
+
+@contextmanager
+def listen_for_fields(listener: FieldListener) -> Iterator[None]:
+    """Send fields completed by streamed responses in this context to ``listener``"""
+    token = _field_listener.set(listener)
+    try:
+        yield
+    finally:
+        _field_listener.reset(token)
+
+
+class StreamingJsonPolicy:
+    """
+    Streams and validates the responses of agents with an output schema.
+
+    Args:
+        max_attempts: Responses requested per call before giving up; a call
+            whose every response violates the schema raises SchemaViolation
+    """
+
+    def __init__(self, max_attempts: int = 3):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.calls = 0
+        self.aborted = 0
+        self.retries = 0
+        self.failures = 0
+        self.aborted_chars = 0
+        self.early_fields = 0
+
+    def wrap(
+        self, model: str | BaseLlm, agent_name: str, output_schema: type[BaseModel]
+    ) -> "StreamingJsonLlm":
+        """Wrap one agent's model (name or instance) with streaming validation"""
+        if isinstance(model, StreamingJsonLlm):
+            model = model.inner
+        if isinstance(model, str):
+            model = LLMRegistry.new_llm(model)
+        return StreamingJsonLlm(
+            model=model.model,
+            inner=model,
+            policy=self,
+            agent_name=agent_name,
+            output_schema=output_schema,
+        )
+
+    def apply(self, root_agent: Any) -> None:
+        """Wrap the model of every agent with an output schema in an agent tree"""
+        output_schema = getattr(root_agent, "output_schema", None)
+        if getattr(root_agent, "model", None) and output_schema is not None:
+            root_agent.model = self.wrap(
+                root_agent.model, root_agent.name, output_schema
+            )
+        for sub_agent in root_agent.sub_agents:
+            self.apply(sub_agent)
+
+    def report(self) -> StreamingJsonReport:
+        """Abort and retry counts so far"""
+        return StreamingJsonReport(
+            calls=self.calls,
+            aborted=self.aborted,
+            retries=self.retries,
+            failures=self.failures,
+            aborted_chars=self.aborted_chars,
+            early_fields=self.early_fields,
+        )
+
+
+def _response_text(response: LlmResponse) -> str:
+    if not response.content:
+        return ""
+    return "".join(
+        part.text or "" for part in response.content.parts or [] if not part.thought
+    )
+
+
+class StreamingJsonLlm(BaseLlm):
+    """Model wrapper validating one agent's structured output as it streams"""
+
+    inner: BaseLlm
+    policy: Any
+    agent_name: str
+    output_schema: Any
+
+    async def _attempt(
+        self, llm_request: LlmRequest, attempt: int
+    ) -> tuple[IncrementalJsonDecoder, LlmResponse | None]:
+        """Stream one response; returns the decoder and the last response
+
+        A response with an error code is returned as-is, undecoded.
+        """
+        decoder = IncrementalJsonDecoder(self.output_schema)
+        listener = _field_listener.get()
+        last = None
+        stream = self.inner.generate_content_async(llm_request, stream=True)
+        try:
+            async for response in stream:
+                if response.error_code:
+                    return decoder, response
+                last = response
+                text = _response_text(response)
+                # Streaming models end with one response aggregating the
+                # partial ones; models that do not stream send only that one
+                if response.partial or not decoder.position:
+                    fields = decoder.feed(text)
+                    if fields and listener is not None:
+                        if not decoder.complete:
+                            self.policy.early_fields += len(fields)
+                        listener(self.agent_name, attempt, fields)
+        finally:
+            await stream.aclose()
+        decoder.result()
+        return decoder, last
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        policy = self.policy
+        policy.calls += 1
+        for attempt in range(1, policy.max_attempts + 1):
+            request = llm_request if attempt == 1 else llm_request.model_copy(deep=True)
+            try:
+                decoder, last = await self._attempt(request, attempt)
+            except SchemaViolation as e:
+                policy.aborted += 1
+                policy.aborted_chars += e.position
+                if attempt == policy.max_attempts:
+                    policy.failures += 1
+                    raise
+                policy.retries += 1
+                logger.warning(
+                    f"Abandoning {self.agent_name} response, attempt {attempt}: {e}"
+                )
+                continue
+            if last is not None and last.error_code:
+                yield last
+                return
+            yield LlmResponse(
+                content=types.Content(
+                    role="model", parts=[types.Part.from_text(text=decoder.text)]
+                ),
+                usage_metadata=last.usage_metadata if last else None,
+                finish_reason=last.finish_reason if last else None,
+            )
+            return
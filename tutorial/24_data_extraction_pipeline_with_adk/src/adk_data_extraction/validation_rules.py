@@ -0,0 +1,271 @@
+"""
+Deterministic Validation Rules
+
+Most of what ``validation_specialist`` checks is mechanical: ISO dates, end after
+start, payment terms adding up to the contract value, line items plus tax adding
+up to the invoice total, valid currency codes, populated fields. RuleValidator
+runs those checks locally on the extraction stored in session state and builds a
+ValidationSummary-shaped result.
+
+Each check passes, fails (an issue) or is inconclusive (e.g. payment terms
+without amounts). A result with issues, or with every check passed and enough
+fields populated, is conclusive and replaces the LLM validator; only inconclusive
+results are escalated to ``validation_specialist``.
+"""
+
+import re
+from collections.abc import Callable
+from datetime import date
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+# Active ISO 4217 currency codes
+ISO_4217_CODES = frozenset(
+    """
+    AED AFN ALL AMD ANG AOA ARS AUD AWG AZN BAM BBD BDT BGN BHD BIF BMD BND BOB BRL
+    BSD BTN BWP BYN BZD CAD CDF CHF CLP CNY COP CRC CUP CVE CZK DJF DKK DOP DZD EGP
+    ERN ETB EUR FJD FKP GBP GEL GHS GIP GMD GNF GTQ GYD HKD HNL HTG HUF IDR ILS INR
+    IQD IRR ISK JMD JOD JPY KES KGS KHR KMF KPW KRW KWD KYD KZT LAK LBP LKR LRD LSL
+    LYD MAD MDL MGA MKD MMK MNT MOP MRU MUR MVR MWK MXN MYR MZN NAD NGN NIO NOK NPR
+    NZD OMR PAB PEN PGK PHP PKR PLN PYG QAR RON RSD RUB RWF SAR SBD SCR SDG SEK SGD
+    SHP SLE SOS SRD SSP STN SVC SYP SZL THB TJS TMT TND TOP TRY TTD TWD TZS UAH UGX
+    USD UYU UZS VED VES VND VUV WST XAF XCD XOF XPF YER ZAR ZMW ZWL
+    """.split()
+)
+
+# A money amount next to a currency symbol or code, e.g. "$35,000" or "1,200.50 EUR"
+_CODES = "|".join(sorted(ISO_4217_CODES))
+_NUMBER = r"(\d{1,3}(?:,\d{3})+|\d+)(\.\d+)?"
+_AMOUNT = re.compile(
+    rf"(?:[$€£¥]\s?|\b(?:{_CODES})\s?){_NUMBER}|{_NUMBER}\s?(?:{_CODES})\b"
+)
+_PERCENT = re.compile(r"(\d+(?:\.\d+)?)\s?%")
+
+
+def parse_amounts(text: str) -> list[float]:
+    """Money amounts (with a currency symbol or code) mentioned in ``text``"""
+    amounts = []
+    for match in _AMOUNT.finditer(text):
+        whole, fraction = match.group(1, 2) if match.group(1) else match.group(3, 4)
+        amounts.append(float(whole.replace(",", "") + (fraction or "")))
+    return amounts
+
+
+def _populated(value: Any) -> bool:
+    return value is not None and value != "" and value != []
+
+
+def _amounts_match(total: float, expected: float) -> bool:
+    return abs(total - expected) <= max(0.01, abs(expected) * 0.005)
+
+
+class RuleValidation(BaseModel):
+    """ValidationSummary fields plus whether the rules settled the outcome"""
+
+    is_valid: bool = Field(description="Whether extraction passed validation")
+    confidence_score: float = Field(description="Share of checks that passed")
+    completeness_score: float = Field(description="Share of schema fields populated")
+    issues: list[str] = Field(description="Quality issues identified")
+    recommendation: str = Field(description="Recommended next action")
+    conclusive: bool = Field(description="False when the LLM validator should decide")
+    inconclusive_checks: list[str] = Field(
+        description="Checks the rules could not decide"
+    )
+
+    def summary(self) -> dict[str, Any]:
+        """Fields of ValidationSummary, ready for session state"""
+        return self.model_dump(exclude={"conclusive", "inconclusive_checks"})
+
+
+class _Checks:
+    """Outcome collector for one validation run"""
+
+    def __init__(self) -> None:
+        self.passed = 0
+        self.issues: list[str] = []
+        self.inconclusive: list[str] = []
+
+    def check(self, ok: bool | None, issue: str) -> None:
+        """Record a check: True passes, False fails, None is inconclusive"""
+        if ok is None:
+            self.inconclusive.append(issue)
+        elif ok:
+            self.passed += 1
+        else:
+            self.issues.append(issue)
+
+    def iso_date(self, data: dict[str, Any], field: str) -> date | None:
+        value = data.get(field)
+        if not _populated(value):
+            return None
+        try:
+            parsed = date.fromisoformat(str(value))
+        except ValueError:
+            self.check(False, f"{field} {value!r} is not an ISO date (YYYY-MM-DD)")
+            return None
+        self.check(True, f"{field} format")
+        return parsed
+
+    def currency(self, data: dict[str, Any]) -> None:
+        value = data.get("currency")
+        if _populated(value):
+            self.check(
+                str(value).upper() in ISO_4217_CODES,
+                f"currency {value!r} is not an ISO 4217 code",
+            )
+
+    def required(self, data: dict[str, Any], *fields: str) -> None:
+        for field in fields:
+            self.check(_populated(data.get(field)), f"{field} is missing")
+
+
+def _check_contract(data: dict[str, Any], checks: _Checks) -> None:
+    checks.check(len(data.get("parties") or []) >= 2, "fewer than two parties")
+    start = checks.iso_date(data, "start_date")
+    end = checks.iso_date(data, "end_date")
+    if start and end:
+        checks.check(end > start, f"end_date {end} is not after start_date {start}")
+    checks.currency(data)
+
+    value = data.get("contract_value")
+    terms = [str(term) for term in data.get("payment_terms") or []]
+    if value is None or not terms:
+        return
+    checks.check(value > 0, f"contract_value {value} is not positive")
+    term_amounts = [parse_amounts(term) for term in terms]
+    scheduled = sum(amounts[0] for amounts in term_amounts if amounts)
+    percents = [float(match) for term in terms for match in _PERCENT.findall(term)]
+    if scheduled and _amounts_match(scheduled, value):
+        checks.check(True, "payment schedule")
+    elif percents and not scheduled:
+        checks.check(
+            _amounts_match(sum(percents), 100.0),
+            f"payment term percentages sum to {sum(percents):g}%, not 100%",
+        )
+    elif scheduled and all(term_amounts):
+        checks.check(
+            False,
+            f"payment terms sum to {scheduled:,.2f}, not contract_value {value:,.2f}",
+        )
+    else:
+        checks.check(None, "payment terms without amounts")
+
+
+def _check_invoice(data: dict[str, Any], checks: _Checks) -> None:
+    checks.required(data, "invoice_number", "vendor_name", "customer_name")
+    invoice_date = checks.iso_date(data, "invoice_date")
+    due_date = checks.iso_date(data, "due_date")
+    if invoice_date and due_date:
+        checks.check(
+            due_date >= invoice_date,
+            f"due_date {due_date} is before invoice_date {invoice_date}",
+        )
+    checks.currency(data)
+
+    total = data.get("total_amount")
+    tax = data.get("tax_amount")
+    if total is None:
+        return
+    checks.check(total > 0, f"total_amount {total} is not positive")
+    if tax is not None:
+        checks.check(tax >= 0, f"tax_amount {tax} is negative")
+
+    line_amounts = [parse_amounts(str(item)) for item in data.get("line_items") or []]
+    if not line_amounts or not all(line_amounts):
+        checks.check(None, "line items without amounts")
+        return
+    # The last amount on a line is its total ("2 x Widget @ $50 = $100")
+    subtotal = sum(amounts[-1] for amounts in line_amounts)
+    expected = subtotal + (tax or 0)
+    checks.check(
+        _amounts_match(expected, total) or _amounts_match(subtotal, total),
+        f"line items ({subtotal:,.2f}) plus tax ({tax or 0:,.2f}) do not match "
+        f"total_amount {total:,.2f}",
+    )
+
+
+def _check_general(data: dict[str, Any], checks: _Checks) -> None:
+    checks.required(data, "document_title", "summary")
+
+
+RULES_BY_EXTRACTION_KEY: dict[str, Callable[[dict[str, Any], _Checks], None]] = {
+    "contract_extraction": _check_contract,
+    "invoice_extraction": _check_invoice,
+    "general_extraction": _check_general,
+}
+
+
+# Event author for validations settled by the rules
+RULE_VALIDATOR = "validation_rules"
+
+
+class RuleValidator:
+    """
+    Validates extractions with deterministic rules.
+
+    Args:
+        min_completeness: Completeness below which a clean result is still
+            escalated to the LLM validator
+    """
+
+    def __init__(self, min_completeness: float = 0.6):
+        self.min_completeness = min_completeness
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies the rule settings (for result-cache keys)"""
+        return f"rules:{self.min_completeness}"
+
+    def validate(
+        self, extraction_key: str, data: dict[str, Any], schema: type[BaseModel]
+    ) -> RuleValidation:
+        """
+        Validate one extraction.
+
+        Args:
+            extraction_key: Session state key the specialist wrote
+                (contract_extraction, invoice_extraction or general_extraction)
+            data: Extraction stored under that key
+            schema: Pydantic schema of the extraction, for completeness
+
+        Returns:
+            RuleValidation: Summary fields plus whether they are conclusive
+        """
+        checks = _Checks()
+        rules = RULES_BY_EXTRACTION_KEY.get(extraction_key)
+        if rules is None:
+            checks.check(None, f"no rules for {extraction_key}")
+        else:
+            try:
+                rules(data, checks)
+            except (TypeError, ValueError) as e:
+                checks.check(None, f"malformed extraction: {e}")
+
+        fields = list(schema.model_fields)
+        completeness = sum(_populated(data.get(field)) for field in fields) / len(
+            fields
+        )
+        total_checks = checks.passed + len(checks.issues) + len(checks.inconclusive)
+        confidence = checks.passed / total_checks if total_checks else 0.0
+
+        if checks.issues:
+            conclusive = True
+            recommendation = (
+                "retry_extraction"
+                if len(checks.issues) >= 3 or completeness < 0.5
+                else "review_needed"
+            )
+        else:
+            conclusive = not checks.inconclusive and completeness >= self.min_completeness
+            recommendation = "approved" if conclusive else "review_needed"
+
+        return RuleValidation(
+            is_valid=not checks.issues,
+            confidence_score=round(confidence, 3),
+            completeness_score=round(completeness, 3),
+            issues=checks.issues,
+            recommendation=recommendation,
+            conclusive=conclusive,
+            inconclusive_checks=checks.inconclusive,
+        )
@@ -0,0 +1,131 @@
+import asyncio
+import importlib
+import json
+from collections.abc import AsyncGenerator
+
+import pytest
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+PIPELINE_MODULES = [
+    "smart_document_extraction_pipeline",
+    "improved_multi_agent_pipeline",
+]
+
+
+@pytest.fixture(params=PIPELINE_MODULES)
+def pipeline_module(request):
+    """Each twin SmartDocumentExtractionPipeline module"""
+    return importlib.import_module(f"adk_data_extraction.examples.{request.param}")
+
+
+def make_pipeline_result(module, extraction_id="doc", status="completed"):
+    """Build a minimal PipelineResult for the given pipeline module"""
+    return module.PipelineResult(
+        extraction_id=extraction_id,
+        classification=module.DocumentClassification(
+            document_type=module.DocumentType.EMAIL,
+            complexity_level="simple",
+            estimated_processing_time=1,
+            recommended_extractor="general_specialist",
+            confidence_score=0.9,
+            key_indicators=["from:"],
+        ),
+        extracted_data=module.GeneralData(
+            document_title=extraction_id,
+            main_entities=[],
+            key_dates=[],
+            summary="",
+            action_items=[],
+            contact_info=[],
+        ),
+        validation=module.ValidationSummary(
+            is_valid=status != "failed",
+            confidence_score=0.9,
+            completeness_score=0.9,
+            issues=[],
+            recommendation="approved",
+        ),
+        processing_time_ms=1,
+        pipeline_status=status,
+    )
+
+
+class ScriptedLlm(BaseLlm):
+    """Model double that replays canned responses and counts calls"""
+
+    responses: list[str] = []
+    calls: int = 0
+    prompt_tokens: int = 100
+    response_tokens: int = 20
+    delay: float = 0.0
+    prompts: list[str] = []
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if not self.responses:
+            raise AssertionError(f"Unexpected call to model {self.model}")
+        self.prompts.append(
+            "\n".join(
+                part.text or ""
+                for content in llm_request.contents
+                for part in content.parts or []
+            )
+        )
+        text = self.responses[min(self.calls, len(self.responses) - 1)]
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part.from_text(text=text)]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=self.prompt_tokens,
+                candidates_token_count=self.response_tokens,
+            ),
+        )
+
+
+def script_agents(root_agent, outputs):
+    """Replace every agent's model with a ScriptedLlm.
+
+    Agents named in ``outputs`` answer with that object serialized as JSON; any
+    other agent fails the test if it is called. Returns the models by agent name.
+    """
+    models = {}
+    agents = [root_agent, *root_agent.sub_agents]
+    for agent in agents:
+        output = outputs.get(agent.name)
+        responses = [] if output is None else [json.dumps(output)]
+        agent.model = models[agent.name] = ScriptedLlm(
+            model=f"scripted-{agent.name}", responses=responses
+        )
+    return models
+
+
+CLASSIFICATION = {
+    "document_type": "invoice",
+    "complexity_level": "simple",
+    "estimated_processing_time": 5,
+    "recommended_extractor": "invoice_specialist",
+    "confidence_score": 0.95,
+    "key_indicators": ["invoice", "bill to"],
+}
+
+INVOICE = {
+    "invoice_number": "INV-1",
+    "vendor_name": "Acme",
+    "customer_name": "Globex",
+    "total_amount": 110.0,
+    "currency": "USD",
+    "line_items": ["Widget: $100"],
+    "tax_amount": 10.0,
+}
+
+VALIDATION = {
+    "is_valid": True,
+    "confidence_score": 0.9,
+    "completeness_score": 0.8,
+    "issues": [],
+    "recommendation": "approved",
+}
@@ -0,0 +1,158 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from google.adk.agents import LlmAgent
+
+from adk_data_extraction.agent_registry import AgentRegistry, agent_spec_key
+from adk_data_extraction.context_cache import ContextCache, StandInContextCacheBackend
+from adk_data_extraction.examples.hierarchical_document_pipeline.agent import (
+    HierarchicalDocumentPipeline,
+)
+from adk_data_extraction.examples.legal_document_analysis.agent import (
+    LegalDocumentAnalysisPipeline,
+)
+from adk_data_extraction.model_backend import ModelBackend
+from conftest import CLASSIFICATION, INVOICE, VALIDATION, ScriptedLlm, script_agents
+
+INVOICE_PATH = ["document_classifier", "invoice_specialist", "validation_specialist"]
+
+
+def _agent(name="root"):
+    return LlmAgent(
+        name=name,
+        model="gemini-2.0-flash",
+        sub_agents=[LlmAgent(name=f"{name}_helper", model="gemini-2.0-flash")],
+    )
+
+
+def test_concurrent_callers_share_one_build():
+    registry = AgentRegistry()
+    builds = []
+    start = threading.Barrier(8)
+
+    def build():
+        builds.append(threading.get_ident())
+        time.sleep(0.05)
+        return _agent()
+
+    def get(_):
+        start.wait()
+        return registry.graph("example", build, {"model": "flash"})
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        graphs = list(executor.map(get, range(8)))
+
+    assert len(builds) == 1
+    assert all(graph is graphs[0] for graph in graphs)
+    assert graphs[0].key == agent_spec_key("example", {"model": "flash"})
+    assert set(graphs[0].agent_runners) == {"root_helper"}
+    assert graphs[0].agent_runners is graphs[0].agent_runners
+    assert registry.stats().model_dump() == {
+        "graphs": 1,
+        "builds": 1,
+        "hits": 7,
+        "evicted": 0,
+    }
+
+
+def test_graphs_are_keyed_by_spec_and_bounded():
+    registry = AgentRegistry(max_graphs=2)
+
+    flash = registry.graph("example", _agent, "flash")
+    pro = registry.graph("example", _agent, "pro")
+    other = registry.graph("other", _agent, "flash")
+
+    assert len({flash.key, pro.key, other.key}) == 3
+    assert other.app_name == "other"
+    assert len(registry) == 2
+    assert registry.stats().evicted == 1
+    assert registry.graph("example", _agent, "flash") is not flash  # rebuilt
+    with pytest.raises(ValueError):
+        AgentRegistry(max_graphs=0)
+
+
+def test_smart_pipelines_share_graph_per_configuration(pipeline_module):
+    registry = AgentRegistry()
+    Pipeline = pipeline_module.SmartDocumentExtractionPipeline
+
+    first = Pipeline(agent_registry=registry)
+    second = Pipeline(agent_registry=registry, execution_mode="router")
+    replay = Pipeline(
+        agent_registry=registry, model_backend=ModelBackend(mode="strict")
+    )
+    cached = Pipeline(
+        agent_registry=registry,
+        context_cache=ContextCache(StandInContextCacheBackend()),
+    )
+    private = Pipeline()
+
+    assert second.coordinator_agent is first.coordinator_agent
+    assert second.runner is first.runner
+    assert second.agent_runners is first.agent_graph.agent_runners
+    assert second.session_service is first.session_service
+    assert second.sessions is not first.sessions
+    assert replay.coordinator_agent is not first.coordinator_agent
+    assert cached.coordinator_agent is not first.coordinator_agent
+    assert private.agent_graph is None
+    assert private.coordinator_agent is not first.coordinator_agent
+    assert first.config_hash == private.config_hash
+    assert registry.stats().builds == 3
+
+
+async def test_pipelines_on_a_shared_graph_run_concurrently(pipeline_module):
+    registry = AgentRegistry()
+    pipelines = [
+        pipeline_module.SmartDocumentExtractionPipeline(
+            execution_mode="router", agent_registry=registry
+        )
+        for _ in range(2)
+    ]
+    models = script_agents(
+        pipelines[0].coordinator_agent,
+        {
+            "document_classifier": CLASSIFICATION,
+            "invoice_specialist": INVOICE,
+            "validation_specialist": VALIDATION,
+        },
+    )
+
+    results = await asyncio.gather(
+        *(
+            pipeline.process_document(f"INVOICE INV-{n}\nBill To: Globex")
+            for n, pipeline in enumerate(pipelines)
+        )
+    )
+
+    assert [result.pipeline_status for result in results] == ["completed"] * 2
+    assert [models[name].calls for name in INVOICE_PATH] == [2, 2, 2]
+    assert all(pipeline.sessions.stats().live_sessions == 0 for pipeline in pipelines)
+
+
+async def test_example_pipelines_reuse_graph_and_runner(tmp_path):
+    registry = AgentRegistry()
+    document = tmp_path / "contract.txt"
+    document.write_text("SERVICE AGREEMENT between Acme and Globex")
+
+    legal = [LegalDocumentAnalysisPipeline(agent_registry=registry) for _ in range(2)]
+    legal[0].main_agent.model = ScriptedLlm(
+        model="scripted", responses=["Parties: Acme, Globex"]
+    )
+    hierarchical = HierarchicalDocumentPipeline(agent_registry=registry)
+    hierarchical.coordinator_agent.model = ScriptedLlm(
+        model="scripted", responses=["Pipeline summary"]
+    )
+
+    analyses = [await pipeline.analyze_document(str(document)) for pipeline in legal]
+    processed = await hierarchical.process_document(document.read_text())
+
+    assert legal[1].runner is legal[0].runner
+    assert [analysis["response"] for analysis in analyses] == [
+        "Parties: Acme, Globex"
+    ] * 2
+    assert analyses[0]["session_id"] != analyses[1]["session_id"]
+    assert processed["coordinator_summary"] == "Pipeline summary"
+    assert legal[0].graph.sessions.stats().stored_sessions == 0
+    assert registry.stats().builds == 2
@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from adk_data_extraction.batch import BatchStats, percentile, process_concurrently
+from conftest import make_pipeline_result
+
+
+async def _collect(agen):
+    return [item async for item in agen]
+
+
+async def test_concurrency_is_bounded_and_results_stream_in_completion_order():
+    in_flight = 0
+    peak = 0
+
+    async def process(delay):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(delay)
+        in_flight -= 1
+        return delay
+
+    results = await _collect(
+        process_concurrently(process, [0.03, 0.01, 0.02, 0.0], concurrency=2)
+    )
+
+    assert peak == 2
+    assert sorted(results) == [0.0, 0.01, 0.02, 0.03]
+    assert results[0] == 0.01
+
+
+async def test_accepts_async_iterables_and_reports_stats():
+    async def documents():
+        for index in range(5):
+            yield index
+
+    async def process(index):
+        await asyncio.sleep(0)
+        return index
+
+    stats = BatchStats()
+    results = await _collect(
+        process_concurrently(
+            process,
+            documents(),
+            concurrency=3,
+            stats=stats,
+            is_failure=lambda index: index == 4,
+        )
+    )
+
+    report = stats.report()
+    assert sorted(results) == [0, 1, 2, 3, 4]
+    assert report.documents == 5
+    assert report.failed == 1
+    assert report.concurrency == 3
+    assert report.throughput_docs_per_sec > 0
+
+
+async def test_raising_items_become_failed_results():
+    async def process(index):
+        await asyncio.sleep(0.01 * index)
+        if index == 1:
+            raise RuntimeError("model unavailable")
+        return str(index)
+
+    stats = BatchStats()
+    results = await _collect(
+        process_concurrently(
+            process,
+            range(4),
+            concurrency=2,
+            stats=stats,
+            on_error=lambda index, error: f"{index}: {error}",
+        )
+    )
+
+    assert sorted(results) == ["0", "1: model unavailable", "2", "3"]
+    assert (stats.report().documents, stats.report().failed) == (4, 1)
+
+    # Without on_error the exception propagates
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        await _collect(process_concurrently(process, range(4)))
+
+
+async def test_reused_stats_report_only_the_latest_batch():
+    async def process(index):
+        return index
+
+    stats = BatchStats()
+    await _collect(process_concurrently(process, range(5), stats=stats))
+    await _collect(process_concurrently(process, range(2), stats=stats))
+
+    assert len(stats.latencies_ms) == 2
+    assert stats.report().documents == 2
+
+
+async def test_early_exit_cancels_in_flight_work():
+    cancelled = []
+
+    async def process(delay):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return delay
+
+    agen = process_concurrently(process, [0.0, 1.0, 1.0], concurrency=3)
+    assert await anext(agen) == 0.0
+    await agen.aclose()
+
+    assert cancelled == [1.0, 1.0]
+
+
+async def test_rejects_non_positive_concurrency():
+    async def process(item):
+        return item
+
+    with pytest.raises(ValueError):
+        await _collect(process_concurrently(process, [1], concurrency=0))
+
+
+def test_percentile_nearest_rank():
+    assert percentile([], 95) == 0.0
+    assert percentile([5.0, 1.0, 3.0, 2.0, 4.0], 50) == 3.0
+    assert percentile(list(range(1, 101)), 95) == 95
+
+
+async def test_pipeline_process_documents_uses_process_document(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline()
+
+    async def fake_process_document(content):
+        status = "failed" if content == "bad" else "completed"
+        return make_pipeline_result(pipeline_module, content, status)
+
+    pipeline.process_document = fake_process_document
+    stats = BatchStats()
+
+    results = [
+        result
+        async for result in pipeline.process_documents(
+            ["a", "b", "bad"], concurrency=2, stats=stats
+        )
+    ]
+
+    assert sorted(result.extraction_id for result in results) == ["a", "b", "bad"]
+    assert stats.report().failed == 1
+
+
+async def test_pipeline_batch_survives_a_raising_document(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline()
+
+    async def fake_process_document(content):
+        if content == "bad":
+            raise RuntimeError("session store down")
+        return make_pipeline_result(pipeline_module, content)
+
+    pipeline.process_document = fake_process_document
+
+    results = {
+        result.extraction_id: result
+        async for result in pipeline.process_documents(["a", "bad", "b"])
+    }
+
+    assert len(results) == 3
+    failed = results[hashlib.md5(b"bad").hexdigest()]
+    assert failed.pipeline_status == "failed"
+    assert "session store down" in failed.validation.issues[0]
+    assert results["a"].pipeline_status == "completed"
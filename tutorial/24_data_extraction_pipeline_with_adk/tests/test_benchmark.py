@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from adk_data_extraction.benchmark import (
+    PIPELINES,
+    StandInLlm,
+    benchmark_pipeline,
+    load_corpus,
+    run_benchmarks,
+    save_run,
+)
+from adk_data_extraction.examples.legal_document_analysis.analysis import (
+    LegalExtraction,
+)
+
+CALLS_PER_DOCUMENT = {
+    "smart_document_extraction": 3,
+    "improved_multi_agent": 3,
+    "sequential_contract": 3,
+    "legal_analysis": 1,
+    "contact_extraction": 1,
+}
+
+
+async def test_stand_in_answers_with_schema_valid_json():
+    model = StandInLlm(model="stand-in", latency_ms=0)
+    request = LlmRequest(
+        contents=[types.Content(role="user", parts=[types.Part.from_text(text="x")])],
+        config=types.GenerateContentConfig(response_schema=LegalExtraction),
+    )
+
+    responses = [r async for r in model.generate_content_async(request)]
+
+    LegalExtraction.model_validate_json(responses[0].content.parts[0].text)
+    assert model.calls == 1
+
+
+def test_corpus_includes_bundled_samples(tmp_path):
+    sample = tmp_path / "contract.txt"
+    sample.write_text("EXTRA CONTRACT")
+
+    corpus = load_corpus(sample)
+
+    assert len(corpus) >= 3
+    assert corpus[-1] == "EXTRA CONTRACT"
+    assert len(set(corpus)) == len(corpus)
+
+
+@pytest.mark.parametrize("pipeline", list(PIPELINES))
+async def test_each_pipeline_runs_against_the_stand_in(pipeline):
+    result = await benchmark_pipeline(
+        pipeline, load_corpus(None), concurrency=3, documents=6, latency_ms=1
+    )
+
+    assert result.documents == 6
+    assert result.failed == 0
+    assert result.model_calls_per_document == CALLS_PER_DOCUMENT[pipeline]
+    assert result.p50_latency_ms <= result.p95_latency_ms <= result.p99_latency_ms
+    assert result.docs_per_sec > 0
+    assert result.peak_rss_mb > 0
+
+
+def test_runs_are_saved_as_json(tmp_path):
+    run = run_benchmarks(
+        ["legal_analysis"], [1, 2], documents=2, latency_ms=0, isolate=False
+    )
+
+    path = save_run(run, tmp_path)
+    saved = json.loads(path.read_text())
+
+    assert [r["concurrency"] for r in saved["results"]] == [1, 2]
+    assert saved["settings"]["documents"] == 2
+    assert "p99_latency_ms" in saved["results"][0]
+    with pytest.raises(ValueError):
+        run_benchmarks(["missing"], [1], isolate=False)
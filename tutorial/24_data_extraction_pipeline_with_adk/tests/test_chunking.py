@@ -0,0 +1,160 @@
+import json
+import time
+
+import pytest
+
+from adk_data_extraction.chunking import DocumentChunker, merge_extractions
+from conftest import VALIDATION, script_agents
+
+CONTRACT_CLASSIFICATION = {
+    "document_type": "contract",
+    "complexity_level": "complex",
+    "estimated_processing_time": 60,
+    "recommended_extractor": "contract_specialist",
+    "confidence_score": 0.9,
+    "key_indicators": ["agreement"],
+}
+
+
+def _long_contract(sections=8, paragraph="The parties agree to the terms. " * 20):
+    return "\n\n".join(
+        f"ARTICLE {number}\n\n{paragraph}\n\n{paragraph}"
+        for number in range(1, sections + 1)
+    )
+
+
+def test_short_documents_are_not_split():
+    assert DocumentChunker(max_chars=100, overlap_chars=10).split("short") == ["short"]
+
+
+def test_chunks_respect_size_start_at_sections_and_overlap():
+    chunker = DocumentChunker(max_chars=2000, overlap_chars=200)
+    text = _long_contract()
+    chunks = chunker.split(text)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 2000 for chunk in chunks)
+    # Every chunk after the first repeats context, then starts at a section
+    for previous, chunk in zip(chunks, chunks[1:], strict=False):
+        overlap, _, body = chunk.partition("\n\nARTICLE")
+        assert overlap and overlap in previous
+    # No text is lost
+    for number in range(1, 9):
+        assert any(f"ARTICLE {number}\n" in chunk for chunk in chunks)
+
+
+def test_oversized_paragraphs_are_split_at_word_boundaries():
+    chunks = DocumentChunker(max_chars=500, overlap_chars=50).split("word " * 400)
+
+    assert len(chunks) > 3
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    assert all(not chunk.startswith("ord") for chunk in chunks)
+
+
+def test_overlap_must_be_smaller_than_chunks():
+    with pytest.raises(ValueError):
+        DocumentChunker(max_chars=100, overlap_chars=100)
+
+
+def test_merge_unions_lists_and_votes_on_scalars():
+    merged = merge_extractions(
+        [
+            {"parties": ["Acme Corp"], "contract_value": 100.0, "currency": "USD"},
+            {"parties": ["acme  corp", "Globex"], "contract_value": 200.0},
+            {"parties": ["Globex"], "contract_value": 200.0, "currency": None},
+            {"parties": [], "governing_law": None},
+        ]
+    )
+
+    assert merged["parties"] == ["Acme Corp", "Globex"]
+    assert merged["contract_value"] == 200.0
+    assert merged["currency"] == "USD"
+    assert merged["governing_law"] is None
+
+
+def test_merge_prefers_values_other_than_the_schema_default():
+    partials = [
+        {"currency": "USD", "governing_law": None},
+        {"currency": "EUR", "governing_law": "Delaware"},
+        {"currency": "USD"},
+    ]
+
+    merged = merge_extractions(partials, defaults={"currency": "USD"})
+    assert merged["currency"] == "EUR"
+    assert merged["governing_law"] == "Delaware"
+    # Without the defaults the chunks that never saw a currency win
+    assert merge_extractions(partials)["currency"] == "USD"
+
+    only_defaults = [{"currency": "usd"}, {"currency": "USD"}]
+    assert merge_extractions(only_defaults, {"currency": "USD"}) == {"currency": "usd"}
+
+
+def test_merge_ignores_zeros_and_placeholders_from_chunks_without_the_value():
+    # Only the last chunk carries the invoice total; the others report the
+    # required field as zero or a placeholder
+    partials = [
+        {"total_amount": 0.0, "invoice_number": "INV-7", "vendor_name": "Unknown"}
+        for _ in range(5)
+    ] + [{"total_amount": 4500.0, "invoice_number": "N/A", "vendor_name": "Acme"}]
+
+    merged = merge_extractions(partials)
+    assert merged == {
+        "total_amount": 4500.0,
+        "invoice_number": "INV-7",
+        "vendor_name": "Acme",
+    }
+    assert merge_extractions([{"total_amount": 0.0}] * 2) == {"total_amount": 0.0}
+
+
+def test_merge_breaks_ties_with_earliest_chunk():
+    merged = merge_extractions([{"end_date": "2025-01-01"}, {"end_date": "2026-01-01"}])
+    assert merged["end_date"] == "2025-01-01"
+
+
+async def test_pipeline_extracts_chunks_concurrently_and_merges(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        chunker=DocumentChunker(max_chars=2000, overlap_chars=200, concurrency=8)
+    )
+    models = script_agents(
+        pipeline.coordinator_agent,
+        {
+            "document_classifier": CONTRACT_CLASSIFICATION,
+            "validation_specialist": VALIDATION,
+        },
+    )
+    specialist = models["contract_specialist"]
+    specialist.responses = [
+        json.dumps(
+            {
+                "parties": ["Acme", f"Vendor {index % 2}"],
+                "payment_terms": [f"Milestone {index}"],
+                "key_obligations": ["Deliver software"],
+                "contract_value": 1000.0,
+            }
+        )
+        for index in range(8)
+    ]
+    specialist.delay = 0.1
+    content = _long_contract()
+    chunk_count = len(pipeline.chunker.split(content))
+
+    started = time.perf_counter()
+    result = await pipeline.process_document(content)
+    elapsed = time.perf_counter() - started
+
+    assert result.pipeline_status == "completed"
+    assert specialist.calls == chunk_count
+    data = result.extracted_data
+    assert set(data.parties) == {"Acme", "Vendor 0", "Vendor 1"}
+    assert len(data.payment_terms) == chunk_count
+    assert data.key_obligations == ["Deliver software"]
+    assert data.contract_value == 1000.0
+    # All chunks ran at once rather than one after another
+    assert elapsed < 0.1 * chunk_count / 2
+    specialist_stage = next(
+        stage for stage in result.stage_metrics if stage.agent == "contract_specialist"
+    )
+    assert specialist_stage.prompt_tokens == 100 * chunk_count
+    assert pipeline.session_stats().stored_sessions == 0
+    # The validator sees the whole document, not only the classified first chunk
+    assert "ARTICLE 8" in models["validation_specialist"].prompts[-1]
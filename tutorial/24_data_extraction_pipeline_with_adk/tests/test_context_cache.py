@@ -0,0 +1,174 @@
+import asyncio
+import time
+
+import pytest
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from adk_data_extraction.benchmark import StandInLlm, benchmark_pipeline
+from adk_data_extraction.context_cache import (
+    ContextCache,
+    ContextCachingLlm,
+    StandInContextCacheBackend,
+    static_prefix,
+)
+
+LONG_INSTRUCTION = "Extract every party, date and amount precisely. " * 100
+
+
+def _request(text, instruction=LONG_INSTRUCTION):
+    return LlmRequest(
+        model="stand-in",
+        contents=[types.Content(role="user", parts=[types.Part.from_text(text=text)])],
+        config=types.GenerateContentConfig(system_instruction=instruction),
+    )
+
+
+async def _call(model, request):
+    return [response async for response in model.generate_content_async(request)]
+
+
+def _cached_stand_in(min_prefix_tokens=0, ttl_seconds=3600):
+    backend = StandInContextCacheBackend(ttl_seconds=ttl_seconds)
+    stand_in = StandInLlm(model="stand-in", latency_ms=0, context_cache=backend)
+    cache = ContextCache(backend, min_prefix_tokens=min_prefix_tokens)
+    return cache, stand_in, cache.wrap(stand_in)
+
+
+async def test_prefix_is_registered_once_and_only_contents_are_sent():
+    cache, stand_in, model = _cached_stand_in()
+    uncached = StandInLlm(model="stand-in", latency_ms=0)
+
+    for index in range(5):
+        responses = await _call(model, _request(f"Document {index}"))
+        await _call(uncached, _request(f"Document {index}"))
+
+    usage = responses[0].usage_metadata
+    assert cache.registrations == 1
+    assert usage.cached_content_token_count > 0
+    assert stand_in.prompt_tokens < uncached.prompt_tokens / 10
+    report = cache.report()
+    assert report.requests == report.cached_requests == 5
+    assert report.mean_prompt_tokens_sent_cached < usage.cached_content_token_count
+
+
+async def test_concurrent_calls_share_one_registration():
+    cache, _, model = _cached_stand_in()
+
+    await asyncio.gather(*(_call(model, _request(f"Doc {i}")) for i in range(8)))
+
+    assert cache.registrations == 1
+
+
+async def test_short_prefixes_stay_uncached():
+    cache, stand_in, model = _cached_stand_in(min_prefix_tokens=10_000)
+
+    await _call(model, _request("Document"))
+
+    report = cache.report()
+    assert (report.registrations, report.cached_requests) == (0, 0)
+    assert report.mean_prompt_tokens_sent_uncached == stand_in.prompt_tokens
+
+
+async def test_failed_registration_falls_back_to_uncached_calls():
+    class FailingBackend(StandInContextCacheBackend):
+        async def create(self, prefix, request):
+            raise RuntimeError("quota exceeded")
+
+    backend = FailingBackend()
+    cache = ContextCache(backend, min_prefix_tokens=0)
+    model = cache.wrap(StandInLlm(model="stand-in", latency_ms=0))
+
+    responses = await _call(model, _request("Document"))
+
+    assert responses[0].content.parts[0].text
+    assert cache.report().cached_requests == 0
+
+
+async def test_failed_registrations_are_retried_after_a_backoff(monkeypatch):
+    class FlakyBackend(StandInContextCacheBackend):
+        failures = 2
+
+        async def create(self, prefix, request):
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("service unavailable")
+            return await super().create(prefix, request)
+
+    cache = ContextCache(FlakyBackend(), min_prefix_tokens=0, retry_after=10)
+    request = _request("Document")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+
+    assert await cache.handle_for(request) is None
+    now += 5
+    assert await cache.handle_for(request) is None
+    now += 10
+    # Retried after 10 s, then after 20 s
+    assert await cache.handle_for(request) is None
+    now += 15
+    assert await cache.handle_for(request) is None
+    now += 10
+    assert await cache.handle_for(request) is not None
+    assert cache.registrations == 1
+
+
+def test_prefix_key_includes_the_tool_config():
+    request = _request("Document")
+    auto = _request("Document")
+    auto.config.tool_config = types.ToolConfig(
+        function_calling_config=types.FunctionCallingConfig(mode="ANY")
+    )
+
+    assert static_prefix(request).key != static_prefix(auto).key
+
+
+async def test_handles_close_to_expiry_are_registered_again():
+    cache, _, model = _cached_stand_in(ttl_seconds=30)
+
+    await _call(model, _request("first"))
+    await _call(model, _request("second"))
+
+    assert cache.registrations == 2
+
+
+async def test_stand_in_rejects_unknown_handles():
+    stand_in = StandInLlm(
+        model="stand-in", latency_ms=0, context_cache=StandInContextCacheBackend()
+    )
+    request = _request("Document")
+    request.config.cached_content = "cachedContents/missing"
+
+    with pytest.raises(ValueError):
+        await _call(stand_in, request)
+
+
+def test_pipeline_wraps_every_agent_without_changing_its_config(pipeline_module):
+    cache = ContextCache(StandInContextCacheBackend())
+    plain = pipeline_module.SmartDocumentExtractionPipeline()
+    cached = pipeline_module.SmartDocumentExtractionPipeline(context_cache=cache)
+
+    root = cached.coordinator_agent
+    assert all(
+        isinstance(agent.model, ContextCachingLlm) for agent in [root, *root.sub_agents]
+    )
+    assert cached.config_hash == plain.config_hash
+
+
+async def test_caching_cuts_prompt_tokens_and_latency_in_the_benchmark():
+    settings = {
+        "corpus": ["SERVICE AGREEMENT between Acme and Globex. Fee: $1,000."],
+        "concurrency": 2,
+        "documents": 4,
+        "latency_ms": 0,
+        "ms_per_1k_prompt_tokens": 100,
+    }
+    uncached = await benchmark_pipeline("smart_document_extraction", **settings)
+    cached = await benchmark_pipeline(
+        "smart_document_extraction", context_cache=True, **settings
+    )
+
+    assert cached.failed == 0
+    assert cached.cached_tokens_per_call > 0
+    assert cached.prompt_tokens_per_call < uncached.prompt_tokens_per_call / 2
+    assert cached.mean_latency_ms < uncached.mean_latency_ms
@@ -0,0 +1,209 @@
+import json
+import queue
+
+import pytest
+
+from adk_data_extraction.directory_runner import (
+    _process_shard,
+    discover_documents,
+    merge_shards,
+    run_directory,
+    shard,
+)
+from adk_data_extraction.governor import ModelCallGovernor, SharedTokenBucket
+from adk_data_extraction.job_store import JobStore
+
+
+class _DiskProgress:
+    """Progress queue recording the records on disk at each report"""
+
+    def __init__(self, shard_path):
+        self.shard_path = shard_path
+        self.reports = []
+
+    def put(self, message):
+        on_disk = len(self.shard_path.read_bytes().splitlines())
+        self.reports.append((message[2], on_disk))
+
+
+def _write_documents(directory, count):
+    (directory / "nested").mkdir(parents=True)
+    for number in range(count):
+        folder = directory / "nested" if number % 3 == 0 else directory
+        (folder / f"doc{number:02d}.txt").write_text(
+            f"INVOICE INV-{number}\nBill to: Customer {number}\nTotal: ${number}0\n"
+        )
+    (directory / "notes.md").write_text("not a document")
+
+
+def test_documents_are_listed_in_order_and_dealt_round_robin(tmp_path):
+    _write_documents(tmp_path, 7)
+
+    paths = discover_documents(tmp_path)
+
+    assert len(paths) == 7
+    assert paths == sorted(paths)
+    assert shard(7, 3) == [[0, 3, 6], [1, 4], [2, 5]]
+    assert shard(2, 4) == [[0], [1], [], []]
+
+
+def test_shards_are_merged_in_document_order(tmp_path):
+    shards = []
+    for worker, indexes in enumerate([[3, 0], [1, 4], [2]]):
+        path = tmp_path / f"shard-{worker}.jsonl"
+        path.write_text("".join(json.dumps({"index": i}) + "\n" for i in indexes))
+        shards.append(path)
+
+    # A worker killed mid-write leaves a partial last record
+    with shards[1].open("a") as file:
+        file.write('{"index": 5, "res')
+
+    written = merge_shards([*shards, tmp_path / "missing.jsonl"], tmp_path / "out")
+
+    assert written == 5
+    lines = (tmp_path / "out").read_text().splitlines()
+    assert [json.loads(line)["index"] for line in lines] == [0, 1, 2, 3, 4]
+
+
+def test_shared_bucket_behaves_like_a_token_bucket():
+    bucket = SharedTokenBucket(per_minute=60, capacity=1)
+
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+    bucket.adjust(2)
+    assert bucket.available() == pytest.approx(1.0, abs=0.05)
+
+
+async def test_worker_processes_its_shard_and_reports_progress(tmp_path):
+    _write_documents(tmp_path / "in", 4)
+    paths = discover_documents(tmp_path / "in")
+    items = [(index, str(path), path.name) for index, path in enumerate(paths)]
+    progress = _DiskProgress(tmp_path / "shard.jsonl")
+    governor = ModelCallGovernor(request_bucket=SharedTokenBucket(6000))
+
+    completed, failed = await _process_shard(
+        0,
+        items,
+        {
+            "pipeline": "improved_multi_agent",
+            "execution_mode": "router",
+            "concurrency": 2,
+            "stand_in_latency_ms": 0,
+            "checkpoint_every": 3,
+            "checkpoint_interval": 60,
+        },
+        tmp_path / "shard.jsonl",
+        progress,
+        governor,
+    )
+
+    assert (completed, failed) == (4, 0)
+    records = [
+        json.loads(line) for line in (tmp_path / "shard.jsonl").read_text().splitlines()
+    ]
+    assert sorted(record["index"] for record in records) == [0, 1, 2, 3]
+    assert all(record["result"]["pipeline_status"] == "completed" for record in records)
+    # Checkpoints every 3 documents and at the end; every reported document
+    # had been written to the shard
+    assert progress.reports == [(3, 3), (4, 4)]
+    # Every model call went through the governor
+    assert governor.metrics().calls == 12
+
+
+@pytest.mark.slow
+def test_directory_is_processed_across_worker_processes(tmp_path):
+    _write_documents(tmp_path / "in", 10)
+
+    report = run_directory(
+        tmp_path / "in",
+        tmp_path / "results.jsonl",
+        workers=2,
+        concurrency=3,
+        requests_per_minute=60_000,
+        stand_in_latency_ms=0,
+    )
+
+    assert (report.documents, report.completed, report.failed) == (10, 10, 0)
+    assert [worker.documents for worker in report.workers] == [5, 5]
+    assert not any(worker.error for worker in report.workers)
+    lines = (tmp_path / "results.jsonl").read_text().splitlines()
+    names = [json.loads(line)["path"] for line in lines]
+    assert names == [
+        path.relative_to(tmp_path / "in").as_posix()
+        for path in discover_documents(tmp_path / "in")
+    ]
+    assert not (tmp_path / "results.jsonl.shards").exists()
+
+
+async def test_worker_records_progress_in_the_job_store(tmp_path):
+    _write_documents(tmp_path / "in", 3)
+    paths = discover_documents(tmp_path / "in")
+    items = [(index, str(path), path.name) for index, path in enumerate(paths)]
+    options = {
+        "pipeline": "smart_document_extraction",
+        "execution_mode": "router",
+        "concurrency": 2,
+        "stand_in_latency_ms": 0,
+        "job_store": str(tmp_path / "jobs.db"),
+    }
+
+    for run in range(2):
+        completed, failed = await _process_shard(
+            0, items, options, tmp_path / f"shard-{run}.jsonl", queue.Queue(), None
+        )
+        assert (completed, failed) == (3, 0)
+
+    store = JobStore(tmp_path / "jobs.db")
+    assert store.counts()["done"] == 3
+    # The rerun returned the stored results
+    first, second = (
+        {
+            record["index"]: record["result"]["extracted_data"]
+            for record in map(json.loads, path.read_text().splitlines())
+        }
+        for path in (tmp_path / "shard-0.jsonl", tmp_path / "shard-1.jsonl")
+    )
+    assert first == second
+
+
+async def test_pdfs_are_ingested_with_page_provenance(tmp_path):
+    pymupdf = pytest.importorskip("pymupdf")
+    (tmp_path / "in").mkdir()
+    for number in range(2):
+        document = pymupdf.open()
+        document.new_page().insert_text((72, 72), f"INVOICE INV-{number}")
+        document.new_page().insert_text((72, 72), "Bill to: Customer\nTotal: $10")
+        document.save(tmp_path / "in" / f"doc{number}.pdf")
+        document.close()
+    (tmp_path / "in" / "broken.pdf").write_bytes(b"not a pdf")
+    paths = discover_documents(tmp_path / "in", "*.pdf")
+    items = [(index, str(path), path.name) for index, path in enumerate(paths)]
+
+    completed, failed = await _process_shard(
+        0,
+        items,
+        {
+            "pipeline": "smart_document_extraction",
+            "execution_mode": "router",
+            "concurrency": 2,
+            "stand_in_latency_ms": 0,
+            "pdf_cache": str(tmp_path / "cache"),
+        },
+        tmp_path / "shard.jsonl",
+        queue.Queue(),
+        None,
+    )
+
+    assert (completed, failed) == (3, 1)
+    records = {
+        record["path"]: record
+        for record in map(
+            json.loads, (tmp_path / "shard.jsonl").read_text().splitlines()
+        )
+    }
+    assert records["broken.pdf"]["result"] is None
+    assert "Cannot read PDF" in records["broken.pdf"]["error"]
+    for record in (records["doc0.pdf"], records["doc1.pdf"]):
+        assert record["result"]["pipeline_status"] == "completed"
+        assert isinstance(record["pages"], dict)
+    assert len(list((tmp_path / "cache").iterdir())) == 2
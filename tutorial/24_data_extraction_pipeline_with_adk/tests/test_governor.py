@@ -0,0 +1,173 @@
+import asyncio
+
+import pytest
+from google.adk.models import LlmRequest
+from google.genai import errors, types
+
+from adk_data_extraction.governor import (
+    GovernedLlm,
+    ModelCallGovernor,
+    TokenBucket,
+    set_model_call_governor,
+    status_code,
+)
+from adk_data_extraction.model_backend import ModelBackend
+from conftest import CLASSIFICATION, INVOICE, VALIDATION, ScriptedLlm, script_agents
+
+
+class FlakyLlm(ScriptedLlm):
+    """ScriptedLlm that fails its first calls with the given API status"""
+
+    failures: int = 0
+    failure_code: int = 429
+    running: int = 0
+    peak_running: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.running += 1
+        self.peak_running = max(self.peak_running, self.running)
+        try:
+            if self.failures:
+                self.failures -= 1
+                raise errors.APIError(
+                    self.failure_code, {"error": {"message": "Quota exceeded"}}
+                )
+            async for response in super().generate_content_async(llm_request, stream):
+                yield response
+        finally:
+            self.running -= 1
+
+
+def _request(text="hello"):
+    return LlmRequest(
+        model="flaky",
+        contents=[types.Content(role="user", parts=[types.Part.from_text(text=text)])],
+        config=types.GenerateContentConfig(),
+    )
+
+
+async def _call(model):
+    return [response async for response in model.generate_content_async(_request())]
+
+
+def _governor(**kwargs):
+    return ModelCallGovernor(base_delay=0.001, max_delay=0.01, **kwargs)
+
+
+def test_token_bucket_makes_later_reservations_wait():
+    bucket = TokenBucket(per_minute=60, capacity=2)
+
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+    bucket.adjust(1)
+    assert bucket.available() == pytest.approx(0, abs=0.05)
+
+
+def test_status_code_reads_api_errors():
+    assert status_code(errors.ClientError(429, {"error": {}})) == 429
+    assert status_code(RuntimeError("429 RESOURCE_EXHAUSTED")) == 429
+    assert status_code(ValueError("bad schema")) is None
+
+
+async def test_rate_limited_calls_back_off_and_retry():
+    governor = _governor(initial_concurrency=8)
+    model = governor.wrap(FlakyLlm(model="flaky", responses=["{}"], failures=2))
+
+    responses = await _call(model)
+
+    assert len(responses) == 1
+    metrics = governor.metrics()
+    assert (metrics.calls, metrics.throttled, metrics.retries) == (1, 2, 2)
+    # One decrease per congestion episode
+    assert metrics.concurrency_limit == pytest.approx(4 + 1 / 4)
+
+
+async def test_non_retryable_and_exhausted_errors_are_raised():
+    governor = _governor(max_retries=1)
+    invalid = governor.wrap(
+        FlakyLlm(model="flaky", responses=["{}"], failures=1, failure_code=400)
+    )
+    with pytest.raises(errors.APIError):
+        await _call(invalid)
+
+    exhausted = governor.wrap(
+        FlakyLlm(model="flaky", responses=["{}"], failures=5, failure_code=503)
+    )
+    with pytest.raises(errors.APIError):
+        await _call(exhausted)
+    assert governor.metrics().failures == 2
+    assert governor.metrics().retries == 1
+
+
+async def test_concurrency_limit_queues_calls_and_grows_on_success():
+    governor = _governor(initial_concurrency=2, max_concurrency=4)
+    inner = FlakyLlm(model="flaky", responses=["{}"], delay=0.05)
+    model = governor.wrap(inner)
+
+    calls = asyncio.gather(*(_call(model) for _ in range(6)))
+    await asyncio.sleep(0.01)
+    metrics = governor.metrics()
+    assert (metrics.in_flight, metrics.queue_depth) == (2, 4)
+    await calls
+
+    assert inner.peak_running <= 3
+    assert governor.metrics().in_flight == 0
+    assert 2 < governor.metrics().concurrency_limit <= 4
+
+
+async def test_latency_above_target_shrinks_concurrency():
+    governor = _governor(initial_concurrency=8, target_latency_ms=10)
+    model = governor.wrap(FlakyLlm(model="flaky", responses=["{}"], delay=0.03))
+
+    await _call(model)
+
+    assert governor.metrics().concurrency_limit == 4
+
+
+async def test_token_limit_is_corrected_by_reported_usage():
+    governor = _governor(tokens_per_minute=10_000, expected_output_tokens=500)
+    model = governor.wrap(FlakyLlm(model="flaky", responses=["{}"]))
+
+    await _call(model)
+
+    # 100 prompt + 20 response tokens were used, not the ~500 reserved
+    assert governor.metrics().available_tokens == pytest.approx(10_000 - 120, abs=2)
+
+
+def test_model_backend_hands_out_governed_models():
+    governor = _governor()
+    set_model_call_governor(governor)
+    try:
+        model = ModelBackend(mode="replay").model("gemini-2.0-flash")
+    finally:
+        set_model_call_governor(None)
+
+    assert isinstance(model, GovernedLlm)
+    assert model.model == "gemini-2.0-flash"
+    assert model.inner.mode == "replay"
+    assert ModelBackend().model("gemini-2.0-flash") == "gemini-2.0-flash"
+
+
+async def test_pipeline_survives_rate_limited_agent(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(execution_mode="router")
+    models = script_agents(
+        pipeline.coordinator_agent,
+        {
+            "document_classifier": CLASSIFICATION,
+            "invoice_specialist": INVOICE,
+            "validation_specialist": VALIDATION,
+        },
+    )
+    classifier = pipeline.coordinator_agent.sub_agents[0]
+    assert classifier.name == "document_classifier"
+    classifier.model = FlakyLlm(
+        model="flaky", responses=models["document_classifier"].responses, failures=1
+    )
+    governor = _governor()
+    governor.apply(pipeline.coordinator_agent)
+
+    result = await pipeline.process_document("INVOICE INV-1")
+
+    assert result.pipeline_status == "completed"
+    assert governor.metrics().throttled == 1
@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import pytest
+from google.adk.models import LlmRequest
+from google.genai import types
+from pydantic import BaseModel
+
+from adk_data_extraction.hedging import HedgedLlm, HedgingPolicy
+from conftest import CLASSIFICATION, INVOICE, VALIDATION, ScriptedLlm, script_agents
+
+
+class Answer(BaseModel):
+    value: int
+
+
+class TailLlm(ScriptedLlm):
+    """ScriptedLlm with a delay per call, to produce a slow tail"""
+
+    delays: list[float] = []
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+
+def _request():
+    return LlmRequest(
+        model="tail",
+        contents=[types.Content(role="user", parts=[types.Part.from_text(text="q")])],
+        config=types.GenerateContentConfig(),
+    )
+
+
+async def _call(model):
+    responses = [r async for r in model.generate_content_async(_request())]
+    return responses[-1].content.parts[0].text
+
+
+def _hedged(delays, responses=('{"value": 1}',), **policy):
+    policy = HedgingPolicy(**{"min_samples": 5, "percentile": 90, **policy})
+    inner = TailLlm(model="tail", responses=list(responses), delays=delays)
+    return policy, inner, policy.wrap(inner, "specialist", Answer)
+
+
+async def test_calls_are_not_hedged_until_latencies_are_known():
+    policy, inner, model = _hedged([0.3])
+
+    await _call(model)
+
+    assert inner.calls == 1
+    assert policy.report().hedged == 0
+    assert policy.hedge_delay("specialist") is None
+
+
+async def test_slow_call_is_hedged_and_duplicate_wins():
+    # Five fast calls, then a slow primary whose duplicate is fast again
+    policy, inner, model = _hedged([0.01] * 5 + [1.0, 0.01])
+    for _ in range(5):
+        await _call(model)
+
+    started = time.perf_counter()
+    assert await _call(model) == '{"value": 1}'
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.3
+    assert inner.calls == 7
+    report = policy.report()
+    assert (report.calls, report.hedged, report.hedge_wins) == (6, 1, 1)
+    assert report.hedge_rate == 1 / 6
+    # The cancelled primary counts with the time it had run (a lower bound)
+    assert report.p99_without_hedging_ms >= report.p99_ms
+    assert report.p99_improvement_ms == pytest.approx(
+        report.p99_without_hedging_ms - report.p99_ms, abs=0.11
+    )
+
+
+async def test_invalid_duplicate_response_is_not_used():
+    policy, inner, model = _hedged(
+        [0.01] * 5 + [0.2, 0.01],
+        responses=['{"value": 1}'] * 6 + ["not json"],
+    )
+    for _ in range(5):
+        await _call(model)
+
+    assert await _call(model) == '{"value": 1}'
+    report = policy.report()
+    assert (report.hedged, report.hedge_wins) == (1, 0)
+
+
+async def test_losing_request_is_cancelled():
+    policy, inner, model = _hedged([0.01] * 5 + [1.0, 0.01])
+    for _ in range(5):
+        await _call(model)
+    tasks_before = len(asyncio.all_tasks())
+
+    await _call(model)
+
+    assert len(asyncio.all_tasks()) == tasks_before
+    # The cancelled primary still informs the agent's latency percentile
+    assert len(policy.latencies["specialist"]) == 7
+
+
+async def test_pipeline_hedges_every_agent(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router", hedging=HedgingPolicy(min_samples=1)
+    )
+    assert all(
+        isinstance(agent.model, HedgedLlm)
+        for agent in pipeline.coordinator_agent.sub_agents
+    )
+    script_agents(
+        pipeline.coordinator_agent,
+        {
+            "document_classifier": CLASSIFICATION,
+            "invoice_specialist": INVOICE,
+            "validation_specialist": VALIDATION,
+        },
+    )
+    pipeline.hedging.apply(pipeline.coordinator_agent)
+
+    first = await pipeline.process_document("INVOICE INV-1")
+    second = await pipeline.process_document("INVOICE INV-2")
+
+    assert first.pipeline_status == second.pipeline_status == "completed"
+    assert pipeline.hedging_report().calls == 6
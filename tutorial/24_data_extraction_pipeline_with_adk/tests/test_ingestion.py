@@ -0,0 +1,158 @@
+import shutil
+
+import pytest
+from pydantic import BaseModel
+
+from adk_data_extraction import ingestion
+from adk_data_extraction.ingestion import (
+    PdfIngestionError,
+    PdfIngestor,
+    load_document,
+    page_provenance,
+    read_document,
+)
+
+pymupdf = pytest.importorskip("pymupdf")
+
+PAGES = [
+    "SERVICE AGREEMENT\nBetween Acme Corp and Globex Inc",
+    "Payment Terms\nTotal fee: $12,000\nDue within 30 days",
+    "Governing law: State of New York\nSigned by Acme Corp",
+]
+
+
+def _write_pdf(path, pages=PAGES):
+    document = pymupdf.open()
+    for text in pages:
+        document.new_page().insert_text((72, 72), text)
+    document.save(path)
+    document.close()
+    return path
+
+
+class Party(BaseModel):
+    name: str
+    role: str
+
+
+class Contract(BaseModel):
+    title: str
+    parties: list[Party]
+    governing_law: str | None = None
+    total: float
+
+
+def test_pages_are_extracted_in_order_with_spans(tmp_path):
+    path = _write_pdf(tmp_path / "contract.pdf")
+
+    with PdfIngestor(workers=3) as ingestor:
+        document = ingestor.read(path)
+
+    assert [page.number for page in document.pages] == [1, 2, 3]
+    for span, text in zip(document.pages, PAGES, strict=True):
+        assert document.text[span.start : span.end] == text
+    assert document.page_at(document.text.index("Total fee")) == 2
+    assert document.page_at(document.pages[0].end) is None  # page separator
+
+
+def test_pages_are_streamed_within_the_window(tmp_path, monkeypatch):
+    path = _write_pdf(tmp_path / "long.pdf", [f"Page {n}" for n in range(1, 11)])
+    extracted = []
+    page_text = ingestion._page_text
+
+    def recording(path, sha256, number):
+        extracted.append(number)
+        return page_text(path, sha256, number)
+
+    monkeypatch.setattr(ingestion, "_page_text", recording)
+
+    with PdfIngestor(workers=2, window=2) as ingestor:
+        pages = ingestor.pages(path)
+        assert next(pages).text == "Page 1"
+        assert max(extracted) <= 2
+        assert [page.number for page in pages] == list(range(2, 11))
+
+
+def test_extracted_text_is_cached_by_file_hash(tmp_path, monkeypatch):
+    path = _write_pdf(tmp_path / "contract.pdf")
+    ingestor = PdfIngestor(cache_dir=tmp_path / "cache")
+    first = ingestor.read(path)
+
+    # Interrupted extractions are not cached
+    other = _write_pdf(tmp_path / "other.pdf", ["Other", "Document"])
+    next(ingestor.pages(other))
+    assert [p.name for p in (tmp_path / "cache").iterdir()] == [
+        f"{first.sha256}.jsonl"
+    ]
+
+    def unavailable(path):
+        raise AssertionError("the PDF was opened again")
+
+    monkeypatch.setattr(ingestion, "_page_count", unavailable)
+    copy = shutil.copy(path, tmp_path / "renamed.pdf")
+    cached = ingestor.read(copy)
+
+    assert cached.text == first.text
+    assert cached.pages == first.pages
+    assert cached.source == str(copy)
+
+
+async def test_pages_are_streamed_without_blocking_the_loop(tmp_path):
+    path = _write_pdf(tmp_path / "contract.pdf")
+
+    with PdfIngestor(workers=2) as ingestor:
+        pages = [page.number async for page in ingestor.stream(path)]
+        document = await load_document(path, ingestor)
+
+    assert pages == [1, 2, 3]
+    assert document == ingestor.read(path)
+
+
+@pytest.mark.slow
+def test_pages_can_be_extracted_in_worker_processes(tmp_path):
+    path = _write_pdf(tmp_path / "contract.pdf")
+
+    with PdfIngestor(workers=2, use_processes=True) as ingestor:
+        document = ingestor.read(path)
+
+    assert document.text == PdfIngestor().read(path).text
+
+
+def test_extracted_fields_get_page_provenance(tmp_path):
+    document = read_document(
+        _write_pdf(tmp_path / "contract.pdf"), PdfIngestor(cache_dir=None)
+    )
+    contract = Contract(
+        title="Service agreement",
+        parties=[
+            Party(name="Acme Corp", role="client"),
+            Party(name="Globex Inc", role="provider"),
+        ],
+        governing_law="State of New York",
+        total=12000,
+    )
+
+    assert page_provenance(contract, document) == {
+        "title": [1],
+        "parties.0.name": [1, 3],
+        "parties.1.name": [1],
+        "governing_law": [3],
+    }
+    # Whole words only, line breaks match spaces
+    assert document.pages_for("Acme") == [1, 3]
+    assert document.pages_for("Acm") == []
+    assert document.pages_for("terms total fee") == [2]
+
+
+def test_text_files_and_unreadable_pdfs(tmp_path):
+    (tmp_path / "notes.txt").write_text("Plain text", encoding="utf-8")
+    (tmp_path / "broken.pdf").write_bytes(b"not a pdf")
+
+    document = read_document(tmp_path / "notes.txt")
+
+    assert (document.text, document.pages) == ("Plain text", [])
+    assert page_provenance({"note": "Plain text"}, document) == {}
+    with pytest.raises(PdfIngestionError):
+        read_document(tmp_path / "broken.pdf", PdfIngestor())
+    with pytest.raises(FileNotFoundError):
+        read_document(tmp_path / "missing.pdf", PdfIngestor())
@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import time
+
+import pytest
+
+from adk_data_extraction.job_store import JobStore, LeaseLost
+from adk_data_extraction.preclassifier import KeywordPreClassifier
+from conftest import CLASSIFICATION, INVOICE, VALIDATION, script_agents
+from test_preclassifier import INVOICE_TEXT
+
+DOCUMENT = "INVOICE INV-1\nBill to: Globex\nTotal: $110"
+DOCUMENT_ID = hashlib.md5(DOCUMENT.encode()).hexdigest()
+
+
+def test_documents_are_registered_once_and_leased_by_one_worker(tmp_path):
+    first = JobStore(tmp_path / "jobs.db", owner="worker-1")
+    second = JobStore(tmp_path / "jobs.db", owner="worker-2")
+
+    assert first.enqueue("doc", source="a.txt")
+    assert not second.enqueue("doc", source="b.txt")
+
+    record = first.lease("doc")
+    assert (record.state, record.source, record.attempts) == ("queued", "a.txt", 1)
+    assert first.lease("doc") is None  # already held in this process
+    assert second.lease("doc") is None
+    with pytest.raises(LeaseLost):
+        second.save_stage("doc", "classified", {"classification": {}})
+
+    first.complete("doc", '{"ok": true}')
+    assert second.lease("doc") is None
+    assert second.result("doc") == '{"ok": true}'
+    assert second.counts()["done"] == 1
+
+
+def test_stage_outputs_are_kept_and_state_only_moves_forward(tmp_path):
+    store = JobStore(tmp_path / "jobs.db", owner="worker-1")
+    store.lease("doc")
+
+    store.save_stage("doc", "classified", {"classification": {"type": "invoice"}})
+    store.save_stage("doc", "extracted", {"invoice_extraction": {"total": 110}})
+    store.save_stage("doc", "classified", {"classification": {"type": "email"}})
+
+    assert store.record("doc").state == "extracted"
+    assert store.stage_outputs("doc") == {
+        "classification": {"type": "email"},
+        "invoice_extraction": {"total": 110},
+    }
+    store.fail("doc", "RuntimeError: boom")
+    record = store.record("doc")
+    assert (record.state, record.error, record.lease_owner) == (
+        "failed",
+        "RuntimeError: boom",
+        None,
+    )
+
+
+def test_expired_leases_are_taken_over(tmp_path):
+    crashed = JobStore(tmp_path / "jobs.db", owner="worker-1", lease_seconds=0.05)
+    other = JobStore(tmp_path / "jobs.db", owner="worker-2")
+    crashed.lease("doc")
+
+    assert other.lease("doc") is None
+    time.sleep(0.06)
+    assert other.lease("doc").lease_owner == "worker-2"
+    with pytest.raises(LeaseLost):
+        crashed.complete("doc", "{}")
+
+
+def test_restarted_worker_reclaims_its_own_leases(tmp_path):
+    JobStore(tmp_path / "jobs.db", owner="worker-1").lease("doc")
+
+    restarted = JobStore(tmp_path / "jobs.db", owner="worker-1")
+
+    assert restarted.lease("doc").attempts == 2
+
+
+async def test_acquire_waits_for_another_worker(tmp_path):
+    holder = JobStore(tmp_path / "jobs.db", owner="worker-1")
+    waiter = JobStore(tmp_path / "jobs.db", owner="worker-2", poll_interval=0.01)
+    holder.lease("doc")
+
+    waiting = asyncio.ensure_future(waiter.acquire("doc"))
+    await asyncio.sleep(0.05)
+    assert not waiting.done()
+    holder.complete("doc", "{}")
+
+    assert await waiting is None
+
+
+async def test_crashed_run_resumes_from_last_completed_stage(tmp_path, pipeline_module):
+    store = JobStore(tmp_path / "jobs.db", owner="worker-1")
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router", job_store=store
+    )
+    # The validator fails (no scripted response) after two stages completed
+    script_agents(
+        pipeline.coordinator_agent,
+        {"document_classifier": CLASSIFICATION, "invoice_specialist": INVOICE},
+    )
+
+    failed = await pipeline.process_document(DOCUMENT)
+
+    assert failed.pipeline_status == "failed"
+    assert store.record(DOCUMENT_ID).state == "failed"
+    assert set(store.stage_outputs(DOCUMENT_ID)) == {
+        "classification",
+        "invoice_extraction",
+    }
+
+    restarted = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router",
+        job_store=JobStore(tmp_path / "jobs.db", owner="worker-1"),
+    )
+    models = script_agents(
+        restarted.coordinator_agent, {"validation_specialist": VALIDATION}
+    )
+
+    result = await restarted.process_document(DOCUMENT)
+
+    assert result.pipeline_status == "completed"
+    assert result.extracted_data.invoice_number == "INV-1"
+    assert result.validation.recommendation == "approved"
+    assert models["validation_specialist"].calls == 1
+    # The validator sees the stored extraction and the document
+    assert "INV-1" in models["validation_specialist"].prompts[0]
+    assert "Bill to: Globex" in models["validation_specialist"].prompts[0]
+    assert restarted.job_store.record(DOCUMENT_ID).state == "done"
+
+    # Done documents return their stored result without any model calls
+    again = await restarted.process_document(DOCUMENT)
+    assert again.extracted_data == result.extracted_data
+    assert models["validation_specialist"].calls == 1
+
+
+async def test_pre_classified_run_resumes_without_any_classifier(
+    tmp_path, pipeline_module
+):
+    store = JobStore(tmp_path / "jobs.db", owner="worker-1")
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router", pre_classifier=KeywordPreClassifier(), job_store=store
+    )
+    # The validator fails (no scripted response) after the extraction
+    script_agents(pipeline.coordinator_agent, {"invoice_specialist": INVOICE})
+    document_id = hashlib.md5(INVOICE_TEXT.encode()).hexdigest()
+
+    failed = await pipeline.process_document(INVOICE_TEXT)
+
+    assert failed.pipeline_status == "failed"
+    stored = store.stage_outputs(document_id)
+    assert set(stored) == {"classification", "invoice_extraction"}
+    assert stored["classification"]["document_type"] == "invoice"
+
+    # Without a pre-classifier the stored classification must be used
+    restarted = pipeline_module.SmartDocumentExtractionPipeline(
+        job_store=JobStore(tmp_path / "jobs.db", owner="worker-1")
+    )
+    models = script_agents(
+        restarted.coordinator_agent, {"validation_specialist": VALIDATION}
+    )
+
+    result = await restarted.process_document(INVOICE_TEXT)
+
+    assert result.pipeline_status == "completed"
+    assert result.classification.document_type == "invoice"
+    assert result.extracted_data.invoice_number == "INV-1"
+    called = {name: model.calls for name, model in models.items() if model.calls}
+    assert called == {"validation_specialist": 1}
+
+
+async def test_stored_extraction_is_not_extracted_again(tmp_path, pipeline_module):
+    store = JobStore(tmp_path / "jobs.db", owner="worker-1")
+    # A crashed run that stored only the extraction
+    store.lease(DOCUMENT_ID)
+    store.save_stage(DOCUMENT_ID, "extracted", {"invoice_extraction": INVOICE})
+    store.release(DOCUMENT_ID)
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(job_store=store)
+    models = script_agents(
+        pipeline.coordinator_agent,
+        {"document_classifier": CLASSIFICATION, "validation_specialist": VALIDATION},
+    )
+
+    result = await pipeline.process_document(DOCUMENT)
+
+    assert result.pipeline_status == "completed"
+    assert result.extracted_data.invoice_number == "INV-1"
+    assert models["invoice_specialist"].calls == 0
+    assert models["extraction_coordinator"].calls == 0
+    assert "INV-1" in models["validation_specialist"].prompts[0]
+    assert store.record(DOCUMENT_ID).state == "done"
+
+
+async def test_duplicate_documents_in_a_batch_are_processed_once(
+    tmp_path, pipeline_module
+):
+    store = JobStore(tmp_path / "jobs.db", poll_interval=0.01)
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router", job_store=store
+    )
+    models = script_agents(
+        pipeline.coordinator_agent,
+        {
+            "document_classifier": CLASSIFICATION,
+            "invoice_specialist": INVOICE,
+            "validation_specialist": VALIDATION,
+        },
+    )
+    for model in models.values():
+        model.delay = 0.02
+
+    results = [
+        result
+        async for result in pipeline.process_documents(
+            [DOCUMENT, DOCUMENT, DOCUMENT], concurrency=3
+        )
+    ]
+
+    assert [result.pipeline_status for result in results] == ["completed"] * 3
+    assert models["document_classifier"].calls == 1
+    assert store.counts()["done"] == 1
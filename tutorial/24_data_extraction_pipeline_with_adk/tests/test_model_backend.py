@@ -0,0 +1,210 @@
+import json
+import time
+
+import pytest
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from adk_data_extraction.agent_registry import AgentRegistry
+from adk_data_extraction.examples.hierarchical_document_pipeline.agent import (
+    HierarchicalDocumentPipeline,
+)
+from adk_data_extraction.examples.legal_document_analysis.agent import (
+    LegalDocumentAnalysisPipeline,
+)
+from adk_data_extraction.examples.sequential_contract_pipeline.agent import (
+    SequentialContractPipeline,
+)
+from adk_data_extraction.governor import (
+    GovernedLlm,
+    ModelCallGovernor,
+    set_model_call_governor,
+)
+from adk_data_extraction.model_backend import (
+    CassetteLlm,
+    CassetteMissError,
+    ModelBackend,
+    get_model_backend,
+    normalize_request,
+    request_key,
+    set_model_backend,
+)
+from conftest import CLASSIFICATION, INVOICE, VALIDATION, ScriptedLlm
+
+INVOICE_TEXT = "INVOICE INV-1\nBill To: Globex\nWidget: $100\nTax: $10\nTotal: $110"
+
+
+def _request(text, call_id=None):
+    parts = [types.Part.from_text(text=text)]
+    if call_id:
+        parts.append(
+            types.Part(
+                function_call=types.FunctionCall(
+                    id=call_id, name="transfer_to_agent", args={"agent_name": "x"}
+                )
+            )
+        )
+    return LlmRequest(
+        model="gemini-2.0-flash",
+        contents=[types.Content(role="user", parts=parts)],
+        config=types.GenerateContentConfig(system_instruction="Be   precise."),
+    )
+
+
+async def _generate(model, request):
+    return [response async for response in model.generate_content_async(request)]
+
+
+def _record_live(pipeline, outputs):
+    """Give each CassetteLlm of the pipeline a scripted live model"""
+    live = {}
+    root = pipeline.coordinator_agent
+    for agent in [root, *root.sub_agents]:
+        output = outputs.get(agent.name)
+        agent.model.live = live[agent.name] = ScriptedLlm(
+            model=f"live-{agent.name}",
+            responses=[] if output is None else [json.dumps(output)],
+        )
+    return live
+
+
+def test_request_key_ignores_whitespace_and_call_ids():
+    first = request_key(normalize_request(_request("Total:  $110\n", "adk-1")))
+    second = request_key(normalize_request(_request("Total: $110", "adk-2")))
+    other = request_key(normalize_request(_request("Total: $120", "adk-1")))
+
+    assert first == second
+    assert first != other
+
+
+async def test_record_then_replay_serves_recorded_responses(tmp_path):
+    live = ScriptedLlm(model="live", responses=['{"answer": 1}'])
+    recorder = CassetteLlm(
+        model="gemini-2.0-flash", mode="record", cassette_dir=str(tmp_path), live=live
+    )
+    recorded = await _generate(recorder, _request("question"))
+
+    replayer = CassetteLlm(
+        model="gemini-2.0-flash", mode="strict", cassette_dir=str(tmp_path)
+    )
+    replayed = await _generate(replayer, _request("question"))
+
+    assert live.calls == 1
+    assert len(list(tmp_path.glob("*.json"))) == 1
+    assert replayed[0].content.parts[0].text == '{"answer": 1}'
+    assert replayed[0].model_dump() == recorded[0].model_dump()
+
+
+async def test_strict_mode_fails_on_unknown_requests(tmp_path):
+    model = CassetteLlm(
+        model="gemini-2.0-flash", mode="strict", cassette_dir=str(tmp_path)
+    )
+
+    with pytest.raises(CassetteMissError):
+        await _generate(model, _request("never recorded"))
+
+
+async def test_replay_mode_records_misses_from_the_live_model(tmp_path):
+    live = ScriptedLlm(model="live", responses=["fresh"])
+    model = CassetteLlm(
+        model="gemini-2.0-flash", mode="replay", cassette_dir=str(tmp_path), live=live
+    )
+
+    await _generate(model, _request("new"))
+    await _generate(model, _request("new"))
+
+    assert live.calls == 1
+
+
+async def test_replay_injects_latency(tmp_path):
+    recorder = CassetteLlm(
+        model="gemini-2.0-flash",
+        mode="record",
+        cassette_dir=str(tmp_path),
+        live=ScriptedLlm(model="live", responses=["ok"]),
+    )
+    await _generate(recorder, _request("slow"))
+    model = ModelBackend("strict", tmp_path, latency_ms=50).model("gemini-2.0-flash")
+
+    started = time.perf_counter()
+    await _generate(model, _request("slow"))
+
+    assert time.perf_counter() - started >= 0.05
+
+
+def test_backend_modes_and_environment(monkeypatch, tmp_path):
+    assert ModelBackend("live").model("gemini-2.0-flash") == "gemini-2.0-flash"
+    with pytest.raises(ValueError):
+        ModelBackend("offline")
+
+    monkeypatch.setenv("ADK_MODEL_BACKEND", "replay")
+    monkeypatch.setenv("ADK_CASSETTE_DIR", str(tmp_path))
+    monkeypatch.setenv("ADK_REPLAY_LATENCY_MS", "25")
+    model = get_model_backend().model("gemini-2.0-flash")
+
+    assert isinstance(model, CassetteLlm)
+    assert (model.mode, model.cassette_dir, model.latency_ms) == (
+        "replay",
+        str(tmp_path),
+        25.0,
+    )
+
+
+async def test_pipeline_runs_offline_from_recordings(pipeline_module, tmp_path):
+    outputs = {
+        "document_classifier": CLASSIFICATION,
+        "invoice_specialist": INVOICE,
+        "validation_specialist": VALIDATION,
+    }
+    recording = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router", model_backend=ModelBackend("record", tmp_path)
+    )
+    live = _record_live(recording, outputs)
+    recorded = await recording.process_document(INVOICE_TEXT)
+
+    replaying = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router", model_backend=ModelBackend("strict", tmp_path)
+    )
+    replayed = await replaying.process_document(INVOICE_TEXT)
+
+    assert sum(model.calls for model in live.values()) == 3
+    assert replayed.pipeline_status == "completed"
+    assert replayed.extracted_data == recorded.extracted_data
+    assert replayed.validation == recorded.validation
+    # Recording does not change the configuration the result cache sees
+    assert replaying.config_hash == recording.config_hash
+
+    unknown = await replaying.process_document("A document nobody recorded")
+    assert unknown.pipeline_status == "failed"
+
+
+@pytest.mark.parametrize(
+    "pipeline_class",
+    [
+        LegalDocumentAnalysisPipeline,
+        SequentialContractPipeline,
+        HierarchicalDocumentPipeline,
+    ],
+)
+def test_example_agents_use_the_model_backend(pipeline_class, tmp_path):
+    registry = AgentRegistry()
+    governor = ModelCallGovernor()
+    set_model_backend(ModelBackend("strict", tmp_path))
+    set_model_call_governor(governor)
+    try:
+        governed = pipeline_class(agent_registry=registry)
+        set_model_backend(None)
+        set_model_call_governor(None)
+        live = pipeline_class(agent_registry=registry)
+    finally:
+        set_model_backend(None)
+        set_model_call_governor(None)
+
+    root = governed.graph.root_agent
+    for agent in [root, *root.sub_agents]:
+        assert isinstance(agent.model, GovernedLlm)
+        assert agent.model.governor is governor
+        assert isinstance(agent.model.inner, CassetteLlm)
+    # A different backend or governor builds a different graph
+    assert live.graph is not governed.graph
+    assert live.graph.root_agent.model == "gemini-2.0-flash"
@@ -0,0 +1,182 @@
+import random
+import threading
+import time
+from array import array
+
+import pytest
+
+from adk_data_extraction.near_duplicates import NearDuplicateIndex
+from conftest import CLASSIFICATION, INVOICE, VALIDATION, script_agents
+
+TEMPLATE = """SERVICES AGREEMENT
+
+This Services Agreement is entered into on {date} between {customer}, a Delaware
+corporation ("Customer"), and Acme Software Inc. ("Provider").
+
+1. Services. Provider shall deliver the software services described in Exhibit A
+and provide support during business hours.
+
+2. Fees. Customer shall pay Provider {amount} USD per month, invoiced monthly and
+due within thirty days of the invoice date.
+
+3. Term. This Agreement begins on the effective date and continues for twelve
+months, renewing automatically unless either party gives sixty days notice.
+
+4. Confidentiality. Each party shall keep the other party's confidential
+information secret and use it only to perform this Agreement.
+
+5. Governing Law. This Agreement is governed by the laws of the State of Delaware.
+"""
+
+REPORT = """QUARTERLY SALES REPORT
+
+Executive summary: revenue grew in every region, led by new enterprise accounts.
+Findings: churn fell, average deal size rose and the pipeline doubled year over
+year. Methodology: figures come from the CRM export at quarter end.
+"""
+
+
+def _contract(customer="Globex Corporation", amount="12,000", date="March 1, 2024"):
+    return TEMPLATE.format(customer=customer, amount=amount, date=date)
+
+
+def test_template_variants_match_and_other_documents_do_not():
+    index = NearDuplicateIndex()
+    index.add("original", index.signature(_contract()), {"n": 1})
+
+    match = index.query(
+        index.signature(_contract("Initech LLC", "9,500", "June 5, 2025"))
+    )
+    assert match is not None
+    assert match.key == "original"
+    assert match.similarity >= index.threshold
+    assert index.query(index.signature(REPORT)) is None
+    assert index.payload("original") == {"n": 1}
+
+    stats = index.stats()
+    assert (stats.documents, stats.lookups, stats.matches) == (1, 2, 1)
+
+
+def test_signatures_are_deterministic():
+    first = NearDuplicateIndex().signature(_contract())
+
+    assert first == NearDuplicateIndex().signature(_contract())
+    assert first != NearDuplicateIndex(seed=2).signature(_contract())
+    assert len(first) == 128
+
+
+def test_re_adding_a_key_replaces_its_payload():
+    index = NearDuplicateIndex()
+    signature = index.signature(_contract())
+    index.add("doc", signature, {"version": 1})
+    index.add("doc", signature, {"version": 2})
+
+    assert len(index) == 1
+    assert index.payload("doc") == {"version": 2}
+
+
+def test_bands_put_lsh_threshold_just_below_similarity_threshold():
+    index = NearDuplicateIndex(threshold=0.8, num_perm=128)
+
+    lsh_threshold = (1 / index.bands) ** (1 / index.rows)
+    assert 0.7 < lsh_threshold <= 0.8
+    assert index.bands * index.rows <= 128
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(threshold=0)
+
+
+def test_lookups_stay_fast_with_many_documents():
+    index = NearDuplicateIndex(max_bucket_size=8)
+    rng = random.Random(0)
+    for number in range(10_000):
+        signature = array("I")
+        signature.frombytes(rng.randbytes(signature.itemsize * index.num_perm))
+        index.add(f"doc-{number}", signature, {})
+    # A bucket crowded with one template stays bounded
+    template = index.signature(_contract())
+    for number in range(100):
+        index.add(f"template-{number}", template, {})
+    query = index.signature(_contract("Initech LLC"))
+
+    started = time.perf_counter()
+    for _ in range(100):
+        assert index.query(query) is not None
+    assert (time.perf_counter() - started) / 100 < 0.001
+
+
+async def test_pipeline_reuses_classification_and_passes_reference(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router", near_duplicates=NearDuplicateIndex()
+    )
+    models = script_agents(
+        pipeline.coordinator_agent,
+        {
+            "document_classifier": CLASSIFICATION,
+            "invoice_specialist": INVOICE,
+            "validation_specialist": VALIDATION,
+        },
+    )
+
+    first = await pipeline.process_document(_contract())
+    second = await pipeline.process_document(_contract("Initech LLC", "9,500"))
+
+    assert first.near_duplicate is None
+    assert second.pipeline_status == "completed"
+    assert second.near_duplicate.key == first.extraction_id
+    # The classifier ran only for the first document
+    assert models["document_classifier"].calls == 1
+    assert second.classification == first.classification
+    reference_prompt = models["invoice_specialist"].prompts[1]
+    assert "near-duplicate" in reference_prompt
+    assert INVOICE["invoice_number"] in reference_prompt
+    assert "Initech LLC" in reference_prompt
+
+
+def test_long_documents_are_sampled_and_still_match():
+    rng = random.Random(0)
+    vocabulary = ["".join(rng.choices("abcdefghij", k=6)) for _ in range(5000)]
+    words = [rng.choice(vocabulary) for _ in range(23_000)]
+    variant = [
+        "changed" if number % 100 == 0 else word for number, word in enumerate(words)
+    ]
+    index = NearDuplicateIndex()
+
+    started = time.perf_counter()
+    signature = index.signature(" ".join(words))
+    # ~140 KB: the full shingle set would take about a second
+    assert time.perf_counter() - started < 0.5
+    assert len(index._shingles(" ".join(words))) == index.max_shingles
+
+    index.add("original", signature, {})
+    match = index.query(index.signature(" ".join(variant)))
+    assert match is not None and match.key == "original"
+    assert NearDuplicateIndex(max_shingles=None).fingerprint != index.fingerprint
+
+
+async def test_signatures_are_computed_off_the_event_loop(pipeline_module):
+    index = NearDuplicateIndex()
+    signature_threads = []
+    signature = index.signature
+
+    def recording_signature(text):
+        signature_threads.append(threading.current_thread())
+        return signature(text)
+
+    index.signature = recording_signature
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router", near_duplicates=index
+    )
+    script_agents(
+        pipeline.coordinator_agent,
+        {
+            "document_classifier": CLASSIFICATION,
+            "invoice_specialist": INVOICE,
+            "validation_specialist": VALIDATION,
+        },
+    )
+
+    result = await pipeline.process_document(_contract())
+
+    assert result.pipeline_status == "completed"
+    assert signature_threads
+    assert threading.main_thread() not in signature_threads
@@ -0,0 +1,142 @@
+from adk_data_extraction.normalization import DocumentNormalizer
+from conftest import CLASSIFICATION, INVOICE, VALIDATION, script_agents
+
+NOTICE = "This document is confidential and intended solely for the named recipient."
+
+PAGED_INVOICE = f"""ACME CORP    Page 1
+    INVOICE   INV-1
+
+{NOTICE}
+Bill to:    Globex    Corporation
+Total:	$500.00
+
+
+
+Signature: ____________________
+\fACME CORP    Page 2
+{NOTICE}
+
+Line items:   Widgets
+\fACME CORP    Page 3
+"""
+
+LINE_ITEMS = """ARTICLE 1
+Consulting hours  10  $1,500.00
+Consulting hours  12  $1,800.00
+ARTICLE 2
+Consulting hours  8  $1,200.00
+ARTICLE 3
+Total: $4,500.00
+"""
+
+
+def test_whitespace_is_collapsed_but_line_breaks_kept():
+    normalized = DocumentNormalizer().normalize("  Bill to:   Globex\n\tTotal:  $5  \n")
+
+    assert normalized.text == "Bill to: Globex\nTotal: $5"
+
+
+def test_headers_rules_and_boilerplate_are_removed():
+    normalized = DocumentNormalizer().normalize(PAGED_INVOICE)
+
+    assert "ACME CORP" not in normalized.text
+    assert normalized.text.count(NOTICE) == 1
+    assert "Signature: ___\n" in normalized.text
+    assert "\n\n\n" not in normalized.text
+    assert normalized.removed_lines == 3
+    assert normalized.deduplicated_paragraphs == 1
+
+    summary = normalized.summary()
+    assert summary.original_chars == len(PAGED_INVOICE)
+    assert summary.normalized_chars == len(normalized.text)
+    assert summary.tokens_saved > 0
+
+
+def test_repeated_body_lines_are_content_not_furniture():
+    normalized = DocumentNormalizer().normalize(LINE_ITEMS)
+    assert normalized.text.count("Consulting hours") == 3
+    assert normalized.removed_lines == 0
+
+    # Numbered headings at the top of each page are not page numbers
+    paged = "\f".join(
+        f"ACME CORP Page {n} of 3\nARTICLE {n}\n"
+        f"Consulting hours  {n}  $150.00\nConsulting hours  {n}  $150.00\n"
+        "Confidential"
+        for n in (1, 2, 3)
+    )
+    normalized = DocumentNormalizer().normalize(paged)
+
+    assert "ACME CORP" not in normalized.text
+    assert "Confidential" not in normalized.text
+    assert normalized.removed_lines == 6
+    for n in (1, 2, 3):
+        assert f"ARTICLE {n}" in normalized.text
+    assert normalized.text.count("Consulting hours") == 6
+
+
+def test_repeated_paragraphs_are_dropped_whole():
+    paragraph = (
+        "Payment is due within thirty days of the invoice date, net of any credits."
+    )
+    text = f"{paragraph}\n\nTotal: $5\n\n{paragraph}\n\nTotal: $6"
+
+    normalized = DocumentNormalizer().normalize(text)
+
+    assert normalized.text == f"{paragraph}\n\nTotal: $5\n\nTotal: $6"
+    assert normalized.deduplicated_paragraphs == 1
+
+
+def test_disabled_steps_leave_text_alone():
+    normalizer = DocumentNormalizer(
+        collapse_whitespace=False,
+        shorten_rules=False,
+        strip_repeated_lines=False,
+        dedupe_paragraphs=False,
+    )
+    text = "A   b\nSign: ______\n\nA   b\nSign: ______"
+
+    assert normalizer.normalize(text).text == text
+
+
+def test_offsets_map_back_to_the_original():
+    normalized = DocumentNormalizer().normalize(PAGED_INVOICE)
+
+    for needle in ("INVOICE", "Globex Corporation", "Widgets", "$500.00"):
+        start = normalized.text.index(needle)
+        original_start, original_end = normalized.original_span(
+            start, start + len(needle)
+        )
+        original = PAGED_INVOICE[original_start:original_end]
+        assert " ".join(original.split()) == needle
+    assert normalized.original_offset(len(normalized.text)) == len(PAGED_INVOICE)
+
+
+def test_fingerprint_tracks_settings():
+    assert DocumentNormalizer().fingerprint == DocumentNormalizer().fingerprint
+    assert (
+        DocumentNormalizer(min_line_repeats=2).fingerprint
+        != DocumentNormalizer().fingerprint
+    )
+
+
+async def test_pipeline_sends_normalized_text_and_reports_savings(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router", normalizer=DocumentNormalizer()
+    )
+    models = script_agents(
+        pipeline.coordinator_agent,
+        {
+            "document_classifier": CLASSIFICATION,
+            "invoice_specialist": INVOICE,
+            "validation_specialist": VALIDATION,
+        },
+    )
+
+    result = await pipeline.process_document(PAGED_INVOICE)
+
+    assert result.pipeline_status == "completed"
+    prompt = models["document_classifier"].prompts[0]
+    assert "Bill to: Globex Corporation" in prompt
+    assert "ACME CORP" not in prompt
+    assert result.normalization.removed_lines == 3
+    assert result.normalization.tokens_saved > 0
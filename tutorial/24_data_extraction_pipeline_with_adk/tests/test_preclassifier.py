@@ -0,0 +1,120 @@
+import time
+
+import pytest
+
+from adk_data_extraction.preclassifier import KeywordAutomaton, KeywordPreClassifier
+from conftest import INVOICE, VALIDATION, script_agents
+
+INVOICE_TEXT = """INVOICE
+Invoice Number: INV-1
+Bill To: Globex Corporation
+Due Date: 2024-04-01
+
+Line Item         Qty   Unit Price
+Widget              1      $100.00
+Subtotal: $100.00
+Amount Due: $110.00
+"""
+
+CONTRACT_TEXT = """SERVICE AGREEMENT
+This Agreement is entered into by and between the parties below, hereinafter
+referred to as the Client and the Provider. WHEREAS the Client requires services,
+the parties agree to the terms and conditions set out here. Governing law:
+Delaware. IN WITNESS WHEREOF the parties have executed this Agreement.
+"""
+
+
+def test_automaton_reports_overlapping_and_prefix_matches():
+    automaton = KeywordAutomaton(["invoice", "invoice number", "number", "to:"])
+    counts = automaton.count("Invoice Number 7; INVOICE; bill to: x; photo: y")
+
+    assert counts["invoice"] == 2
+    assert counts["invoice number"] == 1
+    assert counts["number"] == 1
+    # Keywords only start at word boundaries ("photo:" is not "to:")
+    assert counts["to:"] == 1
+
+
+def test_keywords_match_whole_words_and_stems_match_prefixes():
+    automaton = KeywordAutomaton(["report", "contract", "indemnif*", "dear "])
+    counts = automaton.count(
+        "Reporting to the contractor: Report. Indemnify; indemnification. Dear Jo"
+    )
+
+    assert counts["report"] == 1
+    assert counts["contract"] == 0
+    assert counts["indemnif*"] == 2
+    assert counts["dear "] == 1
+
+
+@pytest.mark.parametrize(
+    ("text", "document_type", "specialist"),
+    [
+        (INVOICE_TEXT, "invoice", "invoice_specialist"),
+        (CONTRACT_TEXT, "agreement", "contract_specialist"),
+    ],
+)
+def test_classifies_clear_documents_confidently(text, document_type, specialist):
+    pre_classifier = KeywordPreClassifier()
+    classification = pre_classifier.classify(text)
+
+    assert classification["document_type"] == document_type
+    assert classification["recommended_extractor"] == specialist
+    assert classification["key_indicators"]
+    assert pre_classifier.is_confident(classification)
+
+
+def test_weak_or_mixed_evidence_is_not_confident():
+    pre_classifier = KeywordPreClassifier()
+
+    assert not pre_classifier.is_confident(pre_classifier.classify("See invoice."))
+    assert pre_classifier.classify("Hello there")["document_type"] == "unknown"
+    mixed = pre_classifier.classify(INVOICE_TEXT + CONTRACT_TEXT)
+    assert not pre_classifier.is_confident(mixed)
+
+
+def test_scans_a_megabyte_in_one_fast_pass():
+    pre_classifier = KeywordPreClassifier()
+    text = (CONTRACT_TEXT * 4000)[: 1024 * 1024]
+
+    start = time.perf_counter()
+    classification = pre_classifier.classify(text)
+    elapsed = time.perf_counter() - start
+
+    assert classification["document_type"] == "agreement"
+    assert classification["complexity_level"] == "complex"
+    assert elapsed < 1.0
+
+
+@pytest.mark.parametrize("execution_mode", ["coordinator", "router"])
+async def test_confident_pre_classification_skips_classifier_agent(
+    pipeline_module, execution_mode
+):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode=execution_mode, pre_classifier=KeywordPreClassifier()
+    )
+    models = script_agents(
+        pipeline.coordinator_agent,
+        {"invoice_specialist": INVOICE, "validation_specialist": VALIDATION},
+    )
+
+    result = await pipeline.process_document(INVOICE_TEXT)
+
+    assert result.pipeline_status == "completed"
+    assert result.classification.document_type == "invoice"
+    assert "bill to" in result.classification.key_indicators
+    assert result.extracted_data.invoice_number == "INV-1"
+    assert models["document_classifier"].calls == 0
+    assert models["extraction_coordinator"].calls == 0
+    assert models["invoice_specialist"].calls == 1
+
+
+def test_pre_classifier_changes_config_hash(pipeline_module):
+    plain = pipeline_module.SmartDocumentExtractionPipeline()
+    strict = pipeline_module.SmartDocumentExtractionPipeline(
+        pre_classifier=KeywordPreClassifier(confidence_threshold=0.95)
+    )
+    loose = pipeline_module.SmartDocumentExtractionPipeline(
+        pre_classifier=KeywordPreClassifier(confidence_threshold=0.5)
+    )
+    assert len({plain.config_hash, strict.config_hash, loose.config_hash}) == 3
@@ -0,0 +1,162 @@
+import hashlib
+import time
+
+from adk_data_extraction.job_store import JobStore
+from adk_data_extraction.near_duplicates import NearDuplicateIndex
+from adk_data_extraction.result_cache import (
+    MemoryResultCache,
+    SQLiteResultCache,
+    TieredResultCache,
+    cache_key,
+    create_result_cache,
+    pipeline_config_hash,
+)
+from conftest import make_pipeline_result, script_agents
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryResultCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert len(cache) == 2
+
+
+def test_sqlite_cache_survives_reopen(tmp_path):
+    path = tmp_path / "results.db"
+    cache = SQLiteResultCache(path)
+    cache.set("key", "value")
+    cache.close()
+
+    reopened = SQLiteResultCache(path)
+    assert reopened.get("key") == "value"
+    assert reopened.total_bytes == len("value")
+
+
+def test_sqlite_cache_expires_entries(tmp_path, monkeypatch):
+    cache = SQLiteResultCache(tmp_path / "results.db", ttl_seconds=60)
+    cache.set("key", "value")
+
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+
+    assert cache.get("key") is None
+    assert len(cache) == 0
+    assert cache.total_bytes == 0
+
+
+def test_sqlite_cache_evicts_by_size(tmp_path):
+    cache = SQLiteResultCache(tmp_path / "results.db", max_bytes=10)
+    cache.set("old", "12345")
+    cache.set("newer", "12345")
+    cache.get("old")
+    cache.set("newest", "12345")
+
+    assert cache.get("newer") is None
+    assert cache.get("old") == "12345"
+    assert cache.get("newest") == "12345"
+    assert cache.total_bytes <= 10
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    disk = SQLiteResultCache(tmp_path / "results.db")
+    disk.set("key", "value")
+    cache = TieredResultCache(MemoryResultCache(), disk)
+
+    assert cache.get("key") == "value"
+    assert cache.memory.get("key") == "value"
+    assert isinstance(create_result_cache(tmp_path / "other.db"), TieredResultCache)
+    assert isinstance(create_result_cache(), MemoryResultCache)
+
+
+def test_tiered_cache_expires_memory_entries_with_the_disk_tier(tmp_path, monkeypatch):
+    disk = SQLiteResultCache(tmp_path / "results.db", ttl_seconds=60)
+    disk.set("promoted", "1")
+    cache = TieredResultCache(MemoryResultCache(), disk)
+    cache.set("written", "2")
+    assert cache.get("promoted") == "1"
+
+    later = time.time() + 120
+    monkeypatch.setattr(time, "time", lambda: later)
+
+    assert cache.get("promoted") is None
+    assert cache.get("written") is None
+    assert len(cache.memory) == 0
+
+
+def test_sqlite_cache_purges_expired_entries_periodically(tmp_path, monkeypatch):
+    cache = SQLiteResultCache(
+        tmp_path / "results.db", ttl_seconds=60, purge_interval=300
+    )
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache.set("old", "1")
+
+    now += 120
+    # Within purge_interval of the last purge: "old" expired but is kept
+    cache.set("new", "2")
+    assert len(cache) == 2
+    now += 240
+    cache.set("newest", "3")
+    assert len(cache) == 1
+    assert cache.total_bytes == 1
+    indexes = cache._conn.execute("PRAGMA index_list(results)").fetchall()
+    assert "results_created_at" in {index[1] for index in indexes}
+
+
+def test_config_hash_tracks_agent_configuration(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline()
+    extras = ("coordinator", None, None, None, None, None)
+    original = pipeline_config_hash(pipeline.coordinator_agent, *extras)
+    assert pipeline.config_hash == original
+
+    pipeline.coordinator_agent.sub_agents[0].instruction += " Be brief."
+    assert pipeline_config_hash(pipeline.coordinator_agent, *extras) != original
+
+
+async def test_pipeline_returns_cached_result_without_running_agents(pipeline_module):
+    cache = MemoryResultCache()
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(result_cache=cache)
+    pipeline.runner = None  # any agent call would fail
+
+    content = "From: a@example.com\nSubject: hello"
+    extraction_id = hashlib.md5(content.encode()).hexdigest()
+    stored = make_pipeline_result(pipeline_module, extraction_id)
+    cache.set(cache_key(extraction_id, pipeline.config_hash), stored.model_dump_json())
+
+    result = await pipeline.process_document(content)
+
+    assert result.pipeline_status == "completed"
+    assert result.extraction_id == extraction_id
+    assert result.extracted_data == stored.extracted_data
+    assert cache.hits == 1
+
+
+async def test_missing_agent_outputs_fail_without_being_stored(
+    tmp_path, pipeline_module
+):
+    cache = MemoryResultCache()
+    store = JobStore(tmp_path / "jobs.db")
+    index = NearDuplicateIndex()
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        result_cache=cache, job_store=store, near_duplicates=index
+    )
+    # The coordinator answers without handing off to any specialist
+    script_agents(pipeline.coordinator_agent, {"extraction_coordinator": "Done."})
+    content = "INVOICE INV-1\nTotal: $110"
+    extraction_id = hashlib.md5(content.encode()).hexdigest()
+
+    result = await pipeline.process_document(content)
+
+    assert result.pipeline_status == "failed"
+    assert result.extracted_data.summary == "No extraction output"
+    assert result.validation.recommendation == "manual_processing"
+    assert "No extraction output from the pipeline" in result.validation.issues
+    assert len(cache) == 0
+    assert store.record(extraction_id).state == "failed"
+    assert index.query(index.signature(content)) is None
@@ -0,0 +1,62 @@
+import pytest
+
+from adk_data_extraction.routing import select_specialist
+from conftest import CLASSIFICATION, INVOICE, VALIDATION, script_agents
+
+INVOICE_PATH = ["document_classifier", "invoice_specialist", "validation_specialist"]
+
+
+@pytest.mark.parametrize(
+    ("document_type", "specialist"),
+    [
+        ("contract", "contract_specialist"),
+        ("agreement", "contract_specialist"),
+        ("invoice", "invoice_specialist"),
+        ("email", "general_specialist"),
+        (None, "general_specialist"),
+    ],
+)
+def test_select_specialist(document_type, specialist):
+    assert select_specialist(document_type) == specialist
+
+
+def test_select_specialist_accepts_enum_members(pipeline_module):
+    assert select_specialist(pipeline_module.DocumentType.AGREEMENT) == (
+        "contract_specialist"
+    )
+
+
+async def test_router_mode_skips_coordinator(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router"
+    )
+    models = script_agents(
+        pipeline.coordinator_agent,
+        {
+            "document_classifier": CLASSIFICATION,
+            "invoice_specialist": INVOICE,
+            "validation_specialist": VALIDATION,
+        },
+    )
+
+    result = await pipeline.process_document("INVOICE INV-1\nBill To: Globex")
+
+    assert result.pipeline_status == "completed"
+    assert result.classification.document_type == "invoice"
+    assert isinstance(result.extracted_data, pipeline_module.InvoiceData)
+    assert result.extracted_data.invoice_number == "INV-1"
+    assert result.validation.completeness_score == 0.8
+    assert models["extraction_coordinator"].calls == 0
+    assert models["contract_specialist"].calls == 0
+    assert [models[name].calls for name in INVOICE_PATH] == [1, 1, 1]
+
+
+def test_unknown_execution_mode_is_rejected(pipeline_module):
+    with pytest.raises(ValueError):
+        pipeline_module.SmartDocumentExtractionPipeline(execution_mode="fast")
+
+
+def test_router_mode_changes_config_hash(pipeline_module):
+    coordinator = pipeline_module.SmartDocumentExtractionPipeline()
+    router = pipeline_module.SmartDocumentExtractionPipeline(execution_mode="router")
+    assert coordinator.config_hash != router.config_hash
@@ -0,0 +1,262 @@
+import asyncio
+
+import httpx
+import pytest
+from google.adk.agents import LlmAgent
+
+from adk_data_extraction.examples.basic_contact_extraction.schemas import ContactInfo
+from adk_data_extraction.service import (
+    AdmissionController,
+    AgentPipeline,
+    DocumentPipeline,
+    ExtractionService,
+    PipelineOutput,
+    QueueFull,
+    create_app,
+)
+from conftest import CLASSIFICATION, INVOICE, VALIDATION, ScriptedLlm, script_agents
+
+CONTACT = {"name": "Jane Doe", "email": "jane@acme.com", "company": "Acme"}
+
+
+class SlowPipeline:
+    """Pipeline double echoing the document after a delay"""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.documents = []
+
+    async def __call__(self, text):
+        self.documents.append(text)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return PipelineOutput(result={"length": len(text)})
+
+
+def _contact_pipeline():
+    model = ScriptedLlm(
+        model="scripted-contacts", responses=[ContactInfo(**CONTACT).model_dump_json()]
+    )
+    agent = LlmAgent(
+        model=model,
+        name="contact_extractor",
+        instruction="Extract the contact",
+        output_schema=ContactInfo,
+    )
+    return AgentPipeline(agent, "contacts_test"), model
+
+
+@pytest.fixture
+async def client_for():
+    """Start an app around an ExtractionService and return an HTTP client"""
+    contexts = []
+
+    async def start(service):
+        app = create_app(service)
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        )
+        contexts.append((lifespan, client))
+        return client
+
+    yield start
+    for lifespan, client in contexts:
+        await client.aclose()
+        await lifespan.__aexit__(None, None, None)
+
+
+async def test_documents_are_accepted_as_json_text_or_upload(client_for):
+    pipeline, model = _contact_pipeline()
+    client = await client_for(ExtractionService({"contacts": pipeline}))
+
+    responses = [
+        await client.post("/extract/contacts", json={"text": "Jane Doe, Acme"}),
+        await client.post("/extract/contacts", content="Jane Doe, Acme"),
+        await client.post(
+            "/extract/contacts", files={"file": ("mail.txt", b"Jane Doe, Acme")}
+        ),
+    ]
+
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    body = responses[2].json()
+    assert body["pipeline"] == "contacts"
+    assert body["result"]["email"] == "jane@acme.com"
+    assert set(body["stages"]) == {"contact_extractor"}
+    assert all("Jane Doe, Acme" in prompt for prompt in model.prompts)
+    # One warm runner; every request's session is cleaned up
+    assert pipeline.sessions.stats().created == 3
+    assert pipeline.sessions.stats().stored_sessions == 0
+
+
+async def test_missing_or_oversized_documents_are_rejected(client_for):
+    client = await client_for(
+        ExtractionService({"legal": SlowPipeline()}, max_document_bytes=10)
+    )
+
+    assert (await client.post("/analyze/legal", json={})).status_code == 422
+    assert (await client.post("/analyze/legal", content="x" * 11)).status_code == 413
+    assert (await client.post("/extract/contract", content="x")).status_code == 404
+
+
+async def test_oversized_bodies_are_rejected_before_they_are_read(client_for):
+    pipeline = SlowPipeline()
+    client = await client_for(
+        ExtractionService({"legal": pipeline}, max_document_bytes=10)
+    )
+    sent = []
+
+    async def chunks():
+        for chunk in [b"x" * 8] * 100:
+            sent.append(chunk)
+            yield chunk
+
+    streamed = await client.post("/analyze/legal", content=chunks())
+    # Reading stopped at the chunk crossing the limit
+    assert (streamed.status_code, len(sent)) == (413, 2)
+
+    sent.clear()
+    declared = await client.post(
+        "/analyze/legal", content=chunks(), headers={"content-length": "800"}
+    )
+    assert (declared.status_code, len(sent)) == (413, 0)
+
+    uploaded = await client.post(
+        "/analyze/legal", files={"file": ("big.txt", b"x" * 11)}
+    )
+    escaped = await client.post("/analyze/legal", json={"text": "line\n" * 2})
+    assert (uploaded.status_code, escaped.status_code) == (413, 200)
+    assert pipeline.documents == ["line\n" * 2]
+
+
+async def test_smart_pipeline_is_served(client_for, pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(execution_mode="router")
+    script_agents(
+        pipeline.coordinator_agent,
+        {
+            "document_classifier": CLASSIFICATION,
+            "invoice_specialist": INVOICE,
+            "validation_specialist": VALIDATION,
+        },
+    )
+    client = await client_for(ExtractionService({"smart": DocumentPipeline(pipeline)}))
+
+    response = await client.post("/pipeline/smart", json={"text": "INVOICE INV-1"})
+
+    assert response.status_code == 200
+    assert response.json()["result"]["pipeline_status"] == "completed"
+
+
+async def test_full_admission_queue_returns_429(client_for):
+    service = ExtractionService(
+        {"contract": SlowPipeline(delay=0.2)}, max_concurrency=1, max_queue=1
+    )
+    client = await client_for(service)
+
+    responses = await asyncio.gather(
+        *(client.post("/extract/contract", content=f"doc {n}") for n in range(3))
+    )
+
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200, 200, 429]
+    rejected = next(r for r in responses if r.status_code == 429)
+    assert rejected.headers["Retry-After"] == "1"
+    assert service.admission.stats().rejected == 1
+
+
+async def test_full_queue_rejects_before_the_body_is_read(client_for):
+    service = ExtractionService(
+        {"contract": SlowPipeline(delay=0.2)}, max_concurrency=1, max_queue=0
+    )
+    client = await client_for(service)
+    sent = []
+
+    async def body():
+        sent.append(b"doc")
+        yield b"doc"
+
+    running = asyncio.create_task(client.post("/extract/contract", content="doc 0"))
+    await asyncio.sleep(0.05)
+    rejected = await client.post("/extract/contract", content=body())
+
+    assert (rejected.status_code, sent) == (429, [])
+    assert (await running).status_code == 200
+    assert service.admission.stats().waiting == 0
+
+
+async def test_admission_controller_bounds_concurrency():
+    admission = AdmissionController(max_concurrency=2, max_queue=0)
+    async with admission.slot(), admission.slot():
+        assert admission.stats().in_flight == 2
+        with pytest.raises(QueueFull):
+            async with admission.slot():
+                pass
+
+        # Jobs wait instead of being rejected
+        waiter = asyncio.create_task(_hold(admission.slot(reject_when_full=False)))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+    await waiter
+    assert admission.stats().admitted == 3
+
+
+async def _hold(slot):
+    async with slot:
+        pass
+
+
+async def test_jobs_run_in_the_background(client_for):
+    pipeline = SlowPipeline(delay=0.05)
+    client = await client_for(ExtractionService({"legal": pipeline}))
+
+    submitted = await client.post("/jobs/legal", content="a long contract")
+    assert submitted.status_code == 202
+    job = submitted.json()
+    assert job["status"] == "queued"
+    assert submitted.headers["Location"] == f"/jobs/{job['job_id']}"
+
+    while job["status"] in ("queued", "running"):
+        await asyncio.sleep(0.01)
+        job = (await client.get(f"/jobs/{job['job_id']}")).json()
+
+    assert job["status"] == "completed"
+    assert job["response"]["result"] == {"length": 15}
+    assert (await client.get("/jobs/unknown")).status_code == 404
+    assert (await client.post("/jobs/smart", content="x")).status_code == 404
+
+
+async def test_failures_are_reported(client_for):
+    client = await client_for(
+        ExtractionService({"legal": SlowPipeline(fail=True)}, max_pending_jobs=1)
+    )
+
+    response = await client.post("/analyze/legal", content="contract")
+    assert response.status_code == 502
+    assert "model unavailable" in response.json()["detail"]
+
+    job = (await client.post("/jobs/legal", content="contract")).json()
+    assert (await client.post("/jobs/legal", content="contract")).status_code == 429
+    while job["status"] in ("queued", "running"):
+        await asyncio.sleep(0.01)
+        job = (await client.get(f"/jobs/{job['job_id']}")).json()
+    assert job["error"] == "RuntimeError: model unavailable"
+
+
+async def test_metrics_report_latency_histograms(client_for):
+    client = await client_for(ExtractionService({"contacts": SlowPipeline(delay=0.03)}))
+    for _ in range(3):
+        await client.post("/extract/contacts", content="Jane")
+
+    metrics = (await client.get("/metrics")).json()
+
+    histogram = metrics["endpoints"]["/extract/contacts"]
+    assert histogram["count"] == 3
+    assert histogram["errors"] == 0
+    assert 30 <= histogram["p50_ms"] <= histogram["p99_ms"]
+    assert histogram["buckets"]["10"] == 0
+    assert histogram["buckets"]["+Inf"] == 3
+    assert metrics["admission"]["admitted"] == 3
+    assert metrics["jobs"] == {}
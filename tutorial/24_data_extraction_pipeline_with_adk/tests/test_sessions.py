@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from google.adk.sessions import InMemorySessionService
+
+from adk_data_extraction.sessions import SessionArchive, SessionPool
+from conftest import CLASSIFICATION, INVOICE, VALIDATION, script_agents
+
+
+def _pool(**kwargs):
+    return SessionPool(InMemorySessionService(), app_name="test_app", **kwargs)
+
+
+async def test_sessions_get_unique_ids_and_are_deleted_on_close():
+    pool = _pool()
+    first = await pool.open("extraction_abc")
+    second = await pool.open("extraction_abc")
+
+    assert first != second
+    assert first.startswith("extraction_abc_")
+    assert pool.stats().stored_sessions == 2
+
+    await pool.close(first)
+    await pool.close(second)
+    await pool.close(second)  # closing twice is harmless
+
+    stats = pool.stats()
+    assert stats.live_sessions == 0
+    assert stats.stored_sessions == 0
+    assert stats.closed == 2
+    assert stats.peak_live_sessions == 2
+
+
+async def test_live_session_cap_evicts_least_recently_used():
+    pool = _pool(max_live_sessions=2)
+    oldest = await pool.open("doc")
+    newer = await pool.open("doc")
+    await pool.get(oldest)
+    await pool.open("doc")
+
+    assert await pool.get(newer) is None
+    assert await pool.get(oldest) is not None
+    stats = pool.stats()
+    assert stats.evicted == 1
+    assert stats.live_sessions == stats.stored_sessions == 2
+
+
+async def test_leased_sessions_are_not_evicted_and_new_runs_wait():
+    pool = _pool(max_live_sessions=2)
+    released = asyncio.Event()
+    scratch_ids = []
+
+    async def run():
+        async with pool.session("doc") as session_id:
+            # Scratch sessions of a running document go past the cap
+            async with pool.session("scratch") as scratch_id:
+                scratch_ids.append(scratch_id)
+                await released.wait()
+            return await pool.get(session_id)
+
+    runs = [asyncio.create_task(run()) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    # Two runs with their scratch sessions; the third waits
+    assert (pool.stats().live_sessions, len(scratch_ids)) == (4, 2)
+    released.set()
+
+    assert all(session is not None for session in await asyncio.gather(*runs))
+    stats = pool.stats()
+    assert (stats.evicted, stats.waits, stats.live_sessions) == (0, 1, 0)
+
+
+async def test_archive_receives_final_session_state():
+    archive = SessionArchive(max_entries=1)
+    pool = _pool(archive=archive)
+
+    async with pool.session("doc", state={"classification": {"document_type": "x"}}):
+        pass
+
+    assert archive.entries[0]["state"] == {"classification": {"document_type": "x"}}
+    assert pool.stats().archived == 1
+    assert pool.stats().stored_sessions == 0
+
+
+def test_rejects_non_positive_cap():
+    with pytest.raises(ValueError):
+        _pool(max_live_sessions=0)
+
+
+async def test_pipeline_footprint_stays_flat_across_resubmissions(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(execution_mode="router")
+    outputs = {
+        "document_classifier": CLASSIFICATION,
+        "invoice_specialist": INVOICE,
+        "validation_specialist": VALIDATION,
+    }
+    script_agents(pipeline.coordinator_agent, outputs)
+
+    for _ in range(3):
+        result = await pipeline.process_document("INVOICE INV-1\nBill To: Globex")
+        assert result.pipeline_status == "completed"
+
+    stats = pipeline.session_stats()
+    assert stats.created == stats.closed == 3
+    assert stats.live_sessions == stats.stored_sessions == 0
+    assert stats.peak_live_sessions == 1
@@ -0,0 +1,170 @@
+import csv
+import gzip
+import json
+
+import pytest
+
+from adk_data_extraction.examples.basic_contact_extraction.schemas import ContactInfo
+from adk_data_extraction.examples.sequential_contract_pipeline.schemas import (
+    ContractAnalysisResult,
+    ContractData,
+)
+from adk_data_extraction.sinks import (
+    CsvSink,
+    GzipJsonlSink,
+    JsonlSink,
+    flatten,
+    open_sink,
+)
+
+
+def _contacts(start, stop):
+    return [
+        ContactInfo(name=f"Person {n}", email=f"p{n}@example.com", company="Acme")
+        for n in range(start, stop)
+    ]
+
+
+def _read_jsonl(path):
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt") as file:
+        return [json.loads(line) for line in file]
+
+
+@pytest.mark.parametrize("name", ["out.jsonl", "out.jsonl.gz", "out.csv"])
+def test_open_sink_picks_the_format_from_the_file_name(tmp_path, name):
+    with open_sink(tmp_path / name) as sink:
+        sink.write_many(_contacts(0, 3))
+
+    assert sink.format == {"out.jsonl": "jsonl", "out.jsonl.gz": "jsonl.gz"}.get(
+        name, "csv"
+    )
+    assert [record["email"] for record in sink._existing()] == [
+        "p0@example.com",
+        "p1@example.com",
+        "p2@example.com",
+    ]
+
+
+def test_records_are_written_in_batches(tmp_path):
+    sink = JsonlSink(tmp_path / "out.jsonl", batch_size=2)
+
+    sink.write(_contacts(0, 1)[0], source="a.txt")
+    assert (tmp_path / "out.jsonl").read_text() == ""
+    sink.write(_contacts(1, 2)[0], source="b.txt")
+    assert len(_read_jsonl(tmp_path / "out.jsonl")) == 2
+    sink.write(_contacts(2, 3)[0])
+    sink.close()
+
+    records = _read_jsonl(tmp_path / "out.jsonl")
+    assert [record.get("source") for record in records] == ["a.txt", "b.txt", None]
+    assert sink.written == 3
+
+
+@pytest.mark.parametrize("sink_class", [JsonlSink, GzipJsonlSink, CsvSink])
+def test_append_resumes_after_a_crash(tmp_path, sink_class):
+    path = tmp_path / f"out.{sink_class.format}"
+    with sink_class(path, batch_size=2) as sink:
+        sink.write_many(_contacts(0, 4))
+    # A crash in the middle of writing the next batch
+    with path.open("ab") as file:
+        file.write(sink._encode([_contacts(4, 5)[0].model_dump()])[:-7])
+
+    with sink_class(path, append=True, key_field="email") as sink:
+        assert sink.completed_keys == {f"p{n}@example.com" for n in range(4)}
+        sink.write_many(
+            contact
+            for contact in _contacts(0, 6)
+            if contact.email not in sink.completed_keys
+        )
+
+    names = [record["name"] for record in sink._existing()]
+    assert names == [f"Person {n}" for n in range(6)]
+
+
+def test_csv_repair_keeps_only_complete_records(tmp_path):
+    path = tmp_path / "out.csv"
+    records = [
+        {"result": {"id": f"doc-{n}", "notes": f"line one\nline two {n}"}}
+        for n in range(3)
+    ]
+    with CsvSink(path) as sink:
+        sink.write_many(records[:2])
+    # A crash inside a quoted field, right after one of its newlines
+    with path.open("ab") as file:
+        file.write(sink._encode([records[2]]).split(b"\n")[0] + b"\n")
+
+    with CsvSink(path, append=True, key_field="result.id") as sink:
+        assert sink.completed_keys == {"doc-0", "doc-1"}
+        sink.write(records[2])
+
+    rows = list(sink._existing())
+    assert [row["result.id"] for row in rows] == ["doc-0", "doc-1", "doc-2"]
+    assert rows[2]["result.notes"] == "line one\nline two 2"
+
+
+def test_csv_projects_flat_fields(tmp_path):
+    result = ContractAnalysisResult(
+        contract_data=ContractData(
+            parties=["Acme", "Globex"],
+            contract_value=1200.0,
+            payment_terms=["net 30"],
+            key_obligations=[],
+        ),
+        processing_status="completed",
+        processing_time_ms=42,
+        validation_notes=["ok"],
+    )
+    assert "contract_data.parties" not in flatten(result.model_dump())
+
+    with CsvSink(tmp_path / "out.csv") as sink:
+        sink.write(result)
+        sink.write(
+            ContractAnalysisResult(processing_status="failed", processing_time_ms=1)
+        )
+
+    with (tmp_path / "out.csv").open(newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert rows[0]["contract_data.contract_value"] == "1200.0"
+    assert rows[0]["processing_status"] == "completed"
+    assert rows[1]["contract_data.contract_value"] == ""
+    assert "validation_notes" not in rows[0]
+
+
+def test_csv_header_grows_with_new_fields(tmp_path):
+    path = tmp_path / "out.csv"
+    with CsvSink(path, batch_size=1, key_field="index") as sink:
+        # A failed document first, then two document types
+        sink.write({"index": 0, "result": None, "error": "timeout"})
+        sink.write({"index": 1, "result": {"invoice_number": "INV-1"}})
+        sink.write({"index": 2, "result": {"parties": "Acme"}})
+    assert sink.completed_keys == {"0", "1", "2"}
+
+    with CsvSink(path, append=True, key_field="index") as sink:
+        assert sink.completed_keys == {"0", "1", "2"}
+        sink.write({"index": 3, "result": {"total_amount": 12.5}})
+
+    with path.open(newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["index"] for row in rows] == ["0", "1", "2", "3"]
+    assert rows[0]["error"] == "timeout"
+    assert rows[1]["result.invoice_number"] == "INV-1"
+    assert rows[2]["result.parties"] == "Acme"
+    assert rows[3]["result.total_amount"] == "12.5"
+    assert rows[3]["result.invoice_number"] == ""
+
+
+def test_csv_explicit_columns_project(tmp_path):
+    with CsvSink(tmp_path / "out.csv", columns=["name"]) as sink:
+        sink.write_many(_contacts(0, 2))
+
+    assert (tmp_path / "out.csv").read_text().splitlines() == [
+        "name",
+        "Person 0",
+        "Person 1",
+    ]
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="format must be one of"):
+        open_sink(tmp_path / "out.parquet", format="parquet")
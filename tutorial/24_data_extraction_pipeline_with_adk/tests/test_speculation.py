@@ -0,0 +1,84 @@
+import time
+
+from adk_data_extraction.preclassifier import KeywordPreClassifier
+from adk_data_extraction.speculation import SpeculationPolicy, SpeculationStats
+from conftest import CLASSIFICATION, INVOICE, VALIDATION, script_agents
+from test_preclassifier import CONTRACT_TEXT, INVOICE_TEXT
+
+CONTRACT = {"parties": ["Acme", "Globex"], "contract_value": 1000.0}
+
+
+def _pipeline(pipeline_module, policy, delay=0.0):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router", speculation=policy
+    )
+    models = script_agents(
+        pipeline.coordinator_agent,
+        {
+            "document_classifier": CLASSIFICATION,
+            "contract_specialist": CONTRACT,
+            "invoice_specialist": INVOICE,
+            "validation_specialist": VALIDATION,
+        },
+    )
+    for model in models.values():
+        model.delay = delay
+    return pipeline, models
+
+
+def test_policy_prefers_confident_heuristic_over_prior():
+    policy = SpeculationPolicy(pre_classifier=KeywordPreClassifier())
+
+    assert policy.predict(INVOICE_TEXT) == "invoice_specialist"
+    assert policy.predict(CONTRACT_TEXT) == "contract_specialist"
+    assert policy.predict("nothing to see") == "contract_specialist"
+    assert SpeculationPolicy(default_specialist=None).predict("x") is None
+
+
+def test_stats_report_hit_rate_and_savings():
+    stats = SpeculationStats()
+    stats.record_hit(40.0)
+    stats.record_hit(20.0)
+    stats.record_miss(15.0)
+
+    report = stats.report()
+    assert report.attempts == 3
+    assert report.hit_rate == 2 / 3
+    assert report.latency_saved_ms == 60.0
+    assert report.mean_latency_saved_ms == 30.0
+    assert report.wasted_ms == 15.0
+
+
+async def test_agreeing_classification_adopts_speculative_extraction(pipeline_module):
+    pipeline, models = _pipeline(
+        pipeline_module, SpeculationPolicy("invoice_specialist"), delay=0.1
+    )
+
+    started = time.perf_counter()
+    result = await pipeline.process_document("INVOICE INV-1")
+    elapsed = time.perf_counter() - started
+
+    assert result.pipeline_status == "completed"
+    assert result.extracted_data.invoice_number == "INV-1"
+    assert result.validation.completeness_score == 0.8
+    assert models["invoice_specialist"].calls == 1
+    assert models["validation_specialist"].calls == 1
+    # Classifier and specialist overlapped: three model calls in about two slots
+    assert elapsed < 0.25
+    report = pipeline.speculation_report()
+    assert (report.hits, report.misses) == (1, 0)
+    assert report.latency_saved_ms > 0
+    assert pipeline.session_stats().stored_sessions == 0
+
+
+async def test_disagreeing_classification_discards_speculative_run(pipeline_module):
+    pipeline, models = _pipeline(pipeline_module, SpeculationPolicy())
+
+    result = await pipeline.process_document("INVOICE INV-1")
+
+    assert result.pipeline_status == "completed"
+    assert isinstance(result.extracted_data, pipeline_module.InvoiceData)
+    assert models["invoice_specialist"].calls == 1
+    report = pipeline.speculation_report()
+    assert (report.hits, report.misses) == (0, 1)
+    assert pipeline.session_stats().stored_sessions == 0
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+from google.genai import types
+
+from adk_data_extraction.batch import BatchStats
+from adk_data_extraction.stage_metrics import StageAggregator, StageRecorder
+from conftest import CLASSIFICATION, INVOICE, VALIDATION, script_agents
+
+
+def _event(author, prompt_tokens=None, response_tokens=None):
+    usage = None
+    if prompt_tokens is not None:
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens, candidates_token_count=response_tokens
+        )
+    return SimpleNamespace(author=author, usage_metadata=usage)
+
+
+def test_recorder_attributes_events_to_authors():
+    recorder = StageRecorder()
+    recorder.observe(_event("document_classifier", 100, 10))
+    recorder.observe(_event("invoice_specialist", 200, None))
+    recorder.observe(_event("invoice_specialist"))
+
+    classifier, specialist = recorder.metrics()
+    assert classifier.agent == "document_classifier"
+    assert classifier.events == 1
+    assert classifier.prompt_tokens == 100
+    assert classifier.response_tokens == 10
+    assert specialist.events == 2
+    assert specialist.prompt_tokens == 200
+    assert specialist.response_tokens == 0
+    assert specialist.first_event_at <= specialist.last_event_at
+
+
+def test_aggregator_sums_runs_per_agent():
+    first, second = StageRecorder(), StageRecorder()
+    first.observe(_event("validation_specialist", 50, 5))
+    second.observe(_event("validation_specialist", 70, 7))
+    aggregator = StageAggregator()
+    aggregator.add(first.metrics())
+    aggregator.add(second.metrics())
+
+    totals = aggregator.report()["validation_specialist"]
+    assert totals.runs == 2
+    assert totals.prompt_tokens == 120
+    assert totals.response_tokens == 12
+    assert totals.mean_elapsed_ms == totals.total_elapsed_ms / 2
+
+
+async def test_pipeline_reports_stage_metrics_per_document_and_batch(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router"
+    )
+    script_agents(
+        pipeline.coordinator_agent,
+        {
+            "document_classifier": CLASSIFICATION,
+            "invoice_specialist": INVOICE,
+            "validation_specialist": VALIDATION,
+        },
+    )
+    stats = BatchStats()
+
+    results = [
+        result
+        async for result in pipeline.process_documents(
+            ["INVOICE INV-1", "INVOICE INV-2"], concurrency=2, stats=stats
+        )
+    ]
+
+    stages = results[0].stage_metrics
+    assert [stage.agent for stage in stages] == [
+        "document_classifier",
+        "invoice_specialist",
+        "validation_specialist",
+    ]
+    assert all(stage.prompt_tokens == 100 for stage in stages)
+    assert all(stage.response_tokens == 20 for stage in stages)
+
+    report = stats.report().stages
+    assert report["invoice_specialist"].runs == 2
+    assert report["invoice_specialist"].prompt_tokens == 200
+    assert pipeline.stage_report()["document_classifier"].runs == 2
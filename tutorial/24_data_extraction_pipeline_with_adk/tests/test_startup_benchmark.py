@@ -0,0 +1,127 @@
+import importlib
+import sys
+import types
+
+import pytest
+
+from adk_data_extraction.lazy import LazyAttributes, lazy_exports
+from adk_data_extraction.startup_benchmark import (
+    console_scripts,
+    measure_script,
+    package_self_times,
+    parse_importtime,
+    run_startup_benchmark,
+    save_run,
+)
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       277 |        277 |   _io
+/site-packages/x.py:1: DeprecationWarning: something
+import time:      1200 |       1200 |     google.genai.types
+import time:       300 |       1500 |   google.genai
+import time:       400 |        400 |   pydantic.main
+import time:       100 |       2000 | adk_data_extraction
+"""
+
+# Console scripts that must start without importing google-adk
+LIGHT_SCRIPTS = [
+    "adk-analyze-legal",
+    "adk-extract-contacts",
+    "adk-extract-directory",
+    "adk-sequential-contract",
+]
+
+
+def test_importtime_output_is_parsed_and_grouped():
+    timings = parse_importtime(IMPORTTIME)
+
+    assert [(t.module, t.depth) for t in timings] == [
+        ("_io", 1),
+        ("google.genai.types", 2),
+        ("google.genai", 1),
+        ("pydantic.main", 1),
+        ("adk_data_extraction", 0),
+    ]
+    assert timings[2].cumulative_us == 1500
+    assert package_self_times(timings).most_common(2) == [
+        ("google.genai", 1500),
+        ("pydantic", 400),
+    ]
+
+
+def test_every_console_script_is_found():
+    scripts = console_scripts()
+
+    assert set(LIGHT_SCRIPTS) <= set(scripts)
+    assert scripts["adk-extract-contacts"] == (
+        "adk_data_extraction.examples.basic_contact_extraction:main"
+    )
+
+
+@pytest.mark.parametrize("script", LIGHT_SCRIPTS)
+def test_console_scripts_start_without_google_adk(script):
+    result = measure_script(script, console_scripts()[script], repeat=1)
+
+    assert not result.imports_adk
+    assert result.modules < 1000
+    assert result.import_ms > 0
+
+
+def test_runs_are_saved_and_broken_entry_points_reported(tmp_path):
+    script = "adk-extract-contacts"
+    run = run_startup_benchmark({script: console_scripts()[script]}, repeat=1)
+    path = save_run(run, tmp_path)
+
+    assert path.name.startswith("startup-")
+    assert path.read_text().count('"script"') == 1
+    with pytest.raises(RuntimeError, match="cannot import"):
+        measure_script("missing", "adk_data_extraction.missing:main", repeat=1)
+
+
+def test_lazy_attributes_are_built_once_on_first_access(monkeypatch):
+    module = types.ModuleType("lazy_example")
+    monkeypatch.setitem(sys.modules, "lazy_example", module)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return {"root_agent": object()}
+
+    agents = LazyAttributes("lazy_example", build, names=("root_agent",))
+    module.__getattr__ = agents.getattr
+
+    assert not agents.built
+    with pytest.raises(AttributeError):
+        module.other  # noqa: B018
+    agent = module.root_agent
+    assert agents["root_agent"] is agent
+    assert vars(module)["root_agent"] is agent
+    assert builds == [1]
+
+
+def test_lazy_exports_import_on_first_use(monkeypatch):
+    package = types.ModuleType("lazy_package")
+    monkeypatch.setitem(sys.modules, "lazy_package", package)
+    package.__getattr__ = lazy_exports(
+        "lazy_package", {"dumps": "json:dumps", "json": "json"}
+    )
+
+    assert package.dumps is importlib.import_module("json").dumps
+    assert package.json is sys.modules["json"]
+    with pytest.raises(AttributeError):
+        package.loads  # noqa: B018
+
+
+def test_example_agents_are_still_module_attributes():
+    from adk_data_extraction.examples import basic_contact_extraction
+    from adk_data_extraction.examples.sequential_contract_pipeline import pipeline
+
+    assert basic_contact_extraction.contact_extractor.name == "contact_extractor"
+    assert basic_contact_extraction.agent.root_agent.name == "basic_contact_extraction"
+    assert pipeline.root_agent is pipeline.service_contract_pipeline
+    assert [agent.name for agent in pipeline.root_agent.sub_agents] == [
+        "ServiceDataExtractor",
+        "QualityValidator",
+        "SummaryReporter",
+    ]
@@ -0,0 +1,67 @@
+import asyncio
+
+from adk_data_extraction.preclassifier import KeywordPreClassifier
+from conftest import CLASSIFICATION, INVOICE, VALIDATION, script_agents
+from test_preclassifier import INVOICE_TEXT
+
+OUTPUTS = {
+    "document_classifier": CLASSIFICATION,
+    "invoice_specialist": INVOICE,
+    "validation_specialist": VALIDATION,
+}
+
+
+async def _collect(agen):
+    return [update async for update in agen]
+
+
+async def test_stream_yields_each_stage_then_final(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router"
+    )
+    script_agents(pipeline.coordinator_agent, OUTPUTS)
+
+    updates = await _collect(pipeline.process_document_stream("INVOICE INV-1"))
+
+    assert [update.stage for update in updates] == [
+        "classification",
+        "extraction",
+        "validation",
+        "final",
+    ]
+    classification, extraction, validation, final = updates
+    assert classification.classification.document_type == "invoice"
+    assert isinstance(extraction.extracted_data, pipeline_module.InvoiceData)
+    assert validation.validation.completeness_score == 0.8
+    assert final.result.pipeline_status == "completed"
+    assert final.result.extracted_data == extraction.extracted_data
+    assert classification.elapsed_ms <= final.elapsed_ms
+
+
+async def test_stream_publishes_pre_classification_first(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router", pre_classifier=KeywordPreClassifier()
+    )
+    models = script_agents(pipeline.coordinator_agent, OUTPUTS)
+
+    updates = await _collect(pipeline.process_document_stream(INVOICE_TEXT))
+
+    assert updates[0].stage == "classification"
+    assert "bill to" in updates[0].classification.key_indicators
+    assert updates[-1].stage == "final"
+    assert models["document_classifier"].calls == 0
+
+
+async def test_closing_the_stream_cancels_the_run(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router"
+    )
+    script_agents(pipeline.coordinator_agent, OUTPUTS)
+
+    stream = pipeline.process_document_stream("INVOICE INV-1")
+    first = await anext(stream)
+    await stream.aclose()
+    await asyncio.sleep(0)
+
+    assert first.stage == "classification"
+    assert pipeline.session_stats().live_sessions == 0
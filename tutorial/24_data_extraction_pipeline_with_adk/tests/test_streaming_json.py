@@ -0,0 +1,204 @@
+import json
+from collections.abc import AsyncGenerator
+
+import pytest
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from adk_data_extraction.examples.legal_document_analysis.analysis import (
+    LegalExtraction,
+)
+from adk_data_extraction.streaming_json import (
+    IncrementalJsonDecoder,
+    SchemaViolation,
+    StreamingJsonPolicy,
+    listen_for_fields,
+)
+from conftest import CLASSIFICATION, INVOICE, VALIDATION, ScriptedLlm
+
+OUTPUTS = {
+    "document_classifier": CLASSIFICATION,
+    "invoice_specialist": INVOICE,
+    "validation_specialist": VALIDATION,
+}
+
+LEGAL = {
+    "document_type": "contract",
+    "parties": ["Acme Corp", 'Globex "West" LLC'],
+    "key_dates": ["2024-01-01"],
+    "financial_terms": [
+        {"amount": 5000, "description": "Monthly fee", "due_date": None},
+        {"amount": 1.5e3, "currency": "EUR", "description": "Setup"},
+    ],
+    "obligations": [],
+    "governing_law": "Delaware",
+    "effective_date": "2024-01-01",
+    "expiration_date": None,
+}
+
+
+class ChunkedLlm(ScriptedLlm):
+    """ScriptedLlm streaming each response in small partial chunks"""
+
+    chunk_size: int = 8
+    chunks_sent: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        text = self.responses[min(self.calls, len(self.responses) - 1)]
+        self.calls += 1
+        for start in range(0, len(text), self.chunk_size):
+            self.chunks_sent += 1
+            yield LlmResponse(
+                content=types.Content(
+                    role="model",
+                    parts=[
+                        types.Part.from_text(text=text[start : start + self.chunk_size])
+                    ],
+                ),
+                partial=True,
+            )
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part.from_text(text=text)])
+        )
+
+
+def _decode(schema, text, chunk_size=5):
+    decoder = IncrementalJsonDecoder(schema)
+    completed = []
+    for start in range(0, len(text), chunk_size):
+        for key in decoder.feed(text[start : start + chunk_size]):
+            completed.append((key, decoder.complete))
+    return decoder, completed
+
+
+def test_fields_complete_before_the_object_closes(pipeline_module):
+    InvoiceData = pipeline_module.InvoiceData
+    decoder, completed = _decode(InvoiceData, json.dumps(INVOICE, indent=2), 1)
+
+    assert [key for key, _ in completed] == list(INVOICE)
+    assert not any(closed for _, closed in completed)
+    assert decoder.fields["total_amount"] == 110.0
+    assert decoder.result() == InvoiceData(**INVOICE)
+
+
+def test_nested_schema_is_decoded_field_by_field():
+    decoder, completed = _decode(LegalExtraction, json.dumps(LEGAL), chunk_size=3)
+
+    assert [key for key, _ in completed] == list(LEGAL)
+    assert decoder.fields["financial_terms"][1].currency == "EUR"
+    assert decoder.result().parties[1] == 'Globex "West" LLC'
+
+
+@pytest.mark.parametrize(
+    ("text", "position", "message"),
+    [
+        ("Here is the invoice: {", 0, "expected a JSON object"),
+        (
+            '{"invoice_number": "INV-1", "total_amount": [1',
+            44,
+            "cannot be a JSON array",
+        ),
+        ('{"invoice_number": "INV-1", "total_amount": "lots"', 44, "total_amount"),
+        ('{"invoice_number": "INV-1" "vendor_name"', 27, "expected ','"),
+        ('{"extra": nul}', 10, "invalid literal"),
+        ('{"extra": nil', 11, "invalid literal"),
+        ('{"line_items": ["a"}', 19, "expected ','"),
+    ],
+)
+def test_violations_are_raised_where_they_occur(
+    pipeline_module, text, position, message
+):
+    decoder = IncrementalJsonDecoder(pipeline_module.InvoiceData)
+
+    with pytest.raises(SchemaViolation, match=message) as raised:
+        for char in text:
+            decoder.feed(char)
+
+    assert raised.value.position == position
+    assert decoder.position <= len(text)
+
+
+def test_unfinished_or_incomplete_objects_are_rejected(pipeline_module):
+    decoder = IncrementalJsonDecoder(pipeline_module.InvoiceData)
+    decoder.feed('{"invoice_number": "INV-1", "extra": {"ignored": [1, 2]}')
+
+    with pytest.raises(SchemaViolation, match="before the JSON object closed"):
+        decoder.result()
+    decoder.feed("}")
+    with pytest.raises(SchemaViolation, match="Field required"):
+        decoder.result()
+    assert decoder.fields == {"invoice_number": "INV-1"}
+
+
+async def test_invalid_response_is_abandoned_and_retried(pipeline_module):
+    policy = StreamingJsonPolicy()
+    bad = '{"invoice_number": "INV-1", "total_amount": ["110"], ' + '"x": 1, ' * 50
+    inner = ChunkedLlm(model="chunked", responses=[bad, json.dumps(INVOICE)])
+    model = policy.wrap(inner, "invoice_specialist", pipeline_module.InvoiceData)
+    seen = []
+
+    with listen_for_fields(lambda *args: seen.append(args)):
+        responses = [r async for r in model.generate_content_async(LlmRequest())]
+
+    assert json.loads(responses[0].content.parts[0].text) == INVOICE
+    assert inner.chunks_sent < len(bad) // 8 + len(json.dumps(INVOICE)) // 8
+    assert seen[0] == ("invoice_specialist", 1, {"invoice_number": "INV-1"})
+    assert {attempt for _, attempt, _ in seen[1:]} == {2}
+    assert policy.wrap(model, "x", pipeline_module.InvoiceData).inner is inner
+    report = policy.report()
+    assert (report.calls, report.aborted, report.retries, report.failures) == (
+        1,
+        1,
+        1,
+        0,
+    )
+    assert report.aborted_chars == 44
+    # One from the abandoned response; the retry's last field ends with "}"
+    assert report.early_fields == 1 + len(INVOICE) - 1
+
+
+async def test_call_fails_once_every_attempt_is_invalid(pipeline_module):
+    policy = StreamingJsonPolicy(max_attempts=2)
+    inner = ChunkedLlm(model="chunked", responses=["I cannot help with that."])
+    model = policy.wrap(inner, "invoice_specialist", pipeline_module.InvoiceData)
+
+    with pytest.raises(SchemaViolation, match="expected a JSON object"):
+        async for _ in model.generate_content_async(LlmRequest()):
+            pass
+
+    assert inner.calls == 2
+    assert policy.report().failures == 1
+    with pytest.raises(ValueError):
+        StreamingJsonPolicy(max_attempts=0)
+
+
+async def test_stream_yields_fields_before_each_stage(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router", streaming_json=StreamingJsonPolicy()
+    )
+    root = pipeline.coordinator_agent
+    for agent in [root, *root.sub_agents]:
+        output = OUTPUTS.get(agent.name)
+        agent.model = ChunkedLlm(
+            model=f"chunked-{agent.name}",
+            responses=[] if output is None else [json.dumps(output)],
+        )
+    pipeline.streaming_json.apply(root)
+
+    updates = [u async for u in pipeline.process_document_stream("INVOICE INV-1")]
+
+    stages = [update.stage for update in updates]
+    assert stages[-1] == "final"
+    assert updates[-1].result.pipeline_status == "completed"
+    assert stages.index("fields") < stages.index("classification")
+    extraction = stages.index("extraction")
+    invoice_fields = {
+        key: value
+        for update in updates[:extraction]
+        if update.agent == "invoice_specialist"
+        for key, value in update.fields.items()
+    }
+    assert invoice_fields == INVOICE
+    assert pipeline.streaming_json_report().calls == 3
@@ -0,0 +1,133 @@
+import pytest
+
+from adk_data_extraction.pipeline import EXTRACTION_MODEL_BY_KEY, ValidationSummary
+from adk_data_extraction.validation_rules import RuleValidator, parse_amounts
+from conftest import CLASSIFICATION, INVOICE, VALIDATION, script_agents
+
+CONTRACT = {
+    "parties": ["TechCorp Solutions LLC", "Global Industries Inc."],
+    "contract_value": 125000.0,
+    "currency": "USD",
+    "start_date": "2024-04-01",
+    "end_date": "2025-04-30",
+    "payment_terms": [
+        "$35,000 upon contract execution",
+        "$40,000 upon completion of testing",
+        "$50,000 upon go-live",
+    ],
+    "key_obligations": ["Custom software development"],
+    "governing_law": "State of California",
+}
+
+
+def _validate(key, data):
+    return RuleValidator().validate(key, data, EXTRACTION_MODEL_BY_KEY[key])
+
+
+def test_parse_amounts_requires_currency_marker():
+    assert parse_amounts("$35,000 upon execution, Net 30, 1,200.50 EUR") == [
+        35000.0,
+        1200.5,
+    ]
+    assert parse_amounts("due 2024-04-01 for 30 days") == []
+
+
+def test_clean_contract_is_approved_without_llm():
+    validation = _validate("contract_extraction", CONTRACT)
+
+    assert validation.conclusive
+    assert validation.is_valid
+    assert validation.recommendation == "approved"
+    assert validation.completeness_score == 1.0
+    assert validation.confidence_score == 1.0
+    ValidationSummary(**validation.summary())
+
+
+@pytest.mark.parametrize(
+    ("changes", "issue"),
+    [
+        ({"start_date": "April 1, 2024"}, "not an ISO date"),
+        ({"end_date": "2024-01-01"}, "is not after start_date"),
+        ({"contract_value": 100000.0}, "payment terms sum to 125,000.00"),
+        ({"currency": "DOLLARS"}, "not an ISO 4217 code"),
+        ({"parties": ["TechCorp"]}, "fewer than two parties"),
+    ],
+)
+def test_contract_rule_failures_are_conclusive(changes, issue):
+    validation = _validate("contract_extraction", CONTRACT | changes)
+
+    assert validation.conclusive
+    assert not validation.is_valid
+    assert validation.recommendation == "review_needed"
+    assert any(issue in found for found in validation.issues)
+
+
+def test_percentage_schedule_and_missing_amounts():
+    by_percent = CONTRACT | {"payment_terms": ["50% on signing", "50% on delivery"]}
+    assert _validate("contract_extraction", by_percent).conclusive
+
+    vague = CONTRACT | {"payment_terms": ["Net 30 from invoice"]}
+    validation = _validate("contract_extraction", vague)
+    assert not validation.conclusive
+    assert validation.inconclusive_checks == ["payment terms without amounts"]
+
+
+def test_invoice_totals_are_checked():
+    invoice = INVOICE | {"invoice_date": "2024-03-01", "due_date": "2024-04-01"}
+    assert _validate("invoice_extraction", invoice).recommendation == ("approved")
+
+    wrong_total = invoice | {"total_amount": 150.0}
+    validation = _validate("invoice_extraction", wrong_total)
+    assert validation.conclusive
+    assert "do not match total_amount 150.00" in validation.issues[0]
+
+    no_prices = invoice | {"line_items": ["Widget"]}
+    assert not _validate("invoice_extraction", no_prices).conclusive
+
+
+def test_sparse_general_extraction_is_escalated():
+    sparse = {"document_title": "Memo", "summary": "Short note", "main_entities": []}
+    validation = _validate("general_extraction", sparse)
+
+    assert validation.is_valid
+    assert not validation.conclusive
+
+
+async def test_conclusive_rules_skip_validation_specialist(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router", rule_validator=RuleValidator()
+    )
+    models = script_agents(
+        pipeline.coordinator_agent,
+        {
+            "document_classifier": CLASSIFICATION,
+            "invoice_specialist": INVOICE,
+            "validation_specialist": VALIDATION,
+        },
+    )
+
+    result = await pipeline.process_document("INVOICE INV-1")
+
+    assert result.validation.recommendation == "approved"
+    assert result.validation.completeness_score == pytest.approx(7 / 9, abs=1e-3)
+    assert models["validation_specialist"].calls == 0
+    assert [stage.agent for stage in result.stage_metrics][-1] == "validation_rules"
+
+
+async def test_inconclusive_rules_escalate_to_validation_specialist(pipeline_module):
+    pipeline = pipeline_module.SmartDocumentExtractionPipeline(
+        execution_mode="router", rule_validator=RuleValidator()
+    )
+    models = script_agents(
+        pipeline.coordinator_agent,
+        {
+            "document_classifier": CLASSIFICATION,
+            "invoice_specialist": INVOICE | {"line_items": ["Widget"]},
+            "validation_specialist": VALIDATION,
+        },
+    )
+
+    result = await pipeline.process_document("INVOICE INV-1")
+
+    assert result.validation.completeness_score == 0.8
+    assert models["validation_specialist"].calls == 1